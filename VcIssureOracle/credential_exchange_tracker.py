@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 凭证交换状态机
+接收Issuer/Holder两端ACA-Py的 issue_credential_v2_0 webhook，
+按thread_id驱动每个凭证交换：状态一到达就立即触发 send-request / issue / store
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from vc_connection_manager import ConnectionManager
+
+
+logger = logging.getLogger('credential_exchange_tracker')
+
+
+# webhook主题
+TOPIC_ISSUE_CREDENTIAL_V2 = "issue_credential_v2_0"
+
+# 角色
+ROLE_ISSUER = "issuer"
+ROLE_HOLDER = "holder"
+
+
+def normalize_state(state: Optional[str]) -> Optional[str]:
+    """统一状态写法（request_sent -> request-sent）"""
+    return state.replace('_', '-') if state else state
+
+
+class ExchangeRecord:
+    """单个凭证交换（thread_id）的两端状态"""
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.issuer_cred_ex_id: Optional[str] = None
+        self.holder_cred_ex_id: Optional[str] = None
+        self.issuer_state: Optional[str] = None
+        self.holder_state: Optional[str] = None
+
+        # 是否由本Oracle发起（只对自己发起的交换触发动作）
+        self.tracked = False
+        # 已触发的动作，保证每个动作只触发一次
+        self.actions_done: Set[str] = set()
+
+        # 状态变化回调 on_state(role, state)（由 track() 设置，用于记录发行阶段）
+        self.on_state: Optional[Callable[[str, str], None]] = None
+
+        # 结果: None=进行中, True=完成, False=失败/废弃
+        self.result: Optional[bool] = None
+        self.completed: Optional[asyncio.Event] = None
+
+        self.created_at = time.monotonic()
+        self.updated_at = self.created_at
+
+    def to_dict(self) -> Dict:
+        """转换为字典（用于日志和调试）"""
+        return {
+            "thread_id": self.thread_id,
+            "issuer_cred_ex_id": self.issuer_cred_ex_id,
+            "holder_cred_ex_id": self.holder_cred_ex_id,
+            "issuer_state": self.issuer_state,
+            "holder_state": self.holder_state,
+            "actions_done": sorted(self.actions_done),
+            "result": self.result
+        }
+
+
+class CredentialExchangeTracker:
+    """
+    凭证交换状态机
+
+    状态转移（每个动作只触发一次）:
+    - Holder offer-received       -> Holder send-request
+    - Issuer request-received     -> Issuer issue
+    - Holder credential-received  -> Holder store
+    - Holder done / Issuer done   -> 完成
+    - 任一端 abandoned            -> 失败
+
+    webhook可能早于 track() 到达（发送Offer的响应返回前），
+    此时只记录状态，track() 时再补触发动作。
+    """
+
+    def __init__(self, connection_manager: ConnectionManager, max_records: int = 2000):
+        """
+        初始化状态机
+
+        参数:
+            connection_manager: vc_connection_manager.ConnectionManager（执行ACA-Py动作）
+            max_records: 最多保留的未跟踪记录数（超出时清理最旧的）
+        """
+        self.connection_manager = connection_manager
+        self.max_records = max_records
+        self._records: Dict[str, ExchangeRecord] = {}
+
+        self._stats = {
+            "events": 0,
+            "events_ignored": 0,
+            "actions": 0,
+            "action_failures": 0,
+            "completed": 0,
+            "failed": 0
+        }
+
+    def _get_record(self, thread_id: str) -> ExchangeRecord:
+        """获取（必要时创建）thread_id对应的记录"""
+        record = self._records.get(thread_id)
+        if record is None:
+            record = ExchangeRecord(thread_id)
+            self._records[thread_id] = record
+            self._prune()
+        return record
+
+    def _prune(self):
+        """未跟踪的记录过多时，清理最旧的"""
+        if len(self._records) <= self.max_records:
+            return
+        untracked = sorted(
+            (r for r in self._records.values() if not r.tracked),
+            key=lambda r: r.updated_at
+        )
+        for record in untracked[:len(self._records) - self.max_records]:
+            self._records.pop(record.thread_id, None)
+
+    def track(self, thread_id: str, issuer_cred_ex_id: Optional[str] = None,
+              on_state: Optional[Callable[[str, str], None]] = None) -> ExchangeRecord:
+        """
+        开始跟踪本Oracle发起的凭证交换
+
+        参数:
+            thread_id: 凭证交换thread_id（发送Offer的响应中返回）
+            issuer_cred_ex_id: Issuer端cred_ex_id
+            on_state: 状态变化回调 on_state(role, state)，track() 之前已到达的状态会立即回调
+        """
+        record = self._get_record(thread_id)
+        record.tracked = True
+        if record.completed is None:
+            record.completed = asyncio.Event()
+        if issuer_cred_ex_id:
+            record.issuer_cred_ex_id = issuer_cred_ex_id
+        if on_state is not None:
+            record.on_state = on_state
+            for role, state in ((ROLE_ISSUER, record.issuer_state), (ROLE_HOLDER, record.holder_state)):
+                if state:
+                    self._notify(record, role, state)
+        return record
+
+    def _notify(self, record: ExchangeRecord, role: str, state: str):
+        """调用状态变化回调（回调异常不影响状态机）"""
+        try:
+            record.on_state(role, state)
+        except Exception as e:
+            logger.warning(f"凭证交换 {record.thread_id}: 状态回调异常: {e}")
+
+    def untrack(self, thread_id: str):
+        """结束跟踪并删除记录"""
+        self._records.pop(thread_id, None)
+
+    async def handle_event(self, role: str, payload: Dict):
+        """
+        处理一条 issue_credential_v2_0 事件（webhook或轮询补偿）
+
+        参数:
+            role: 事件来源 issuer / holder
+            payload: cred_ex_record（含 thread_id、cred_ex_id、state）
+        """
+        cred_ex = payload.get('cred_ex_record', payload)
+        thread_id = cred_ex.get('thread_id')
+        state = normalize_state(cred_ex.get('state'))
+        if not thread_id or not state:
+            self._stats["events_ignored"] += 1
+            return
+
+        self._stats["events"] += 1
+        record = self._get_record(thread_id)
+        record.updated_at = time.monotonic()
+
+        if role == ROLE_ISSUER:
+            record.issuer_state = state
+            record.issuer_cred_ex_id = cred_ex.get('cred_ex_id') or record.issuer_cred_ex_id
+        elif role == ROLE_HOLDER:
+            record.holder_state = state
+            record.holder_cred_ex_id = cred_ex.get('cred_ex_id') or record.holder_cred_ex_id
+        else:
+            self._stats["events_ignored"] += 1
+            return
+
+        logger.debug(f"凭证交换事件: thread_id={thread_id}, {role}={state}")
+        if record.on_state is not None:
+            self._notify(record, role, state)
+
+        if record.tracked:
+            await self.advance(record)
+
+    async def advance(self, record: ExchangeRecord):
+        """根据当前两端状态触发下一步动作或结束交换"""
+        if record.result is not None:
+            return
+
+        if 'abandoned' in (record.issuer_state, record.holder_state):
+            self._finish(record, False)
+            return
+
+        if record.holder_state == 'done' or record.issuer_state == 'done':
+            self._finish(record, True)
+            return
+
+        cm = self.connection_manager
+
+        if record.holder_state == 'offer-received' and record.holder_cred_ex_id:
+            await self._run_action(record, 'send-request', cm.send_holder_request_v2, record.holder_cred_ex_id)
+
+        if record.issuer_state == 'request-received' and record.issuer_cred_ex_id:
+            await self._run_action(record, 'issue', cm.issue_credential_v2, record.issuer_cred_ex_id)
+
+        if record.holder_state == 'credential-received' and record.holder_cred_ex_id:
+            await self._run_action(record, 'store', cm.store_holder_credential_v2, record.holder_cred_ex_id)
+
+    async def _run_action(self, record: ExchangeRecord, action: str,
+                          func: Callable[[str], Awaitable[bool]], cred_ex_id: str):
+        """执行一次ACA-Py动作（同一交换的同一动作只执行一次，失败后允许重试）"""
+        if action in record.actions_done:
+            return
+        record.actions_done.add(action)
+        self._stats["actions"] += 1
+
+        logger.info(f"凭证交换 {record.thread_id}: 触发 {action} ({cred_ex_id})")
+        try:
+            ok = await func(cred_ex_id)
+        except Exception as e:
+            logger.warning(f"凭证交换 {record.thread_id}: {action} 异常: {e}")
+            ok = False
+
+        if not ok:
+            # 可能对端已自动完成该步骤；允许下一次事件或轮询补偿时重试
+            self._stats["action_failures"] += 1
+            record.actions_done.discard(action)
+
+    def _finish(self, record: ExchangeRecord, success: bool):
+        """记录交换结果并唤醒等待者"""
+        record.result = success
+        self._stats["completed" if success else "failed"] += 1
+        logger.info(f"凭证交换 {record.thread_id} {'完成' if success else '失败'}: {record.to_dict()}")
+        if record.completed is not None:
+            record.completed.set()
+
+    async def wait(self, thread_id: str, timeout: float,
+                   reconcile: Optional[Callable[[], Awaitable[Any]]] = None,
+                   reconcile_interval: float = 5.0) -> bool:
+        """
+        等待凭证交换结束
+
+        没有事件到达时每隔 reconcile_interval 调用一次 reconcile（轮询补偿），
+        代理未配置webhook时仍能完成流程。
+
+        参数:
+            thread_id: 凭证交换thread_id
+            timeout: 总超时（秒）
+            reconcile: 轮询补偿协程函数（查询两端状态并调用 handle_event）
+            reconcile_interval: 补偿间隔（秒）
+
+        返回:
+            交换成功完成返回True，失败、废弃或超时返回False
+        """
+        record = self._records.get(thread_id)
+        if record is None or record.completed is None:
+            record = self.track(thread_id)
+
+        # 处理 track() 之前已到达的事件
+        await self.advance(record)
+
+        deadline = time.monotonic() + timeout
+        while record.result is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"凭证交换超时({timeout}秒): {record.to_dict()}")
+                return False
+            try:
+                await asyncio.wait_for(record.completed.wait(), timeout=min(reconcile_interval, remaining))
+            except asyncio.TimeoutError:
+                if reconcile is not None:
+                    try:
+                        await reconcile()
+                    except Exception as e:
+                        logger.warning(f"凭证交换 {thread_id} 轮询补偿失败: {e}")
+
+        return bool(record.result)
+
+    def get_stats(self) -> Dict:
+        """获取状态机统计"""
+        return {
+            "records": len(self._records),
+            "in_progress": sum(1 for r in self._records.values() if r.tracked and r.result is None),
+            **self._stats
+        }
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - gunicorn配置
+
+    cd VcIssureOracle && gunicorn -c gunicorn.conf.py
+
+监听地址、worker数量从 vc_issuance_config.json 读取:
+    service.host / service.port          监听地址（默认 0.0.0.0:6000）
+    service.workers.count                worker进程数（默认CPU核数，最多8）
+    service.workers.threads              每个worker的请求线程数（发行请求在线程中等待异步结果）
+    service.request_timeout_seconds      请求超时（worker超时在此基础上留出余量）
+
+不使用 preload_app：事件循环线程、aiohttp会话和SQLite连接都必须在fork之后创建。
+"""
+
+import json
+import multiprocessing
+from pathlib import Path
+
+_config_path = Path(__file__).parent / "vc_issuance_config.json"
+try:
+    _service_config = json.loads(_config_path.read_text(encoding='utf-8')).get('service', {})
+except (OSError, ValueError):
+    _service_config = {}
+_workers_config = _service_config.get('workers', {})
+
+chdir = str(Path(__file__).parent)
+wsgi_app = "wsgi:create_app()"
+bind = f"{_service_config.get('host', '0.0.0.0')}:{_service_config.get('port', 6000)}"
+workers = _workers_config.get('count', min(multiprocessing.cpu_count(), 8))
+worker_class = "gthread"
+threads = _workers_config.get('threads', 32)
+timeout = _service_config.get('request_timeout_seconds', 300) + 30
+graceful_timeout = 30
+preload_app = False
+
+
+def worker_exit(server, worker):
+    """worker退出前停止发行核心（未完成的任务保留在任务存储中，由其他worker或下次启动接管）"""
+    import vc_issuance_oracle
+    if vc_issuance_oracle.async_core is not None:
+        try:
+            vc_issuance_oracle.run_async(vc_issuance_oracle.async_core.stop(), timeout=graceful_timeout)
+        except Exception as e:
+            server.log.warning(f"worker {worker.pid} 停止发行核心失败: {e}")
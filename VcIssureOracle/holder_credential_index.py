@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - Holder凭证本地索引
+在内存中维护Holder钱包凭证的索引（按Date排序、按contractName查找），
+/credentials 的分页、计数、日期范围和分组查询直接由索引回答，不再每次全量拉取。
+
+索引更新来源:
+- Holder的 issue_credential_v2_0 / issue_credential_v2_0_indy webhook（新凭证存储后立即加入）
+- 本Oracle发行成功后按UUID查到的凭证
+- 周期性同步：分页拉取全部凭证，只对新增/删除/变化的凭证修改索引
+
+多worker部署时只有主worker（vc_issuance_workers.LeaderElection）执行周期同步，并把结果写入协调目录中的快照；
+其他worker读取更新后的快照，新凭证仍通过 WebhookRelay 转发的webhook即时加入。
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('holder_credential_index')
+
+
+# webhook主题
+TOPIC_ISSUE_CREDENTIAL_V2_INDY = "issue_credential_v2_0_indy"
+
+# 多worker部署时检查快照/主worker身份的最长间隔（秒）
+SNAPSHOT_POLL_SECONDS = 5
+
+
+def _sort_date(cred: Dict) -> str:
+    """排序用的Date值（缺失时为空字符串）"""
+    return cred.get('attrs', {}).get('Date', '') or ''
+
+
+def _group_date(cred: Dict) -> str:
+    """分组用的Date值（缺失时为unknown，与原分组统计一致）"""
+    return cred.get('attrs', {}).get('Date', 'unknown')
+
+
+class HolderCredentialIndex:
+    """
+    Holder凭证索引
+
+    读取在Flask线程中进行，写入在后台事件循环中进行，统一由 threading.Lock 保护。
+    """
+
+    def __init__(self, async_core: "AsyncVCIssuanceCore", sync_interval: float = 300, page_size: int = 1000):
+        """
+        初始化索引
+
+        参数:
+            async_core: 异步发行核心（提供Holder管理URL和共享会话）
+            sync_interval: 周期同步间隔（秒）
+            page_size: 同步时每页拉取的凭证数（ACA-Py start/count）
+        """
+        self.async_core = async_core
+        self.holder_admin_url = async_core.holder_admin_url
+        self.sync_interval = sync_interval
+        self.page_size = page_size
+
+        self._lock = threading.Lock()
+        self._by_referent: Dict[str, Dict] = {}
+        self._by_contract: Dict[str, str] = {}     # contractName -> referent
+        self._sorted: List[Tuple[str, str]] = []   # (Date, referent) 升序
+        self._date_counts: Counter = Counter()
+
+        # 通过webhook加入的凭证及时间（晚于快照拉取开始的不能因不在快照中而删除）
+        self._touched: Dict[str, float] = {}
+
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+        self._synced_at: Optional[float] = None     # 本进程上次全量同步（monotonic）
+        self._snapshot_mtime: Optional[float] = None
+        self._stats = {
+            "syncs": 0,
+            "snapshot_loads": 0,
+            "last_sync_at": None,
+            "last_sync_seconds": None,
+            "last_sync_added": 0,
+            "last_sync_removed": 0,
+            "webhook_updates": 0,
+            "last_error": None
+        }
+
+    # ==================== 生命周期 ====================
+
+    async def start(self):
+        """启动后台同步任务（首次同步在任务中立即执行）"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sync_loop())
+            logger.info(f"Holder凭证索引已启动，同步间隔: {self.sync_interval}秒")
+
+    async def stop(self):
+        """停止后台同步任务"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Holder凭证索引已停止")
+
+    @property
+    def _coordination(self):
+        return self.async_core.coordination
+
+    def _is_leader(self) -> bool:
+        """是否负责全量同步（单进程部署或主worker）"""
+        return self._coordination is None or self._coordination.is_leader
+
+    async def _sync_loop(self):
+        """后台同步循环（主worker按 sync_interval 全量同步，其他worker读取快照）"""
+        poll_interval = self.sync_interval
+        if self._coordination is not None:
+            poll_interval = min(self.sync_interval, SNAPSHOT_POLL_SECONDS)
+        while True:
+            try:
+                if not self._is_leader():
+                    await self._load_snapshot()
+                elif self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_interval:
+                    await self.sync()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._stats["last_error"] = str(e)
+                logger.error(f"Holder凭证同步失败: {e}", exc_info=True)
+            try:
+                await asyncio.sleep(poll_interval)
+            except asyncio.CancelledError:
+                break
+
+    # ==================== 索引维护 ====================
+
+    def _remove_locked(self, referent: str):
+        """删除一条凭证（调用方持有锁）"""
+        cred = self._by_referent.pop(referent, None)
+        if cred is None:
+            return
+        key = (_sort_date(cred), referent)
+        pos = bisect.bisect_left(self._sorted, key)
+        if pos < len(self._sorted) and self._sorted[pos] == key:
+            del self._sorted[pos]
+        self._date_counts[_group_date(cred)] -= 1
+        if self._date_counts[_group_date(cred)] <= 0:
+            del self._date_counts[_group_date(cred)]
+        contract_name = cred.get('attrs', {}).get('contractName')
+        if contract_name and self._by_contract.get(contract_name) == referent:
+            del self._by_contract[contract_name]
+
+    def _upsert_locked(self, cred: Dict) -> bool:
+        """加入或更新一条凭证（调用方持有锁），返回是否有变化"""
+        referent = cred.get('referent')
+        if not referent:
+            return False
+        existing = self._by_referent.get(referent)
+        if existing == cred:
+            return False
+        if existing is not None:
+            self._remove_locked(referent)
+
+        self._by_referent[referent] = cred
+        bisect.insort(self._sorted, (_sort_date(cred), referent))
+        self._date_counts[_group_date(cred)] += 1
+        contract_name = cred.get('attrs', {}).get('contractName')
+        if contract_name:
+            self._by_contract[contract_name] = referent
+        return True
+
+    def upsert(self, cred: Dict):
+        """加入或更新一条凭证"""
+        with self._lock:
+            self._upsert_locked(cred)
+            if cred.get('referent'):
+                self._touched[cred['referent']] = time.time()
+
+    def remove(self, referent: str):
+        """删除一条凭证"""
+        with self._lock:
+            self._remove_locked(referent)
+
+    # ==================== 同步 ====================
+
+    async def _fetch_all(self) -> Dict[str, Dict]:
+        """分页拉取Holder全部凭证"""
+        credentials: Dict[str, Dict] = {}
+        start = 0
+        while True:
+            data = await self.async_core._get_json(
+                f"{self.holder_admin_url}/credentials",
+                params={"start": start, "count": self.page_size}
+            )
+            if data is None:
+                raise Exception("获取Holder凭证失败")
+            page = data.get('results', [])
+            for cred in page:
+                if cred.get('referent'):
+                    credentials[cred['referent']] = cred
+            if len(page) < self.page_size:
+                return credentials
+            start += self.page_size
+
+    def _apply_snapshot(self, snapshot: Dict[str, Dict], fetched_at: float) -> Tuple[int, int, int]:
+        """
+        用全量快照更新索引（只修改有差异的凭证）
+
+        参数:
+            snapshot: referent -> 凭证
+            fetched_at: 快照开始拉取的时间（time.time()），此后通过webhook加入的凭证保留
+
+        返回:
+            (新增/更新数, 删除数, 总数)
+        """
+        with self._lock:
+            self._touched = {r: t for r, t in self._touched.items() if t >= fetched_at}
+            removed = [r for r in self._by_referent if r not in snapshot and r not in self._touched]
+            for referent in removed:
+                self._remove_locked(referent)
+            added = sum(1 for cred in snapshot.values() if self._upsert_locked(cred))
+            total = len(self._by_referent)
+        self.ready = True
+        return added, len(removed), total
+
+    async def sync(self) -> Dict:
+        """
+        与Holder钱包同步（只修改有差异的凭证）；多worker部署时同时写出共享快照
+
+        返回:
+            {"added": int, "removed": int, "total": int}
+        """
+        started = time.monotonic()
+        fetched_at = time.time()
+        snapshot = await self._fetch_all()
+        added, removed, total = self._apply_snapshot(snapshot, fetched_at)
+        self._synced_at = time.monotonic()
+
+        if self._coordination is not None:
+            await self.async_core._run_blocking(
+                self._write_snapshot, self._coordination.credential_snapshot_path, snapshot, fetched_at
+            )
+
+        elapsed = time.monotonic() - started
+        self._stats.update({
+            "syncs": self._stats["syncs"] + 1,
+            "last_sync_at": datetime.now().isoformat(),
+            "last_sync_seconds": round(elapsed, 3),
+            "last_sync_added": added,
+            "last_sync_removed": removed,
+            "last_error": None
+        })
+        if added or removed:
+            logger.info(f"Holder凭证同步完成: 新增/更新 {added}, 删除 {removed}, 共 {total}, 耗时 {elapsed:.2f}秒")
+        return {"added": added, "removed": removed, "total": total}
+
+    @staticmethod
+    def _write_snapshot(path: Path, snapshot: Dict[str, Dict], fetched_at: float):
+        """写出共享快照（先写临时文件再替换，读取方不会看到写了一半的文件）"""
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        content = {"synced_at": fetched_at, "credentials": list(snapshot.values())}
+        tmp_path.write_text(json.dumps(content, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_snapshot(path: Path) -> Optional[Tuple[float, Dict]]:
+        """读取共享快照，返回 (修改时间, 内容)；文件不存在时返回None"""
+        try:
+            mtime = path.stat().st_mtime
+            return mtime, json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+
+    async def _load_snapshot(self):
+        """非主worker: 主worker写出新快照后载入"""
+        path = self._coordination.credential_snapshot_path
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if self._snapshot_mtime is not None and mtime <= self._snapshot_mtime:
+            return
+
+        result = await self.async_core._run_blocking(self._read_snapshot, path)
+        if result is None:
+            return
+        mtime, content = result
+        snapshot = {cred['referent']: cred for cred in content.get('credentials', []) if cred.get('referent')}
+        added, removed, total = self._apply_snapshot(snapshot, content.get('synced_at', 0))
+        self._snapshot_mtime = mtime
+        self._stats.update({
+            "snapshot_loads": self._stats["snapshot_loads"] + 1,
+            "last_sync_at": datetime.fromtimestamp(content.get('synced_at', mtime)).isoformat(),
+            "last_sync_added": added,
+            "last_sync_removed": removed,
+            "last_error": None
+        })
+        if added or removed:
+            logger.info(f"载入Holder凭证快照: 新增/更新 {added}, 删除 {removed}, 共 {total}")
+
+    async def refresh_credential(self, cred_id: str):
+        """按凭证ID从Holder获取一条凭证并加入索引"""
+        cred = await self.async_core._get_json(f"{self.holder_admin_url}/credential/{cred_id}")
+        if cred:
+            self.upsert(cred)
+            self._stats["webhook_updates"] += 1
+
+    async def handle_webhook(self, topic: str, payload: Dict):
+        """
+        处理Holder的凭证交换webhook
+
+        - issue_credential_v2_0_indy: 含 cred_id_stored，直接获取该凭证
+        - issue_credential_v2_0 且 state=done: 查询交换记录得到 cred_id_stored
+        """
+        try:
+            cred_id = payload.get('cred_id_stored')
+            if not cred_id and topic != TOPIC_ISSUE_CREDENTIAL_V2_INDY:
+                cred_ex = payload.get('cred_ex_record', payload)
+                if cred_ex.get('state') != 'done' or not cred_ex.get('cred_ex_id'):
+                    return
+                record = await self.async_core._get_json(
+                    f"{self.holder_admin_url}/issue-credential-2.0/records/{cred_ex['cred_ex_id']}"
+                )
+                cred_id = ((record or {}).get('indy') or {}).get('cred_id_stored')
+            if cred_id:
+                await self.refresh_credential(cred_id)
+        except Exception as e:
+            logger.warning(f"处理凭证webhook失败: {e}")
+
+    # ==================== 查询 ====================
+
+    def count(self) -> int:
+        """凭证总数"""
+        return len(self._by_referent)
+
+    def _referents(self, descending: bool) -> List[str]:
+        """按Date排序的referent列表（调用方持有锁）"""
+        referents = [referent for _, referent in self._sorted]
+        return referents[::-1] if descending else referents
+
+    def page(self, start: int = 0, count: int = 1000, descending: bool = True) -> List[Dict]:
+        """按Date排序分页"""
+        with self._lock:
+            if descending:
+                end = len(self._sorted) - start
+                window = self._sorted[max(end - count, 0):max(end, 0)][::-1]
+            else:
+                window = self._sorted[start:start + count]
+            return [self._by_referent[referent] for _, referent in window]
+
+    def sorted_by_date(self, descending: bool = True) -> List[Dict]:
+        """全部凭证按Date排序"""
+        with self._lock:
+            return [self._by_referent[referent] for referent in self._referents(descending)]
+
+    def by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
+        """Date在 [start_date, end_date] 范围内的凭证（按Date升序）"""
+        with self._lock:
+            lo = bisect.bisect_left(self._sorted, (start_date, ''))
+            hi = bisect.bisect_right(self._sorted, (end_date, '\uffff'))
+            return [self._by_referent[referent] for _, referent in self._sorted[lo:hi]]
+
+    def grouped_by_date(self) -> List[Dict]:
+        """按Date分组计数（按日期降序）"""
+        with self._lock:
+            result = [{"Date": date, "count": count} for date, count in self._date_counts.items()]
+        result.sort(key=lambda x: x['Date'], reverse=True)
+        return result
+
+    def get_by_contract_name(self, contract_name: str) -> Optional[Dict]:
+        """按contractName（发行时的UUID）查找凭证"""
+        with self._lock:
+            referent = self._by_contract.get(contract_name)
+            return self._by_referent.get(referent) if referent else None
+
+    def get_stats(self) -> Dict:
+        """获取索引统计"""
+        return {"ready": self.ready, "leader": self._is_leader(), "credentials": self.count(), **self._stats}
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 发行任务持久化
+每个发行请求作为一条任务记录保存在SQLite（WAL模式）中，记录当前所处阶段及各阶段产出
+（cred_ex_id、thread_id、vc_hash、tx_hash ...）。进程重启后未完成的任务从最后阶段继续，
+不会重新发送Offer、重复颁发凭证或重复上链。
+多worker部署时各进程共享同一数据库，任务记录所属进程（owner_pid），只有所属进程已退出的任务才会被接管。
+
+阶段顺序:
+    created -> offer_sent -> holder_requested -> issued -> stored -> anchored -> completed
+    任一阶段出错 -> failed
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger('issuance_job_store')
+
+
+DEFAULT_JOB_STORE_PATH = './logs/issuance_jobs.db'
+
+# 阶段
+STAGE_CREATED = "created"                    # 已受理，UUID已生成，Offer尚未发送
+STAGE_OFFER_SENT = "offer_sent"              # Offer已发送（cred_ex_id/thread_id已知）
+STAGE_HOLDER_REQUESTED = "holder_requested"  # Holder已发送凭证请求
+STAGE_ISSUED = "issued"                      # Issuer已颁发凭证
+STAGE_STORED = "stored"                      # Holder已存储凭证（UUID已验证）
+STAGE_ANCHORED = "anchored"                  # 上链交易已提交（tx_hash已知）
+STAGE_COMPLETED = "completed"                # 全部完成（UUID已登记）
+STAGE_FAILED = "failed"
+
+STAGES = (STAGE_CREATED, STAGE_OFFER_SENT, STAGE_HOLDER_REQUESTED, STAGE_ISSUED,
+          STAGE_STORED, STAGE_ANCHORED, STAGE_COMPLETED)
+FINAL_STAGES = (STAGE_COMPLETED, STAGE_FAILED)
+
+# 凭证交换状态 -> 阶段（webhook状态机和轮询补偿共用）
+_EXCHANGE_STAGES = {
+    ("holder", "request-sent"): STAGE_HOLDER_REQUESTED,
+    ("issuer", "request-received"): STAGE_HOLDER_REQUESTED,
+    ("issuer", "credential-issued"): STAGE_ISSUED,
+    ("holder", "credential-received"): STAGE_ISSUED,
+}
+
+# JSON序列化保存的字段
+_JSON_FIELDS = ("metadata", "attributes")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issuance_job (
+    request_id TEXT PRIMARY KEY,
+    vc_type TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    attributes TEXT NOT NULL,
+    original_contract_name TEXT,
+    vc_uuid TEXT,
+    async_anchor INTEGER,
+    idempotency_key TEXT,
+    connection_id TEXT,
+    cred_ex_id TEXT,
+    thread_id TEXT,
+    vc_hash TEXT,
+    tx_hash TEXT,
+    block_number INTEGER,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_issuance_job_stage ON issuance_job (stage, created_at);
+"""
+
+# 建表之后新增的列（旧数据库启动时补齐）
+_ADDED_COLUMNS = {
+    "idempotency_key": "TEXT",
+    "owner_pid": "INTEGER"
+}
+_ADDED_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_issuance_job_idempotency ON issuance_job (idempotency_key, created_at)",
+)
+
+
+def stage_for_exchange_state(role: str, state: Optional[str]) -> Optional[str]:
+    """凭证交换状态对应的发行阶段（不对应任何阶段时返回None）"""
+    if not state:
+        return None
+    return _EXCHANGE_STAGES.get((role, state.replace('_', '-')))
+
+
+def stage_reached(current: str, stage: str) -> bool:
+    """current 是否已到达（或越过）stage"""
+    if current not in STAGES or stage not in STAGES:
+        return False
+    return STAGES.index(current) >= STAGES.index(stage)
+
+
+class IssuanceJobStore:
+    """
+    发行任务存储
+
+    每个线程使用独立的SQLite连接；写入通过进程内锁串行化。
+    阶段只前进不后退（update_stage 对已越过的阶段不做修改）。
+    """
+
+    def __init__(self, db_path: str = DEFAULT_JOB_STORE_PATH):
+        """
+        初始化任务存储（数据库不存在时自动创建）
+
+        参数:
+            db_path: SQLite数据库路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(issuance_job)")}
+        for column, column_type in _ADDED_COLUMNS.items():
+            if column not in columns:
+                conn.execute(f"ALTER TABLE issuance_job ADD COLUMN {column} {column_type}")
+        for statement in _ADDED_INDEXES:
+            conn.execute(statement)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """数据库行 -> 任务字典"""
+        job = {key: row[key] for key in row.keys()}
+        for field in _JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] else {}
+        if job["async_anchor"] is not None:
+            job["async_anchor"] = bool(job["async_anchor"])
+        return job
+
+    # ==================== 写入 ====================
+
+    def create(self, request_id: str, vc_type: str, metadata: Dict, attributes: Dict,
+               original_contract_name: str, vc_uuid: str, async_anchor: Optional[bool],
+               idempotency_key: Optional[str] = None) -> Dict:
+        """
+        创建任务（阶段 created）
+
+        参数:
+            request_id: 发行请求ID
+            vc_type: VC类型
+            metadata: 上链元数据
+            attributes: 凭证属性（已写入UUID和productBatch，恢复时原样发送）
+            original_contract_name: 原始contractName
+            vc_uuid: VC的UUID
+            async_anchor: 是否异步锚定（None使用服务配置）
+            idempotency_key: 幂等键
+
+        返回:
+            任务字典
+        """
+        now = datetime.now().isoformat()
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO issuance_job "
+                "(request_id, vc_type, stage, metadata, attributes, original_contract_name, vc_uuid, "
+                "async_anchor, idempotency_key, owner_pid, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (request_id, vc_type, STAGE_CREATED,
+                 json.dumps(metadata, ensure_ascii=False), json.dumps(attributes, ensure_ascii=False),
+                 original_contract_name, vc_uuid,
+                 None if async_anchor is None else int(async_anchor), idempotency_key, os.getpid(), now, now)
+            )
+            conn.commit()
+        return self.get(request_id)
+
+    def update_stage(self, request_id: str, stage: str, **fields) -> bool:
+        """
+        推进任务阶段并保存该阶段的产出
+
+        参数:
+            request_id: 发行请求ID
+            stage: 新阶段（早于当前阶段时只保存字段，不回退阶段）
+            fields: 需要保存的字段（如 cred_ex_id、thread_id、vc_hash、tx_hash）
+
+        返回:
+            阶段是否发生变化
+        """
+        with self._write_lock:
+            conn = self._conn()
+            row = conn.execute("SELECT stage FROM issuance_job WHERE request_id = ?", (request_id,)).fetchone()
+            if row is None:
+                return False
+            current = row[0]
+            advance = current not in FINAL_STAGES and (
+                stage == STAGE_FAILED or not stage_reached(current, stage)
+            )
+
+            values = dict(fields)
+            if advance:
+                values["stage"] = stage
+            values["updated_at"] = datetime.now().isoformat()
+            assignments = ", ".join(f"{key} = ?" for key in values)
+            conn.execute(
+                f"UPDATE issuance_job SET {assignments} WHERE request_id = ?",
+                (*values.values(), request_id)
+            )
+            conn.commit()
+
+        if advance:
+            logger.debug(f"[{request_id}] 发行阶段: {current} -> {stage}")
+        return advance
+
+    def fail(self, request_id: str, error: str):
+        """标记任务失败"""
+        self.update_stage(request_id, STAGE_FAILED, error=error)
+
+    def mark_resumed(self, request_id: str):
+        """记录一次恢复执行"""
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "UPDATE issuance_job SET attempts = attempts + 1, updated_at = ? WHERE request_id = ?",
+                (datetime.now().isoformat(), request_id)
+            )
+            conn.commit()
+
+    def claim(self, request_id: str, expected_owner: Optional[int]) -> bool:
+        """
+        将任务的所属进程改为当前进程（比较并交换，多个worker同时接管同一任务时只有一个成功）
+
+        参数:
+            request_id: 发行请求ID
+            expected_owner: 读取任务时的所属进程
+
+        返回:
+            是否接管成功
+        """
+        with self._write_lock:
+            conn = self._conn()
+            cursor = conn.execute(
+                "UPDATE issuance_job SET owner_pid = ?, updated_at = ? "
+                "WHERE request_id = ? AND owner_pid IS ?",
+                (os.getpid(), datetime.now().isoformat(), request_id, expected_owner)
+            )
+            conn.commit()
+        return cursor.rowcount == 1
+
+    # ==================== 查询 ====================
+
+    def get(self, request_id: str) -> Optional[Dict]:
+        """按请求ID查询任务"""
+        row = self._conn().execute("SELECT * FROM issuance_job WHERE request_id = ?", (request_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def find_by_idempotency_key(self, idempotency_key: str, since: str) -> Optional[Dict]:
+        """
+        查询幂等键对应的最新任务（不含失败的任务）
+
+        参数:
+            idempotency_key: 幂等键
+            since: 只查询该时间（ISO格式）之后创建的任务
+        """
+        row = self._conn().execute(
+            "SELECT * FROM issuance_job WHERE idempotency_key = ? AND created_at >= ? AND stage != ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (idempotency_key, since, STAGE_FAILED)
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def unfinished(self) -> List[Dict]:
+        """未完成的任务（按创建时间正序）"""
+        placeholders = ", ".join("?" for _ in FINAL_STAGES)
+        rows = self._conn().execute(
+            f"SELECT * FROM issuance_job WHERE stage NOT IN ({placeholders}) ORDER BY created_at",
+            FINAL_STAGES
+        )
+        return [self._to_dict(row) for row in rows]
+
+    def query(self, stage: Optional[str] = None, vc_type: Optional[str] = None,
+              limit: int = 100, offset: int = 0) -> List[Dict]:
+        """按阶段、VC类型查询任务（最新的在前）"""
+        conditions, params = [], []
+        if stage:
+            conditions.append("stage = ?")
+            params.append(stage)
+        if vc_type:
+            conditions.append("vc_type = ?")
+            params.append(vc_type)
+
+        sql = "SELECT * FROM issuance_job"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        return [self._to_dict(row) for row in self._conn().execute(sql, params)]
+
+    def unfinished_counts(self) -> Dict[str, int]:
+        """未完成任务的各阶段数量"""
+        placeholders = ", ".join("?" for _ in FINAL_STAGES)
+        rows = self._conn().execute(
+            f"SELECT stage, COUNT(*) FROM issuance_job WHERE stage NOT IN ({placeholders}) GROUP BY stage",
+            FINAL_STAGES
+        )
+        return {row[0]: row[1] for row in rows}
+
+    def close(self):
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -13,6 +13,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, List
 
+from uuid_registry import load_uuid_records
+
 
 # 颜色类
 class Colors:
@@ -29,7 +31,8 @@ class Colors:
 
 # 默认配置
 ORACLE_URL = "http://localhost:7002"
-UUID_JSON_PATH = Path(__file__).parent / "logs" / "uuid.json"
+UUID_REGISTRY_PATH = Path(__file__).parent / "logs" / "uuid_registry.db"
+UUID_JSON_PATH = Path(__file__).parent / "logs" / "uuid.json"  # 登记表不存在时读取
 CONFIG_JSON_PATH = Path(__file__).parent / "vc_issuance_config.json"
 
 # 4种VC类型及其默认请求属性
@@ -77,14 +80,11 @@ def print_warning(msg: str):
 
 
 def load_uuid_data() -> Dict:
-    """加载uuid.json数据"""
+    """加载发行记录（优先读取UUID登记表，不存在时读取uuid.json）"""
     try:
-        if UUID_JSON_PATH.exists():
-            with open(UUID_JSON_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        return load_uuid_records(str(UUID_REGISTRY_PATH), str(UUID_JSON_PATH))
     except Exception as e:
-        print_error(f"无法加载uuid.json: {e}")
+        print_error(f"无法加载发行记录: {e}")
         return {}
 
 
@@ -340,7 +340,7 @@ def main():
     config_data = load_config()
 
     if not uuid_data:
-        print_error("无法加载uuid.json，没有可用的VC进行测试")
+        print_error("无法加载发行记录，没有可用的VC进行测试")
         sys.exit(1)
 
     # 准备测试
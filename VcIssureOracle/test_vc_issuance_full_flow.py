@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 VC发行验证脚本
-从 uuid.json 读取最新的 n 个记录，验证 Holder 存储和链上写入
+从UUID登记表（logs/uuid_registry.db）读取最新的 n 个记录，验证 Holder 存储和链上写入
 
 使用方法:
     python3 test_vc_issuance_full_flow.py              # 验证最新1条记录
@@ -21,11 +21,14 @@ from typing import Dict, List, Optional, Tuple
 import requests
 from web3 import Web3
 
+from uuid_registry import load_uuid_records
+
 # 配置
 ORACLE_URL = "http://localhost:6000"
 HOLDER_URL = "http://localhost:8081"
 ISSUER_URL = "http://localhost:8080"
-UUID_FILE = Path(__file__).parent / "logs" / "uuid.json"
+UUID_REGISTRY_FILE = Path(__file__).parent / "logs" / "uuid_registry.db"
+UUID_FILE = Path(__file__).parent / "logs" / "uuid.json"  # 登记表不存在时读取
 CONFIG_FILE = Path(__file__).parent / "vc_issuance_config.json"
 OUTPUT_DIR = Path(__file__).parent / "logs"
 
@@ -84,12 +87,8 @@ class VCVerifier:
                     )
 
     def load_uuid_records(self, n: int = 1) -> List[Tuple[str, Dict]]:
-        """从uuid.json加载最新的n条记录"""
-        if not UUID_FILE.exists():
-            return []
-
-        with open(UUID_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        """从UUID登记表加载最新的n条记录"""
+        data = load_uuid_records(str(UUID_REGISTRY_FILE), str(UUID_FILE))
 
         # 按时间戳排序（最新的在前）
         records = []
@@ -104,11 +103,7 @@ class VCVerifier:
 
     def find_uuid_by_vc_hash(self, vc_hash: str) -> Optional[Tuple[str, Dict]]:
         """通过vc_hash反向查找uuid（不需要区块链连接）"""
-        if not UUID_FILE.exists():
-            return None
-
-        with open(UUID_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_uuid_records(str(UUID_REGISTRY_FILE), str(UUID_FILE))
 
         # 遍历查找匹配的vc_hash
         for uuid, info in data.items():
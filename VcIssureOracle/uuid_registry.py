@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - UUID登记表
+使用SQLite（WAL模式）保存每次发行的 UUID -> {vc_type, vc_hash, tx_hash, ...}，
+替代每次都整体读写的 logs/uuid.json；支持按uuid、vc_hash、vc_type和时间范围查询。
+Merkle批量锚定模式下同时保存每批的Merkle根和每个VC的包含证明（vc_merkle_anchor.py）
+
+用法:
+    python uuid_registry.py migrate [--json logs/uuid.json] [--db logs/uuid_registry.db]
+    python uuid_registry.py export  [--db logs/uuid_registry.db] [--json logs/uuid.json]
+
+只读方（oracle/ 下的测试脚本）通过 load_uuid_records() 读取，登记表不存在时回退到旧的 uuid.json。
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger('uuid_registry')
+
+
+DEFAULT_REGISTRY_PATH = './logs/uuid_registry.db'
+DEFAULT_UUID_JSON_PATH = './logs/uuid.json'
+
+# 记录字段（与 uuid.json 中每条记录的字段一致）
+RECORD_FIELDS = ("timestamp", "vc_type", "original_contract_name", "vc_hash", "tx_hash", "request_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vc_uuid (
+    uuid TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    vc_type TEXT NOT NULL,
+    original_contract_name TEXT,
+    vc_hash TEXT,
+    tx_hash TEXT,
+    request_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vc_uuid_vc_hash ON vc_uuid (vc_hash);
+CREATE INDEX IF NOT EXISTS idx_vc_uuid_type_time ON vc_uuid (vc_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_vc_uuid_time ON vc_uuid (timestamp);
+CREATE TABLE IF NOT EXISTS registry_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS vc_merkle_root (
+    merkle_root TEXT PRIMARY KEY,
+    vc_type TEXT NOT NULL,
+    vc_count INTEGER NOT NULL,
+    tx_hash TEXT,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vc_merkle_proof (
+    vc_hash TEXT PRIMARY KEY,
+    merkle_root TEXT NOT NULL,
+    leaf_index INTEGER NOT NULL,
+    proof TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_vc_merkle_proof_root ON vc_merkle_proof (merkle_root);
+"""
+
+
+class UUIDRegistry:
+    """
+    UUID登记表
+
+    每个线程使用独立的SQLite连接；写入通过进程内锁串行化，
+    WAL模式下读取不会被写入阻塞，其他进程（webapp、测试脚本）可同时只读访问。
+    """
+
+    def __init__(self, db_path: str = DEFAULT_REGISTRY_PATH):
+        """
+        初始化登记表（数据库不存在时自动创建）
+
+        参数:
+            db_path: SQLite数据库路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """数据库行 -> 记录字典（含uuid）"""
+        return {key: row[key] for key in row.keys()}
+
+    # ==================== 写入 ====================
+
+    def record(self, vc_uuid: str, vc_type: str, original_contract_name: str,
+               vc_hash: str, tx_hash: str, request_id: str, timestamp: Optional[str] = None):
+        """
+        登记一次发行（同一UUID重复登记时覆盖）
+
+        参数:
+            vc_uuid: VC的UUID（凭证中的contractName）
+            vc_type: VC类型
+            original_contract_name: 原始contractName
+            vc_hash: VC Hash
+            tx_hash: 上链交易哈希
+            request_id: 发行请求ID
+            timestamp: 发行时间（ISO格式），默认当前时间
+        """
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO vc_uuid "
+                "(uuid, timestamp, vc_type, original_contract_name, vc_hash, tx_hash, request_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (vc_uuid, timestamp or datetime.now().isoformat(), vc_type,
+                 original_contract_name, vc_hash, tx_hash, request_id)
+            )
+            conn.commit()
+
+    def record_merkle_batch(self, merkle_root: str, vc_type: str, tx_hash: str, proofs: Dict[str, Dict],
+                            timestamp: Optional[str] = None):
+        """
+        登记一批Merkle锚定（Merkle根及批次内每个VC的包含证明）
+
+        参数:
+            merkle_root: Merkle根（0x前缀）
+            vc_type: VC类型
+            tx_hash: anchorMerkleRoot 交易哈希
+            proofs: {vc_hash: {"leaf_index": 叶子序号, "proof": [兄弟节点, ...]}}
+            timestamp: 锚定时间（ISO格式），默认当前时间
+        """
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO vc_merkle_root (merkle_root, vc_type, vc_count, tx_hash, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (merkle_root, vc_type, len(proofs), tx_hash, timestamp or datetime.now().isoformat())
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO vc_merkle_proof (vc_hash, merkle_root, leaf_index, proof) VALUES (?, ?, ?, ?)",
+                [(vc_hash, merkle_root, entry["leaf_index"], json.dumps(entry["proof"]))
+                 for vc_hash, entry in proofs.items()]
+            )
+            conn.commit()
+
+    # ==================== 查询 ====================
+
+    def get_by_uuid(self, vc_uuid: str) -> Optional[Dict]:
+        """按UUID查询"""
+        row = self._conn().execute("SELECT * FROM vc_uuid WHERE uuid = ?", (vc_uuid,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_by_vc_hash(self, vc_hash: str) -> Optional[Dict]:
+        """按VC Hash查询（同一Hash有多条记录时返回最新的）"""
+        row = self._conn().execute(
+            "SELECT * FROM vc_uuid WHERE vc_hash = ? ORDER BY timestamp DESC LIMIT 1", (vc_hash,)
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_merkle_root(self, merkle_root: str) -> Optional[Dict]:
+        """按Merkle根查询批次"""
+        row = self._conn().execute("SELECT * FROM vc_merkle_root WHERE merkle_root = ?", (merkle_root,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_merkle_proof(self, vc_hash: str) -> Optional[Dict]:
+        """
+        按VC Hash查询包含证明
+
+        返回:
+            {vc_hash, merkle_root, leaf_index, proof, vc_type, vc_count, tx_hash, timestamp}，
+            该VC不是以Merkle批量方式锚定时返回None
+        """
+        row = self._conn().execute(
+            "SELECT p.vc_hash, p.merkle_root, p.leaf_index, p.proof, r.vc_type, r.vc_count, r.tx_hash, r.timestamp "
+            "FROM vc_merkle_proof p JOIN vc_merkle_root r ON r.merkle_root = p.merkle_root WHERE p.vc_hash = ?",
+            (vc_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = self._to_dict(row)
+        record["proof"] = json.loads(record["proof"])
+        return record
+
+    def query(self, vc_type: Optional[str] = None, start_time: Optional[str] = None,
+              end_time: Optional[str] = None, limit: Optional[int] = None, offset: int = 0,
+              descending: bool = True) -> List[Dict]:
+        """
+        按VC类型和时间范围查询
+
+        参数:
+            vc_type: VC类型（None表示全部）
+            start_time: 起始时间（ISO格式，含）
+            end_time: 结束时间（ISO格式，含；只给日期时包含当天全部记录）
+            limit: 最多返回条数（None表示不限）
+            offset: 跳过条数
+            descending: 按时间倒序（最新的在前）
+
+        返回:
+            记录列表
+        """
+        conditions, params = [], []
+        if vc_type:
+            conditions.append("vc_type = ?")
+            params.append(vc_type)
+        if start_time:
+            conditions.append("timestamp >= ?")
+            params.append(start_time)
+        if end_time:
+            conditions.append("timestamp <= ?")
+            params.append(end_time if 'T' in end_time else f"{end_time}T23:59:59.999999")
+
+        sql = "SELECT * FROM vc_uuid"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY timestamp {'DESC' if descending else 'ASC'}"
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([limit if limit is not None else -1, offset])
+
+        return [self._to_dict(row) for row in self._conn().execute(sql, params)]
+
+    def latest_by_type(self, vc_type: Optional[str] = None, limit_per_type: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        按VC类型分组返回记录（每组最新的在前）
+
+        参数:
+            vc_type: 只返回该类型（None表示全部类型）
+            limit_per_type: 每个类型最多返回条数
+
+        返回:
+            {vc_type: [记录, ...]}
+        """
+        vc_types = [vc_type] if vc_type else self.vc_types()
+        return {t: self.query(vc_type=t, limit=limit_per_type) for t in vc_types}
+
+    def vc_types(self) -> List[str]:
+        """已登记的VC类型"""
+        return [row[0] for row in self._conn().execute("SELECT DISTINCT vc_type FROM vc_uuid ORDER BY vc_type")]
+
+    def count(self, vc_type: Optional[str] = None) -> int:
+        """记录数"""
+        if vc_type:
+            return self._conn().execute("SELECT COUNT(*) FROM vc_uuid WHERE vc_type = ?", (vc_type,)).fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM vc_uuid").fetchone()[0]
+
+    def to_uuid_json(self) -> Dict[str, Dict]:
+        """导出为 uuid.json 格式 {uuid: {timestamp, vc_type, ...}}（按时间正序）"""
+        return {
+            record.pop("uuid"): record
+            for record in self.query(descending=False)
+        }
+
+    # ==================== 迁移 ====================
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """读取元数据"""
+        row = self._conn().execute("SELECT value FROM registry_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def migrate_from_json(self, json_path: str = DEFAULT_UUID_JSON_PATH) -> int:
+        """
+        从 uuid.json 一次性导入（已存在的UUID保持不变）
+
+        参数:
+            json_path: uuid.json路径
+
+        返回:
+            新导入的记录数
+        """
+        path = Path(json_path)
+        if not path.exists():
+            logger.info(f"未找到 {path}，无需迁移")
+            return 0
+
+        with open(path, 'r', encoding='utf-8') as f:
+            uuid_data = json.load(f)
+
+        rows = [
+            (vc_uuid, entry.get('timestamp') or '', entry.get('vc_type') or '',
+             entry.get('original_contract_name'), entry.get('vc_hash'),
+             entry.get('tx_hash'), entry.get('request_id'))
+            for vc_uuid, entry in uuid_data.items()
+            if isinstance(entry, dict)
+        ]
+
+        with self._write_lock:
+            conn = self._conn()
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO vc_uuid "
+                "(uuid, timestamp, vc_type, original_contract_name, vc_hash, tx_hash, request_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            imported = conn.total_changes - before
+            conn.execute(
+                "INSERT OR REPLACE INTO registry_meta (key, value) VALUES (?, ?)",
+                ("migrated_from", f"{path.resolve()}@{datetime.now().isoformat()}")
+            )
+            conn.commit()
+
+        logger.info(f"已从 {path} 导入 {imported}/{len(rows)} 条UUID记录")
+        return imported
+
+    def close(self):
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def load_uuid_records(db_path: str = DEFAULT_REGISTRY_PATH,
+                      json_path: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    读取全部发行记录（uuid.json格式，按时间正序），供测试脚本等只读方使用
+
+    登记表存在时从登记表读取（不会创建新的登记表）；不存在时读取旧的 uuid.json。
+
+    参数:
+        db_path: 登记表路径
+        json_path: 登记表不存在时读取的uuid.json路径
+
+    返回:
+        {uuid: {timestamp, vc_type, ...}}；两者都不存在时返回空字典
+    """
+    if Path(db_path).exists():
+        return UUIDRegistry(db_path).to_uuid_json()
+    if json_path and Path(json_path).exists():
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def main():
+    """命令行入口：迁移或导出"""
+    parser = argparse.ArgumentParser(description='UUID登记表迁移/导出工具')
+    parser.add_argument('action', choices=['migrate', 'export'], help='migrate: uuid.json导入登记表; export: 登记表导出为uuid.json')
+    parser.add_argument('--json', default=DEFAULT_UUID_JSON_PATH, help=f'uuid.json路径 (默认: {DEFAULT_UUID_JSON_PATH})')
+    parser.add_argument('--db', default=DEFAULT_REGISTRY_PATH, help=f'登记表路径 (默认: {DEFAULT_REGISTRY_PATH})')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    registry = UUIDRegistry(args.db)
+
+    if args.action == 'migrate':
+        imported = registry.migrate_from_json(args.json)
+        print(f"导入 {imported} 条记录，登记表共 {registry.count()} 条: {args.db}")
+    else:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(registry.to_uuid_json(), f, ensure_ascii=False, indent=2)
+        print(f"导出 {registry.count()} 条记录: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 链上锚定状态跟踪
+记录每个VC的锚定交易（addVCMetadata，或Merkle批量锚定时批次共用的anchorMerkleRoot），
+异步锚定模式下在后台确认交易回执，
+供 /vc-status/<vc_hash> 查询（pending / confirmed / failed）
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('vc_anchor_tracker')
+
+
+# 锚定状态
+ANCHOR_PENDING = "pending"
+ANCHOR_CONFIRMED = "confirmed"
+ANCHOR_FAILED = "failed"
+
+
+def normalize_vc_hash(vc_hash: str) -> str:
+    """统一VC Hash写法（小写、0x前缀）"""
+    vc_hash = vc_hash.strip().lower()
+    return vc_hash if vc_hash.startswith('0x') else f"0x{vc_hash}"
+
+
+class AnchorTracker:
+    """
+    链上锚定状态跟踪器
+
+    后台循环只在出现新区块时才查询待确认交易的回执，
+    待确认交易很多时每个区块也只做一轮查询；多个VC共用同一笔交易时只查询一次。
+    """
+
+    def __init__(self, async_core: "AsyncVCIssuanceCore", poll_interval: float = 1.0,
+                 confirm_timeout: float = 120, max_records: int = 10000):
+        """
+        初始化跟踪器
+
+        参数:
+            async_core: 异步发行核心（提供回执查询和线程池执行）
+            poll_interval: 区块高度检查间隔（秒）
+            confirm_timeout: 交易提交后等待确认的最长时间（秒）
+            max_records: 内存中保留的最大记录数（超出时淘汰最旧的已结束记录）
+        """
+        self.async_core = async_core
+        self.poll_interval = poll_interval
+        self.confirm_timeout = confirm_timeout
+        self.max_records = max_records
+
+        self._records: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pending: Dict[str, float] = {}  # vc_hash -> 提交时刻（monotonic）
+        self._last_block: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "submitted": 0,
+            "confirmed": 0,
+            "failed": 0,
+            "background_confirmed": 0,
+            "total_confirm_seconds": 0.0
+        }
+
+    async def start(self):
+        """启动后台确认任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._confirm_loop())
+            logger.info(f"锚定确认任务已启动，检查间隔: {self.poll_interval}秒")
+
+    async def stop(self):
+        """停止后台确认任务"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("锚定确认任务已停止")
+
+    def _store(self, record: Dict):
+        """保存记录并淘汰多余的已结束记录"""
+        vc_hash = record["vc_hash"]
+        self._records[vc_hash] = record
+        self._records.move_to_end(vc_hash)
+
+        excess = len(self._records) - self.max_records
+        if excess > 0:
+            for old_hash in [h for h in self._records if h not in self._pending][:excess]:
+                del self._records[old_hash]
+
+    def track_pending(self, vc_hash: str, tx_hash: str, vc_type: str,
+                      vc_uuid: Optional[str] = None, request_id: Optional[str] = None) -> Dict:
+        """
+        记录已提交、待确认的交易（异步锚定模式）
+
+        返回:
+            锚定记录
+        """
+        vc_hash = normalize_vc_hash(vc_hash)
+        record = {
+            "vc_hash": vc_hash,
+            "vc_type": vc_type,
+            "vc_uuid": vc_uuid,
+            "request_id": request_id,
+            "tx_hash": tx_hash,
+            "status": ANCHOR_PENDING,
+            "block_number": None,
+            "submitted_at": datetime.now().isoformat(),
+            "confirmed_at": None,
+            "error": None
+        }
+        self._store(record)
+        self._pending[vc_hash] = time.monotonic()
+        self._stats["submitted"] += 1
+        return record
+
+    def record_confirmed(self, vc_hash: str, tx_hash: str, vc_type: str, block_number: Optional[int],
+                         vc_uuid: Optional[str] = None, request_id: Optional[str] = None) -> Dict:
+        """记录同步模式下已确认的交易"""
+        now = datetime.now().isoformat()
+        record = {
+            "vc_hash": normalize_vc_hash(vc_hash),
+            "vc_type": vc_type,
+            "vc_uuid": vc_uuid,
+            "request_id": request_id,
+            "tx_hash": tx_hash,
+            "status": ANCHOR_CONFIRMED,
+            "block_number": block_number,
+            "submitted_at": now,
+            "confirmed_at": now,
+            "error": None
+        }
+        self._store(record)
+        self._stats["submitted"] += 1
+        self._stats["confirmed"] += 1
+        return record
+
+    def get(self, vc_hash: str) -> Optional[Dict]:
+        """查询锚定记录（返回副本）"""
+        record = self._records.get(normalize_vc_hash(vc_hash))
+        return dict(record) if record else None
+
+    async def _confirm_loop(self):
+        """后台确认循环"""
+        while True:
+            try:
+                await asyncio.sleep(self.poll_interval)
+                if self._pending:
+                    await self._check_pending()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"锚定确认出错: {e}", exc_info=True)
+
+    async def _check_pending(self):
+        """出现新区块时查询所有待确认交易的回执；没有新区块时只检查超时"""
+        core = self.async_core.core
+        block_number = await self.async_core._run_blocking(lambda: core.w3.eth.block_number)
+        if block_number == self._last_block:
+            self._expire_pending(time.monotonic())
+            return
+        self._last_block = block_number
+
+        pending = list(self._pending.items())
+        tx_hashes = list(dict.fromkeys(self._records[h]["tx_hash"] for h, _ in pending))
+        results = await asyncio.gather(
+            *(self.async_core._run_blocking(core.get_transaction_receipt, tx_hash) for tx_hash in tx_hashes),
+            return_exceptions=True
+        )
+        receipts = dict(zip(tx_hashes, results))
+
+        now = time.monotonic()
+        for vc_hash, submitted_at in pending:
+            record = self._records[vc_hash]
+            receipt = receipts[record["tx_hash"]]
+            if isinstance(receipt, Exception):
+                logger.warning(f"查询交易回执失败 {record['tx_hash']}: {receipt}")
+                receipt = None
+
+            if receipt is not None:
+                if receipt.status == 1:
+                    self._finish(vc_hash, ANCHOR_CONFIRMED, block_number=receipt.blockNumber)
+                    self._stats["background_confirmed"] += 1
+                    self._stats["total_confirm_seconds"] += now - submitted_at
+                else:
+                    self._finish(vc_hash, ANCHOR_FAILED, error=f"交易失败, 状态: {receipt.status}")
+
+        self._expire_pending(now)
+
+    def _expire_pending(self, now: float):
+        """将超过 confirm_timeout 仍未确认的交易标记为失败"""
+        for vc_hash, submitted_at in list(self._pending.items()):
+            if now - submitted_at > self.confirm_timeout:
+                self._finish(vc_hash, ANCHOR_FAILED, error=f"等待交易回执超时({self.confirm_timeout}秒)")
+
+    def _finish(self, vc_hash: str, status: str, block_number: Optional[int] = None, error: Optional[str] = None):
+        """结束待确认记录"""
+        self._pending.pop(vc_hash, None)
+        record = self._records[vc_hash]
+        record["status"] = status
+        record["block_number"] = block_number
+        record["error"] = error
+        if status == ANCHOR_CONFIRMED:
+            record["confirmed_at"] = datetime.now().isoformat()
+            self._stats["confirmed"] += 1
+            logger.info(f"VC锚定已确认: {vc_hash}, 交易 {record['tx_hash']}, 区块 {block_number}")
+        else:
+            self._stats["failed"] += 1
+            logger.error(f"VC锚定失败: {vc_hash}, 交易 {record['tx_hash']}: {error}")
+
+    def get_stats(self) -> Dict:
+        """获取锚定统计"""
+        background_confirmed = self._stats["background_confirmed"]
+        return {
+            "pending": len(self._pending),
+            "records": len(self._records),
+            "last_block": self._last_block,
+            "submitted": self._stats["submitted"],
+            "confirmed": self._stats["confirmed"],
+            "failed": self._stats["failed"],
+            "background_confirmed": background_confirmed,
+            "avg_background_confirm_seconds": round(self._stats["total_confirm_seconds"] / background_confirmed, 2)
+            if background_confirmed else None
+        }
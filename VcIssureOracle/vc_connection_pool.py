@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - Issuer-Holder连接池
+维护多条active的Issuer-Holder连接，发送Offer时轮询分配；
+连接有效性按TTL缓存，并由 connections webhook 实时更新，补充新连接在后台进行；
+多worker部署时只有主worker创建新连接，其他worker收集已有的池连接（vc_issuance_workers.LeaderElection）
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('vc_connection_pool')
+
+
+# webhook主题
+TOPIC_CONNECTIONS = "connections"
+
+# 可用于凭证交换的连接状态
+USABLE_STATES = ('active', 'response')
+# 不可恢复的连接状态
+DEAD_STATES = ('abandoned', 'error', 'deleted')
+
+
+class PooledConnection:
+    """连接池中的一条连接"""
+
+    def __init__(self, connection_id: str, state: str = 'active'):
+        self.connection_id = connection_id
+        self.state = state
+        self.checked_at = time.monotonic()
+        self.offers = 0
+
+    @property
+    def usable(self) -> bool:
+        return self.state in USABLE_STATES
+
+
+class IssuerConnectionPool:
+    """
+    Issuer-Holder连接池
+
+    - acquire(): 在可用连接间轮询分配，不访问ACA-Py
+    - 后台任务: 超过 health_ttl 的连接重新验证，数量不足时创建新连接（多worker时仅主worker创建，
+      其他worker重新收集已有连接）
+    - connections webhook: 连接进入 active/response 或 abandoned/error 时立即更新
+    - 池为空时回退到 AsyncVCIssuanceCore.get_or_create_connection（单连接）
+    """
+
+    def __init__(self, async_core: "AsyncVCIssuanceCore", size: int = 4,
+                 health_ttl: float = 30, replenish_interval: float = 10,
+                 alias_prefix: str = "oracle-issuer-pool"):
+        """
+        初始化连接池
+
+        参数:
+            async_core: 异步发行核心（提供连接查询/创建方法）
+            size: 目标连接数
+            health_ttl: 连接有效性缓存时间（秒）
+            replenish_interval: 后台检查/补充间隔（秒）
+            alias_prefix: 池内连接的Issuer端别名前缀
+        """
+        self.async_core = async_core
+        self.size = max(1, size)
+        self.health_ttl = health_ttl
+        self.replenish_interval = replenish_interval
+        self.alias_prefix = alias_prefix
+
+        self._connections: Dict[str, PooledConnection] = {}
+        self._round_robin = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"acquired": 0, "fallbacks": 0, "created": 0, "evicted": 0, "webhook_updates": 0}
+
+    # ==================== 生命周期 ====================
+
+    async def start(self):
+        """启动后台任务（收集已有连接、补充连接均在后台进行，不阻塞启动）"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._maintain_loop())
+            logger.info(f"连接池已启动: 目标 {self.size} 条")
+
+    async def stop(self):
+        """停止后台任务"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("连接池已停止")
+
+    def _is_leader(self) -> bool:
+        """是否负责创建连接（单进程部署或主worker）"""
+        coordination = self.async_core.coordination
+        return coordination is None or coordination.is_leader
+
+    async def _discover(self):
+        """收集已有的池连接（按别名前缀，优先最新创建的，不超过目标连接数）和DID匹配的共享连接"""
+        try:
+            data = await self.async_core._get_json(f"{self.async_core.issuer_admin_url}/connections")
+            candidates = [
+                conn for conn in (data or {}).get('results', [])
+                if (conn.get('alias') or '').startswith(self.alias_prefix)
+                and conn.get('state') in USABLE_STATES
+                and conn.get('connection_id') not in self._connections
+            ]
+            candidates.sort(key=lambda conn: conn.get('created_at') or '', reverse=True)
+            for conn in candidates[:max(0, self.size - len(self._usable()))]:
+                self._add(conn['connection_id'], conn['state'])
+        except Exception as e:
+            logger.warning(f"收集已有连接失败: {e}")
+
+        if len(self._usable()) < self.size:
+            shared = await self.async_core._find_existing_connection()
+            if shared:
+                self._add(shared)
+
+    async def _maintain_loop(self):
+        """后台循环：收集已有连接，然后定期验证过期连接、补充连接"""
+        try:
+            await self._discover()
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.warning(f"收集已有连接失败: {e}")
+
+        while True:
+            try:
+                await self.maintain()
+                await asyncio.sleep(self.replenish_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"连接池维护出错: {e}", exc_info=True)
+                await asyncio.sleep(self.replenish_interval)
+
+    async def maintain(self):
+        """验证超过TTL的连接，移除失效连接，数量不足时逐条创建（非主worker改为重新收集已有连接）"""
+        now = time.monotonic()
+        stale = [c for c in self._connections.values() if now - c.checked_at >= self.health_ttl]
+        for conn in stale:
+            state = await self._fetch_state(conn.connection_id)
+            self._update(conn.connection_id, state, evict_unusable=True)
+
+        missing = self.size - len(self._usable())
+        if missing > 0 and not self._is_leader():
+            await self._discover()
+            return
+        for _ in range(missing):
+            alias = f"{self.alias_prefix}-{int(time.time() * 1000)}"
+            conn_id = await self.async_core._create_connection(alias)
+            if not conn_id:
+                logger.warning("连接池补充连接失败，稍后重试")
+                break
+            self._add(conn_id)
+            self._stats["created"] += 1
+            logger.info(f"连接池新增连接: {conn_id}（{len(self._usable())}/{self.size}）")
+
+    async def _fetch_state(self, connection_id: str) -> Optional[str]:
+        """查询Issuer端连接状态（不存在时返回 deleted）"""
+        try:
+            data = await self.async_core._get_json(f"{self.async_core.issuer_admin_url}/connections/{connection_id}")
+            return data.get('state') if data else 'deleted'
+        except Exception as e:
+            logger.warning(f"查询连接状态失败 {connection_id}: {e}")
+            return None
+
+    # ==================== 状态更新 ====================
+
+    def _add(self, connection_id: str, state: str = 'active'):
+        """加入（或刷新）一条连接"""
+        conn = self._connections.get(connection_id)
+        if conn is None:
+            self._connections[connection_id] = PooledConnection(connection_id, state)
+        else:
+            conn.state = state
+            conn.checked_at = time.monotonic()
+
+    def _update(self, connection_id: str, state: Optional[str], evict_unusable: bool = False):
+        """
+        根据查询或webhook得到的状态更新连接
+
+        参数:
+            evict_unusable: 非可用状态（如仍在 request）也移除；否则只移除 abandoned/error/deleted
+        """
+        conn = self._connections.get(connection_id)
+        if conn is None or state is None:
+            return
+        if state in DEAD_STATES or (evict_unusable and state not in USABLE_STATES):
+            self._connections.pop(connection_id, None)
+            self._stats["evicted"] += 1
+            logger.warning(f"连接池移除连接 {connection_id}（状态: {state}）")
+            return
+        conn.state = state
+        conn.checked_at = time.monotonic()
+
+    def mark_invalid(self, connection_id: str):
+        """标记连接可疑（如发送Offer失败），立即移出轮询，后台下次维护时重新验证"""
+        conn = self._connections.get(connection_id)
+        if conn is not None:
+            conn.state = 'suspect'
+            conn.checked_at = 0.0
+
+    def handle_webhook(self, payload: Dict):
+        """处理Issuer的 connections webhook"""
+        connection_id = payload.get('connection_id')
+        state = payload.get('state')
+        if not connection_id or not state:
+            return
+        if connection_id in self._connections:
+            self._stats["webhook_updates"] += 1
+            self._update(connection_id, state)
+        elif ((payload.get('alias') or '').startswith(self.alias_prefix) and state in USABLE_STATES
+              and len(self._usable()) < self.size):
+            self._add(connection_id, state)
+
+    # ==================== 分配 ====================
+
+    def _usable(self) -> List[PooledConnection]:
+        return [c for c in self._connections.values() if c.usable]
+
+    async def acquire(self) -> Optional[str]:
+        """
+        分配一条连接（轮询）
+
+        返回:
+            connection_id；池中没有可用连接时回退到单连接获取/创建
+        """
+        usable = self._usable()
+        if not usable:
+            self._stats["fallbacks"] += 1
+            conn_id = await self.async_core.get_or_create_connection()
+            if conn_id:
+                self._add(conn_id)
+            return conn_id
+
+        conn = usable[next(self._round_robin) % len(usable)]
+        conn.offers += 1
+        self._stats["acquired"] += 1
+        return conn.connection_id
+
+    def get_stats(self) -> Dict:
+        """获取连接池状态"""
+        now = time.monotonic()
+        return {
+            "target_size": self.size,
+            "usable": len(self._usable()),
+            "connections": [
+                {
+                    "connection_id": c.connection_id,
+                    "state": c.state,
+                    "offers": c.offers,
+                    "checked_seconds_ago": round(now - c.checked_at, 1)
+                }
+                for c in self._connections.values()
+            ],
+            **self._stats
+        }
@@ -0,0 +1,1141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 异步发行核心
+基于aiohttp与vc_connection_manager.py中的凭证交换方法，
+发行流程中的等待全部使用asyncio.sleep，单进程可同时处理数百个发行请求
+
+架构说明:
+- ACA-Py交互: vc_connection_manager.ConnectionManager（共享aiohttp会话）
+- 配置、合约、Hash计算、UUID记录: 复用同步版 VCIssuanceCore
+- 区块链写入: 交易发送在线程池中执行，回执通过异步轮询等待
+- 发行通道: 每个vc_type独立的队列、工作协程和nonce序列（vc_issuance_lanes.py）
+- 异步锚定: 交易提交后即返回（anchor_status=pending），回执由 vc_anchor_tracker.py 在后台确认
+- Holder凭证索引: /credentials 查询由 holder_credential_index.py 的本地索引回答
+- 连接池: 多条Issuer-Holder连接轮询发送Offer（vc_connection_pool.py）
+- 任务持久化: 每个发行请求的阶段保存在 issuance_job_store.py，重启后从最后阶段继续
+- 幂等: 同一幂等键的重复请求共享进行中的发行或返回已有结果（vc_issuance_idempotency.py）
+- 分阶段耗时: 按vc_type记录各阶段耗时直方图（vc_issuance_metrics.py），/metrics 输出
+- 批量上链（可选）: 每个区块每种vc_type最多一笔 addVCMetadataBatch 交易（vc_metadata_aggregator.py）
+- Merkle批量锚定（可选）: 一个窗口内的VC Hash只上链一个Merkle根（vc_merkle_anchor.py）
+- 多worker部署（可选）: nonce、webhook事件和耗时统计在同一主机的worker进程间共享（vc_issuance_workers.py）
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from vc_anchor_tracker import ANCHOR_CONFIRMED, ANCHOR_PENDING, AnchorTracker
+from credential_exchange_tracker import (
+    ROLE_HOLDER, ROLE_ISSUER, TOPIC_ISSUE_CREDENTIAL_V2, CredentialExchangeTracker
+)
+from holder_credential_index import HolderCredentialIndex
+from issuance_job_store import (
+    DEFAULT_JOB_STORE_PATH, STAGE_ANCHORED, STAGE_COMPLETED, STAGE_CREATED, STAGE_FAILED,
+    STAGE_HOLDER_REQUESTED, STAGE_ISSUED, STAGE_OFFER_SENT, STAGE_STORED,
+    IssuanceJobStore, stage_for_exchange_state, stage_reached
+)
+from vc_connection_pool import TOPIC_CONNECTIONS, IssuerConnectionPool
+from vc_issuance_idempotency import IdempotencyCache
+from vc_issuance_metrics import (
+    STAGE_CHAIN_CONFIRM, STAGE_CHAIN_SUBMIT, STAGE_CONNECTION, STAGE_HOLDER_RESPONSE, STAGE_ISSUE,
+    STAGE_OFFER, STAGE_REGISTRY, STAGE_STORE, IssuanceMetrics, StageTimer
+)
+from vc_connection_manager import ConnectionManager
+from vc_merkle_anchor import MerkleAnchorBatcher
+from vc_metadata_aggregator import VCMetadataAggregator
+from vc_issuance_lanes import IssuanceLane, IssuanceLaneManager
+from vc_issuance_workers import pid_alive
+
+if TYPE_CHECKING:
+    from vc_issuance_oracle import VCIssuanceCore
+
+
+logger = logging.getLogger('vc_issuance_async')
+
+
+# Holder/Issuer凭证交换状态（issue-credential-2.0，兼容下划线写法）
+OFFER_STATES = ('offer-received', 'offer_received')
+REQUEST_SENT_STATES = ('request-sent', 'request_sent')
+CREDENTIAL_RECEIVED_STATES = ('credential-received', 'credential_received')
+ISSUED_STATES = ('credential-issued', 'credential_issued')
+ABANDONED_STATES = ('abandoned',)
+
+# 任务阶段 -> 结束的计时阶段
+_JOB_STAGE_TIMINGS = {
+    STAGE_OFFER_SENT: STAGE_OFFER,
+    STAGE_HOLDER_REQUESTED: STAGE_HOLDER_RESPONSE,
+    STAGE_ISSUED: STAGE_ISSUE,
+    STAGE_STORED: STAGE_STORE,
+    STAGE_ANCHORED: STAGE_CHAIN_SUBMIT,
+    STAGE_COMPLETED: STAGE_REGISTRY,
+}
+
+
+class AsyncVCIssuanceCore:
+    """
+    异步VC发行核心
+
+    与 VCIssuanceCore.issue_vc 的流程和返回值一致，区别在于：
+    - 所有ACA-Py调用都是异步的，轮询等待不占用线程
+    - 发送Offer的响应中直接取得thread_id，无需再轮询Issuer记录
+    - 按thread_id过滤Holder记录、按UUID（WQL）查询Holder凭证，避免全量拉取
+    - max_concurrent 限制同时进行的发行数量
+    """
+
+    def __init__(self, core: "VCIssuanceCore"):
+        """
+        初始化异步发行核心
+
+        参数:
+            core: 同步版VCIssuanceCore（提供配置、合约和Hash计算）
+        """
+        self.core = core
+        self.issuer_admin_url = core.issuer_admin_url
+        self.holder_admin_url = core.holder_admin_url
+
+        service_config = core.service_config
+        self.poll_interval = service_config.get('issuance_poll_interval_seconds', 1.0)
+        self.issuance_timeout = service_config.get('issuance_timeout_seconds', 90)
+        self.receipt_timeout = service_config.get('receipt_timeout_seconds', 120)
+        self.max_concurrent = service_config.get('max_concurrent_issuances', 200)
+        self.connection_recheck = service_config.get('connection_recheck_seconds', 10)
+
+        # webhook驱动的凭证交换状态机（代理未配置webhook时依靠轮询补偿）
+        webhook_config = service_config.get('webhooks', {})
+        self.webhooks_enabled = webhook_config.get('enabled', True)
+        self.reconcile_interval = webhook_config.get('reconcile_interval_seconds', 5)
+        self.exchange_tracker: Optional[CredentialExchangeTracker] = None
+
+        # Issuer-Holder连接池
+        pool_config = service_config.get('connection_pool', {})
+        self.connection_pool: Optional[IssuerConnectionPool] = None
+        if pool_config.get('enabled', True):
+            self.connection_pool = IssuerConnectionPool(
+                self,
+                size=pool_config.get('size', 4),
+                health_ttl=pool_config.get('health_ttl_seconds', 30),
+                replenish_interval=pool_config.get('replenish_interval_seconds', 10)
+            )
+
+        # Holder凭证索引
+        index_config = service_config.get('credential_index', {})
+        self.credential_index: Optional[HolderCredentialIndex] = None
+        if index_config.get('enabled', True):
+            self.credential_index = HolderCredentialIndex(
+                self,
+                sync_interval=index_config.get('sync_interval_seconds', 300),
+                page_size=index_config.get('page_size', 1000)
+            )
+
+        # 按vc_type划分的发行通道
+        self.lane_config = service_config.get('issuance_lanes', {})
+        self.lanes: Optional[IssuanceLaneManager] = None
+
+        # 链上锚定：async_anchor=True 时交易提交后立即返回，后台确认回执
+        anchoring_config = service_config.get('anchoring', {})
+        self.async_anchor = anchoring_config.get('async', False)
+        self.anchor_tracker = AnchorTracker(
+            self,
+            poll_interval=self.poll_interval,
+            confirm_timeout=anchoring_config.get('confirm_timeout_seconds', self.receipt_timeout),
+            max_records=anchoring_config.get('max_records', 10000)
+        )
+        # 批量上链 / Merkle批量锚定：启用时不再逐个VC调用addVCMetadata（两者都启用时使用Merkle锚定）
+        self.metadata_aggregator = VCMetadataAggregator.from_config(self, anchoring_config.get('batch'))
+        self.merkle_anchor = MerkleAnchorBatcher.from_config(self, anchoring_config.get('merkle'))
+        self._receipt_waits: Dict[str, asyncio.Task] = {}  # tx_hash -> 回执轮询任务
+
+        # 发行任务持久化：进程重启后未完成的任务从最后阶段继续
+        job_config = service_config.get('job_store', {})
+        self.job_store: Optional[IssuanceJobStore] = None
+        if job_config.get('enabled', True):
+            self.job_store = IssuanceJobStore(job_config.get('path', DEFAULT_JOB_STORE_PATH))
+        self.resume_on_start = job_config.get('resume_on_start', True)
+        self.max_resume_age = job_config.get('max_resume_age_seconds', 86400)
+        self._resume_tasks = set()
+
+        # 幂等：同一幂等键的请求共享进行中的发行或返回已有结果
+        idempotency_config = service_config.get('idempotency', {})
+        self.idempotency: Optional[IdempotencyCache] = None
+        if idempotency_config.get('enabled', True):
+            self.idempotency = IdempotencyCache(
+                retention_seconds=idempotency_config.get('retention_seconds', 3600),
+                derived_retention_seconds=idempotency_config.get('derived_retention_seconds', 300),
+                max_entries=idempotency_config.get('max_entries', 10000)
+            )
+        self.derive_idempotency_keys = idempotency_config.get('derive_from_payload', True)
+
+        # 分阶段耗时直方图
+        self.metrics = IssuanceMetrics(service_config.get('metrics', {}).get('buckets'))
+
+        # 多worker部署时的进程间协调（单进程运行时为None）
+        self.coordination = core.coordination
+
+        # 以下对象需在事件循环中创建（见 start）
+        self.connection_manager: Optional[ConnectionManager] = None
+        self._connection_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._connection_checked_at = 0.0
+
+        # 统计
+        self._in_flight = 0
+        self._stats = {"started": 0, "succeeded": 0, "failed": 0, "resumed": 0}
+
+        logger.info(f"异步发行核心初始化完成，最大并发发行数: {self.max_concurrent}")
+
+    async def start(self):
+        """在事件循环中初始化ACA-Py会话、锁和并发限制"""
+        if self._semaphore is None:
+            self.connection_manager = ConnectionManager(
+                issuer_admin_url=self.issuer_admin_url,
+                holder_admin_url=self.holder_admin_url,
+                issuer_did=self.core.issuer_did,
+                holder_did=self.core.holder_did
+            )
+            self._connection_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            if self.webhooks_enabled:
+                self.exchange_tracker = CredentialExchangeTracker(self.connection_manager)
+            await self.anchor_tracker.start()
+            if self.connection_pool:
+                await self.connection_pool.start()
+            if self.credential_index:
+                await self.credential_index.start()
+            if self.lane_config.get('enabled', True):
+                self.lanes = IssuanceLaneManager(self, self.lane_config)
+                await self.lanes.start()
+            if self.coordination:
+                await self.coordination.start(self)
+            if self.job_store and self.resume_on_start:
+                self._spawn(self.resume_jobs())
+            logger.info(f"异步发行核心已启动（webhook状态机: {'启用' if self.webhooks_enabled else '禁用'}）")
+
+    async def stop(self):
+        """停止发行通道并关闭ACA-Py会话（未完成的任务保留在任务存储中，下次启动时继续）"""
+        for task in list(self._resume_tasks):
+            task.cancel()
+        if self.coordination:
+            await self.coordination.stop()
+        if self.lanes:
+            await self.lanes.stop()
+        if self.metadata_aggregator:
+            await self.metadata_aggregator.stop()
+        if self.merkle_anchor:
+            await self.merkle_anchor.stop()
+        for task in list(self._receipt_waits.values()):
+            task.cancel()
+        await self.anchor_tracker.stop()
+        if self.connection_pool:
+            await self.connection_pool.stop()
+        if self.credential_index:
+            await self.credential_index.stop()
+        if self.connection_manager:
+            await self.connection_manager.close()
+        logger.info("异步发行核心已停止")
+
+    @property
+    def session(self):
+        """共享的aiohttp会话"""
+        return self.connection_manager.session
+
+    async def _run_blocking(self, func, *args):
+        """在默认线程池中执行阻塞调用（Web3、文件写入）"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    # ==================== 连接管理 ====================
+
+    async def _get_json(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """GET请求，返回JSON（非200返回None）"""
+        async with self.session.get(url, params=params) as resp:
+            if resp.status != 200:
+                return None
+            return await resp.json()
+
+    async def _is_connection_valid(self, conn_id: str) -> bool:
+        """验证连接是否仍然有效（active 或 response 状态）"""
+        try:
+            data = await self._get_json(f"{self.issuer_admin_url}/connections/{conn_id}")
+            return bool(data) and data.get('state') in ['active', 'response']
+        except Exception:
+            return False
+
+    async def _find_existing_connection(self) -> Optional[str]:
+        """查找DID匹配的active或response连接（逻辑同 VCIssuanceCore.get_existing_connection）"""
+        try:
+            issuer_data, holder_data = await asyncio.gather(
+                self._get_json(f"{self.issuer_admin_url}/connections"),
+                self._get_json(f"{self.holder_admin_url}/connections")
+            )
+            if not issuer_data or not holder_data:
+                return None
+
+            # Holder端: my_did -> 连接（只保留与Issuer的有效连接）
+            holder_dids = {
+                conn.get('my_did')
+                for conn in holder_data.get('results', [])
+                if conn.get('state') in ['active', 'response'] and 'Issuer' in conn.get('their_label', '')
+            }
+
+            for issuer_conn in issuer_data.get('results', []):
+                if (issuer_conn.get('state') in ['active', 'response'] and
+                        'Holder' in issuer_conn.get('their_label', '') and
+                        issuer_conn.get('their_did') in holder_dids):
+                    conn_id = issuer_conn.get('connection_id')
+                    logger.info(f"找到DID匹配的连接: {conn_id} (DID: {issuer_conn.get('their_did')})")
+                    return conn_id
+
+            logger.info("未找到DID匹配的有效连接")
+            return None
+        except Exception as e:
+            logger.warning(f"检查现有连接失败: {e}")
+            return None
+
+    async def _create_connection(self, alias: str = "oracle-issuer") -> Optional[str]:
+        """创建新连接（Issuer创建邀请，Holder接受邀请）"""
+        logger.info(f"创建新连接: {alias}")
+        try:
+            invitation_data = await self.connection_manager.create_invitation(alias=alias)
+            issuer_conn_id = invitation_data.get('connection_id')
+            invitation = invitation_data.get('invitation')
+
+            async with self.session.post(
+                f"{self.holder_admin_url}/connections/receive-invitation",
+                params={"auto_accept": "true", "alias": "oracle-holder"},
+                json=invitation
+            ) as resp:
+                if resp.status not in [200, 201]:
+                    logger.error(f"Holder接受邀请失败: {resp.status}")
+                    return None
+            logger.info("Holder接受邀请成功")
+
+            await self.connection_manager.wait_for_connection_active(issuer_conn_id, max_wait=30)
+            return issuer_conn_id
+        except Exception as e:
+            logger.error(f"创建连接失败: {e}")
+            return None
+
+    async def get_or_create_connection(self) -> Optional[str]:
+        """
+        获取或创建连接（验证缓存连接有效性，并发请求共用同一次创建）
+
+        缓存连接在 connection_recheck_seconds 内验证过则直接复用。
+        """
+        async with self._connection_lock:
+            cached = self.core.issuer_connection_id
+            if cached:
+                if time.monotonic() - self._connection_checked_at < self.connection_recheck:
+                    return cached
+                if await self._is_connection_valid(cached):
+                    self._connection_checked_at = time.monotonic()
+                    return cached
+                logger.warning(f"缓存的连接已失效: {cached}，将重新获取")
+                self.core.issuer_connection_id = None
+
+            conn_id = await self._find_existing_connection()
+            if not conn_id:
+                logger.info("无可用连接，创建新连接...")
+                conn_id = await self._create_connection()
+
+            self.core.issuer_connection_id = conn_id
+            self._connection_checked_at = time.monotonic() if conn_id else 0.0
+            return conn_id
+
+    async def acquire_connection(self) -> Optional[str]:
+        """为一次发行分配连接（启用连接池时轮询分配，否则使用单一共享连接）"""
+        if self.connection_pool is not None:
+            return await self.connection_pool.acquire()
+        return await self.get_or_create_connection()
+
+    async def _find_connection_by_alias(self, alias: str) -> Optional[str]:
+        """按别名查找Issuer端active或response状态的连接"""
+        try:
+            data = await self._get_json(f"{self.issuer_admin_url}/connections", params={"alias": alias})
+            for conn in (data or {}).get('results', []):
+                if conn.get('alias') == alias and conn.get('state') in ['active', 'response']:
+                    return conn.get('connection_id')
+        except Exception as e:
+            logger.warning(f"按别名查找连接失败 {alias}: {e}")
+        return None
+
+    async def get_lane_connection(self, lane: IssuanceLane) -> Optional[str]:
+        """
+        获取发行通道的连接
+
+        通道未启用独立连接时使用共享连接；启用时按别名 oracle-issuer-<vc_type>
+        复用或创建该通道专用的连接。
+        """
+        if not lane.dedicated_connection:
+            return await self.acquire_connection()
+
+        async with lane.connection_lock:
+            cached = lane.connection_id
+            if cached:
+                if time.monotonic() - lane.connection_checked_at < self.connection_recheck:
+                    return cached
+                if await self._is_connection_valid(cached):
+                    lane.connection_checked_at = time.monotonic()
+                    return cached
+                logger.warning(f"通道 {lane.vc_type} 的连接已失效: {cached}，将重新获取")
+
+            alias = f"oracle-issuer-{lane.vc_type}"
+            conn_id = await self._find_connection_by_alias(alias) or await self._create_connection(alias)
+            lane.connection_id = conn_id
+            lane.connection_checked_at = time.monotonic() if conn_id else 0.0
+            return conn_id
+
+    # ==================== 凭证交换 ====================
+
+    async def _get_holder_record(self, thread_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        按thread_id查询Holder端凭证交换记录
+
+        返回:
+            (holder_cred_ex_id, state)，未找到时为 (None, None)
+        """
+        try:
+            data = await self._get_json(
+                f"{self.holder_admin_url}/issue-credential-2.0/records",
+                params={"thread_id": thread_id}
+            )
+            for record in (data or {}).get('results', []):
+                cred_ex = record.get('cred_ex_record', record)
+                if cred_ex.get('thread_id') == thread_id:
+                    return cred_ex.get('cred_ex_id'), cred_ex.get('state')
+        except Exception as e:
+            logger.warning(f"查询Holder记录失败: {e}")
+        return None, None
+
+    async def _get_issuer_state(self, cred_ex_id: str) -> Optional[str]:
+        """获取Issuer端凭证交换状态"""
+        try:
+            data = await self._get_json(f"{self.issuer_admin_url}/issue-credential-2.0/records/{cred_ex_id}")
+            if data:
+                cred_ex_record = data.get('cred_ex_record', data)
+                return cred_ex_record.get('state') or data.get('state')
+        except Exception as e:
+            logger.warning(f"获取Issuer状态失败: {e}")
+        return None
+
+    async def _holder_has_credential(self, vc_uuid: str) -> bool:
+        """按contractName(UUID)查询Holder钱包中是否已有该凭证（找到时同时加入凭证索引）"""
+        try:
+            data = await self._get_json(
+                f"{self.holder_admin_url}/credentials",
+                params={"wql": json.dumps({"attr::contractName::value": vc_uuid})}
+            )
+            for cred in (data or {}).get('results', []):
+                if cred.get('attrs', {}).get('contractName') == vc_uuid:
+                    if self.credential_index:
+                        self.credential_index.upsert(cred)
+                    return True
+            return False
+        except Exception as e:
+            logger.warning(f"查询Holder凭证失败: {e}")
+            return False
+
+    async def _wait_until(self, check, timeout: float) -> Any:
+        """
+        以poll_interval轮询check()，直到返回非None值或超时
+
+        返回:
+            check()的返回值；超时返回None
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            result = await check()
+            if result is not None:
+                return result
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def handle_webhook(self, role: str, payload: Dict, topic: str = TOPIC_ISSUE_CREDENTIAL_V2):
+        """
+        处理ACA-Py的凭证交换webhook
+
+        参数:
+            role: issuer / holder
+            payload: webhook请求体（cred_ex_record）
+            topic: issue_credential_v2_0、issue_credential_v2_0_indy 或 connections
+        """
+        if topic == TOPIC_CONNECTIONS:
+            if role == ROLE_ISSUER and self.connection_pool is not None:
+                self.connection_pool.handle_webhook(payload)
+            return
+        if role == ROLE_HOLDER and self.credential_index is not None:
+            await self.credential_index.handle_webhook(topic, payload)
+        if self.exchange_tracker is not None and topic == TOPIC_ISSUE_CREDENTIAL_V2:
+            await self.exchange_tracker.handle_event(role, payload)
+
+    async def monitor_issuance(self, cred_ex_id: str, thread_id: str,
+                               vc_uuid: Optional[str] = None,
+                               on_stage: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        监控VC发行进度
+
+        启用webhook时由状态机驱动（见 _monitor_with_tracker），
+        否则按轮询方式执行下述阶段。
+
+        参数:
+            on_stage: 到达 holder_requested / issued 阶段时的回调（用于持久化发行阶段）
+        """
+        if self.exchange_tracker is not None:
+            return await self._monitor_with_tracker(cred_ex_id, thread_id, vc_uuid, on_stage)
+        return await self._monitor_by_polling(cred_ex_id, thread_id, vc_uuid, on_stage)
+
+    async def _monitor_with_tracker(self, cred_ex_id: str, thread_id: str,
+                                    vc_uuid: Optional[str] = None,
+                                    on_stage: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        由webhook状态机驱动发行：每个状态到达即触发下一步
+
+        没有webhook到达时，每隔 reconcile_interval 查询一次两端状态补偿。
+        """
+        def on_state(role: str, state: str):
+            stage = stage_for_exchange_state(role, state)
+            if stage and on_stage is not None:
+                on_stage(stage)
+
+        tracker = self.exchange_tracker
+        tracker.track(thread_id, cred_ex_id, on_state=on_state)
+
+        async def reconcile():
+            holder_cred_ex_id, holder_state = await self._get_holder_record(thread_id)
+            if holder_state:
+                await tracker.handle_event(ROLE_HOLDER, {
+                    "thread_id": thread_id, "cred_ex_id": holder_cred_ex_id, "state": holder_state
+                })
+            issuer_state = await self._get_issuer_state(cred_ex_id)
+            if issuer_state:
+                await tracker.handle_event(ROLE_ISSUER, {
+                    "thread_id": thread_id, "cred_ex_id": cred_ex_id, "state": issuer_state
+                })
+
+        try:
+            completed = await tracker.wait(
+                thread_id,
+                timeout=self.issuance_timeout,
+                reconcile=reconcile,
+                reconcile_interval=self.reconcile_interval
+            )
+        finally:
+            tracker.untrack(thread_id)
+
+        if not completed:
+            return False
+
+        # 验证 VC 存储（UUID 匹配）
+        if vc_uuid:
+            async def credential_stored():
+                return True if await self._holder_has_credential(vc_uuid) else None
+
+            verify_timeout = max(self.issuance_timeout // 9, 1)
+            if not await self._wait_until(credential_stored, verify_timeout):
+                logger.error(f"凭证交换已完成，但Holder中未找到 UUID: {vc_uuid}")
+                return False
+            logger.info(f"Holder 已存储 VC (找到 UUID: {vc_uuid})!")
+
+        return True
+
+    async def _monitor_by_polling(self, cred_ex_id: str, thread_id: str,
+                                  vc_uuid: Optional[str] = None,
+                                  on_stage: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        轮询方式监控VC发行进度（阶段同 VCIssuanceCore.monitor_issuance，thread_id已由Offer响应给出）
+
+        阶段划分:
+        1. 等待 Holder 响应（自动响应或由Oracle触发send-request）
+        2. 触发 Issuer 颁发凭证
+        3. 等待 credential-received 并调用 Holder store
+        4. 验证 VC 存储（UUID 匹配）
+        """
+        stage_timeout = max(self.issuance_timeout // 3, 1)
+        cm = self.connection_manager
+
+        # ========== 阶段 1: 等待 Holder 响应 ==========
+        async def holder_responded():
+            holder_cred_ex_id, state = await self._get_holder_record(thread_id)
+            if state in ABANDONED_STATES:
+                return False
+            if state in OFFER_STATES and holder_cred_ex_id:
+                logger.info(f"Holder处于{state}状态，触发send-request")
+                await cm.send_holder_request_v2(holder_cred_ex_id)
+                return None
+            if state in REQUEST_SENT_STATES + CREDENTIAL_RECEIVED_STATES + ('done',):
+                return True
+            return None
+
+        responded = await self._wait_until(holder_responded, stage_timeout)
+        if not responded:
+            logger.error("等待 Holder 响应超时或凭证交换被废弃")
+            return False
+        if on_stage is not None:
+            on_stage(STAGE_HOLDER_REQUESTED)
+
+        # ========== 阶段 2: 触发 Issuer 颁发凭证 ==========
+        issuer_state = await self._get_issuer_state(cred_ex_id)
+        if issuer_state in ISSUED_STATES or issuer_state == 'done':
+            logger.info(f"Issuer 已颁发凭证 (状态：{issuer_state})，跳过触发步骤")
+        else:
+            if issuer_state is None:
+                logger.warning("无法获取 Issuer 状态，尝试继续流程")
+            if not await cm.issue_credential_v2(cred_ex_id):
+                logger.error("凭证颁发失败")
+                return False
+        if on_stage is not None:
+            on_stage(STAGE_ISSUED)
+
+        # ========== 阶段 3: 等待凭证到达并调用 Holder store ==========
+        async def holder_stored():
+            holder_cred_ex_id, state = await self._get_holder_record(thread_id)
+            if state == 'done':
+                return True
+            if state in CREDENTIAL_RECEIVED_STATES and holder_cred_ex_id:
+                if await cm.store_holder_credential_v2(holder_cred_ex_id):
+                    return True
+                logger.warning("Holder store 调用失败，继续等待")
+            return None
+
+        if not await self._wait_until(holder_stored, stage_timeout):
+            logger.warning("未能触发 Holder store，但继续验证 VC 存储")
+
+        # ========== 阶段 4: 验证 VC 存储（UUID 匹配） ==========
+        if vc_uuid:
+            async def credential_stored():
+                return True if await self._holder_has_credential(vc_uuid) else None
+
+            verify_timeout = max(self.issuance_timeout // 9, 1)
+            if not await self._wait_until(credential_stored, verify_timeout):
+                return False
+            logger.info(f"Holder 已存储 VC (找到 UUID: {vc_uuid})!")
+
+        return True
+
+    # ==================== 区块链写入 ====================
+
+    async def submit_to_blockchain(self, vc_type: str, vc_hash: str, metadata: Dict,
+                                   lane: Optional[IssuanceLane] = None) -> str:
+        """
+        在线程池中签名并发送交易（不等待回执）
+
+        参数:
+            lane: 发行通道（使用通道的nonce序列），None时每笔交易读取pending nonce
+
+        返回:
+            交易哈希（hex）
+        """
+        return await self._run_blocking(
+            self.core.send_vc_metadata_transaction, vc_type, vc_hash, metadata,
+            lane.nonce_stream if lane else None
+        )
+
+    async def wait_for_receipt(self, tx_hash: str):
+        """
+        异步等待交易回执（同一交易的并发等待共用一次轮询，如批量上链时同一批次的VC）
+
+        返回:
+            交易回执
+
+        异常:
+            交易失败或等待超时时抛出Exception
+        """
+        task = self._receipt_waits.get(tx_hash)
+        if task is None:
+            task = asyncio.create_task(self._poll_receipt(tx_hash))
+            self._receipt_waits[tx_hash] = task
+            task.add_done_callback(lambda t: self._receipt_wait_done(tx_hash, t))
+        return await asyncio.shield(task)
+
+    def _receipt_wait_done(self, tx_hash: str, task: asyncio.Task):
+        """回执轮询结束：移除任务（异常由等待方处理，这里只读取以免告警）"""
+        self._receipt_waits.pop(tx_hash, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _poll_receipt(self, tx_hash: str):
+        """轮询交易回执直到成功、失败或超时"""
+        deadline = time.monotonic() + self.receipt_timeout
+        while time.monotonic() < deadline:
+            receipt = await self._run_blocking(self.core.get_transaction_receipt, tx_hash)
+            if receipt is not None:
+                if receipt.status == 1:
+                    logger.info(f"交易确认成功, 区块: {receipt.blockNumber}")
+                    return receipt
+                raise Exception(f"交易失败, 状态: {receipt.status}")
+            await asyncio.sleep(self.poll_interval)
+
+        raise Exception(f"等待交易回执超时({self.receipt_timeout}秒): {tx_hash}")
+
+    async def write_to_blockchain(self, vc_type: str, vc_hash: str, metadata: Dict,
+                                  lane: Optional[IssuanceLane] = None) -> str:
+        """
+        写入区块链：发送交易并等待回执
+
+        返回:
+            交易哈希（hex）
+        """
+        tx_hash = await self.submit_to_blockchain(vc_type, vc_hash, metadata, lane)
+        await self.wait_for_receipt(tx_hash)
+        return tx_hash
+
+    # ==================== 主发行流程 ====================
+
+    async def issue_vc(self, vc_type: str, metadata: Dict, attributes: Dict,
+                       async_anchor: Optional[bool] = None,
+                       idempotency_key: Optional[str] = None) -> Dict:
+        """
+        完整的VC发行流程（返回值同 VCIssuanceCore.issue_vc，另含 anchor_status）
+
+        启用发行通道时请求进入对应vc_type的通道排队，由通道的工作协程执行。
+
+        参数:
+            async_anchor: 交易提交后立即返回（anchor_status=pending），None使用 service.anchoring.async
+            idempotency_key: 幂等键；同一键的请求正在执行时等待其结果，保留期内已成功时直接返回已有结果
+                             （此时结果含 idempotent_replay=true）
+        """
+        await self.start()
+        if not idempotency_key or self.idempotency is None:
+            return await self._dispatch(vc_type, metadata, attributes, async_anchor)
+
+        result, replayed = await self.idempotency.run(
+            idempotency_key,
+            lambda: self._dispatch(vc_type, metadata, attributes, async_anchor, idempotency_key),
+            lookup=self._lookup_idempotent_result if self.job_store else None
+        )
+        result = {**result, "idempotency_key": idempotency_key}
+        if replayed:
+            result["idempotent_replay"] = True
+        return result
+
+    async def _dispatch(self, vc_type: str, metadata: Dict, attributes: Dict,
+                        async_anchor: Optional[bool] = None,
+                        idempotency_key: Optional[str] = None) -> Dict:
+        """将请求交给对应vc_type的发行通道（未启用通道时直接执行）"""
+        if self.lanes is not None and vc_type in self.lanes:
+            return await self.lanes.submit(
+                vc_type, metadata, attributes, async_anchor=async_anchor, idempotency_key=idempotency_key
+            )
+        return await self.issue_in_lane(
+            None, vc_type, metadata, attributes, async_anchor=async_anchor, idempotency_key=idempotency_key
+        )
+
+    async def issue_in_lane(self, lane: Optional[IssuanceLane], vc_type: str,
+                            metadata: Dict, attributes: Dict,
+                            async_anchor: Optional[bool] = None,
+                            idempotency_key: Optional[str] = None) -> Dict:
+        """在并发限制内执行发行（发行通道的工作协程调用，lane为None时不经通道）"""
+        return await self._run_limited(
+            self._issue_vc(vc_type, metadata, attributes, lane, async_anchor, idempotency_key)
+        )
+
+    async def _run_limited(self, coro) -> Dict:
+        """在并发限制内执行一次发行并更新统计"""
+        async with self._semaphore:
+            self._in_flight += 1
+            self._stats["started"] += 1
+            try:
+                result = await coro
+            finally:
+                self._in_flight -= 1
+
+        if result.get("status") == "success":
+            self._stats["succeeded"] += 1
+        else:
+            self._stats["failed"] += 1
+        return result
+
+    async def _issue_vc(self, vc_type: str, metadata: Dict, attributes: Dict,
+                        lane: Optional[IssuanceLane] = None,
+                        async_anchor: Optional[bool] = None,
+                        idempotency_key: Optional[str] = None) -> Dict:
+        """受理发行请求：校验VC类型、生成UUID、创建任务记录，然后执行任务"""
+        request_id = str(uuid.uuid4())
+        logger.info(f"[{request_id}] 开始发行 {vc_type} VC")
+
+        # 验证VC类型
+        if vc_type not in self.core.vc_type_configs:
+            return {"status": "failed", "request_id": request_id, "error": f"不支持的VC类型: {vc_type}"}
+
+        if not self.core.vc_type_configs[vc_type].get('cred_def_id'):
+            return {"status": "failed", "request_id": request_id, "error": "缺少cred_def_id配置"}
+
+        # 生成UUID
+        attributes = dict(attributes)
+        original_contract_name = attributes.get('contractName', '')
+        vc_uuid = str(uuid.uuid4())
+        attributes['contractName'] = vc_uuid
+        logger.info(f"[{request_id}] 生成UUID: {vc_uuid}")
+
+        # 自动生成productBatch
+        if not attributes.get('productBatch'):
+            attributes['productBatch'] = f"BATCH-{str(uuid.uuid4())[:8].upper()}"
+
+        job = {
+            "request_id": request_id,
+            "vc_type": vc_type,
+            "stage": STAGE_CREATED,
+            "metadata": metadata,
+            "attributes": attributes,
+            "original_contract_name": original_contract_name,
+            "vc_uuid": vc_uuid,
+            "async_anchor": async_anchor,
+            "idempotency_key": idempotency_key
+        }
+        if self.job_store is not None:
+            try:
+                job = await self._run_blocking(
+                    self.job_store.create, request_id, vc_type, metadata, attributes,
+                    original_contract_name, vc_uuid, async_anchor, idempotency_key
+                )
+            except Exception as e:
+                logger.error(f"[{request_id}] 创建发行任务记录失败: {e}", exc_info=True)
+                return {"status": "failed", "request_id": request_id, "error": f"创建发行任务失败: {e}"}
+
+        return await self._run_job(job, lane, StageTimer())
+
+    def _set_stage(self, job: Dict, stage: str, timer: Optional[StageTimer] = None, **fields):
+        """更新内存中的任务阶段（阶段只前进不后退）并记录阶段耗时"""
+        job.update(fields)
+        if not stage_reached(job["stage"], stage):
+            job["stage"] = stage
+            if timer is not None and stage in _JOB_STAGE_TIMINGS:
+                timer.mark(_JOB_STAGE_TIMINGS[stage])
+
+    async def _persist_stage(self, job: Dict, stage: str, **fields):
+        """在线程池中持久化任务阶段（多worker共享数据库时写锁等待不阻塞事件循环）"""
+        if self.job_store is None:
+            return
+        try:
+            await self._run_blocking(functools.partial(self.job_store.update_stage, job["request_id"], stage, **fields))
+        except Exception as e:
+            logger.error(f"[{job['request_id']}] 保存发行阶段 {stage} 失败: {e}")
+
+    async def _advance_job(self, job: Dict, stage: str, timer: Optional[StageTimer] = None, **fields):
+        """推进任务阶段并持久化"""
+        self._set_stage(job, stage, timer, **fields)
+        await self._persist_stage(job, stage, **fields)
+
+    def _on_exchange_stage(self, job: Dict, stage: str, timer: Optional[StageTimer] = None):
+        """凭证交换的中间阶段回调（同步调用）：立即更新内存阶段，持久化在后台执行"""
+        self._set_stage(job, stage, timer)
+        if self.job_store is not None:
+            self._spawn(self._persist_stage(job, stage))
+
+    async def _fail_job(self, job: Dict, error: str, **extra) -> Dict:
+        """标记任务失败，返回失败结果"""
+        job["stage"] = STAGE_FAILED
+        if self.job_store is not None:
+            try:
+                await self._run_blocking(self.job_store.fail, job["request_id"], error)
+            except Exception as e:
+                logger.error(f"[{job['request_id']}] 保存任务失败状态失败: {e}")
+        return {"status": "failed", "request_id": job["request_id"], "error": error, **extra}
+
+    async def _run_job(self, job: Dict, lane: Optional[IssuanceLane] = None,
+                       timer: Optional[StageTimer] = None) -> Dict:
+        """
+        执行任务并记录分阶段耗时
+
+        参数:
+            timer: 阶段计时器；恢复的任务不计时（其首个阶段的耗时不完整）
+
+        返回:
+            发行结果，计时时含 stage_timings
+        """
+        result = await self._execute_job(job, lane, timer)
+        if timer is not None:
+            timings = timer.finish()
+            self.metrics.record(job["vc_type"], timings, result.get("status", "failed"))
+            result["stage_timings"] = timings
+        return result
+
+    async def _execute_job(self, job: Dict, lane: Optional[IssuanceLane] = None,
+                           timer: Optional[StageTimer] = None) -> Dict:
+        """
+        从任务当前阶段开始执行发行流程（新请求从 created 开始，恢复的任务从最后阶段继续）
+
+        已完成的阶段不再重复：Offer只发送一次，上链交易只提交一次。
+        """
+        request_id = job["request_id"]
+        vc_type = job["vc_type"]
+        vc_uuid = job["vc_uuid"]
+        attributes = job["attributes"]
+        config = self.core.vc_type_configs[vc_type]
+        cred_def_id = config.get('cred_def_id')
+        entry_stage = job["stage"]
+        found_on_chain = False
+
+        try:
+            if job["stage"] == STAGE_CREATED:
+                # 步骤1: 获取连接
+                logger.info(f"[{request_id}] 步骤1: 获取连接")
+                if lane is not None:
+                    connection_id = await self.get_lane_connection(lane)
+                else:
+                    connection_id = await self.acquire_connection()
+                if not connection_id:
+                    return await self._fail_job(job, "无法建立ACA-Py连接")
+                if timer is not None:
+                    timer.mark(STAGE_CONNECTION)
+
+                # 步骤2: 发送VC Offer
+                logger.info(f"[{request_id}] 步骤2: 发送VC Offer (AIP 2.0)")
+                try:
+                    offer = await self.connection_manager.send_credential_offer_v2(
+                        connection_id, cred_def_id, attributes
+                    )
+                except Exception as e:
+                    logger.error(f"[{request_id}] 发送VC Offer失败: {e}")
+                    offer = None
+                    if self.connection_pool is not None:
+                        self.connection_pool.mark_invalid(connection_id)
+
+                cred_ex_id = (offer or {}).get('cred_ex_id')
+                thread_id = (offer or {}).get('thread_id')
+                if not cred_ex_id or not thread_id:
+                    return await self._fail_job(job, "发送VC Offer失败")
+                await self._advance_job(job, STAGE_OFFER_SENT, timer, connection_id=connection_id,
+                                  cred_ex_id=cred_ex_id, thread_id=thread_id)
+                logger.info(f"[{request_id}] VC Offer已发送: cred_ex_id={cred_ex_id}, thread_id={thread_id}")
+
+            cred_ex_id = job["cred_ex_id"]
+
+            if not stage_reached(job["stage"], STAGE_STORED):
+                # 步骤3: 监控发行进度
+                logger.info(f"[{request_id}] 步骤3: 监控发行进度")
+                if not await self.monitor_issuance(
+                    cred_ex_id, job["thread_id"], vc_uuid=vc_uuid,
+                    on_stage=lambda stage: self._on_exchange_stage(job, stage, timer)
+                ):
+                    return await self._fail_job(job, "VC发行超时或失败")
+                await self._advance_job(job, STAGE_STORED, timer)
+
+            if not stage_reached(job["stage"], STAGE_ANCHORED):
+                # 步骤4: 计算VC Hash
+                logger.info(f"[{request_id}] 步骤4: 计算VC Hash")
+                vc_content = {
+                    "schema_id": config.get('schema_id', ''),
+                    "cred_def_id": cred_def_id,
+                    "values": attributes,
+                    "credential_exchange_id": cred_ex_id
+                }
+                vc_hash = self.core.calculate_vc_hash(vc_content)
+                logger.info(f"[{request_id}] VC Hash: {vc_hash}")
+
+                # 步骤5: 写入区块链
+                metadata_with_uuid = job["metadata"].copy()
+                metadata_with_uuid['vcName'] = f"{job['metadata'].get('vcName', '')} (UUID: {vc_uuid})"
+                on_chain = None
+                if self.merkle_anchor is None and stage_reached(entry_stage, STAGE_STORED):
+                    # 恢复的任务：上次可能已发送交易但未保存 anchored 阶段，合约中已有该VC时不再重复发送
+                    on_chain = await self._run_blocking(self.core.find_vc_metadata_anchor, vc_type, vc_hash)
+
+                if on_chain is not None:
+                    logger.info(f"[{request_id}] 步骤5: VC已在合约中，跳过上链（交易 {on_chain['tx_hash']}）")
+                    found_on_chain = True
+                    tx_hash = on_chain["tx_hash"]
+                    job["block_number"] = on_chain["block_number"]
+                elif self.merkle_anchor is not None:
+                    logger.info(f"[{request_id}] 步骤5: 加入Merkle批量锚定")
+                    tx_hash = (await self.merkle_anchor.anchor(vc_type, vc_hash, vc_uuid))["tx_hash"]
+                elif self.metadata_aggregator is not None:
+                    logger.info(f"[{request_id}] 步骤5: 加入批量上链（addVCMetadataBatch）")
+                    tx_hash = await self.metadata_aggregator.add(vc_type, vc_hash, metadata_with_uuid)
+                else:
+                    logger.info(f"[{request_id}] 步骤5: 写入区块链")
+                    tx_hash = await self.submit_to_blockchain(vc_type, vc_hash, metadata_with_uuid, lane)
+                await self._advance_job(job, STAGE_ANCHORED, timer, vc_hash=vc_hash, tx_hash=tx_hash)
+
+            vc_hash, tx_hash = job["vc_hash"], job["tx_hash"]
+            async_anchor = job.get("async_anchor")
+            if found_on_chain or not tx_hash:
+                # 恢复时在合约中找到的VC（未找到事件时没有交易哈希）：交易已打包，直接记录为已确认
+                anchor_status, block_number = ANCHOR_CONFIRMED, job.get("block_number")
+                self.anchor_tracker.record_confirmed(
+                    vc_hash, tx_hash, vc_type, block_number, vc_uuid, request_id
+                )
+                logger.info(f"[{request_id}] VC已在合约中，记录为已确认")
+            elif async_anchor if async_anchor is not None else self.async_anchor:
+                # 异步锚定：交易已提交，回执由后台确认
+                self.anchor_tracker.track_pending(vc_hash, tx_hash, vc_type, vc_uuid, request_id)
+                anchor_status, block_number = ANCHOR_PENDING, None
+                logger.info(f"[{request_id}] 交易已提交，后台确认: {tx_hash}")
+            else:
+                receipt = await self.wait_for_receipt(tx_hash)
+                self.anchor_tracker.record_confirmed(
+                    vc_hash, tx_hash, vc_type, receipt.blockNumber, vc_uuid, request_id
+                )
+                anchor_status, block_number = ANCHOR_CONFIRMED, receipt.blockNumber
+                if timer is not None:
+                    timer.mark(STAGE_CHAIN_CONFIRM)
+                logger.info(f"[{request_id}] 区块链写入成功: {tx_hash}")
+
+            # 步骤6: 记录UUID
+            await self._run_blocking(
+                self.core.log_uuid_to_file,
+                vc_uuid, vc_type, job["original_contract_name"], vc_hash, tx_hash, request_id
+            )
+            await self._advance_job(job, STAGE_COMPLETED, timer, block_number=block_number)
+            return self._job_result(job, anchor_status)
+
+        except asyncio.CancelledError:
+            # 服务停止：任务保留在当前阶段，下次启动时继续
+            raise
+        except Exception as e:
+            logger.error(f"[{request_id}] VC 发行失败: {e}", exc_info=True)
+            return await self._fail_job(
+                job, str(e),
+                error_type=type(e).__name__,
+                timestamp=datetime.now().isoformat()
+            )
+
+    def _job_result(self, job: Dict, anchor_status: Optional[str] = None) -> Dict:
+        """已完成任务的发行结果（anchor_status为None时取锚定跟踪器的最新状态）"""
+        if anchor_status is None:
+            record = self.anchor_tracker.get(job["vc_hash"])
+            if record:
+                anchor_status = record["status"]
+            else:
+                anchor_status = ANCHOR_CONFIRMED if job.get("block_number") is not None else ANCHOR_PENDING
+        return {
+            "status": "success",
+            "request_id": job["request_id"],
+            "vc_hash": job["vc_hash"],
+            "vc_uuid": job["vc_uuid"],
+            "tx_hash": job["tx_hash"],
+            "anchor_status": anchor_status,
+            "block_number": job.get("block_number"),
+            "cred_ex_id": job["cred_ex_id"],
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def _lookup_idempotent_result(self, idempotency_key: str,
+                                        retention: float) -> Optional[Tuple[Dict, float]]:
+        """
+        从任务存储查询幂等键已完成的发行（进程重启后内存缓存为空时使用）
+
+        返回:
+            (发行结果, 完成后已过去的秒数)；没有已完成的任务时返回None
+        """
+        since = (datetime.now() - timedelta(seconds=retention)).isoformat()
+        job = await self._run_blocking(self.job_store.find_by_idempotency_key, idempotency_key, since)
+        if job is not None and job["stage"] != STAGE_COMPLETED and self._owned_by_other_worker(job):
+            job = await self._wait_for_other_worker(job)
+        if job is None or job["stage"] != STAGE_COMPLETED:
+            return None
+        age = (datetime.now() - datetime.fromisoformat(job["updated_at"])).total_seconds()
+        logger.info(f"幂等键 {idempotency_key} 已有完成的发行任务: {job['request_id']}")
+        return self._job_result(job), age
+
+    def _owned_by_other_worker(self, job: Dict) -> bool:
+        """任务是否正由另一个存活的worker进程执行"""
+        owner = job.get("owner_pid")
+        return owner is not None and owner != os.getpid() and pid_alive(owner)
+
+    async def _wait_for_other_worker(self, job: Dict) -> Optional[Dict]:
+        """等待另一个worker进程中同一幂等键的任务结束（失败、超时或该进程退出时返回None）"""
+        logger.info(f"幂等键 {job['idempotency_key']} 的任务 {job['request_id']} 正在进程 {job['owner_pid']} 中执行，等待结果")
+        deadline = time.monotonic() + self.issuance_timeout + self.receipt_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            job = await self._run_blocking(self.job_store.get, job["request_id"])
+            if job is None or job["stage"] in (STAGE_COMPLETED, STAGE_FAILED):
+                return job
+            if not self._owned_by_other_worker(job):
+                return None
+        logger.warning(f"等待任务 {job['request_id']} 超时")
+        return None
+
+    # ==================== 任务恢复 ====================
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """创建后台任务并保留引用"""
+        task = asyncio.create_task(coro)
+        self._resume_tasks.add(task)
+        task.add_done_callback(self._resume_tasks.discard)
+        return task
+
+    async def resume_jobs(self) -> int:
+        """
+        恢复未完成的发行任务（服务启动时调用）
+
+        超过 max_resume_age_seconds 的任务和VC类型已不在配置中的任务标记为失败。
+        多worker部署时跳过所属进程仍存活的任务，其余任务先接管（claim）再恢复，同一任务只由一个worker执行。
+
+        返回:
+            恢复执行的任务数
+        """
+        try:
+            jobs = await self._run_blocking(self.job_store.unfinished)
+        except Exception as e:
+            logger.error(f"读取未完成的发行任务失败: {e}", exc_info=True)
+            return 0
+
+        resumed = 0
+        now = datetime.now()
+        for job in jobs:
+            if self._owned_by_other_worker(job):
+                continue
+            if job.get("owner_pid") != os.getpid():
+                if not await self._run_blocking(self.job_store.claim, job["request_id"], job.get("owner_pid")):
+                    continue
+            age = (now - datetime.fromisoformat(job["created_at"])).total_seconds()
+            if age > self.max_resume_age:
+                await self._fail_job(job, f"任务已过期（{int(age)}秒前创建），不再恢复")
+                continue
+            if job["vc_type"] not in self.core.vc_type_configs:
+                await self._fail_job(job, f"不支持的VC类型: {job['vc_type']}")
+                continue
+
+            await self._run_blocking(self.job_store.mark_resumed, job["request_id"])
+            self._spawn(self._resume_job(job))
+            resumed += 1
+
+        if jobs:
+            logger.info(f"发现 {len(jobs)} 个未完成的发行任务，恢复 {resumed} 个")
+        return resumed
+
+    async def _resume_job(self, job: Dict) -> Dict:
+        """从最后阶段继续执行一个任务（使用该VC类型通道的nonce序列和连接）"""
+        logger.info(f"[{job['request_id']}] 恢复发行任务: {job['vc_type']}, 阶段 {job['stage']}")
+        self._stats["resumed"] += 1
+        lane = self.lanes.lanes.get(job["vc_type"]) if self.lanes else None
+        if job.get("idempotency_key") and self.idempotency is not None:
+            # 登记为进行中，客户端重试时等待恢复的任务而不是重新发行
+            result, _ = await self.idempotency.run(
+                job["idempotency_key"], lambda: self._run_limited(self._run_job(job, lane))
+            )
+        else:
+            result = await self._run_limited(self._run_job(job, lane))
+        logger.info(f"[{job['request_id']}] 恢复的发行任务结束: {result.get('status')}")
+        return result
+
+    def get_stats(self) -> Dict:
+        """获取发行统计"""
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrent": self.max_concurrent,
+            **self._stats,
+            "exchange_tracker": self.exchange_tracker.get_stats() if self.exchange_tracker else None,
+            "lanes": self.lanes.get_stats() if self.lanes else None,
+            "anchoring": {
+                "async": self.async_anchor,
+                **self.anchor_tracker.get_stats(),
+                "batch": self.metadata_aggregator.get_stats() if self.metadata_aggregator else None,
+                "merkle": self.merkle_anchor.get_stats() if self.merkle_anchor else None
+            },
+            "credential_index": self.credential_index.get_stats() if self.credential_index else None,
+            "connection_pool": self.connection_pool.get_stats() if self.connection_pool else None,
+            "unfinished_jobs": self.job_store.unfinished_counts() if self.job_store else None,
+            "idempotency": self.idempotency.get_stats() if self.idempotency else None,
+            "gas_cache": self.core.gas_cache.get_stats(),
+            "workers": self.coordination.get_stats() if self.coordination else None
+        }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 批量发行
+一次请求提交多个 {vc_type, metadata, attributes}，并发执行，
+同一vc_type的并发数受 parallelism 限制，每完成一项立即回调（供HTTP流式返回）
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from vc_metadata_aggregator import parse_expiry_time
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('vc_issuance_batch')
+
+
+# 默认参数（可通过 service.batch_issuance 配置段覆盖）
+DEFAULT_BATCH_SETTINGS = {
+    "max_items": 100,              # 单次批量请求的最大条目数
+    "default_parallelism": 5,      # 每个vc_type的默认并发数
+    "max_parallelism": 50,         # 请求可指定的最大并发数
+    "parallelism_per_type": {},    # 按vc_type覆盖默认并发数
+    "batch_timeout_seconds": 1800  # 整批等待超时（秒）
+}
+
+
+def load_batch_settings(batch_config: Optional[Dict] = None) -> Dict:
+    """
+    合并批量发行配置与默认值
+
+    参数:
+        batch_config: service.batch_issuance 配置段
+
+    返回:
+        完整的配置字典
+    """
+    batch_config = batch_config or {}
+    return {key: batch_config.get(key, default) for key, default in DEFAULT_BATCH_SETTINGS.items()}
+
+
+def validate_batch_items(items, max_items: int) -> Optional[str]:
+    """
+    校验批量请求条目
+
+    参数:
+        items: 请求中的 items 字段
+        max_items: 最大条目数
+
+    返回:
+        错误信息，校验通过返回None
+    """
+    if not isinstance(items, list) or not items:
+        return "items必须是非空列表"
+    if len(items) > max_items:
+        return f"items数量超过上限: {len(items)} > {max_items}"
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('vc_type'):
+            return f"第{index}项缺少vc_type参数"
+        try:
+            parse_expiry_time(item.get('metadata'))
+        except ValueError as e:
+            return f"第{index}项{e}"
+    return None
+
+
+def resolve_parallelism(settings: Dict, vc_type: str, requested: Optional[int] = None) -> int:
+    """
+    计算某个vc_type的并发数（请求指定 > 按类型配置 > 默认值，且不超过 max_parallelism）
+
+    参数:
+        settings: load_batch_settings 返回的配置
+        vc_type: VC类型
+        requested: 请求中指定的并发数
+
+    返回:
+        并发数（至少为1）
+    """
+    if requested:
+        parallelism = requested
+    else:
+        parallelism = settings["parallelism_per_type"].get(vc_type, settings["default_parallelism"])
+    return max(1, min(int(parallelism), settings["max_parallelism"]))
+
+
+async def issue_batch(
+    core: "AsyncVCIssuanceCore",
+    items: List[Dict],
+    settings: Dict,
+    on_result: Callable[[Dict], None],
+    parallelism: Optional[int] = None
+) -> Dict:
+    """
+    并发执行批量发行，每完成一项调用一次 on_result
+
+    参数:
+        core: 异步发行核心
+        items: [{vc_type, metadata, attributes, async_anchor?, idempotency_key?}]
+        settings: load_batch_settings 返回的配置
+        on_result: 单项结果回调（在事件循环线程中调用）
+        parallelism: 请求指定的每个vc_type并发数（None使用配置）
+
+    返回:
+        汇总结果 {total, succeeded, failed, elapsed_seconds, ...}
+    """
+    batch_start = time.monotonic()
+    limits = {
+        vc_type: resolve_parallelism(settings, vc_type, parallelism)
+        for vc_type in dict.fromkeys(item['vc_type'] for item in items)
+    }
+    semaphores = {vc_type: asyncio.Semaphore(limit) for vc_type, limit in limits.items()}
+    logger.info(f"开始批量发行: {len(items)} 项, 每类型并发限制={limits}")
+
+    item_durations: List[float] = []
+    by_type: Dict[str, Dict[str, int]] = {}
+
+    async def run_item(index: int, item: Dict):
+        vc_type = item['vc_type']
+        async with semaphores[vc_type]:
+            item_start = time.monotonic()
+            try:
+                result = await core.issue_vc(
+                    vc_type, item.get('metadata', {}), item.get('attributes', {}),
+                    async_anchor=item.get('async_anchor'),
+                    idempotency_key=item.get('idempotency_key')
+                )
+            except Exception as e:
+                logger.error(f"批量发行第{index}项异常: {e}", exc_info=True)
+                result = {"status": "failed", "error": str(e), "error_type": type(e).__name__}
+            elapsed = time.monotonic() - item_start
+
+        item_durations.append(elapsed)
+        counters = by_type.setdefault(vc_type, {"succeeded": 0, "failed": 0})
+        counters["succeeded" if result.get("status") == "success" else "failed"] += 1
+
+        on_result({
+            "type": "result",
+            "index": index,
+            "vc_type": vc_type,
+            "elapsed_seconds": round(elapsed, 3),
+            **result
+        })
+
+    await asyncio.gather(*(run_item(index, item) for index, item in enumerate(items)))
+
+    elapsed = time.monotonic() - batch_start
+    succeeded = sum(c["succeeded"] for c in by_type.values())
+    summary = {
+        "type": "summary",
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "by_type": by_type,
+        "parallelism": limits,
+        "elapsed_seconds": round(elapsed, 3),
+        "avg_item_seconds": round(sum(item_durations) / len(item_durations), 3) if item_durations else None,
+        "max_item_seconds": round(max(item_durations), 3) if item_durations else None,
+        "throughput_per_minute": round(len(items) / elapsed * 60, 2) if elapsed > 0 else None,
+        "timestamp": datetime.now().isoformat()
+    }
+    logger.info(f"批量发行完成: 成功 {succeeded}/{len(items)}, 耗时 {elapsed:.2f}秒")
+    return summary
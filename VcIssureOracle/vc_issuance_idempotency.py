@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 发行请求幂等
+同一幂等键（Idempotency-Key请求头，或由规范化请求内容计算）的请求：
+- 正在执行时，后到的请求等待并共享同一结果
+- 保留期内已成功完成时，直接返回已有结果（内存缓存，进程重启后由任务存储回答）
+失败的结果不保留，客户端重试会重新发行
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+logger = logging.getLogger('vc_issuance_idempotency')
+
+
+# 请求头
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# 由请求内容计算的幂等键前缀（与客户端提供的键区分）
+DERIVED_KEY_PREFIX = "payload:"
+
+
+# metadata 中每次请求都会重新生成、不参与幂等键计算的字段
+VOLATILE_METADATA_FIELDS = ("expiryTime",)
+
+
+def _normalize(value: Any) -> Any:
+    """规范化属性值：字符串去除首尾空白，其余转为字符串（字典和列表逐项规范化）"""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return str(value).strip()
+
+
+def derive_idempotency_key(vc_type: str, metadata: Dict, attributes: Dict) -> str:
+    """
+    由请求内容计算幂等键
+
+    使用 vc_type、metadata（链上的vcName、vcDescription等）和 attributes（凭证内容）；
+    metadata 中每次请求都会重新生成的 expiryTime 不参与计算。
+
+    返回:
+        "payload:" + SHA-256十六进制
+    """
+    canonical = json.dumps(
+        {
+            "vc_type": vc_type,
+            "metadata": {
+                str(k): _normalize(v) for k, v in (metadata or {}).items()
+                if k not in VOLATILE_METADATA_FIELDS
+            },
+            "attributes": {str(k): _normalize(v) for k, v in (attributes or {}).items()}
+        },
+        sort_keys=True, ensure_ascii=False, separators=(',', ':')
+    )
+    return DERIVED_KEY_PREFIX + hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class IdempotencyCache:
+    """
+    幂等请求缓存（在事件循环中使用）
+
+    进行中的请求以 asyncio.Future 登记；成功结果按保留期缓存，超出 max_entries 时淘汰最旧的。
+    """
+
+    def __init__(self, retention_seconds: float = 3600, derived_retention_seconds: float = 300,
+                 max_entries: int = 10000):
+        """
+        初始化幂等缓存
+
+        参数:
+            retention_seconds: 客户端提供的幂等键的结果保留时间（秒）
+            derived_retention_seconds: 由请求内容计算的幂等键的结果保留时间（秒）
+            max_entries: 内存中最多保留的结果数
+        """
+        self.retention_seconds = retention_seconds
+        self.derived_retention_seconds = derived_retention_seconds
+        self.max_entries = max_entries
+
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._completed: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._stats = {"executed": 0, "joined": 0, "replayed": 0, "restored": 0}
+
+    def retention_for(self, key: str) -> float:
+        """幂等键对应的保留时间（秒）"""
+        return self.derived_retention_seconds if key.startswith(DERIVED_KEY_PREFIX) else self.retention_seconds
+
+    def _cached(self, key: str) -> Optional[Dict]:
+        """读取未过期的缓存结果"""
+        entry = self._completed.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.monotonic() >= expires_at:
+            del self._completed[key]
+            return None
+        return result
+
+    def _remember(self, key: str, result: Dict, age: float = 0.0):
+        """缓存成功结果"""
+        self._completed[key] = (time.monotonic() + self.retention_for(key) - age, result)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_entries:
+            self._completed.popitem(last=False)
+
+    async def run(self, key: str, execute: Callable[[], Awaitable[Dict]],
+                  lookup: Optional[Callable[[str, float], Awaitable[Optional[Tuple[Dict, float]]]]] = None
+                  ) -> Tuple[Dict, bool]:
+        """
+        按幂等键执行请求
+
+        参数:
+            key: 幂等键
+            execute: 实际执行发行的协程函数
+            lookup: 内存中没有结果时查询持久化记录的协程函数 lookup(key, retention)，
+                    返回 (结果, 已过去的秒数) 或 None
+
+        返回:
+            (结果, 是否为重复请求)
+        """
+        result = self._cached(key)
+        if result is not None:
+            self._stats["replayed"] += 1
+            return result, True
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._stats["joined"] += 1
+            logger.info(f"幂等键 {key} 的请求正在执行，等待其结果")
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            if lookup is not None:
+                found = await lookup(key, self.retention_for(key))
+                if found is not None:
+                    result, age = found
+                    self._remember(key, result, age)
+                    self._stats["restored"] += 1
+                    future.set_result(result)
+                    return result, True
+
+            self._stats["executed"] += 1
+            result = await execute()
+            if result.get("status") == "success":
+                self._remember(key, result)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            if not future.done():
+                future.set_result({"status": "failed", "error": f"发行请求异常: {e}", "error_type": type(e).__name__})
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        """获取幂等缓存统计"""
+        return {"in_flight": len(self._in_flight), "cached": len(self._completed), **self._stats}
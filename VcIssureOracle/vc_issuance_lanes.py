@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 按VC类型划分的发行通道
+每个vc_type一条通道：独立的请求队列、工作协程、Oracle账户nonce序列，
+以及可选的独立Issuer-Holder连接，某一类型的请求积压不会拖慢其他类型
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('vc_issuance_lanes')
+
+
+# 默认参数（可通过 service.issuance_lanes 配置段覆盖）
+DEFAULT_LANE_SETTINGS = {
+    "enabled": True,
+    "default_workers": 20,           # 每条通道的工作协程数
+    "workers_per_type": {},          # 按vc_type覆盖工作协程数
+    "max_queue_size": 1000,          # 每条通道的最大排队数
+    "dedicated_connections": False   # 每条通道使用独立的Issuer-Holder连接
+}
+
+
+class NonceStream:
+    """
+    Oracle账户的本地nonce序列
+
+    首次发送时从链上读取pending nonce，之后在本地递增，
+    避免每笔交易都查询一次 eth_getTransactionCount；发送失败时重置，下次重新读取。
+    """
+
+    def __init__(self, address: str):
+        """
+        初始化nonce序列
+
+        参数:
+            address: Oracle账户地址
+        """
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce: Optional[int] = None
+        self._stats = {"sent": 0, "resyncs": 0}
+
+    def send(self, fetch_nonce: Callable[[], int], send_with_nonce: Callable[[int], Any]) -> Tuple[Any, int]:
+        """
+        分配nonce并发送交易（同一账户的发送串行执行，保证nonce连续）
+
+        参数:
+            fetch_nonce: 读取链上pending nonce的函数
+            send_with_nonce: 使用给定nonce签名并发送交易的函数
+
+        返回:
+            (send_with_nonce的返回值, 使用的nonce)
+        """
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = fetch_nonce()
+                self._stats["resyncs"] += 1
+
+            nonce = self._next_nonce
+            try:
+                result = send_with_nonce(nonce)
+            except Exception:
+                # nonce可能已被占用或交易未进入交易池，下次重新读取
+                self._next_nonce = None
+                raise
+
+            self._next_nonce = nonce + 1
+            self._stats["sent"] += 1
+            return result, nonce
+
+    def get_stats(self) -> Dict:
+        """获取nonce序列状态"""
+        return {"address": self.address, "next_nonce": self._next_nonce, **self._stats}
+
+
+class IssuanceLane:
+    """单个VC类型的发行通道"""
+
+    def __init__(self, vc_type: str, workers: int, max_queue_size: int,
+                 nonce_stream: NonceStream, dedicated_connection: bool = False):
+        """
+        初始化发行通道
+
+        参数:
+            vc_type: VC类型
+            workers: 工作协程数
+            max_queue_size: 最大排队数
+            nonce_stream: 该类型Oracle账户的nonce序列
+            dedicated_connection: 是否使用独立的Issuer-Holder连接
+        """
+        self.vc_type = vc_type
+        self.workers = max(1, workers)
+        self.max_queue_size = max_queue_size
+        self.nonce_stream = nonce_stream
+        self.dedicated_connection = dedicated_connection
+
+        # 独立连接（dedicated_connection=True时使用）
+        self.connection_id: Optional[str] = None
+        self.connection_checked_at = 0.0
+
+        # 以下对象需在事件循环中创建（见 start）
+        self.queue: Optional[asyncio.Queue] = None
+        self.connection_lock: Optional[asyncio.Lock] = None
+        self._tasks = []
+
+        self._in_flight = 0
+        self._stats = {"submitted": 0, "rejected": 0, "completed": 0, "total_wait_seconds": 0.0}
+
+    async def start(self, handler: Callable[["IssuanceLane", str, Dict, Dict], Any]):
+        """
+        启动工作协程
+
+        参数:
+            handler: 处理单个请求的协程函数 handler(lane, vc_type, metadata, attributes, **options)
+        """
+        if self.queue is not None:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.connection_lock = asyncio.Lock()
+        self._tasks = [
+            asyncio.create_task(self._worker(handler), name=f"lane-{self.vc_type}-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"发行通道 {self.vc_type} 已启动: 工作协程={self.workers}, 独立连接={self.dedicated_connection}")
+
+    async def stop(self):
+        """停止工作协程（未处理的请求返回失败）"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while self.queue is not None and not self.queue.empty():
+            future = self.queue.get_nowait()[0]
+            if not future.done():
+                future.set_result({"status": "failed", "error": f"发行通道 {self.vc_type} 已停止"})
+
+    async def submit(self, metadata: Dict, attributes: Dict, **options) -> Dict:
+        """
+        提交发行请求并等待结果
+
+        参数:
+            options: 透传给处理函数的发行选项（如 async_anchor）
+
+        返回:
+            发行结果（同 AsyncVCIssuanceCore.issue_vc）
+        """
+        if self.queue.full():
+            self._stats["rejected"] += 1
+            return {"status": "failed", "error": f"发行通道 {self.vc_type} 排队已满({self.max_queue_size})"}
+
+        future = asyncio.get_running_loop().create_future()
+        self._stats["submitted"] += 1
+        self.queue.put_nowait((future, metadata, attributes, options, time.monotonic()))
+        return await future
+
+    async def _worker(self, handler):
+        """工作协程：依次处理队列中的请求"""
+        while True:
+            future, metadata, attributes, options, enqueued_at = await self.queue.get()
+            self._stats["total_wait_seconds"] += time.monotonic() - enqueued_at
+            self._in_flight += 1
+            try:
+                result = await handler(self, self.vc_type, metadata, attributes, **options)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.set_result({"status": "failed", "error": f"发行通道 {self.vc_type} 已停止"})
+                raise
+            except Exception as e:
+                logger.error(f"发行通道 {self.vc_type} 处理请求异常: {e}", exc_info=True)
+                result = {"status": "failed", "error": str(e), "error_type": type(e).__name__}
+            finally:
+                self._in_flight -= 1
+                self.queue.task_done()
+
+            self._stats["completed"] += 1
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> Dict:
+        """获取通道统计"""
+        started = self._stats["completed"] + self._in_flight
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "in_flight": self._in_flight,
+            "submitted": self._stats["submitted"],
+            "completed": self._stats["completed"],
+            "rejected": self._stats["rejected"],
+            "avg_queue_wait_seconds": round(self._stats["total_wait_seconds"] / started, 3) if started else None,
+            "connection_id": self.connection_id,
+            "nonce": self.nonce_stream.get_stats()
+        }
+
+
+class IssuanceLaneManager:
+    """
+    发行通道管理器
+
+    为每个配置的vc_type创建一条通道；多个vc_type配置了同一Oracle地址时共用一个nonce序列。
+    多worker部署时nonce序列由 vc_issuance_workers.WorkerCoordination 提供（各进程共享）。
+    """
+
+    def __init__(self, core: "AsyncVCIssuanceCore", lane_config: Optional[Dict] = None):
+        """
+        初始化通道管理器
+
+        参数:
+            core: 异步发行核心（提供 issue_in_lane 处理函数）
+            lane_config: service.issuance_lanes 配置段
+        """
+        lane_config = lane_config or {}
+        self.core = core
+        self.settings = {key: lane_config.get(key, default) for key, default in DEFAULT_LANE_SETTINGS.items()}
+
+        nonce_streams: Dict[str, NonceStream] = {}
+        self.lanes: Dict[str, IssuanceLane] = {}
+        for vc_type, config in core.core.vc_type_configs.items():
+            address = config.get('oracle_address', vc_type)
+            if core.coordination is not None:
+                stream = core.coordination.nonce_stream(address)
+            else:
+                stream = nonce_streams.setdefault(address.lower(), NonceStream(address))
+            self.lanes[vc_type] = IssuanceLane(
+                vc_type=vc_type,
+                workers=self.settings["workers_per_type"].get(vc_type, self.settings["default_workers"]),
+                max_queue_size=self.settings["max_queue_size"],
+                nonce_stream=stream,
+                dedicated_connection=self.settings["dedicated_connections"]
+            )
+
+        logger.info(f"发行通道初始化完成: {list(self.lanes.keys())}")
+
+    def __contains__(self, vc_type: str) -> bool:
+        return vc_type in self.lanes
+
+    async def start(self):
+        """启动全部通道"""
+        for lane in self.lanes.values():
+            await lane.start(self.core.issue_in_lane)
+
+    async def stop(self):
+        """停止全部通道"""
+        for lane in self.lanes.values():
+            await lane.stop()
+
+    async def submit(self, vc_type: str, metadata: Dict, attributes: Dict, **options) -> Dict:
+        """将请求提交到对应vc_type的通道并等待结果"""
+        return await self.lanes[vc_type].submit(metadata, attributes, **options)
+
+    def get_stats(self) -> Dict:
+        """获取全部通道统计"""
+        return {vc_type: lane.get_stats() for vc_type, lane in self.lanes.items()}
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 分阶段耗时统计
+记录每次发行各阶段的耗时（按vc_type分桶直方图），由 /metrics 以Prometheus文本格式或JSON输出；
+?debug=1 时发行结果中附带本次的 stage_timings
+
+阶段:
+    connection       获取Issuer-Holder连接
+    offer            发送VC Offer
+    holder_response  等待Holder发送凭证请求
+    issue            Issuer颁发凭证
+    store            Holder存储凭证及UUID验证
+    chain_submit     计算VC Hash并提交上链交易
+    chain_confirm    等待交易回执（异步锚定时没有此阶段）
+    registry         登记UUID
+    total            全流程
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# 阶段名称
+STAGE_CONNECTION = "connection"
+STAGE_OFFER = "offer"
+STAGE_HOLDER_RESPONSE = "holder_response"
+STAGE_ISSUE = "issue"
+STAGE_STORE = "store"
+STAGE_CHAIN_SUBMIT = "chain_submit"
+STAGE_CHAIN_CONFIRM = "chain_confirm"
+STAGE_REGISTRY = "registry"
+STAGE_TOTAL = "total"
+
+# 直方图桶上限（秒）
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+class StageTimer:
+    """单次发行的阶段计时器：每次 mark 记录距上一次 mark 的耗时"""
+
+    def __init__(self):
+        self._started = time.monotonic()
+        self._last = self._started
+        self.timings: Dict[str, float] = {}
+
+    def mark(self, stage: str):
+        """结束一个阶段（同一阶段多次出现时累加）"""
+        now = time.monotonic()
+        self.timings[stage] = round(self.timings.get(stage, 0.0) + now - self._last, 3)
+        self._last = now
+
+    def finish(self) -> Dict[str, float]:
+        """记录全流程耗时并返回各阶段耗时"""
+        self.timings[STAGE_TOTAL] = round(time.monotonic() - self._started, 3)
+        return self.timings
+
+
+class Histogram:
+    """固定分桶的直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """累计计数 [(le, count)]（Prometheus格式）"""
+        result, total = [], 0
+        for upper, n in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += n
+            result.append(("+Inf" if upper == float('inf') else f"{upper:g}", total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶估算分位数（取所在桶的上限，落在 +Inf 桶时取最大桶上限）"""
+        if not self.count:
+            return None
+        target = q * self.count
+        total = 0
+        for upper, n in zip(self.buckets, self.counts):
+            total += n
+            if total >= target:
+                return upper
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 3),
+            "avg_seconds": round(self.sum / self.count, 3) if self.count else None,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "buckets": dict(self.cumulative())
+        }
+
+
+class IssuanceMetrics:
+    """
+    按 (vc_type, 阶段) 记录耗时直方图，按 (vc_type, 结果) 记录发行次数
+
+    记录在事件循环线程中进行，输出在Flask线程中进行，由 threading.Lock 保护。
+    """
+
+    def __init__(self, buckets: Optional[Iterable[float]] = None):
+        """
+        初始化统计
+
+        参数:
+            buckets: 直方图桶上限（秒），默认 DEFAULT_BUCKETS
+        """
+        self.buckets = tuple(sorted(buckets)) if buckets else DEFAULT_BUCKETS
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._results: Dict[Tuple[str, str], int] = {}
+
+    def record(self, vc_type: str, timings: Dict[str, float], status: str):
+        """记录一次发行的各阶段耗时和结果"""
+        with self._lock:
+            for stage, seconds in timings.items():
+                key = (vc_type, stage)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.buckets)
+                histogram.observe(seconds)
+            self._results[(vc_type, status)] = self._results.get((vc_type, status), 0) + 1
+
+    def export_state(self) -> Dict:
+        """导出原始计数（多worker部署时由 vc_issuance_workers.MetricsExchange 写出并合并）"""
+        with self._lock:
+            return {
+                "histograms": [
+                    [vc_type, stage, histogram.counts, histogram.count, histogram.sum]
+                    for (vc_type, stage), histogram in self._histograms.items()
+                ],
+                "results": [[vc_type, status, n] for (vc_type, status), n in self._results.items()]
+            }
+
+    @classmethod
+    def from_states(cls, states: Iterable[Dict], buckets: Optional[Iterable[float]] = None) -> "IssuanceMetrics":
+        """合并多个 export_state() 的结果（桶设置不同的状态忽略其直方图）"""
+        merged = cls(buckets)
+        for state in states:
+            for vc_type, stage, counts, count, total in state.get("histograms", []):
+                if len(counts) != len(merged.buckets) + 1:
+                    continue
+                key = (vc_type, stage)
+                histogram = merged._histograms.get(key)
+                if histogram is None:
+                    histogram = merged._histograms[key] = Histogram(merged.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.count += count
+                histogram.sum += total
+            for vc_type, status, n in state.get("results", []):
+                merged._results[(vc_type, status)] = merged._results.get((vc_type, status), 0) + n
+        return merged
+
+    def snapshot(self) -> Dict:
+        """JSON格式: {vc_type: {"results": {...}, "stages": {stage: {...}}}}"""
+        result: Dict[str, Dict] = {}
+        with self._lock:
+            for (vc_type, status), n in self._results.items():
+                result.setdefault(vc_type, {"results": {}, "stages": {}})["results"][status] = n
+            for (vc_type, stage), histogram in self._histograms.items():
+                result.setdefault(vc_type, {"results": {}, "stages": {}})["stages"][stage] = histogram.to_dict()
+        return result
+
+    def render_prometheus(self) -> str:
+        """Prometheus文本格式"""
+        lines = [
+            "# HELP vc_issuance_stage_seconds VC issuance stage latency in seconds",
+            "# TYPE vc_issuance_stage_seconds histogram"
+        ]
+        with self._lock:
+            for (vc_type, stage), histogram in sorted(self._histograms.items()):
+                labels = f'vc_type="{vc_type}",stage="{stage}"'
+                for le, count in histogram.cumulative():
+                    lines.append(f'vc_issuance_stage_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"vc_issuance_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"vc_issuance_stage_seconds_count{{{labels}}} {histogram.count}")
+
+            lines.append("# HELP vc_issuance_requests_total VC issuance results")
+            lines.append("# TYPE vc_issuance_requests_total counter")
+            for (vc_type, status), n in sorted(self._results.items()):
+                lines.append(f'vc_issuance_requests_total{{vc_type="{vc_type}",status="{status}"}} {n}')
+        return "\n".join(lines) + "\n"
@@ -1,31 +1,52 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-VC发行Oracle服务 - 同步版
+VC发行Oracle服务
 基于simple_vc_issuance_test.py已验证的核心逻辑
 
 架构说明:
-- 使用同步requests库（与simple_vc_issuance_test.py一致）
-- 使用Flask作为HTTP服务框架
-- 核心VC发行逻辑完全采用simple_vc_issuance_test.py的实现
+- VCIssuanceCore: 配置、合约、Hash计算及同步版发行流程（requests）
+- AsyncVCIssuanceCore（vc_issuance_async.py）: /issue-vc 使用的异步发行流程（aiohttp）
+- 使用Flask作为HTTP服务框架，异步流程在后台事件循环线程中执行
+- 生产部署: wsgi.py + gunicorn.conf.py 启动多个worker进程，进程间协调见 vc_issuance_workers.py
 """
 
+import asyncio
 import json
 import logging
+import os
+import queue
 import sys
 import threading
 import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Tuple
 
 import requests
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from eth_account import Account
 
 from web3_fixed_connection import FixedWeb3
+from vc_issuance_async import AsyncVCIssuanceCore
+from vc_issuance_batch import issue_batch, load_batch_settings, validate_batch_items
+from vc_metadata_aggregator import parse_expiry_time
+from uuid_registry import DEFAULT_REGISTRY_PATH, DEFAULT_UUID_JSON_PATH, UUIDRegistry
+from vc_anchor_tracker import ANCHOR_CONFIRMED, normalize_vc_hash
+from credential_exchange_tracker import ROLE_HOLDER, ROLE_ISSUER, TOPIC_ISSUE_CREDENTIAL_V2
+from holder_credential_index import TOPIC_ISSUE_CREDENTIAL_V2_INDY
+from vc_connection_pool import TOPIC_CONNECTIONS
+from vc_issuance_idempotency import IDEMPOTENCY_HEADER, derive_idempotency_key
+from vc_issuance_workers import WorkerCoordination
+
+# 与跨链Oracle、webapp共用的Gas估算缓存（oracle/gas_estimate_cache.py）和
+# 与VP验证Oracle共用的健康检查快照（oracle/health_snapshot.py）
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from oracle.gas_estimate_cache import GasEstimateCache
+from oracle.health_snapshot import HealthSnapshot
 
 # 配置日志
 def setup_logging(log_dir: str):
@@ -111,9 +132,19 @@ class VCIssuanceCore:
         self.issuer_connection_id: Optional[str] = None
         self._connection_lock = threading.Lock()
 
-        # UUID日志文件锁
-        self._uuid_file_lock = threading.Lock()
-        self._uuid_log_path = Path('./logs/uuid.json')
+        # 交易发送锁（每个Oracle账户一把，按小写地址索引；多个VC类型共用账户时共用同一把锁，保证nonce顺序分配）
+        self._tx_locks: Dict[str, threading.Lock] = {}
+        self._tx_locks_guard = threading.Lock()
+
+        # 多worker部署时的进程间协调（由 init_service 设置，单进程运行时为None）
+        self.coordination: Optional[WorkerCoordination] = None
+
+        # Gas估算缓存（blockchain.gas_cache）
+        self.gas_cache = GasEstimateCache.from_config(self.blockchain_config.get('gas_cache'))
+
+        # UUID登记表（首次启动时自动导入旧的 logs/uuid.json）
+        self.uuid_registry = UUIDRegistry(self.service_config.get('uuid_registry_path', DEFAULT_REGISTRY_PATH))
+        self._migrate_uuid_json()
 
         # 初始化
         self._init_web3()
@@ -1014,64 +1045,232 @@ class VCIssuanceCore:
             logger.error(f"计算VC Hash失败: {e}")
             raise Exception(f"Hash计算失败: {e}")
 
-    def write_to_blockchain(self, vc_type: str, vc_hash: str, metadata: Dict) -> str:
-        """写入区块链"""
-        try:
-            # 懒加载：合约未初始化时自动重连
-            if vc_type not in self.contracts:
-                if not self._ensure_contracts_initialized():
-                    raise Exception(f"未找到VC类型 {vc_type} 的合约（重连后仍无可用合约）")
-            if vc_type not in self.contracts:
-                raise Exception(f"未找到VC类型 {vc_type} 的合约")
-
-            if vc_type not in self.oracle_accounts:
-                raise Exception(f"未找到VC类型 {vc_type} 的Oracle账户")
-
-            contract = self.contracts[vc_type]
-            oracle_address = self.vc_type_configs[vc_type]['oracle_address']
-
-            function_call = contract.functions.addVCMetadata(
-                bytes.fromhex(vc_hash[2:]),
-                metadata.get('vcName', ''),
-                metadata.get('vcDescription', ''),
-                self.acapy_config.get('issuer', {}).get('endpoint', ''),
-                self.issuer_did,
-                self.acapy_config.get('holder', {}).get('endpoint', ''),
-                self.holder_did,
-                self.blockchain_config.get('rpc_url', ''),
-                'Hyperledger Besu',
-                metadata.get('expiryTime', 0)
-            )
+    def send_vc_metadata_transaction(self, vc_type: str, vc_hash: str, metadata: Dict,
+                                     nonce_stream=None) -> str:
+        """
+        构造、签名并发送 addVCMetadata 交易（不等待回执）
 
-            gas_price = self.blockchain_config.get('gas_price', 1000000000)
-            nonce = self.w3.eth.get_transaction_count(oracle_address)
+        同一VC类型的Oracle账户串行分配nonce（使用pending计数），
+        保证并发发行时不会产生nonce冲突。
 
-            try:
-                gas_estimate = function_call.estimate_gas({'from': oracle_address})
-                gas_limit = int(gas_estimate * 1.2)
-                logger.info(f"Gas 估算：{gas_estimate}，限制：{gas_limit}")
-            except Exception as e:
-                logger.warning(f"Gas 估算失败，使用默认值：{e}")
-                gas_limit = self.blockchain_config.get('gas_limit', 300000)
+        参数:
+            nonce_stream: 发行通道的本地nonce序列（vc_issuance_lanes.NonceStream），
+                          None时每笔交易读取一次pending nonce
+
+        返回:
+            交易哈希（hex）
+        """
+        contract = self._get_contract(vc_type)
+        function_call = contract.functions.addVCMetadata(*self._vc_metadata_fields(vc_hash, metadata))
+        return self._send_contract_transaction(vc_type, function_call, nonce_stream)
+
+    def send_vc_metadata_batch_transaction(self, vc_type: str, items: List[Tuple[str, Dict]],
+                                           nonce_stream=None) -> str:
+        """
+        构造、签名并发送 addVCMetadataBatch 交易（多个VC合并为一笔交易，不等待回执）
+
+        参数:
+            items: [(vc_hash, metadata), ...]，合约跳过已存在的VC Hash
+            nonce_stream: 发行通道的本地nonce序列，None时读取pending nonce
+
+        返回:
+            交易哈希（hex）
+        """
+        contract = self._get_contract(vc_type)
+        function_call = contract.functions.addVCMetadataBatch(
+            [self._vc_metadata_fields(vc_hash, metadata) for vc_hash, metadata in items]
+        )
+        return self._send_contract_transaction(vc_type, function_call, nonce_stream)
+
+    def _vc_metadata_fields(self, vc_hash: str, metadata: Dict) -> Tuple:
+        """
+        addVCMetadata 的参数（即 addVCMetadataBatch 中一条 VCMetadataInput 的字段）
+
+        异常:
+            ValueError: expiryTime超出合约的uint64范围（不发送交易）
+        """
+        expiry_time = parse_expiry_time(metadata)
+        return (
+            bytes.fromhex(vc_hash[2:]),
+            metadata.get('vcName', ''),
+            metadata.get('vcDescription', ''),
+            self.acapy_config.get('issuer', {}).get('endpoint', ''),
+            self.issuer_did,
+            self.acapy_config.get('holder', {}).get('endpoint', ''),
+            self.holder_did,
+            self.blockchain_config.get('rpc_url', ''),
+            'Hyperledger Besu',
+            expiry_time
+        )
+
+    def send_merkle_root_transaction(self, vc_type: str, merkle_root: str, vc_count: int,
+                                     nonce_stream=None) -> str:
+        """
+        构造、签名并发送 anchorMerkleRoot 交易（Merkle批量锚定，不等待回执）
+
+        参数:
+            merkle_root: Merkle根（0x前缀）
+            vc_count: 批次包含的VC数量
+            nonce_stream: 发行通道的本地nonce序列，None时读取pending nonce
 
+        返回:
+            交易哈希（hex）
+        """
+        contract = self._get_contract(vc_type)
+        function_call = contract.functions.anchorMerkleRoot(bytes.fromhex(merkle_root[2:]), vc_count)
+        return self._send_contract_transaction(vc_type, function_call, nonce_stream)
+
+    def _get_contract(self, vc_type: str):
+        """获取VC类型的合约（懒加载：合约未初始化时自动重连）"""
+        if vc_type not in self.contracts:
+            if not self._ensure_contracts_initialized():
+                raise Exception(f"未找到VC类型 {vc_type} 的合约（重连后仍无可用合约）")
+        if vc_type not in self.contracts:
+            raise Exception(f"未找到VC类型 {vc_type} 的合约")
+
+        if vc_type not in self.oracle_accounts:
+            raise Exception(f"未找到VC类型 {vc_type} 的Oracle账户")
+        return self.contracts[vc_type]
+
+    def _send_contract_transaction(self, vc_type: str, function_call, nonce_stream=None) -> str:
+        """使用VC类型的Oracle账户签名并发送合约交易（同一账户串行分配nonce）"""
+        oracle_address = self.vc_type_configs[vc_type]['oracle_address']
+        if nonce_stream is None and self.coordination is not None:
+            # 多worker部署时进程内的交易锁不足以保证nonce不冲突
+            nonce_stream = self.coordination.nonce_stream(oracle_address)
+        gas_price = self.blockchain_config.get('gas_price', 1000000000)
+        gas_limit = self.gas_cache.gas_limit(
+            function_call, oracle_address, fallback=self.blockchain_config.get('gas_limit', 300000)
+        )
+
+        private_key = self.vc_type_configs[vc_type]['oracle_private_key']
+
+        def sign_and_send(nonce: int):
             transaction = function_call.build_transaction({
                 'from': oracle_address,
                 'gas': gas_limit,
                 'gasPrice': gas_price,
                 'nonce': nonce
             })
-
-            private_key = self.vc_type_configs[vc_type]['oracle_private_key']
             signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            return self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+
+        if nonce_stream is not None:
+            tx_hash, nonce = nonce_stream.send(
+                lambda: self.w3.eth.get_transaction_count(oracle_address, 'pending'),
+                sign_and_send
+            )
+        else:
+            with self._get_tx_lock(oracle_address):
+                nonce = self.w3.eth.get_transaction_count(oracle_address, 'pending')
+                tx_hash = sign_and_send(nonce)
+
+        logger.info(f"交易已发送: {tx_hash.hex()} (nonce={nonce}, gas={gas_limit})")
+        self.gas_cache.track(tx_hash.hex(), function_call, gas_limit)
+        return tx_hash.hex()
+
+    def _get_tx_lock(self, oracle_address: str) -> threading.Lock:
+        """获取Oracle账户的交易发送锁（与发行通道的NonceStream一样按小写地址索引）"""
+        key = oracle_address.lower()
+        with self._tx_locks_guard:
+            if key not in self._tx_locks:
+                self._tx_locks[key] = threading.Lock()
+            return self._tx_locks[key]
+
+    def find_vc_type_on_chain(self, vc_hash: str) -> Optional[str]:
+        """
+        在各VC类型合约中查找VC Hash（调用 vcExists）
+
+        参数:
+            vc_hash: VC Hash（0x前缀）
+
+        返回:
+            VC所在的VC类型，未找到返回None
+        """
+        if not self.contracts and not self._ensure_contracts_initialized():
+            raise Exception("没有可用的合约")
+
+        vc_hash_bytes = bytes.fromhex(vc_hash[2:])
+        for vc_type, contract in self.contracts.items():
+            oracle_address = self.vc_type_configs[vc_type].get('oracle_address')
+            try:
+                if contract.functions.vcExists(vc_hash_bytes).call({'from': oracle_address}):
+                    return vc_type
+            except Exception as e:
+                logger.warning(f"查询 {vc_type} 合约失败: {e}")
+        return None
+
+    def is_merkle_root_anchored(self, vc_type: str, merkle_root: str) -> bool:
+        """
+        查询Merkle根是否已在VC类型合约中锚定（调用 isMerkleRootAnchored）
+
+        参数:
+            vc_type: VC类型
+            merkle_root: Merkle根（0x前缀）
+        """
+        contract = self._get_contract(vc_type)
+        oracle_address = self.vc_type_configs[vc_type].get('oracle_address')
+        return contract.functions.isMerkleRootAnchored(bytes.fromhex(merkle_root[2:])).call({'from': oracle_address})
 
-            logger.info(f"交易已发送: {tx_hash.hex()}")
+    def find_vc_metadata_anchor(self, vc_type: str, vc_hash: str) -> Optional[Dict]:
+        """
+        查询VC元数据是否已写入VC类型合约（调用 vcExists，已写入时查找 VCMetadataAdded 事件）
+
+        参数:
+            vc_type: VC类型
+            vc_hash: VC Hash（0x前缀）
+
+        返回:
+            已写入时返回 {"tx_hash", "block_number"}（未找到事件时两者为None），未写入返回None
+        """
+        contract = self._get_contract(vc_type)
+        oracle_address = self.vc_type_configs[vc_type].get('oracle_address')
+        vc_hash_bytes = bytes.fromhex(vc_hash[2:])
+        if not contract.functions.vcExists(vc_hash_bytes).call({'from': oracle_address}):
+            return None
+
+        try:
+            events = contract.events.VCMetadataAdded.get_logs(
+                fromBlock=0,
+                argument_filters={'vcHash': vc_hash_bytes}
+            )
+        except Exception as e:
+            logger.warning(f"查询 {vc_type} 的 VCMetadataAdded 事件失败: {e}")
+            events = []
+
+        if not events:
+            return {"tx_hash": None, "block_number": None}
+        event = events[-1]
+        return {"tx_hash": event['transactionHash'].hex(), "block_number": event['blockNumber']}
+
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[Any]:
+        """
+        查询交易回执（交易未打包时返回None，不阻塞）
+
+        参数:
+            tx_hash: 交易哈希（hex）
+
+        返回:
+            交易回执或None
+        """
+        try:
+            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+        self.gas_cache.observe_receipt(tx_hash, receipt)
+        return receipt
+
+    def write_to_blockchain(self, vc_type: str, vc_hash: str, metadata: Dict) -> str:
+        """写入区块链（发送交易并等待回执）"""
+        try:
+            tx_hash = self.send_vc_metadata_transaction(vc_type, vc_hash, metadata)
 
             receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            self.gas_cache.observe_receipt(tx_hash, receipt)
 
             if receipt.status == 1:
                 logger.info(f"交易确认成功, 区块: {receipt.blockNumber}")
-                return tx_hash.hex()
+                return tx_hash
             else:
                 raise Exception(f"交易失败, 状态: {receipt.status}")
 
@@ -1081,36 +1280,19 @@ class VCIssuanceCore:
 
     # ==================== 日志和UUID管理 ====================
 
+    def _migrate_uuid_json(self):
+        """登记表为空且存在旧的 logs/uuid.json 时，一次性导入"""
+        try:
+            if self.uuid_registry.get_meta('migrated_from') is None and self.uuid_registry.count() == 0:
+                self.uuid_registry.migrate_from_json(self.service_config.get('uuid_json_path', DEFAULT_UUID_JSON_PATH))
+        except Exception as e:
+            logger.error(f"导入uuid.json失败: {e}")
+
     def log_uuid_to_file(self, vc_uuid: str, vc_type: str, original_contract_name: str,
                          vc_hash: str, tx_hash: str, request_id: str):
-        """记录UUID到文件"""
+        """记录UUID到登记表（uuid_registry.py）"""
         try:
-            self._uuid_log_path.parent.mkdir(parents=True, exist_ok=True)
-
-            log_entry = {
-                "timestamp": datetime.now().isoformat(),
-                "vc_type": vc_type,
-                "original_contract_name": original_contract_name,
-                "vc_hash": vc_hash,
-                "tx_hash": tx_hash,
-                "request_id": request_id
-            }
-
-            with self._uuid_file_lock:
-                if self._uuid_log_path.exists():
-                    try:
-                        with open(self._uuid_log_path, 'r', encoding='utf-8') as f:
-                            uuid_data = json.load(f)
-                    except (json.JSONDecodeError, IOError):
-                        uuid_data = {}
-                else:
-                    uuid_data = {}
-
-                uuid_data[vc_uuid] = log_entry
-
-                with open(self._uuid_log_path, 'w', encoding='utf-8') as f:
-                    json.dump(uuid_data, f, ensure_ascii=False, indent=2)
-
+            self.uuid_registry.record(vc_uuid, vc_type, original_contract_name, vc_hash, tx_hash, request_id)
             logger.info(f"UUID已记录: {vc_uuid}")
 
         except Exception as e:
@@ -1208,6 +1390,15 @@ class VCIssuanceCore:
 
 # 全局实例
 oracle_core = None
+async_core = None
+_async_core_lock = threading.Lock()
+health_snapshot = None
+_health_snapshot_lock = threading.Lock()
+
+# 全局事件循环（异步发行流程在后台线程中运行）
+_event_loop = None
+_loop_thread = None
+_loop_started = threading.Event()
 
 
 def get_oracle() -> VCIssuanceCore:
@@ -1218,11 +1409,77 @@ def get_oracle() -> VCIssuanceCore:
     return oracle_core
 
 
+def _run_event_loop():
+    """在后台线程中运行事件循环"""
+    global _event_loop
+    _event_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_event_loop)
+    _loop_started.set()
+    _event_loop.run_forever()
+
+
+def get_event_loop():
+    """获取全局事件循环（在后台线程中运行）"""
+    global _loop_thread
+    if _loop_thread is None or not _loop_thread.is_alive():
+        _loop_started.clear()
+        _loop_thread = threading.Thread(target=_run_event_loop, daemon=True)
+        _loop_thread.start()
+        _loop_started.wait()
+    return _event_loop
+
+
+def run_async(coro, timeout: Optional[float] = None):
+    """在后台事件循环中运行协程，等待结果"""
+    loop = get_event_loop()
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    if timeout is None:
+        timeout = get_oracle().service_config.get('request_timeout_seconds', 300)
+    return future.result(timeout=timeout)
+
+
+def get_async_oracle() -> AsyncVCIssuanceCore:
+    """获取异步发行核心实例（首次调用时在后台事件循环中启动）"""
+    global async_core
+    with _async_core_lock:
+        if async_core is None:
+            core = AsyncVCIssuanceCore(get_oracle())
+            run_async(core.start(), timeout=30)
+            async_core = core
+    return async_core
+
+
+def get_health_snapshot() -> HealthSnapshot:
+    """获取健康快照实例（首次调用时启动后台刷新线程）"""
+    global health_snapshot
+    with _health_snapshot_lock:
+        if health_snapshot is None:
+            snapshot = HealthSnapshot(
+                _collect_health,
+                refresh_interval=get_oracle().service_config.get('health_refresh_seconds', 10)
+            )
+            snapshot.start()
+            health_snapshot = snapshot
+    return health_snapshot
+
+
 # ==================== Flask路由 ====================
 
+def _debug_requested() -> bool:
+    """请求是否带 ?debug=1（结果中保留 stage_timings）"""
+    return request.args.get('debug', '').lower() in ('1', 'true', 'yes')
+
+
 @app.route('/issue-vc', methods=['POST'])
 def handle_issue_vc():
-    """处理VC发行请求"""
+    """
+    处理VC发行请求
+
+    幂等键取自 Idempotency-Key 请求头（或请求体 idempotency_key）；
+    都未提供时按 vc_type + attributes 计算（service.idempotency.derive_from_payload）。
+    重复请求等待进行中的发行或返回已有结果（idempotent_replay=true）。
+    ?debug=1 时结果中附带各阶段耗时 stage_timings。
+    """
     try:
         data = request.get_json()
         vc_type = data.get('vc_type')
@@ -1234,9 +1491,25 @@ def handle_issue_vc():
 
         if not vc_type:
             return jsonify({"status": "failed", "error": "缺少vc_type参数"}), 400
-
-        oracle = get_oracle()
-        result = oracle.issue_vc(vc_type, metadata, attributes)
+        try:
+            parse_expiry_time(metadata)
+        except ValueError as e:
+            return jsonify({"status": "failed", "error": str(e)}), 400
+
+        issuer = get_async_oracle()
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER) or data.get('idempotency_key')
+        if idempotency_key and len(idempotency_key) > 255:
+            return jsonify({"status": "failed", "error": "Idempotency-Key 长度不能超过255"}), 400
+        if not idempotency_key and issuer.derive_idempotency_keys:
+            idempotency_key = derive_idempotency_key(vc_type, metadata, attributes)
+
+        result = run_async(issuer.issue_vc(
+            vc_type, metadata, attributes,
+            async_anchor=data.get('async_anchor'),
+            idempotency_key=idempotency_key
+        ))
+        if not _debug_requested():
+            result.pop('stage_timings', None)
         return jsonify(result)
 
     except Exception as e:
@@ -1244,9 +1517,111 @@ def handle_issue_vc():
         return jsonify({"status": "failed", "error": str(e)}), 500
 
 
+@app.route('/issue-vc/batch', methods=['POST'])
+def handle_issue_vc_batch():
+    """
+    批量VC发行（流式返回）
+
+    请求体: {"items": [{vc_type, metadata, attributes}, ...], "parallelism": 可选, 每个vc_type的并发数}
+    每完成一项输出一行结果，最后输出汇总（type=summary）。
+    默认NDJSON；?format=sse 或 Accept: text/event-stream 时使用SSE；?debug=1 时每项结果附带 stage_timings。
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    settings = load_batch_settings(get_oracle().service_config.get('batch_issuance'))
+
+    error = validate_batch_items(items, settings["max_items"])
+    if error:
+        return jsonify({"status": "failed", "error": error}), 400
+
+    use_sse = (request.args.get('format') == 'sse'
+               or 'text/event-stream' in request.headers.get('Accept', ''))
+    logger.info(f"收到批量VC发行请求: {len(items)} 项, 格式={'SSE' if use_sse else 'NDJSON'}")
+
+    # 事件循环线程中产生的结果通过线程安全队列交给Flask响应线程
+    results: "queue.Queue[Optional[Dict]]" = queue.Queue()
+    issuer = get_async_oracle()
+    debug = _debug_requested()
+
+    def on_result(payload: Dict):
+        if not debug:
+            payload.pop('stage_timings', None)
+        results.put(payload)
+
+    async def run_batch():
+        try:
+            summary = await issue_batch(issuer, items, settings, on_result, data.get('parallelism'))
+        except Exception as e:
+            logger.error(f"批量发行失败: {e}", exc_info=True)
+            summary = {"type": "summary", "status": "failed", "error": str(e)}
+        results.put(summary)
+        results.put(None)
+
+    asyncio.run_coroutine_threadsafe(run_batch(), get_event_loop())
+
+    def format_line(payload: Dict) -> str:
+        body = json.dumps(payload, ensure_ascii=False)
+        if use_sse:
+            return f"event: {payload.get('type', 'result')}\ndata: {body}\n\n"
+        return body + "\n"
+
+    def generate():
+        deadline = time.monotonic() + settings["batch_timeout_seconds"]
+        while True:
+            try:
+                payload = results.get(timeout=max(deadline - time.monotonic(), 0.1))
+            except queue.Empty:
+                yield format_line({"type": "summary", "status": "failed",
+                                   "error": f"批量发行超时({settings['batch_timeout_seconds']}秒)"})
+                return
+            if payload is None:
+                return
+            yield format_line(payload)
+
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route('/webhooks/<role>/topic/<topic>/', methods=['POST'], strict_slashes=False)
+def handle_acapy_webhook(role, topic):
+    """
+    接收ACA-Py webhook（Issuer/Holder分别配置 --webhook-url http://<oracle>:6000/webhooks/issuer|holder）
+
+    只处理 issue_credential_v2_0 / issue_credential_v2_0_indy / connections 主题，
+    事件交给后台事件循环中的状态机、凭证索引和连接池处理，立即返回
+    """
+    if role not in (ROLE_ISSUER, ROLE_HOLDER):
+        return jsonify({"status": "failed", "error": f"未知角色: {role}"}), 404
+
+    if topic not in (TOPIC_ISSUE_CREDENTIAL_V2, TOPIC_ISSUE_CREDENTIAL_V2_INDY, TOPIC_CONNECTIONS):
+        return jsonify({"status": "ignored"})
+
+    payload = request.get_json(silent=True) or {}
+    issuer = get_async_oracle()
+    asyncio.run_coroutine_threadsafe(issuer.handle_webhook(role, payload, topic), get_event_loop())
+    if issuer.coordination is not None:
+        # 多worker部署：发行任务可能在其他worker中等待该事件
+        issuer.coordination.webhook_relay.publish(role, topic, payload)
+    return jsonify({"status": "accepted"})
+
+
 @app.route('/health', methods=['GET'])
 def handle_health():
-    """健康检查（增强版：验证缓存连接有效性）"""
+    """
+    健康检查
+
+    默认返回后台定时刷新的快照（不访问ACA-Py和区块链节点），
+    ?deep=true 时执行实时检查；发行统计始终为实时值。
+    """
+    deep = request.args.get('deep', '').lower() in ('1', 'true', 'yes')
+    health_status = get_health_snapshot().get(deep=deep)
+    health_status["issuance"] = async_core.get_stats() if async_core else None
+    return jsonify(health_status)
+
+
+def _collect_health() -> Dict:
+    """执行完整健康检查：ACA-Py状态、连接有效性、区块链连接"""
     oracle = get_oracle()
 
     # 检查ACA-Py服务
@@ -1265,36 +1640,188 @@ def handle_health():
     except:
         pass
 
-    # 新增：验证缓存连接的有效性
-    active_connection = oracle.issuer_connection_id
-    conn_valid = False
-    if active_connection:
-        conn_valid = oracle._is_connection_valid(active_connection)
-        if not conn_valid:
-            logger.warning(f"健康检查：缓存的连接 {active_connection} 已失效")
+    # 连接有效性：启用连接池时使用连接池缓存的状态，否则验证缓存连接
+    pool = async_core.connection_pool if async_core else None
+    if pool is not None:
+        pool_stats = pool.get_stats()
+        usable = [c["connection_id"] for c in pool_stats["connections"] if c["state"] in ('active', 'response')]
+        active_connection = usable[0] if usable else None
+        conn_valid = bool(usable)
+    else:
+        active_connection = oracle.issuer_connection_id
+        conn_valid = False
+        if active_connection:
+            conn_valid = oracle._is_connection_valid(active_connection)
+            if not conn_valid:
+                logger.warning(f"健康检查：缓存的连接 {active_connection} 已失效")
 
     health_status = {
         "status": "ok" if (issuer_connected and holder_connected) else "degraded",
         "service": "vc_issuance_oracle",
-        "version": "2.0.0-sync",
+        "version": "2.1.0-async",
         "timestamp": datetime.now().isoformat(),
         "connections": {
             "web3": "connected" if oracle.web3_fixed and oracle.web3_fixed.is_connected() else "disconnected",
             "acapy_issuer": "connected" if issuer_connected else "disconnected",
             "acapy_holder": "connected" if holder_connected else "disconnected",
             "active_connection": active_connection if conn_valid else None,
-            "connection_valid": conn_valid
+            "connection_valid": conn_valid,
+            "pooled_connections": len(usable) if pool is not None else None
         },
         "vc_types": list(oracle.vc_type_configs.keys())
     }
-    return jsonify(health_status)
+    return health_status
+
+
+@app.route('/metrics', methods=['GET'])
+def handle_metrics():
+    """
+    发行分阶段耗时统计
+
+    默认Prometheus文本格式；?format=json 时返回 {vc_type: {results, stages: {stage: {count, avg, p50, p95, ...}}}}
+    多worker部署时合并所有存活worker的统计
+    """
+    issuer = get_async_oracle()
+    metrics = issuer.metrics
+    if issuer.coordination is not None:
+        metrics = issuer.coordination.metrics_exchange.merged(metrics)
+    if request.args.get('format') == 'json':
+        return jsonify({"status": "success", "data": metrics.snapshot()})
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/vc-status/<vc_hash>', methods=['GET'])
 def handle_vc_status(vc_hash):
-    """查询VC状态"""
-    # 简化实现
-    return jsonify({"vc_hash": vc_hash, "status": "processed"})
+    """
+    查询VC链上锚定状态
+
+    优先返回本进程记录的锚定状态（pending / confirmed / failed）；
+    没有记录时（如服务重启前发行的VC）查询各VC类型合约的 vcExists。
+    以Merkle批量方式锚定的VC附带包含证明（merkle），链上只查询其Merkle根。
+    """
+    vc_hash = normalize_vc_hash(vc_hash)
+    if len(vc_hash) != 66 or any(c not in '0123456789abcdef' for c in vc_hash[2:]):
+        return jsonify({"vc_hash": vc_hash, "status": "failed", "error": "无效的VC Hash"}), 400
+
+    oracle = get_oracle()
+    merkle = oracle.uuid_registry.get_merkle_proof(vc_hash)
+    extra = {"merkle": merkle} if merkle else {}
+
+    record = async_core.anchor_tracker.get(vc_hash) if async_core else None
+    if record:
+        return jsonify({"source": "tracker", **record, **extra})
+
+    try:
+        if merkle:
+            anchored = oracle.is_merkle_root_anchored(merkle["vc_type"], merkle["merkle_root"])
+            vc_type = merkle["vc_type"] if anchored else None
+        else:
+            vc_type = oracle.find_vc_type_on_chain(vc_hash)
+    except Exception as e:
+        logger.error(f"查询VC链上状态失败: {e}")
+        return jsonify({"vc_hash": vc_hash, "status": "unknown", "error": str(e)}), 503
+
+    if vc_type:
+        return jsonify({"vc_hash": vc_hash, "vc_type": vc_type, "status": ANCHOR_CONFIRMED, "source": "chain", **extra})
+    return jsonify({"vc_hash": vc_hash, "status": "not_found", **extra}), 404
+
+
+@app.route('/issuance-jobs', methods=['GET'])
+def handle_query_issuance_jobs():
+    """
+    查询发行任务
+
+    查询参数:
+        stage: 阶段（created / offer_sent / holder_requested / issued / stored / anchored / completed / failed）
+        vc_type, limit, offset: 列表查询（最新的在前）
+    """
+    job_store = get_async_oracle().job_store
+    if job_store is None:
+        return jsonify({"status": "failed", "error": "发行任务持久化未启用"}), 404
+
+    try:
+        limit = request.args.get('limit', 100, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        jobs = job_store.query(
+            stage=request.args.get('stage'),
+            vc_type=request.args.get('vc_type'),
+            limit=limit,
+            offset=offset
+        )
+        return jsonify({
+            "status": "success",
+            "data": jobs,
+            "unfinished": job_store.unfinished_counts(),
+            "pagination": {"offset": offset, "limit": limit}
+        })
+    except Exception as e:
+        logger.error(f"查询发行任务失败：{e}")
+        return jsonify({"status": "failed", "error": str(e)}), 500
+
+
+@app.route('/issuance-jobs/<request_id>', methods=['GET'])
+def handle_get_issuance_job(request_id):
+    """按请求ID查询发行任务（客户端连接中断后可据此确认发行结果）"""
+    job_store = get_async_oracle().job_store
+    if job_store is None:
+        return jsonify({"status": "failed", "error": "发行任务持久化未启用"}), 404
+
+    job = job_store.get(request_id)
+    if not job:
+        return jsonify({"status": "failed", "error": "未找到发行任务"}), 404
+    return jsonify({"status": "success", "data": job})
+
+
+@app.route('/uuids', methods=['GET'])
+def handle_query_uuids():
+    """
+    查询UUID登记表
+
+    查询参数（任选其一）:
+        uuid / vc_hash: 单条查询
+        vc_type, start_date, end_date, limit, offset: 列表查询（最新的在前）
+        group_by_type=true: 按VC类型分组（可配合 vc_type、limit）
+    """
+    try:
+        registry = get_oracle().uuid_registry
+
+        vc_uuid = request.args.get('uuid')
+        vc_hash = request.args.get('vc_hash')
+        if vc_uuid or vc_hash:
+            record = registry.get_by_uuid(vc_uuid) if vc_uuid else registry.get_by_vc_hash(vc_hash)
+            if not record:
+                return jsonify({"status": "failed", "error": "未找到记录"}), 404
+            return jsonify({"status": "success", "data": record})
+
+        vc_type = request.args.get('vc_type')
+        limit = request.args.get('limit', 100, type=int)
+
+        if request.args.get('group_by_type', 'false').lower() == 'true':
+            return jsonify({"status": "success", "data": registry.latest_by_type(vc_type, limit)})
+
+        offset = request.args.get('offset', 0, type=int)
+        records = registry.query(
+            vc_type=vc_type,
+            start_time=request.args.get('start_date'),
+            end_time=request.args.get('end_date'),
+            limit=limit,
+            offset=offset
+        )
+        return jsonify({
+            "status": "success",
+            "data": records,
+            "pagination": {"offset": offset, "limit": limit, "total": registry.count(vc_type)}
+        })
+
+    except Exception as e:
+        logger.error(f"查询UUID登记表失败：{e}")
+        return jsonify({"status": "failed", "error": str(e)}), 500
+
+
+def _get_credential_index():
+    """获取已完成首次同步的Holder凭证索引（未就绪时返回None，回退到直接查询ACA-Py）"""
+    index = async_core.credential_index if async_core else None
+    return index if index is not None and index.ready else None
 
 
 @app.route('/credentials', methods=['GET'])
@@ -1302,6 +1829,7 @@ def handle_get_credentials():
     """获取 Holder 凭证列表（支持分页和排序）"""
     try:
         oracle = get_oracle()
+        index = _get_credential_index()
 
         # 获取分页参数
         start = request.args.get('start', 0, type=int)
@@ -1320,7 +1848,7 @@ def handle_get_credentials():
 
         if group_by_date:
             # 按日期分组统计
-            result = oracle.get_credentials_grouped_by_date()
+            result = index.grouped_by_date() if index else oracle.get_credentials_grouped_by_date()
             return jsonify({
                 "status": "success",
                 "data": result,
@@ -1329,7 +1857,10 @@ def handle_get_credentials():
 
         if start_date and end_date:
             # 按日期范围查询
-            result = oracle.get_holder_credentials_by_date_range(start_date, end_date)
+            if index:
+                result = index.by_date_range(start_date, end_date)
+            else:
+                result = oracle.get_holder_credentials_by_date_range(start_date, end_date)
             return jsonify({
                 "status": "success",
                 "data": result,
@@ -1339,7 +1870,10 @@ def handle_get_credentials():
 
         if sort_by_date == 'Date':
             # 按 Date 字段排序
-            result = oracle.get_holder_credentials_sorted_by_date(descending=descending)
+            if index:
+                result = index.sorted_by_date(descending=descending)
+            else:
+                result = oracle.get_holder_credentials_sorted_by_date(descending=descending)
             return jsonify({
                 "status": "success",
                 "data": result,
@@ -1347,6 +1881,15 @@ def handle_get_credentials():
                 "sort": {"by": "Date", "order": "desc" if descending else "asc"}
             })
 
+        if index:
+            # 索引按 Date 排序分页（默认从新到旧）
+            return jsonify({
+                "status": "success",
+                "data": index.page(start=start, count=count, descending=descending),
+                "pagination": {"start": start, "count": count, "total": index.count()},
+                "sort": {"by": "Date", "order": "desc" if descending else "asc"}
+            })
+
         # 默认分页查询
         result = oracle.get_holder_credentials(start=start, count=count)
         total = oracle.get_holder_credentials_count()
@@ -1367,8 +1910,8 @@ def handle_get_credentials():
 def handle_credentials_count():
     """获取 Holder 凭证总数"""
     try:
-        oracle = get_oracle()
-        count = oracle.get_holder_credentials_count()
+        index = _get_credential_index()
+        count = index.count() if index else get_oracle().get_holder_credentials_count()
         return jsonify({
             "status": "success",
             "count": count
@@ -1378,24 +1921,72 @@ def handle_credentials_count():
         return jsonify({"status": "failed", "error": str(e)}), 500
 
 
+@app.route('/credentials/by-contract-name/<contract_name>', methods=['GET'])
+def handle_credential_by_contract_name(contract_name):
+    """按 contractName（发行时生成的UUID）查询 Holder 凭证"""
+    index = _get_credential_index()
+    if index is None:
+        return jsonify({"status": "failed", "error": "凭证索引尚未就绪"}), 503
+    cred = index.get_by_contract_name(contract_name)
+    if cred is None:
+        return jsonify({"status": "failed", "error": "未找到凭证"}), 404
+    return jsonify({"status": "success", "data": cred})
+
+
+@app.route('/credentials/sync', methods=['POST'])
+def handle_credentials_sync():
+    """立即与 Holder 钱包同步凭证索引"""
+    issuer = get_async_oracle()
+    if issuer.credential_index is None:
+        return jsonify({"status": "failed", "error": "凭证索引未启用"}), 400
+    try:
+        result = run_async(issuer.credential_index.sync())
+        return jsonify({"status": "success", **result})
+    except Exception as e:
+        logger.error(f"同步凭证索引失败：{e}")
+        return jsonify({"status": "failed", "error": str(e)}), 500
+
+
 
-def main():
-    """主函数"""
-    # 切换到脚本所在目录
-    script_dir = Path(__file__).parent
-    import os
-    os.chdir(script_dir)
+def init_service(multi_worker: bool = False) -> VCIssuanceCore:
+    """
+    初始化服务（切换到脚本目录，创建发行核心并启动后台事件循环和健康快照）
+
+    参数:
+        multi_worker: 是否作为多worker部署中的一个进程运行（wsgi.py），
+                      为True时启用进程间协调（service.workers）
+
+    返回:
+        VCIssuanceCore实例
+    """
+    os.chdir(Path(__file__).parent)
 
     oracle = get_oracle()
+    if multi_worker and oracle.coordination is None:
+        oracle.coordination = WorkerCoordination(oracle.service_config.get('workers', {}))
+    get_async_oracle()
+    get_health_snapshot()
+    return oracle
+
+
+def main():
+    """主函数（开发/单进程运行；生产部署使用 gunicorn -c gunicorn.conf.py，应用入口由配置中的 wsgi_app 指定，不要在命令行另加应用参数）"""
+    oracle = init_service()
     port = oracle.service_config.get('port', 6000)
     host = oracle.service_config.get('host', '0.0.0.0')
 
     logger.info("=" * 80)
-    logger.info("VC发行Oracle服务启动 (同步版)")
+    logger.info("VC发行Oracle服务启动 (异步发行)")
     logger.info("=" * 80)
     logger.info(f"HTTP服务器: http://{host}:{port}")
     logger.info(f"  POST /issue-vc - VC发行")
-    logger.info(f"  GET /health - 健康检查")
+    logger.info(f"  POST /issue-vc/batch - 批量VC发行（NDJSON/SSE流式返回）")
+    logger.info(f"  POST /webhooks/<issuer|holder>/topic/<topic>/ - ACA-Py webhook")
+    logger.info(f"  GET /metrics - 发行分阶段耗时（Prometheus / ?format=json）")
+    logger.info(f"  GET /health - 健康检查（缓存快照，?deep=true 实时检查）")
+    logger.info(f"  GET /vc-status/<vc_hash> - VC链上锚定状态")
+    logger.info(f"  GET /uuids - UUID登记表查询")
+    logger.info(f"  GET /issuance-jobs[/<request_id>] - 发行任务查询")
     logger.info("=" * 80)
 
     # 启动Flask应用
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 多worker进程协调
+gunicorn 多worker部署（wsgi.py）时，同一主机上的各worker进程通过本地协调目录共享状态：
+
+- Oracle账户nonce: 文件锁串行化各进程的交易发送，下一个nonce保存在锁文件中（SharedNonceStream）
+- ACA-Py webhook: 收到webhook的worker写入共享事件表，其他worker轮询后交给各自的凭证交换状态机、
+  凭证索引和连接池（WebhookRelay）
+- 分阶段耗时: 各worker定期写出直方图状态，/metrics 合并所有存活worker的数据（MetricsExchange）
+- 发行任务: 任务记录所属进程，启动时只接管所属进程已退出的任务（IssuanceJobStore.claim）
+- 主worker: 持有 leader.lock 的进程执行Holder凭证全量同步（结果写入共享快照）并补充连接池，
+  其他worker读取快照、复用主worker创建的连接（LeaderElection）
+
+UUID登记表和任务存储本身是SQLite（WAL模式），多个进程可直接共享。
+
+配置（service.workers）:
+    coordination_dir               协调目录（默认 ./logs/workers）
+    nonce_resync_seconds           nonce文件超过该时间未更新时重新读取链上pending nonce
+    webhook_poll_interval_seconds  webhook事件轮询间隔
+    webhook_retention_seconds      webhook事件保留时间
+    metrics_flush_seconds          耗时统计写出间隔
+    leader_retry_seconds           非主worker尝试接管主worker的间隔
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from vc_issuance_lanes import NonceStream
+from vc_issuance_metrics import IssuanceMetrics
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('vc_issuance_workers')
+
+
+DEFAULT_COORDINATION_DIR = './logs/workers'
+
+
+def pid_alive(pid: Optional[int]) -> bool:
+    """本机进程是否存活"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedNonceStream(NonceStream):
+    """
+    多进程共享的Oracle账户nonce序列
+
+    发送交易时持有文件锁，锁文件内容为 "<下一个nonce> <更新时间>"；
+    文件为空、发送失败或超过 resync_seconds 未更新时重新读取链上pending nonce。
+    """
+
+    def __init__(self, address: str, lock_path: Path, resync_seconds: float = 60):
+        """
+        初始化共享nonce序列
+
+        参数:
+            address: Oracle账户地址
+            lock_path: 锁文件路径
+            resync_seconds: 锁文件超过该时间未更新时重新读取pending nonce
+        """
+        super().__init__(address)
+        self.lock_path = lock_path
+        self.resync_seconds = resync_seconds
+
+    @staticmethod
+    def _write(f, content: str):
+        f.seek(0)
+        f.truncate()
+        f.write(content)
+        f.flush()
+
+    def send(self, fetch_nonce: Callable[[], int], send_with_nonce: Callable[[int], Any]) -> Tuple[Any, int]:
+        """分配nonce并发送交易（所有进程对同一账户的发送串行执行）"""
+        with self._lock, open(self.lock_path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                parts = f.read().split()
+                if len(parts) == 2 and time.time() - float(parts[1]) < self.resync_seconds:
+                    nonce = int(parts[0])
+                else:
+                    nonce = fetch_nonce()
+                    self._stats["resyncs"] += 1
+
+                try:
+                    result = send_with_nonce(nonce)
+                except Exception:
+                    # nonce可能已被占用或交易未进入交易池，下次重新读取
+                    self._write(f, "")
+                    self._next_nonce = None
+                    raise
+
+                self._write(f, f"{nonce + 1} {time.time()}")
+                self._next_nonce = nonce + 1
+                self._stats["sent"] += 1
+                return result, nonce
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class LeaderElection:
+    """
+    主worker选举（协调目录中的文件锁）
+
+    持有 leader.lock 排他锁的进程为主worker；锁随进程退出自动释放，其他worker在下次重试时接管。
+    """
+
+    def __init__(self, lock_path: Path, retry_interval: float = 5):
+        """
+        初始化选举（立即尝试一次）
+
+        参数:
+            lock_path: 锁文件路径
+            retry_interval: 非主worker重试获取锁的间隔（秒）
+        """
+        self.lock_path = lock_path
+        self.retry_interval = retry_interval
+        self._file = None
+        self._task: Optional[asyncio.Task] = None
+        self.try_acquire()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        """非阻塞地尝试获取锁，返回本进程是否为主worker"""
+        if self._file is not None:
+            return True
+        f = open(self.lock_path, 'a+')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._write_pid(f)
+        self._file = f
+        logger.info(f"进程 {os.getpid()} 成为主worker（凭证同步、连接池补充）")
+        return True
+
+    @staticmethod
+    def _write_pid(f):
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+
+    def release(self):
+        """释放锁（进程停止时）"""
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+    async def start(self):
+        """非主worker启动重试任务"""
+        if not self.is_leader and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._retry_loop())
+
+    async def stop(self):
+        """停止重试任务并释放锁"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.release()
+
+    async def _retry_loop(self):
+        while not self.is_leader:
+            try:
+                await asyncio.sleep(self.retry_interval)
+                self.try_acquire()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"获取主worker锁失败: {e}")
+
+
+class WebhookRelay:
+    """
+    webhook事件转发（SQLite共享事件表）
+
+    收到webhook的worker在本进程处理后调用 publish()；其他worker的轮询任务读取新事件并交给本进程处理。
+    """
+
+    def __init__(self, db_path: Path, poll_interval: float = 0.2, retention_seconds: float = 300):
+        """
+        初始化事件转发
+
+        参数:
+            db_path: 事件表数据库路径
+            poll_interval: 轮询间隔（秒）
+            retention_seconds: 事件保留时间（秒）
+        """
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.pid = os.getpid()
+
+        self._local = threading.local()
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"published": 0, "received": 0}
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS webhook_event ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin_pid INTEGER NOT NULL, role TEXT NOT NULL, "
+            "topic TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def publish(self, role: str, topic: str, payload: Dict):
+        """转发本进程收到的webhook（在Flask线程中调用）"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT INTO webhook_event (origin_pid, role, topic, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (self.pid, role, topic, json.dumps(payload, ensure_ascii=False), now)
+        )
+        self._stats["published"] += 1
+        if self._stats["published"] % 100 == 0:
+            conn.execute("DELETE FROM webhook_event WHERE created_at < ?", (now - self.retention_seconds,))
+        conn.commit()
+
+    def _fetch(self, after_id: int) -> List[Tuple]:
+        """读取其他进程转发的新事件"""
+        return self._conn().execute(
+            "SELECT id, role, topic, payload FROM webhook_event WHERE id > ? AND origin_pid != ? ORDER BY id",
+            (after_id, self.pid)
+        ).fetchall()
+
+    async def start(self, async_core: "AsyncVCIssuanceCore"):
+        """启动轮询任务（只处理启动之后的事件）"""
+        if self._task is None or self._task.done():
+            row = await async_core._run_blocking(
+                lambda: self._conn().execute("SELECT MAX(id) FROM webhook_event").fetchone()
+            )
+            self._last_id = row[0] or 0
+            self._task = asyncio.create_task(self._poll_loop(async_core))
+
+    async def stop(self):
+        """停止轮询任务"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _poll_loop(self, async_core: "AsyncVCIssuanceCore"):
+        """轮询新事件并交给本进程的webhook处理"""
+        while True:
+            try:
+                await asyncio.sleep(self.poll_interval)
+                rows = await async_core._run_blocking(self._fetch, self._last_id)
+                for event_id, role, topic, payload in rows:
+                    self._last_id = event_id
+                    self._stats["received"] += 1
+                    await async_core.handle_webhook(role, json.loads(payload), topic)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"读取转发的webhook事件失败: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict:
+        return {"last_event_id": self._last_id, **self._stats}
+
+
+class MetricsExchange:
+    """各worker的分阶段耗时统计通过协调目录中的 metrics-<pid>.json 合并"""
+
+    def __init__(self, directory: Path, flush_interval: float = 5):
+        """
+        初始化统计合并
+
+        参数:
+            directory: 协调目录
+            flush_interval: 本进程统计的写出间隔（秒）
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"metrics-{self.pid}.json"
+
+    def write(self, metrics: IssuanceMetrics):
+        """写出本进程的统计（先写临时文件再替换，读取方不会读到半个文件）"""
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(metrics.export_state()), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    def merged(self, metrics: IssuanceMetrics) -> IssuanceMetrics:
+        """合并本进程（实时）和其他存活worker（最近写出）的统计；已退出进程的文件删除"""
+        states = [metrics.export_state()]
+        for path in self.directory.glob('metrics-*.json'):
+            pid = int(path.stem.split('-', 1)[1])
+            if pid == self.pid:
+                continue
+            if not pid_alive(pid):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                states.append(json.loads(path.read_text(encoding='utf-8')))
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取worker {pid} 的耗时统计失败: {e}")
+        return IssuanceMetrics.from_states(states, metrics.buckets)
+
+    async def start(self, async_core: "AsyncVCIssuanceCore"):
+        """启动定期写出任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop(async_core))
+
+    async def stop(self):
+        """停止写出任务并删除本进程的统计文件"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.path.unlink(missing_ok=True)
+
+    async def _flush_loop(self, async_core: "AsyncVCIssuanceCore"):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await async_core._run_blocking(self.write, async_core.metrics)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"写出耗时统计失败: {e}")
+
+
+class WorkerCoordination:
+    """同一主机上多个worker进程的协调（nonce、webhook、耗时统计、主worker）"""
+
+    def __init__(self, settings: Optional[Dict] = None):
+        """
+        初始化协调目录
+
+        参数:
+            settings: service.workers 配置段
+        """
+        settings = settings or {}
+        self.directory = Path(settings.get('coordination_dir', DEFAULT_COORDINATION_DIR))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pid = os.getpid()
+        self.nonce_resync_seconds = settings.get('nonce_resync_seconds', 60)
+
+        self._nonce_streams: Dict[str, SharedNonceStream] = {}
+        self._nonce_lock = threading.Lock()
+        self.webhook_relay = WebhookRelay(
+            self.directory / 'webhook_events.db',
+            poll_interval=settings.get('webhook_poll_interval_seconds', 0.2),
+            retention_seconds=settings.get('webhook_retention_seconds', 300)
+        )
+        self.metrics_exchange = MetricsExchange(self.directory, settings.get('metrics_flush_seconds', 5))
+        self.leader = LeaderElection(self.directory / 'leader.lock', settings.get('leader_retry_seconds', 5))
+
+        logger.info(f"多worker协调已启用: 进程 {self.pid}, 协调目录 {self.directory}")
+
+    @property
+    def is_leader(self) -> bool:
+        """本进程是否为主worker"""
+        return self.leader.is_leader
+
+    @property
+    def credential_snapshot_path(self) -> Path:
+        """主worker写出的Holder凭证快照（holder_credential_index.py）"""
+        return self.directory / 'holder_credentials.json'
+
+    def nonce_stream(self, address: str) -> SharedNonceStream:
+        """Oracle账户的共享nonce序列（同一进程内同一地址共用一个实例）"""
+        key = address.lower()
+        with self._nonce_lock:
+            stream = self._nonce_streams.get(key)
+            if stream is None:
+                stream = self._nonce_streams[key] = SharedNonceStream(
+                    address, self.directory / f"nonce-{key}.lock", self.nonce_resync_seconds
+                )
+            return stream
+
+    async def start(self, async_core: "AsyncVCIssuanceCore"):
+        """启动webhook轮询、耗时统计写出和主worker接管重试"""
+        await self.webhook_relay.start(async_core)
+        await self.metrics_exchange.start(async_core)
+        await self.leader.start()
+
+    async def stop(self):
+        await self.webhook_relay.stop()
+        await self.metrics_exchange.stop()
+        await self.leader.stop()
+
+    def get_stats(self) -> Dict:
+        return {
+            "pid": self.pid,
+            "leader": self.is_leader,
+            "coordination_dir": str(self.directory),
+            "webhook_relay": self.webhook_relay.get_stats(),
+            "nonce_streams": {address: stream.get_stats() for address, stream in self._nonce_streams.items()}
+        }
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - Merkle批量锚定
+按vc_type收集一个时间窗口内的 (VC Hash, UUID)，构建Merkle树，每批只发送一笔 anchorMerkleRoot 交易；
+每个VC的包含证明保存在UUID登记表（uuid_registry.py），验证方（oracle/blockchain_client.py）
+由证明和UUID计算Merkle根，每个根只需一次链上查询，不必逐个VC读取合约。
+叶子包含UUID，登记表中的UUID被改动后包含证明不再成立，登记表只作为证明存储。
+
+启用后链上写入由每个VC一笔 addVCMetadata 变为每个窗口一笔 anchorMerkleRoot。
+注意: 此模式下合约中没有VC的元数据记录，需要链上 initiateCrossChainTransfer 的VC类型不应启用。
+
+配置（service.anchoring.merkle）:
+    enabled         是否启用（默认False）
+    window_seconds  收集窗口（秒），窗口内第一个VC到达时开始计时
+    max_batch       每批最多VC数，达到时立即锚定
+"""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+# 与 oracle/blockchain_client.py 共用的Merkle树实现（oracle/merkle_tree.py）
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from oracle.merkle_tree import build_merkle_levels, merkle_proof, merkle_root
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('vc_merkle_anchor')
+
+
+class MerkleAnchorBatcher:
+    """
+    Merkle批量锚定器（在事件循环中使用）
+
+    anchor() 在所属批次的Merkle根交易提交后返回；回执由调用方按交易哈希等待
+    （AsyncVCIssuanceCore.wait_for_receipt 对同一交易只轮询一次）。
+    """
+
+    def __init__(self, async_core: "AsyncVCIssuanceCore", window_seconds: float = 5.0, max_batch: int = 256):
+        """
+        初始化批量锚定器
+
+        参数:
+            async_core: 异步发行核心（提供交易发送、回执查询和线程池执行）
+            window_seconds: 收集窗口（秒）
+            max_batch: 每批最多VC数
+        """
+        self.async_core = async_core
+        self.window_seconds = window_seconds
+        self.max_batch = max(1, max_batch)
+
+        self._pending: Dict[str, List[Tuple[str, str, asyncio.Future]]] = {}  # vc_type -> [(vc_hash, vc_uuid, future)]
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+        self._stats = {"batches": 0, "anchored_vcs": 0, "failed_batches": 0, "reused_roots": 0, "largest_batch": 0}
+
+    @classmethod
+    def from_config(cls, async_core: "AsyncVCIssuanceCore", config: Optional[Dict]) -> Optional["MerkleAnchorBatcher"]:
+        """从配置段创建（未启用时返回None）"""
+        config = config or {}
+        if not config.get('enabled', False):
+            return None
+        return cls(
+            async_core,
+            window_seconds=config.get('window_seconds', 5.0),
+            max_batch=config.get('max_batch', 256)
+        )
+
+    async def stop(self):
+        """停止：取消未锚定的批次（对应任务保留在 stored 阶段，下次启动时重新加入批次）"""
+        tasks = list(self._timers.values()) + list(self._flushes)
+        for task in tasks:
+            task.cancel()
+        for entries in self._pending.values():
+            for _, _, future in entries:
+                future.cancel()
+        self._pending.clear()
+        self._timers.clear()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ==================== 批次收集 ====================
+
+    async def anchor(self, vc_type: str, vc_hash: str, vc_uuid: str) -> Dict:
+        """
+        将 (VC Hash, UUID) 加入当前批次，等待批次的Merkle根交易提交
+
+        返回:
+            {"merkle_root", "tx_hash", "vc_count", "leaf_index", "proof"}
+
+        异常:
+            Merkle根交易发送失败时抛出Exception
+        """
+        future = asyncio.get_running_loop().create_future()
+        entries = self._pending.setdefault(vc_type, [])
+        entries.append((vc_hash, vc_uuid, future))
+
+        if len(entries) >= self.max_batch:
+            timer = self._timers.pop(vc_type, None)
+            if timer is not None:
+                timer.cancel()
+            self._start_flush(vc_type)
+        elif vc_type not in self._timers:
+            self._timers[vc_type] = asyncio.create_task(self._flush_after_window(vc_type))
+
+        return await future
+
+    def _start_flush(self, vc_type: str):
+        """取出当前批次并在后台锚定"""
+        entries = self._pending.pop(vc_type, [])
+        task = asyncio.create_task(self._flush(vc_type, entries))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush_after_window(self, vc_type: str):
+        """收集窗口结束后锚定当前批次"""
+        await asyncio.sleep(self.window_seconds)
+        self._timers.pop(vc_type, None)
+        self._start_flush(vc_type)
+
+    async def _flush(self, vc_type: str, entries: List[Tuple[str, str, asyncio.Future]]):
+        """构建Merkle树、发送根交易、保存包含证明，并通知批次内的所有VC"""
+        # 等待期间已取消的请求（服务停止）不再加入批次
+        entries = [entry for entry in entries if not entry[2].done()]
+        if not entries:
+            return
+
+        leaves = list(dict.fromkeys((vc_hash, vc_uuid) for vc_hash, vc_uuid, _ in entries))
+        vc_hashes = [vc_hash for vc_hash, _ in leaves]
+        levels = build_merkle_levels(leaves)
+        root = merkle_root(levels)
+        proofs = {
+            vc_hash: {"leaf_index": index, "proof": merkle_proof(levels, index)}
+            for index, vc_hash in enumerate(vc_hashes)
+        }
+
+        core = self.async_core.core
+        try:
+            existing = await self.async_core._run_blocking(core.uuid_registry.get_merkle_root, root)
+            if existing and existing.get("tx_hash"):
+                # 相同的批次已经锚定过（如任务恢复后重新加入），不重复发送
+                tx_hash = existing["tx_hash"]
+                self._stats["reused_roots"] += 1
+            else:
+                lanes = self.async_core.lanes
+                lane = lanes.lanes.get(vc_type) if lanes else None
+                tx_hash = await self.async_core._run_blocking(
+                    core.send_merkle_root_transaction, vc_type, root, len(vc_hashes),
+                    lane.nonce_stream if lane else None
+                )
+                await self.async_core._run_blocking(core.uuid_registry.record_merkle_batch, root, vc_type, tx_hash, proofs)
+        except Exception as e:
+            logger.error(f"{vc_type} Merkle根锚定失败（{len(vc_hashes)} 个VC）: {e}", exc_info=True)
+            self._stats["failed_batches"] += 1
+            for _, _, future in entries:
+                if not future.done():
+                    future.set_exception(Exception(f"Merkle根锚定失败: {e}"))
+            return
+
+        self._stats["batches"] += 1
+        self._stats["anchored_vcs"] += len(vc_hashes)
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(vc_hashes))
+        logger.info(f"{vc_type} Merkle根已提交: {root}（{len(vc_hashes)} 个VC），交易 {tx_hash}")
+
+        for vc_hash, _, future in entries:
+            if not future.done():
+                future.set_result({"merkle_root": root, "tx_hash": tx_hash, "vc_count": len(vc_hashes), **proofs[vc_hash]})
+
+    def get_stats(self) -> Dict:
+        """获取批量锚定统计"""
+        return {
+            "window_seconds": self.window_seconds,
+            "max_batch": self.max_batch,
+            "pending": sum(len(entries) for entries in self._pending.values()),
+            **self._stats
+        }
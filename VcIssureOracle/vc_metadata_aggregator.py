@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - VC元数据批量上链
+已完成发行的VC按vc_type汇总，每个区块最多发送一笔 addVCMetadataBatch 交易，
+摊薄逐个VC调用 addVCMetadata 的交易开销（签名、nonce、基础Gas、回执轮询）。
+与逐个上链相同，合约中保存每个VC的完整元数据（可发起跨链传输）。
+expiryTime 超出合约 uint64 范围的VC在加入队列前单独失败，不影响同一批次的其他VC。
+
+合并规则:
+- 队列中第一个VC到达时，若本类型在当前区块还没有发送过批次，立即发送
+- 否则等到出现新区块时，把期间到达的VC合并为一笔交易
+- 达到 max_batch 时立即发送
+
+配置（service.anchoring.batch）:
+    enabled         是否启用（默认False）
+    max_batch       每笔交易最多VC数
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from vc_issuance_async import AsyncVCIssuanceCore
+
+
+logger = logging.getLogger('vc_metadata_aggregator')
+
+
+# 合约以uint64保存VC失效时间（VCRecord.expiryTime）
+MAX_EXPIRY_TIME = 2 ** 64 - 1
+
+
+def parse_expiry_time(metadata: Optional[Dict]) -> int:
+    """
+    读取并校验 metadata 中的 expiryTime（未提供时为0）
+
+    异常:
+        ValueError: 不是非负整数或超出合约的uint64范围
+    """
+    value = (metadata or {}).get('expiryTime', 0)
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= MAX_EXPIRY_TIME:
+        raise ValueError(f"expiryTime必须是0到{MAX_EXPIRY_TIME}之间的整数: {value!r}")
+    return value
+
+
+class VCMetadataAggregator:
+    """
+    VC元数据批量上链聚合器（在事件循环中使用）
+
+    add() 在所属批次的交易提交后返回交易哈希；回执由调用方按交易哈希等待
+    （AsyncVCIssuanceCore.wait_for_receipt 对同一交易只轮询一次）。
+    """
+
+    def __init__(self, async_core: "AsyncVCIssuanceCore", max_batch: int = 50, poll_interval: float = 1.0):
+        """
+        初始化聚合器
+
+        参数:
+            async_core: 异步发行核心（提供交易发送、区块高度查询和线程池执行）
+            max_batch: 每笔交易最多VC数
+            poll_interval: 区块高度检查间隔（秒）
+        """
+        self.async_core = async_core
+        self.max_batch = max(1, max_batch)
+        self.poll_interval = poll_interval
+
+        self._pending: Dict[str, List[Tuple[str, Dict, asyncio.Future]]] = {}  # vc_type -> [(vc_hash, metadata, future)]
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._flushes: Set[asyncio.Task] = set()
+        self._last_flush_block: Dict[str, int] = {}
+
+        self._stats = {"batches": 0, "vcs": 0, "failed_batches": 0, "largest_batch": 0}
+
+    @classmethod
+    def from_config(cls, async_core: "AsyncVCIssuanceCore", config: Optional[Dict]) -> Optional["VCMetadataAggregator"]:
+        """从配置段创建（未启用时返回None）"""
+        config = config or {}
+        if not config.get('enabled', False):
+            return None
+        return cls(async_core, max_batch=config.get('max_batch', 50), poll_interval=async_core.poll_interval)
+
+    async def stop(self):
+        """停止：取消未发送的批次（对应任务保留在 stored 阶段，下次启动时重新上链）"""
+        tasks = list(self._workers.values()) + list(self._flushes)
+        for task in tasks:
+            task.cancel()
+        for entries in self._pending.values():
+            for _, _, future in entries:
+                future.cancel()
+        self._pending.clear()
+        self._workers.clear()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def add(self, vc_type: str, vc_hash: str, metadata: Dict) -> str:
+        """
+        将VC元数据加入本类型的待上链队列，等待所属批次的交易提交
+
+        返回:
+            交易哈希（hex）
+
+        异常:
+            ValueError: expiryTime无效（不加入批次）
+            批次交易发送失败时抛出Exception
+        """
+        parse_expiry_time(metadata)
+        future = asyncio.get_running_loop().create_future()
+        entries = self._pending.setdefault(vc_type, [])
+        entries.append((vc_hash, metadata, future))
+
+        if len(entries) >= self.max_batch:
+            self._start_flush(vc_type, self._last_flush_block.get(vc_type))
+        elif vc_type not in self._workers:
+            self._workers[vc_type] = asyncio.create_task(self._worker(vc_type))
+
+        return await future
+
+    async def _worker(self, vc_type: str):
+        """每出现一个新区块最多发送一个批次，队列清空后退出"""
+        try:
+            while self._pending.get(vc_type):
+                core = self.async_core.core
+                block_number = await self.async_core._run_blocking(lambda: core.w3.eth.block_number)
+                last_block = self._last_flush_block.get(vc_type)
+                if last_block is None or block_number > last_block:
+                    self._start_flush(vc_type, block_number)
+                else:
+                    await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            # 读取区块高度失败：直接发送当前队列，不让VC滞留
+            logger.warning(f"{vc_type} 读取区块高度失败，直接发送批次: {e}")
+            self._start_flush(vc_type, self._last_flush_block.get(vc_type))
+        finally:
+            self._workers.pop(vc_type, None)
+
+    def _start_flush(self, vc_type: str, block_number: Optional[int]):
+        """取出当前队列并在后台发送批次交易"""
+        entries = self._pending.pop(vc_type, [])
+        if block_number is not None:
+            self._last_flush_block[vc_type] = block_number
+        task = asyncio.create_task(self._flush(vc_type, entries))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, vc_type: str, entries: List[Tuple[str, Dict, asyncio.Future]]):
+        """发送一笔 addVCMetadataBatch 交易并通知批次内的所有VC"""
+        # 等待期间已取消的请求（服务停止）不再加入批次
+        entries = [entry for entry in entries if not entry[2].done()]
+        if not entries:
+            return
+
+        lanes = self.async_core.lanes
+        lane = lanes.lanes.get(vc_type) if lanes else None
+        try:
+            tx_hash = await self.async_core._run_blocking(
+                self.async_core.core.send_vc_metadata_batch_transaction, vc_type,
+                [(vc_hash, metadata) for vc_hash, metadata, _ in entries],
+                lane.nonce_stream if lane else None
+            )
+        except Exception as e:
+            logger.error(f"{vc_type} 批量上链失败（{len(entries)} 个VC）: {e}", exc_info=True)
+            self._stats["failed_batches"] += 1
+            for _, _, future in entries:
+                if not future.done():
+                    future.set_exception(Exception(f"批量上链失败: {e}"))
+            return
+
+        self._stats["batches"] += 1
+        self._stats["vcs"] += len(entries)
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(entries))
+        logger.info(f"{vc_type} 批量上链交易已发送: {tx_hash}（{len(entries)} 个VC）")
+
+        for _, _, future in entries:
+            if not future.done():
+                future.set_result(tx_hash)
+
+    def get_stats(self) -> Dict:
+        """获取批量上链统计"""
+        batches = self._stats["batches"]
+        return {
+            "max_batch": self.max_batch,
+            "pending": sum(len(entries) for entries in self._pending.values()),
+            **self._stats,
+            "avg_batch_size": round(self._stats["vcs"] / batches, 2) if batches else None
+        }
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC发行Oracle - 生产部署入口（WSGI应用工厂）
+
+    gunicorn -c gunicorn.conf.py
+
+gunicorn.conf.py 按 service.workers.count 启动多个worker进程，每个进程在fork之后调用 create_app()，
+各自创建后台事件循环、ACA-Py会话和数据库连接；进程间通过 vc_issuance_workers.py 协调
+（共享nonce、webhook事件转发、耗时统计合并、发行任务归属）。
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from vc_issuance_oracle import app, init_service
+
+
+def create_app():
+    """初始化当前worker进程的发行服务并返回Flask应用"""
+    init_service(multi_worker=True)
+    return app
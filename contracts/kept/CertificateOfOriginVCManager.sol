@@ -27,7 +27,7 @@ contract CertificateOfOriginVCManager {
     // 引用DIDVerifier合约
     address public didVerifier;
 
-    // VC元数据结构（标准格式）
+    // VC元数据结构（标准格式，读取时由 VCRecord 和字符串表还原，不直接存储）
     struct VCMetadata {
         bytes32 vcHash;              // VC的Hash
         string vcName;               // VC名称
@@ -43,12 +43,57 @@ contract CertificateOfOriginVCManager {
         bool exists;                 // 是否存在
     }
 
-    // VC元数据映射：key为VC的hash
-    mapping(bytes32 => VCMetadata) public vcMetadataList;
+    // 批量添加时的单条VC元数据（字段与 addVCMetadata 的参数一致）
+    struct VCMetadataInput {
+        bytes32 vcHash;
+        string vcName;
+        string vcDescription;
+        string issuerEndpoint;
+        string issuerDID;
+        string holderEndpoint;
+        string holderDID;
+        string blockchainEndpoint;
+        string blockchainType;
+        uint256 expiryTime;
+    }
+
+    // VC存储记录（紧凑格式，共2个存储槽）
+    // 各VC相同的字符串（endpoint、DID、区块链类型、名称模板、描述）保存在字符串表中，记录只保存编号；
+    // VC名称中的UUID后缀 " (UUID: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx)" 以bytes16保存
+    struct VCRecord {
+        bytes16 uuid;                // VC名称中的UUID（hasUuid为false时无效）
+        uint32 nameId;               // VC名称（去掉UUID后缀）
+        uint32 descriptionId;        // VC用途描述
+        uint32 issuerEndpointId;     // 发行者ACAPY的endpoint
+        uint32 issuerDIDId;          // 发行者DID
+        uint32 holderEndpointId;     // 持有者ACAPY的endpoint
+        uint32 holderDIDId;          // 持有者DID
+        uint32 blockchainEndpointId; // VC存储区块链的endpoint
+        uint32 blockchainTypeId;     // 存储区块链类型
+        uint64 expiryTime;           // VC失效时间（Unix时间戳）
+        uint32 holderPosition;       // 在持有者列表中的位置（从1开始，0表示不在列表中）
+        bool hasUuid;                // VC名称是否带UUID后缀
+        bool exists;                 // 是否存在
+    }
+
+    // VC记录映射：key为VC的hash
+    mapping(bytes32 => VCRecord) internal vcRecords;
+
+    // 字符串表：编号 -> 字符串（编号0为空字符串）
+    string[] internal internedStrings;
+
+    // 字符串编号：keccak256(字符串) -> 编号
+    mapping(bytes32 => uint32) internal internedIds;
 
     // VC Hash列表（用于遍历）
     bytes32[] public vcHashes;
 
+    // 持有者DID索引：持有者DID编号 -> VC Hash列表（按持有者分页查询，不必遍历全部VC）
+    mapping(uint32 => bytes32[]) internal holderVCHashes;
+
+    // 空列表（查询未知持有者时返回）
+    bytes32[] internal emptyHashes;
+
     // 跨链桥合约地址
     address public vcCrossChainBridge;
 
@@ -62,8 +107,22 @@ contract CertificateOfOriginVCManager {
     // 跨链用户许可DID列表
     mapping(string => bool) public crossChainAllowedDIDs;
 
+    // Merkle批量锚定信息：一批VC Hash只上链一个Merkle根
+    struct MerkleRootInfo {
+        uint256 vcCount;             // 批次包含的VC数量
+        uint256 anchoredAt;          // 锚定时间（Unix时间戳）
+        bool exists;                 // 是否存在
+    }
+
+    // Merkle根映射：key为Merkle根
+    mapping(bytes32 => MerkleRootInfo) public merkleRoots;
+
+    // 已锚定的Merkle根数量
+    uint256 public merkleRootCount;
+
     // 事件定义
     event VCMetadataAdded(bytes32 indexed vcHash, string vcName, string holderDID, uint256 timestamp);
+    event VCMetadataBatchAdded(uint256 added, uint256 skipped, uint256 timestamp);
     event VCMetadataUpdated(bytes32 indexed vcHash, string vcName, uint256 timestamp);
     event VCMetadataDeleted(bytes32 indexed vcHash, uint256 timestamp);
     event OracleDIDAdded(string did, uint256 timestamp);
@@ -73,6 +132,7 @@ contract CertificateOfOriginVCManager {
     event CrossChainTransferInitiated(bytes32 indexed vcHash, string targetChain, uint256 timestamp);
     event AdminAdded(address indexed admin, uint256 timestamp);
     event AdminRemoved(address indexed admin, uint256 timestamp);
+    event MerkleRootAnchored(bytes32 indexed root, uint256 vcCount, uint256 timestamp);
 
     /**
      * @dev 构造函数
@@ -87,6 +147,7 @@ contract CertificateOfOriginVCManager {
         vcCrossChainBridge = _vcCrossChainBridge;
         owner = msg.sender;
         isAdmin[owner] = true;
+        internedStrings.push("");
         emit AdminAdded(owner, block.timestamp);
     }
 
@@ -281,9 +342,9 @@ contract CertificateOfOriginVCManager {
         uint256 _expiryTime
     ) public onlyOracleOrCrossChainUser {
         require(_vcHash != bytes32(0), "Invalid VC hash");
-        require(!vcMetadataList[_vcHash].exists, "VC already exists");
+        require(!vcRecords[_vcHash].exists, "VC already exists");
 
-        vcMetadataList[_vcHash] = VCMetadata({
+        _storeVCMetadata(VCMetadataInput({
             vcHash: _vcHash,
             vcName: _vcName,
             vcDescription: _vcDescription,
@@ -292,21 +353,228 @@ contract CertificateOfOriginVCManager {
             holderEndpoint: _holderEndpoint,
             holderDID: _holderDID,
             blockchainEndpoint: _blockchainEndpoint,
-            vcManagerAddress: address(this),
             blockchainType: _blockchainType,
-            expiryTime: _expiryTime,
-            exists: true
-        });
+            expiryTime: _expiryTime
+        }));
+    }
+
+    /**
+     * @dev 批量添加VC元数据（Oracle或管理员），已存在、Hash为空或失效时间超出uint64的条目跳过
+     * @param _items VC元数据列表
+     * @return 实际添加的数量
+     */
+    function addVCMetadataBatch(VCMetadataInput[] memory _items) public onlyOracleOrCrossChainUser returns (uint256) {
+        uint256 added = 0;
+        for (uint256 i = 0; i < _items.length; i++) {
+            if (
+                _items[i].vcHash == bytes32(0) ||
+                vcRecords[_items[i].vcHash].exists ||
+                _items[i].expiryTime > uint64(-1)
+            ) {
+                continue;
+            }
+            _storeVCMetadata(_items[i]);
+            added++;
+        }
+
+        emit VCMetadataBatchAdded(added, _items.length - added, block.timestamp);
+        return added;
+    }
 
-        vcHashes.push(_vcHash);
+    /**
+     * @dev 内部函数：保存一条VC元数据（调用方已检查不存在；失效时间超出uint64时回滚）
+     * @param _item VC元数据
+     */
+    function _storeVCMetadata(VCMetadataInput memory _item) internal {
+        require(_item.expiryTime <= uint64(-1), "Expiry too large");
+
+        VCRecord storage record = vcRecords[_item.vcHash];
+        (string memory baseName, bytes16 uuid, bool hasUuid) = _splitVCName(_item.vcName);
+        record.uuid = uuid;
+        record.hasUuid = hasUuid;
+        record.nameId = _intern(baseName);
+        record.descriptionId = _intern(_item.vcDescription);
+        record.issuerEndpointId = _intern(_item.issuerEndpoint);
+        record.issuerDIDId = _intern(_item.issuerDID);
+        record.holderEndpointId = _intern(_item.holderEndpoint);
+        record.holderDIDId = _intern(_item.holderDID);
+        record.blockchainEndpointId = _intern(_item.blockchainEndpoint);
+        record.blockchainTypeId = _intern(_item.blockchainType);
+        record.expiryTime = uint64(_item.expiryTime);
+        record.exists = true;
+
+        vcHashes.push(_item.vcHash);
+        _addToHolderIndex(record, _item.vcHash);
 
         // 自动将持有者DID添加到跨链许可列表
-        if (!crossChainAllowedDIDs[_holderDID]) {
-            crossChainAllowedDIDs[_holderDID] = true;
-            emit CrossChainDIDAdded(_holderDID, block.timestamp);
+        if (!crossChainAllowedDIDs[_item.holderDID]) {
+            crossChainAllowedDIDs[_item.holderDID] = true;
+            emit CrossChainDIDAdded(_item.holderDID, block.timestamp);
         }
 
-        emit VCMetadataAdded(_vcHash, _vcName, _holderDID, block.timestamp);
+        emit VCMetadataAdded(_item.vcHash, _item.vcName, _item.holderDID, block.timestamp);
+    }
+
+    /**
+     * @dev 内部函数：将VC Hash加入持有者索引
+     * @param _record VC记录
+     * @param _vcHash VC的Hash
+     */
+    function _addToHolderIndex(VCRecord storage _record, bytes32 _vcHash) internal {
+        bytes32[] storage hashes = holderVCHashes[_record.holderDIDId];
+        hashes.push(_vcHash);
+        _record.holderPosition = uint32(hashes.length);
+    }
+
+    /**
+     * @dev 内部函数：从持有者索引中移除VC Hash（与最后一个元素交换后删除）
+     * @param _record VC记录
+     */
+    function _removeFromHolderIndex(VCRecord storage _record) internal {
+        uint32 position = _record.holderPosition;
+        if (position == 0) {
+            return;
+        }
+
+        bytes32[] storage hashes = holderVCHashes[_record.holderDIDId];
+        bytes32 last = hashes[hashes.length - 1];
+        hashes[position - 1] = last;
+        vcRecords[last].holderPosition = position;
+        hashes.length--;
+        _record.holderPosition = 0;
+    }
+
+    /**
+     * @dev 内部函数：取得字符串在字符串表中的编号（不存在时加入字符串表）
+     * @param _value 字符串
+     * @return 编号（空字符串为0）
+     */
+    function _intern(string memory _value) internal returns (uint32) {
+        if (bytes(_value).length == 0) {
+            return 0;
+        }
+
+        bytes32 key = keccak256(bytes(_value));
+        uint32 id = internedIds[key];
+        if (id == 0) {
+            require(internedStrings.length <= uint32(-1), "String table full");
+            id = uint32(internedStrings.length);
+            internedStrings.push(_value);
+            internedIds[key] = id;
+        }
+        return id;
+    }
+
+    /**
+     * @dev 内部函数：查找字符串的编号（不加入字符串表）
+     * @param _value 字符串
+     * @return 编号（不在字符串表中时为0）
+     */
+    function _internedId(string memory _value) internal view returns (uint32) {
+        return internedIds[keccak256(bytes(_value))];
+    }
+
+    /**
+     * @dev 内部函数：持有者的VC Hash列表（未知的非空DID返回空列表，不与空字符串DID的列表混淆）
+     * @param _holderDID 持有者DID
+     * @return VC Hash列表
+     */
+    function _holderHashes(string memory _holderDID) internal view returns (bytes32[] storage) {
+        uint32 id = _internedId(_holderDID);
+        if (id == 0 && bytes(_holderDID).length > 0) {
+            return emptyHashes;
+        }
+        return holderVCHashes[id];
+    }
+
+    /**
+     * @dev 内部函数：拆分VC名称中的UUID后缀 " (UUID: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx)"
+     * @param _vcName VC名称
+     * @return 去掉后缀的名称、UUID、是否带UUID后缀（格式不符时返回完整名称）
+     */
+    function _splitVCName(string memory _vcName) internal pure returns (string memory, bytes16, bool) {
+        bytes memory name = bytes(_vcName);
+        if (name.length < 45 || uint8(name[name.length - 1]) != 41) {
+            return (_vcName, bytes16(0), false);
+        }
+
+        uint256 start = name.length - 45;
+        bytes memory marker = bytes(" (UUID: ");
+        for (uint256 i = 0; i < marker.length; i++) {
+            if (name[start + i] != marker[i]) {
+                return (_vcName, bytes16(0), false);
+            }
+        }
+
+        uint128 uuid = 0;
+        for (uint256 i = 0; i < 36; i++) {
+            uint8 c = uint8(name[start + 8 + i]);
+            if (i == 8 || i == 13 || i == 18 || i == 23) {
+                if (c != 45) {
+                    return (_vcName, bytes16(0), false);
+                }
+            } else if (c >= 48 && c <= 57) {
+                uuid = uuid * 16 + (c - 48);
+            } else if (c >= 97 && c <= 102) {
+                uuid = uuid * 16 + (c - 87);
+            } else {
+                return (_vcName, bytes16(0), false);
+            }
+        }
+
+        bytes memory baseName = new bytes(start);
+        for (uint256 i = 0; i < start; i++) {
+            baseName[i] = name[i];
+        }
+        return (string(baseName), bytes16(uuid), true);
+    }
+
+    /**
+     * @dev 内部函数：还原带UUID后缀的VC名称（_splitVCName 的逆操作）
+     * @param _baseName 去掉后缀的名称
+     * @param _uuid UUID
+     * @return VC名称
+     */
+    function _joinVCName(string memory _baseName, bytes16 _uuid) internal pure returns (string memory) {
+        bytes memory hexChars = "0123456789abcdef";
+        bytes memory uuidText = new bytes(36);
+        uint128 value = uint128(_uuid);
+        for (uint256 i = 36; i > 0; i--) {
+            uint256 index = i - 1;
+            if (index == 8 || index == 13 || index == 18 || index == 23) {
+                uuidText[index] = "-";
+            } else {
+                uuidText[index] = hexChars[value & 15];
+                value = value >> 4;
+            }
+        }
+        return string(abi.encodePacked(_baseName, " (UUID: ", uuidText, ")"));
+    }
+
+    /**
+     * @dev 内部函数：由VC记录和字符串表还原VC元数据
+     * @param _vcHash VC的Hash
+     * @return VC元数据（不存在时各字段为空，exists为false）
+     */
+    function _loadVCMetadata(bytes32 _vcHash) internal view returns (VCMetadata memory metadata) {
+        VCRecord storage record = vcRecords[_vcHash];
+        if (!record.exists) {
+            return metadata;
+        }
+
+        string memory baseName = internedStrings[record.nameId];
+        metadata.vcHash = _vcHash;
+        metadata.vcName = record.hasUuid ? _joinVCName(baseName, record.uuid) : baseName;
+        metadata.vcDescription = internedStrings[record.descriptionId];
+        metadata.issuerEndpoint = internedStrings[record.issuerEndpointId];
+        metadata.issuerDID = internedStrings[record.issuerDIDId];
+        metadata.holderEndpoint = internedStrings[record.holderEndpointId];
+        metadata.holderDID = internedStrings[record.holderDIDId];
+        metadata.blockchainEndpoint = internedStrings[record.blockchainEndpointId];
+        metadata.vcManagerAddress = address(this);
+        metadata.blockchainType = internedStrings[record.blockchainTypeId];
+        metadata.expiryTime = record.expiryTime;
+        metadata.exists = true;
     }
 
     /**
@@ -322,11 +590,16 @@ contract CertificateOfOriginVCManager {
         string memory _vcDescription,
         uint256 _expiryTime
     ) public onlyOracleOrCrossChainUser {
-        require(vcMetadataList[_vcHash].exists, "VC does not exist");
+        require(vcRecords[_vcHash].exists, "VC does not exist");
+        require(_expiryTime <= uint64(-1), "Expiry too large");
 
-        vcMetadataList[_vcHash].vcName = _vcName;
-        vcMetadataList[_vcHash].vcDescription = _vcDescription;
-        vcMetadataList[_vcHash].expiryTime = _expiryTime;
+        VCRecord storage record = vcRecords[_vcHash];
+        (string memory baseName, bytes16 uuid, bool hasUuid) = _splitVCName(_vcName);
+        record.uuid = uuid;
+        record.hasUuid = hasUuid;
+        record.nameId = _intern(baseName);
+        record.descriptionId = _intern(_vcDescription);
+        record.expiryTime = uint64(_expiryTime);
 
         emit VCMetadataUpdated(_vcHash, _vcName, block.timestamp);
     }
@@ -336,9 +609,10 @@ contract CertificateOfOriginVCManager {
      * @param _vcHash VC的Hash
      */
     function deleteVCMetadata(bytes32 _vcHash) public onlyAdmin {
-        require(vcMetadataList[_vcHash].exists, "VC does not exist");
+        require(vcRecords[_vcHash].exists, "VC does not exist");
 
-        delete vcMetadataList[_vcHash];
+        _removeFromHolderIndex(vcRecords[_vcHash]);
+        delete vcRecords[_vcHash];
 
         // 从列表中移除
         for (uint256 i = 0; i < vcHashes.length; i++) {
@@ -352,6 +626,42 @@ contract CertificateOfOriginVCManager {
         emit VCMetadataDeleted(_vcHash, block.timestamp);
     }
 
+    /**
+     * @dev 读取VC元数据（与原 public 映射 vcMetadataList 的getter接口一致，不检查调用者）
+     * @param _vcHash VC的Hash
+     * @return VC元数据详情
+     */
+    function vcMetadataList(bytes32 _vcHash) public view returns (
+        bytes32 vcHash,
+        string memory vcName,
+        string memory vcDescription,
+        string memory issuerEndpoint,
+        string memory issuerDID,
+        string memory holderEndpoint,
+        string memory holderDID,
+        string memory blockchainEndpoint,
+        address vcManagerAddress,
+        string memory blockchainType,
+        uint256 expiryTime,
+        bool exists
+    ) {
+        VCMetadata memory metadata = _loadVCMetadata(_vcHash);
+        return (
+            metadata.vcHash,
+            metadata.vcName,
+            metadata.vcDescription,
+            metadata.issuerEndpoint,
+            metadata.issuerDID,
+            metadata.holderEndpoint,
+            metadata.holderDID,
+            metadata.blockchainEndpoint,
+            metadata.vcManagerAddress,
+            metadata.blockchainType,
+            metadata.expiryTime,
+            metadata.exists
+        );
+    }
+
     /**
      * @dev 读取VC元数据
      * @param _vcHash VC的Hash
@@ -371,7 +681,7 @@ contract CertificateOfOriginVCManager {
         uint256 expiryTime,
         bool exists
     ) {
-        VCMetadata memory metadata = vcMetadataList[_vcHash];
+        VCMetadata memory metadata = _loadVCMetadata(_vcHash);
         return (
             metadata.vcHash,
             metadata.vcName,
@@ -405,29 +715,82 @@ contract CertificateOfOriginVCManager {
     }
 
     /**
-     * @dev 根据持有者DID获取相关VC Hash列表
+     * @dev 分页获取VC Hash列表
+     * @param _offset 起始位置
+     * @param _limit 最多返回数量
+     * @return VC Hash数组（超出范围时为空）
+     */
+    function getVCHashesRange(uint256 _offset, uint256 _limit) public view onlyVerified returns (bytes32[] memory) {
+        return _sliceHashes(vcHashes, _offset, _limit);
+    }
+
+    /**
+     * @dev 根据持有者DID获取相关VC Hash列表（读取持有者索引）
      * @param _holderDID 持有者DID
      * @return VC Hash数组
      */
     function getVCHashesByHolder(string memory _holderDID) public view onlyVerified returns (bytes32[] memory) {
-        // 先计算匹配数量
-        uint256 count = 0;
-        for (uint256 i = 0; i < vcHashes.length; i++) {
-            if (keccak256(abi.encodePacked(vcMetadataList[vcHashes[i]].holderDID)) == keccak256(abi.encodePacked(_holderDID))) {
-                count++;
-            }
+        return _holderHashes(_holderDID);
+    }
+
+    /**
+     * @dev 获取持有者的VC数量
+     * @param _holderDID 持有者DID
+     * @return VC数量
+     */
+    function getVCCountByHolder(string memory _holderDID) public view onlyVerified returns (uint256) {
+        return _holderHashes(_holderDID).length;
+    }
+
+    /**
+     * @dev 分页获取持有者的VC Hash列表
+     * @param _holderDID 持有者DID
+     * @param _offset 起始位置
+     * @param _limit 最多返回数量
+     * @return VC Hash数组（超出范围时为空）
+     */
+    function getVCHashesByHolderRange(
+        string memory _holderDID,
+        uint256 _offset,
+        uint256 _limit
+    ) public view onlyVerified returns (bytes32[] memory) {
+        return _sliceHashes(_holderHashes(_holderDID), _offset, _limit);
+    }
+
+    /**
+     * @dev 批量读取VC元数据
+     * @param _vcHashes VC Hash列表
+     * @return VC元数据列表（与输入顺序一致，不存在的VC exists为false）
+     */
+    function getVCMetadataBatch(bytes32[] memory _vcHashes) public view onlyVerified returns (VCMetadata[] memory) {
+        VCMetadata[] memory result = new VCMetadata[](_vcHashes.length);
+        for (uint256 i = 0; i < _vcHashes.length; i++) {
+            result[i] = _loadVCMetadata(_vcHashes[i]);
         }
+        return result;
+    }
 
-        // 创建结果数组
-        bytes32[] memory result = new bytes32[](count);
-        uint256 index = 0;
-        for (uint256 i = 0; i < vcHashes.length; i++) {
-            if (keccak256(abi.encodePacked(vcMetadataList[vcHashes[i]].holderDID)) == keccak256(abi.encodePacked(_holderDID))) {
-                result[index] = vcHashes[i];
-                index++;
-            }
+    /**
+     * @dev 内部函数：截取Hash列表的一段
+     * @param _hashes Hash列表
+     * @param _offset 起始位置
+     * @param _limit 最多返回数量
+     * @return Hash数组
+     */
+    function _sliceHashes(bytes32[] storage _hashes, uint256 _offset, uint256 _limit) internal view returns (bytes32[] memory) {
+        if (_offset >= _hashes.length) {
+            return new bytes32[](0);
         }
 
+        uint256 end = _hashes.length;
+        if (_limit < end - _offset) {
+            end = _offset + _limit;
+        }
+
+        bytes32[] memory result = new bytes32[](end - _offset);
+        for (uint256 i = _offset; i < end; i++) {
+            result[i - _offset] = _hashes[i];
+        }
         return result;
     }
 
@@ -437,11 +800,11 @@ contract CertificateOfOriginVCManager {
      * @param _targetChain 目标链名称
      */
     function initiateCrossChainTransfer(bytes32 _vcHash, string memory _targetChain) public onlyOracleOrCrossChainUser {
-        require(vcMetadataList[_vcHash].exists, "VC does not exist");
+        require(vcRecords[_vcHash].exists, "VC does not exist");
         require(_isHolder(msg.sender, _vcHash), "Not holder of this VC");
 
         // 获取VC元数据
-        VCMetadata memory metadata = vcMetadataList[_vcHash];
+        VCMetadata memory metadata = _loadVCMetadata(_vcHash);
 
         // 调用新的简化跨链桥接口（单次调用，只传递7个核心字段）
         IVCCrossChainBridgeSimple bridge = IVCCrossChainBridgeSimple(vcCrossChainBridge);
@@ -480,7 +843,8 @@ contract CertificateOfOriginVCManager {
         string memory callerDID = abi.decode(data, (string));
 
         // 检查是否为持有者
-        return keccak256(abi.encodePacked(vcMetadataList[_vcHash].holderDID)) == keccak256(abi.encodePacked(callerDID));
+        uint32 callerDIDId = _internedId(callerDID);
+        return callerDIDId != 0 && callerDIDId == vcRecords[_vcHash].holderDIDId;
     }
 
     /**
@@ -489,7 +853,7 @@ contract CertificateOfOriginVCManager {
      * @return 是否有效
      */
     function isVCValid(bytes32 _vcHash) public view onlyVerified returns (bool) {
-        return vcMetadataList[_vcHash].exists && vcMetadataList[_vcHash].expiryTime >= block.timestamp;
+        return vcRecords[_vcHash].exists && vcRecords[_vcHash].expiryTime >= block.timestamp;
     }
 
     /**
@@ -498,6 +862,64 @@ contract CertificateOfOriginVCManager {
      * @return 是否存在
      */
     function vcExists(bytes32 _vcHash) public view onlyVerified returns (bool) {
-        return vcMetadataList[_vcHash].exists;
+        return vcRecords[_vcHash].exists;
+    }
+
+    /**
+     * @dev 锚定一批VC Hash的Merkle根（只有Oracle服务）
+     * @param _root Merkle根（叶子为 keccak256(vcHash || uuid)，内部节点为有序拼接后的 keccak256）
+     * @param _vcCount 批次包含的VC数量
+     */
+    function anchorMerkleRoot(bytes32 _root, uint256 _vcCount) public onlyOracle {
+        require(_root != bytes32(0), "Invalid root");
+        require(_vcCount > 0, "Empty batch");
+        require(!merkleRoots[_root].exists, "Root already anchored");
+
+        merkleRoots[_root] = MerkleRootInfo({
+            vcCount: _vcCount,
+            anchoredAt: block.timestamp,
+            exists: true
+        });
+        merkleRootCount++;
+
+        emit MerkleRootAnchored(_root, _vcCount, block.timestamp);
+    }
+
+    /**
+     * @dev 检查Merkle根是否已锚定
+     * @param _root Merkle根
+     * @return 是否已锚定
+     */
+    function isMerkleRootAnchored(bytes32 _root) public view onlyVerified returns (bool) {
+        return merkleRoots[_root].exists;
+    }
+
+    /**
+     * @dev 验证 (VC Hash, UUID) 包含在已锚定的Merkle根中
+     * @param _root Merkle根
+     * @param _vcHash VC的Hash
+     * @param _uuid VC的UUID（16字节）
+     * @param _proof 从叶子到根的兄弟节点列表
+     * @return 是否包含
+     */
+    function verifyMerkleProof(
+        bytes32 _root,
+        bytes32 _vcHash,
+        bytes16 _uuid,
+        bytes32[] memory _proof
+    ) public view onlyVerified returns (bool) {
+        if (!merkleRoots[_root].exists) {
+            return false;
+        }
+
+        bytes32 computed = keccak256(abi.encodePacked(_vcHash, _uuid));
+        for (uint256 i = 0; i < _proof.length; i++) {
+            if (computed <= _proof[i]) {
+                computed = keccak256(abi.encodePacked(computed, _proof[i]));
+            } else {
+                computed = keccak256(abi.encodePacked(_proof[i], computed));
+            }
+        }
+        return computed == _root;
     }
 }
@@ -46,6 +46,10 @@ contract VCCrossChainBridgeSimple {
     bytes32[] public sendListIndexes;
     bytes32[] public receiveListIndexes;
 
+    // 待确认集合：状态为InProgress的已发送VC（Oracle通过updateSendStatus标记Completed后移除）
+    bytes32[] internal pendingIndexes;
+    mapping(bytes32 => uint256) internal pendingPosition;   // 在pendingIndexes中的位置（从1开始，0表示不在集合中）
+
     // 权限控制
     address public owner;
     mapping(address => bool) public adminList;
@@ -108,6 +112,7 @@ contract VCCrossChainBridgeSimple {
         record.exists = true;
 
         sendListIndexes.push(_vcHash);
+        _addPending(_vcHash);
         emit VCSent(_vcHash, _targetChain, msg.sender, _holderEndpoint);
     }
 
@@ -147,6 +152,30 @@ contract VCCrossChainBridgeSimple {
     function updateSendStatus(bytes32 _vcHash, TransferStatus _status) external onlyAllowedOracleDID {
         require(sendList[_vcHash].exists, "VC not found");
         sendList[_vcHash].status = _status;
+        if (_status == TransferStatus.Completed) {
+            _removePending(_vcHash);
+        } else {
+            _addPending(_vcHash);
+        }
+    }
+
+    function _addPending(bytes32 _vcHash) internal {
+        if (pendingPosition[_vcHash] == 0) {
+            pendingIndexes.push(_vcHash);
+            pendingPosition[_vcHash] = pendingIndexes.length;
+        }
+    }
+
+    function _removePending(bytes32 _vcHash) internal {
+        uint256 position = pendingPosition[_vcHash];
+        if (position == 0) {
+            return;
+        }
+        bytes32 last = pendingIndexes[pendingIndexes.length - 1];
+        pendingIndexes[position - 1] = last;
+        pendingPosition[last] = position;
+        pendingIndexes.length--;
+        delete pendingPosition[_vcHash];
     }
 
     // ==================== 查询函数 ====================
@@ -204,6 +233,41 @@ contract VCCrossChainBridgeSimple {
         return receiveListIndexes.length;
     }
 
+    // ==================== 分页查询 ====================
+    function getPendingCount() external view returns (uint256) {
+        return pendingIndexes.length;
+    }
+
+    /**
+     * @dev 分页获取待确认的VC Hash（顺序不固定：确认后由最后一个元素填补空位）
+     */
+    function getPendingRange(uint256 _offset, uint256 _limit) external view returns (bytes32[] memory) {
+        return _sliceHashes(pendingIndexes, _offset, _limit);
+    }
+
+    function getSendListRange(uint256 _offset, uint256 _limit) external view returns (bytes32[] memory) {
+        return _sliceHashes(sendListIndexes, _offset, _limit);
+    }
+
+    function getReceiveListRange(uint256 _offset, uint256 _limit) external view returns (bytes32[] memory) {
+        return _sliceHashes(receiveListIndexes, _offset, _limit);
+    }
+
+    function _sliceHashes(bytes32[] storage _hashes, uint256 _offset, uint256 _limit) internal view returns (bytes32[] memory) {
+        if (_offset >= _hashes.length) {
+            return new bytes32[](0);
+        }
+        uint256 end = _hashes.length;
+        if (_limit < end - _offset) {
+            end = _offset + _limit;
+        }
+        bytes32[] memory result = new bytes32[](end - _offset);
+        for (uint256 i = _offset; i < end; i++) {
+            result[i - _offset] = _hashes[i];
+        }
+        return result;
+    }
+
     // ==================== 权限管理 ====================
     function addAdmin(address _admin) external onlyOwner {
         adminList[_admin] = true;
@@ -243,6 +307,7 @@ contract VCCrossChainBridgeSimple {
     function deleteSendRecord(bytes32 _vcHash) external onlyAdmin {
         require(sendList[_vcHash].exists, "VC not found");
         delete sendList[_vcHash];
+        _removePending(_vcHash);
         // 从索引中移除
         for (uint256 i = 0; i < sendListIndexes.length; i++) {
             if (sendListIndexes[i] == _vcHash) {
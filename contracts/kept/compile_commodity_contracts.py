@@ -3,6 +3,10 @@
 """
 大宗货物跨境交易智能合约编译脚本
 使用py-solc-x编译器（Solidity 0.5.16）
+
+编译产物写入 build_commodity/、合约目录下的 <合约名>.json（部署脚本读取），
+并重新生成 contract_abis/<合约名>.json（Oracle、webapp 读取的ABI和字节码），
+contract_abis 中的产物不再手工编辑。
 """
 
 import os
@@ -26,18 +30,18 @@ class CommodityContractCompiler:
         self.contracts_dir = Path(__file__).parent
         self.build_dir = self.contracts_dir / "build_commodity"
         self.build_dir.mkdir(exist_ok=True)
-
-        # 新生成的合约列表（8个）
-        self.contract_files = [
-            "DIDVerifier.sol",
-            "ContractManager.sol",
-            "InspectionReportVCManager.sol",
-            "InsuranceContractVCManager.sol",
-            "CertificateOfOriginVCManager.sol",
-            "BillOfLadingVCManager.sol",
-            "VCCrossChainBridge.sol",
-            "VCVerifier.sol"
-        ]
+        self.abis_dir = self.contracts_dir / "contract_abis"
+
+        # 合约文件 -> 合约名（文件中还声明了接口，按合约名取编译结果）
+        self.contract_files = {
+            "DIDVerifier.sol": "DIDVerifier",
+            "ContractManager.sol": "ContractManager",
+            "InspectionReportVCManager.sol": "InspectionReportVCManager",
+            "InsuranceContractVCManager.sol": "InsuranceContractVCManager",
+            "CertificateOfOriginVCManager.sol": "CertificateOfOriginVCManager",
+            "BillOfLadingVCManager.sol": "BillOfLadingVCManager",
+            "VCCrossChainBridgeSimple_Final.sol": "VCCrossChainBridgeSimple"
+        }
 
     def setup_solc(self):
         """设置Solidity编译器版本"""
@@ -79,8 +83,8 @@ class CommodityContractCompiler:
             print(f"❌ 读取文件失败 {contract_file}: {e}")
             return None
 
-    def compile_contract(self, contract_file, source_code):
-        """编译单个合约"""
+    def compile_contract(self, contract_file, contract_name, source_code):
+        """编译单个合约（按合约名取编译结果）"""
         print(f"🔨 编译 {contract_file}...")
 
         try:
@@ -93,15 +97,10 @@ class CommodityContractCompiler:
                 optimize_runs=200
             )
 
-            # 提取合约ID和接口
-            contract_id = None
-            for key in compiled_sol.keys():
-                if '<stdin>:' in key:
-                    contract_id = key
-                    break
-
-            if contract_id is None:
-                print(f"❌ {contract_file} 编译失败: 未找到合约")
+            # 提取合约接口（同一文件中的interface没有字节码）
+            contract_id = f"<stdin>:{contract_name}"
+            if contract_id not in compiled_sol:
+                print(f"❌ {contract_file} 编译失败: 未找到合约 {contract_name}")
                 return None
 
             contract_interface = compiled_sol[contract_id]
@@ -121,10 +120,8 @@ class CommodityContractCompiler:
             print(f"❌ 编译 {contract_file} 失败: {e}")
             return None
 
-    def save_contract_artifact(self, contract_file, contract_interface):
+    def save_contract_artifact(self, contract_name, contract_interface):
         """保存合约编译产物"""
-        contract_name = contract_file.replace('.sol', '')
-
         # 保存ABI
         abi_file = self.build_dir / f"{contract_name}.abi"
         with open(abi_file, 'w', encoding='utf-8') as f:
@@ -157,6 +154,19 @@ class CommodityContractCompiler:
             json.dump(artifact, f, indent=2, ensure_ascii=False)
         print(f"   ✅ 保存JSON产物: {json_file}")
 
+        # 重新生成 contract_abis 中的ABI和字节码
+        if self.abis_dir.exists():
+            abis_file = self.abis_dir / f"{contract_name}.json"
+            abi_artifact = {}
+            if abis_file.exists():
+                with open(abis_file, 'r', encoding='utf-8') as f:
+                    abi_artifact = json.load(f)
+            abi_artifact.update(abi=contract_interface['abi'], bytecode=contract_interface['bin'])
+            with open(abis_file, 'w', encoding='utf-8') as f:
+                json.dump(abi_artifact, f, indent=2, ensure_ascii=False)
+                f.write("\n")
+            print(f"   ✅ 更新ABI产物: {abis_file}")
+
     def get_current_timestamp(self):
         """获取当前时间戳"""
         import datetime
@@ -183,7 +193,7 @@ class CommodityContractCompiler:
         success_count = 0
         failed_contracts = []
 
-        for contract_file in self.contract_files:
+        for contract_file, contract_name in self.contract_files.items():
             # 读取合约文件
             source_code = self.read_contract_file(contract_file)
             if source_code is None:
@@ -191,13 +201,13 @@ class CommodityContractCompiler:
                 continue
 
             # 编译合约
-            contract_interface = self.compile_contract(contract_file, source_code)
+            contract_interface = self.compile_contract(contract_file, contract_name, source_code)
             if contract_interface is None:
                 failed_contracts.append(contract_file)
                 continue
 
             # 保存编译产物
-            self.save_contract_artifact(contract_file, contract_interface)
+            self.save_contract_artifact(contract_name, contract_interface)
 
             success_count += 1
             print()
@@ -221,7 +231,7 @@ class CommodityContractCompiler:
         if success_count == len(self.contract_files):
             print("🎉 所有合约编译成功！")
             print(f"📁 编译产物保存在: {self.build_dir}")
-            print(f"📄 JSON产物保存在合约目录")
+            print(f"📄 JSON产物保存在合约目录，ABI产物已更新: {self.abis_dir}")
             return True
         else:
             print("❌ 部分合约编译失败")
@@ -237,9 +247,8 @@ class CommodityContractCompiler:
             shutil.rmtree(self.build_dir)
             print(f"✅ 清理 build 目录: {self.build_dir}")
 
-        # 清理JSON文件
-        for contract_file in self.contract_files:
-            contract_name = contract_file.replace('.sol', '')
+        # 清理JSON文件（contract_abis 保留）
+        for contract_name in self.contract_files.values():
             json_file = self.contracts_dir / f"{contract_name}.json"
             if json_file.exists():
                 json_file.unlink()
@@ -14,16 +14,15 @@ NC='\033[0m' # No Color
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 BUILD_DIR="$SCRIPT_DIR/build_commodity"
 
-# 合约列表
+# 合约列表（合约文件:合约名，solc按合约名输出.abi/.bin）
 CONTRACTS=(
-    "DIDVerifier.sol"
-    "ContractManager.sol"
-    "InspectionReportVCManager.sol"
-    "InsuranceContractVCManager.sol"
-    "CertificateOfOriginVCManager.sol"
-    "BillOfLadingVCManager.sol"
-    "VCCrossChainBridge.sol"
-    "VCVerifier.sol"
+    "DIDVerifier.sol:DIDVerifier"
+    "ContractManager.sol:ContractManager"
+    "InspectionReportVCManager.sol:InspectionReportVCManager"
+    "InsuranceContractVCManager.sol:InsuranceContractVCManager"
+    "CertificateOfOriginVCManager.sol:CertificateOfOriginVCManager"
+    "BillOfLadingVCManager.sol:BillOfLadingVCManager"
+    "VCCrossChainBridgeSimple_Final.sol:VCCrossChainBridgeSimple"
 )
 
 echo "============================================================"
@@ -59,7 +58,9 @@ SUCCESS_COUNT=0
 FAILED_CONTRACTS=()
 
 # 编译每个合约
-for CONTRACT_FILE in "${CONTRACTS[@]}"; do
+for CONTRACT_ENTRY in "${CONTRACTS[@]}"; do
+    CONTRACT_FILE="${CONTRACT_ENTRY%%:*}"
+    CONTRACT_NAME="${CONTRACT_ENTRY##*:}"
     CONTRACT_PATH="$SCRIPT_DIR/$CONTRACT_FILE"
 
     # 检查文件是否存在
@@ -79,7 +80,6 @@ for CONTRACT_FILE in "${CONTRACTS[@]}"; do
             --output-dir "$BUILD_DIR" \
             "$CONTRACT_PATH" > /dev/null 2>&1; then
         # 编译成功
-        CONTRACT_NAME="${CONTRACT_FILE%.sol}"
         SUCCESS_COUNT=$((SUCCESS_COUNT + 1))
 
         # 生成JSON文件
@@ -127,6 +127,18 @@ artifact = {
 with open(f"{script_dir}/{contract_name}.json", 'w', encoding='utf-8') as f:
     json.dump(artifact, f, indent=2, ensure_ascii=False)
 
+# 重新生成 contract_abis 中的ABI和字节码（保留其他字段）
+abis_file = f"{script_dir}/contract_abis/{contract_name}.json"
+try:
+    with open(abis_file, 'r', encoding='utf-8') as f:
+        abi_artifact = json.load(f)
+except FileNotFoundError:
+    abi_artifact = {}
+abi_artifact.update(abi=abi, bytecode=bytecode)
+with open(abis_file, 'w', encoding='utf-8') as f:
+    json.dump(abi_artifact, f, indent=2, ensure_ascii=False)
+    f.write("\n")
+
 print(f"  ✅ 生成 {contract_name}.json")
 EOF
 
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-VCCrossChainBridge合约编译脚本
+VCCrossChainBridgeSimple合约编译脚本（VCCrossChainBridgeSimple_Final.sol）
 使用py-solc-x编译器（Solidity 0.5.16）
+
+产物写入合约目录下的 VCCrossChainBridgeSimple.json（deploy_vc_bridge.py、deploy_vc_managers.py 读取），
+并重新生成 contract_abis/VCCrossChainBridgeSimple.json。
 """
 
 import os
@@ -24,7 +27,8 @@ class VCBridgeCompiler:
         """初始化编译器"""
         self.solc_version = solc_version
         self.contracts_dir = Path(__file__).parent
-        self.contract_file = "VCCrossChainBridge.sol"
+        self.contract_file = "VCCrossChainBridgeSimple_Final.sol"
+        self.contract_name = "VCCrossChainBridgeSimple"
 
     def setup_solc(self):
         """设置Solidity编译器版本"""
@@ -78,15 +82,10 @@ class VCBridgeCompiler:
                 optimize_runs=200
             )
 
-            # 提取合约ID和接口
-            contract_id = None
-            for key in compiled_sol.keys():
-                if '<stdin>:' in key:
-                    contract_id = key
-                    break
-
-            if contract_id is None:
-                print(f"❌ {self.contract_file} 编译失败: 未找到合约")
+            # 提取合约接口（同一文件中的DIDVerifier接口没有字节码）
+            contract_id = f"<stdin>:{self.contract_name}"
+            if contract_id not in compiled_sol:
+                print(f"❌ {self.contract_file} 编译失败: 未找到合约 {self.contract_name}")
                 return None
 
             contract_interface = compiled_sol[contract_id]
@@ -110,7 +109,7 @@ class VCBridgeCompiler:
 
     def save_contract_artifact(self, contract_interface):
         """保存合约编译产物"""
-        contract_name = self.contract_file.replace('.sol', '')
+        contract_name = self.contract_name
 
         # 保存ABI
         abi_file = self.contracts_dir / f"{contract_name}.abi"
@@ -144,6 +143,19 @@ class VCBridgeCompiler:
             json.dump(artifact, f, indent=2, ensure_ascii=False)
         print(f"   ✅ 保存JSON产物: {json_file}")
 
+        # 重新生成 contract_abis 中的ABI和字节码
+        abis_file = self.contracts_dir / "contract_abis" / f"{contract_name}.json"
+        if abis_file.parent.exists():
+            abi_artifact = {}
+            if abis_file.exists():
+                with open(abis_file, 'r', encoding='utf-8') as f:
+                    abi_artifact = json.load(f)
+            abi_artifact.update(abi=contract_interface['abi'], bytecode=contract_interface['bin'])
+            with open(abis_file, 'w', encoding='utf-8') as f:
+                json.dump(abi_artifact, f, indent=2, ensure_ascii=False)
+                f.write("\n")
+            print(f"   ✅ 更新ABI产物: {abis_file}")
+
     def get_current_timestamp(self):
         """获取当前时间戳"""
         import datetime
@@ -152,7 +164,7 @@ class VCBridgeCompiler:
     def compile(self):
         """编译合约"""
         print("=" * 60)
-        print("🔨 VCCrossChainBridge合约编译工具")
+        print("🔨 VCCrossChainBridgeSimple合约编译工具")
         print("=" * 60)
         print()
 
@@ -181,7 +193,7 @@ class VCBridgeCompiler:
 
         print()
         print("=" * 60)
-        print("🎉 VCCrossChainBridge合约编译成功！")
+        print("🎉 VCCrossChainBridgeSimple合约编译成功！")
         print("=" * 60)
         print(f"📁 编译产物保存在: {self.contracts_dir}")
         print()
@@ -139,13 +139,13 @@ class VCBridgeDeployer:
 
         chain_contracts['DIDVerifier'] = did_verifier_address
 
-        # 部署VCCrossChainBridge
+        # 部署VCCrossChainBridge（VCCrossChainBridgeSimple_Final.sol，由compile_vc_bridge.py编译）
         print("\n" + "-"*70)
         print("1/1 部署 VCCrossChainBridge")
         print("-"*70)
         bridge_address = self.deploy_contract(
             w3, account_address, private_key,
-            "VCCrossChainBridge",
+            "VCCrossChainBridgeSimple",
             [did_verifier_address],  # 构造函数参数
             chain_config
         )
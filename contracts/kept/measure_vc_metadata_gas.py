@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC管理合约 addVCMetadata / addVCMetadataBatch 的gas对比测量
+在开发链上分别部署改动前、改动后的VC管理合约（各自配一个新的DIDVerifier），
+用同一组元数据写入，输出每条记录的gasUsed。
+
+用法:
+    # 改动前的产物（含字节码）取自基线提交，改动后的产物由编译脚本生成
+    git show <基线提交>:contracts/kept/contract_abis/InspectionReportVCManager.json > /tmp/before.json
+    python compile_commodity_contracts.py
+    python measure_vc_metadata_gas.py --rpc http://localhost:8545 --private-key 0x... \\
+        --before /tmp/before.json --after contract_abis/InspectionReportVCManager.json
+
+部署账户需有余额；它既是合约owner，也被登记为Oracle（通过DIDVerifier映射到 --oracle-did）。
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import uuid
+from pathlib import Path
+
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+
+
+CONTRACTS_DIR = Path(__file__).parent
+DID_VERIFIER_ARTIFACT = CONTRACTS_DIR / "contract_abis" / "DIDVerifier.json"
+
+# 模拟Oracle写入的元数据：端点和DID在大量VC间重复，vcName带UUID后缀
+ISSUER_ENDPOINT = "http://localhost:8000"
+ISSUER_DID = "did:sov:issuer-gas-test"
+HOLDER_ENDPOINT = "http://localhost:8001"
+HOLDER_DIDS = ["did:sov:holder-gas-test-1", "did:sov:holder-gas-test-2", "did:sov:holder-gas-test-3"]
+BLOCKCHAIN_ENDPOINT = "http://localhost:8545"
+BLOCKCHAIN_TYPE = "Besu"
+EXPIRY_TIME = 2000000000
+
+
+def load_artifact(path: Path):
+    """读取合约产物，返回 (abi, bytecode)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        artifact = json.load(f)
+    bytecode = artifact.get('bytecode')
+    if not bytecode:
+        raise ValueError(f"{path} 中没有字节码（请使用编译脚本生成的产物）")
+    return artifact['abi'], bytecode
+
+
+def metadata_item(index: int, vc_type: str) -> tuple:
+    """第index条测试元数据（addVCMetadata的参数顺序，也是VCMetadataInput的字段顺序）"""
+    return (
+        Web3.keccak(text=f"gas-test-{vc_type}-{index}-{uuid.uuid4()}"),
+        f"{vc_type} VC (UUID: {uuid.uuid4()})",
+        f"{vc_type} issued by the VC issuance oracle",
+        ISSUER_ENDPOINT,
+        ISSUER_DID,
+        HOLDER_ENDPOINT,
+        HOLDER_DIDS[index % len(HOLDER_DIDS)],
+        BLOCKCHAIN_ENDPOINT,
+        BLOCKCHAIN_TYPE,
+        EXPIRY_TIME
+    )
+
+
+class GasMeter:
+    def __init__(self, rpc_url: str, private_key: str, oracle_did: str):
+        """连接开发链"""
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={'timeout': 60}))
+        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        self.account = self.w3.eth.account.from_key(private_key)
+        self.oracle_did = oracle_did
+
+    def transact(self, function_call, gas: int = 8000000):
+        """签名并发送交易，返回回执（失败时抛出异常）"""
+        transaction = function_call.build_transaction({
+            'from': self.account.address,
+            'gas': gas,
+            'gasPrice': self.w3.eth.gas_price,
+            'nonce': self.w3.eth.get_transaction_count(self.account.address, 'pending')
+        })
+        signed_txn = self.account.sign_transaction(transaction)
+        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+        if receipt.status != 1:
+            raise RuntimeError(f"交易失败: {tx_hash.hex()}")
+        return receipt
+
+    def deploy(self, abi, bytecode, *args):
+        """部署合约，返回合约实例"""
+        receipt = self.transact(self.w3.eth.contract(abi=abi, bytecode=bytecode).constructor(*args))
+        return self.w3.eth.contract(address=receipt.contractAddress, abi=abi)
+
+    def setup_manager(self, artifact_path: Path):
+        """部署DIDVerifier和VC管理合约，并把部署账户登记为Oracle"""
+        verifier_abi, verifier_bytecode = load_artifact(DID_VERIFIER_ARTIFACT)
+        did_verifier = self.deploy(verifier_abi, verifier_bytecode)
+        self.transact(did_verifier.functions.verifyIdentity(self.account.address, self.oracle_did))
+
+        abi, bytecode = load_artifact(artifact_path)
+        # 测量不涉及跨链发送，桥地址使用部署账户占位
+        manager = self.deploy(abi, bytecode, did_verifier.address, self.account.address)
+        self.transact(manager.functions.addOracleDID(self.oracle_did))
+        return manager
+
+    def measure(self, artifact_path: Path, vc_type: str, count: int, batch_size: int) -> dict:
+        """
+        测量一个合约产物
+
+        返回:
+            {"single": [逐条addVCMetadata的gasUsed], "batch": 批量交易gasUsed或None, "batch_size": 条数}
+        """
+        manager = self.setup_manager(artifact_path)
+
+        single = []
+        for i in range(count):
+            receipt = self.transact(manager.functions.addVCMetadata(*metadata_item(i, vc_type)))
+            single.append(receipt.gasUsed)
+
+        batch = None
+        if batch_size and any(entry.get('name') == 'addVCMetadataBatch' for entry in manager.abi):
+            items = [metadata_item(count + i, vc_type) for i in range(batch_size)]
+            batch = self.transact(manager.functions.addVCMetadataBatch(items)).gasUsed
+
+        return {"single": single, "batch": batch, "batch_size": batch_size}
+
+
+def summarize(label: str, result: dict):
+    """输出测量结果"""
+    single = result["single"]
+    print(f"\n{label}")
+    print(f"  addVCMetadata 首条: {single[0]:,} gas（写入新的端点/DID字符串）")
+    if len(single) > 1:
+        rest = single[1:]
+        print(f"  addVCMetadata 其余 {len(rest)} 条: 平均 {int(statistics.mean(rest)):,} gas，"
+              f"最小 {min(rest):,}，最大 {max(rest):,}")
+    if result["batch"] is None:
+        print("  addVCMetadataBatch: 合约不支持")
+    else:
+        size = result["batch_size"]
+        print(f"  addVCMetadataBatch {size} 条: {result['batch']:,} gas，每条 {result['batch'] // size:,} gas")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='VC管理合约写入gas对比测量')
+    parser.add_argument('--rpc', default='http://localhost:8545', help='开发链RPC地址')
+    parser.add_argument('--private-key', required=True, help='部署和调用账户私钥')
+    parser.add_argument('--before', required=True, help='改动前的合约产物（含bytecode）')
+    parser.add_argument('--after', required=True, help='改动后的合约产物（含bytecode）')
+    parser.add_argument('--vc-type', default='InspectionReport', help='元数据中的VC类型名')
+    parser.add_argument('--count', type=int, default=20, help='逐条写入的记录数')
+    parser.add_argument('--batch-size', type=int, default=20, help='批量写入的记录数（0表示不测批量）')
+    parser.add_argument('--oracle-did', default='did:sov:oracle-gas-test', help='登记为Oracle的DID')
+    args = parser.parse_args()
+
+    if args.count < 1:
+        print("❌ --count 至少为1")
+        sys.exit(1)
+
+    meter = GasMeter(args.rpc, args.private_key, args.oracle_did)
+    print(f"🔌 开发链: {args.rpc}，账户: {meter.account.address}")
+
+    before = meter.measure(Path(args.before), args.vc_type, args.count, args.batch_size)
+    after = meter.measure(Path(args.after), args.vc_type, args.count, args.batch_size)
+
+    summarize(f"改动前: {args.before}", before)
+    summarize(f"改动后: {args.after}", after)
+
+    before_avg = statistics.mean(before["single"][1:] or before["single"])
+    after_avg = statistics.mean(after["single"][1:] or after["single"])
+    print(f"\n📊 addVCMetadata 平均gas: {int(before_avg):,} -> {int(after_avg):,} "
+          f"（{before_avg / after_avg:.2f}x）")
+    if after["batch"] is not None:
+        per_item = after["batch"] / after["batch_size"]
+        print(f"📊 改动前逐条 vs 改动后批量（每条）: {int(before_avg):,} -> {int(per_item):,} "
+              f"（{before_avg / per_item:.2f}x）")
+
+
+if __name__ == "__main__":
+    main()
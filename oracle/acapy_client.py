@@ -11,6 +11,15 @@ from typing import Dict, Optional, List, Any, Callable, TypeVar
 
 import aiohttp
 
+from circuit_breaker import (
+    STATE_CLOSED,
+    CircuitBreaker,
+    RetryBudget,
+    get_circuit_breaker,
+    get_retry_budget,
+)
+from http_session_pool import acquire_session, build_timeout, release_session
+
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +36,14 @@ class ACAPyConnectionError(ACAPyClientError):
 
 class ACAPyAPIError(ACAPyClientError):
     """API调用错误"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ACAPyCircuitOpenError(ACAPyConnectionError):
+    """熔断器打开，请求被快速拒绝"""
     pass
 
 
@@ -38,7 +55,9 @@ async def retry_with_backoff(
     max_retries: int = 3,
     initial_delay: float = 1.0,
     backoff_factor: float = 2.0,
-    exceptions: tuple = (aiohttp.ClientError, ACAPyConnectionError)
+    exceptions: tuple = (aiohttp.ClientError, ACAPyConnectionError),
+    retry_budget: Optional[RetryBudget] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None
 ) -> T:
     """
     带指数退避的重试装饰器
@@ -49,6 +68,8 @@ async def retry_with_backoff(
         initial_delay: 初始延迟时间（秒）
         backoff_factor: 退避因子
         exceptions: 需要重试的异常类型
+        retry_budget: 重试预算（令牌耗尽时不再重试）
+        circuit_breaker: 熔断器（已打开时不再重试）
 
     返回:
         函数执行结果
@@ -62,12 +83,23 @@ async def retry_with_backoff(
         except exceptions as e:
             last_exception = e
 
+            if isinstance(e, ACAPyCircuitOpenError):
+                raise
+
             if attempt == max_retries:
                 logger.error(
                     f"操作失败，已重试{max_retries}次: {e}"
                 )
                 raise
 
+            if circuit_breaker is not None and circuit_breaker.state != STATE_CLOSED:
+                logger.warning(f"熔断器已打开，放弃重试: {e}")
+                raise
+
+            if retry_budget is not None and not retry_budget.try_acquire():
+                logger.warning(f"重试预算已耗尽，放弃重试: {e}")
+                raise
+
             logger.warning(
                 f"操作失败（尝试{attempt + 1}/{max_retries + 1}），"
                 f"{delay}秒后重试: {e}"
@@ -99,19 +131,85 @@ class ACAPyClient:
         """
         self.admin_url = admin_url.rstrip('/')
         self.wallet_name = wallet_name
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.timeout = build_timeout(timeout)
         self._session: Optional[aiohttp.ClientSession] = None
 
+        # 同一管理URL的客户端共享熔断器和重试预算
+        self.circuit_breaker = get_circuit_breaker(self.admin_url)
+        self.retry_budget = get_retry_budget(self.admin_url)
+
     async def _get_session(self) -> aiohttp.ClientSession:
-        """获取或创建HTTP session"""
+        """获取进程内共享的HTTP session（同一管理URL的客户端共用连接池）"""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(timeout=self.timeout)
+            self._session = await acquire_session(self.admin_url)
         return self._session
 
     async def close(self):
-        """关闭HTTP session"""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """释放共享HTTP session（最后一个使用者释放时关闭）"""
+        if self._session is not None:
+            self._session = None
+            await release_session(self.admin_url)
+
+    async def _call(self, method: str, endpoint: str, do_request: Callable[[], Any]) -> Any:
+        """
+        经熔断器和重试预算执行一次API调用
+
+        连接错误、超时和5xx响应计为失败；4xx响应说明代理正常，计为成功。
+
+        参数:
+            method: HTTP方法（用于日志）
+            endpoint: API端点
+            do_request: 执行单次请求的协程函数
+
+        返回:
+            响应JSON数据
+
+        异常:
+            ACAPyCircuitOpenError: 熔断器打开，快速失败
+            ACAPyConnectionError: 连接失败
+        """
+        breaker = self.circuit_breaker
+
+        async def _attempt():
+            if not breaker.allow_request():
+                raise ACAPyCircuitOpenError(
+                    f"ACA-Py熔断中 {self.admin_url}，"
+                    f"{breaker.retry_after():.0f}秒后重试: {method} {endpoint}"
+                )
+            try:
+                result = await do_request()
+            except ACAPyAPIError as e:
+                if e.status is not None and e.status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            except asyncio.CancelledError:
+                # 请求被取消（如 gather_or_cancel 取消其余任务）不代表代理故障，只归还半开探测名额
+                breaker.release_probe()
+                raise
+            except BaseException:
+                # 连接错误、超时及其他意外异常计为失败（同时释放半开探测名额）
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
+
+        try:
+            return await retry_with_backoff(
+                _attempt,
+                max_retries=3,
+                initial_delay=1.0,
+                exceptions=(aiohttp.ClientError, ACAPyConnectionError),
+                retry_budget=self.retry_budget,
+                circuit_breaker=breaker
+            )
+        except ACAPyCircuitOpenError:
+            logger.warning(f"熔断快速失败 {method} {endpoint}")
+            raise
+        except Exception as e:
+            logger.error(f"Connection error {method} {endpoint}: {e}")
+            raise ACAPyConnectionError(f"Failed to connect to {self.admin_url}{endpoint}: {e}")
 
     async def _get(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
@@ -133,26 +231,17 @@ class ACAPyClient:
             url = f"{self.admin_url}{endpoint}"
 
             logger.debug(f"GET {url} params={params}")
-            async with session.get(url, params=params) as response:
+            async with session.get(url, params=params, timeout=self.timeout) as response:
                 if response.status >= 400:
                     error_text = await response.text()
                     logger.error(f"GET {url} failed: {response.status} - {error_text}")
-                    raise ACAPyAPIError(f"API error {response.status}: {error_text}")
+                    raise ACAPyAPIError(f"API error {response.status}: {error_text}", status=response.status)
 
                 data = await response.json()
                 logger.debug(f"GET {url} response: {data}")
                 return data
 
-        try:
-            return await retry_with_backoff(
-                _do_get,
-                max_retries=3,
-                initial_delay=1.0,
-                exceptions=(aiohttp.ClientError, ACAPyConnectionError)
-            )
-        except Exception as e:
-            logger.error(f"Connection error GET {endpoint}: {e}")
-            raise ACAPyConnectionError(f"Failed to connect to {self.admin_url}{endpoint}: {e}")
+        return await self._call("GET", endpoint, _do_get)
 
     async def _post(self, endpoint: str, json_data: Optional[Dict] = None) -> Dict:
         """
@@ -170,26 +259,17 @@ class ACAPyClient:
             url = f"{self.admin_url}{endpoint}"
 
             logger.debug(f"POST {url} data={json_data}")
-            async with session.post(url, json=json_data) as response:
+            async with session.post(url, json=json_data, timeout=self.timeout) as response:
                 if response.status >= 400:
                     error_text = await response.text()
                     logger.error(f"POST {url} failed: {response.status} - {error_text}")
-                    raise ACAPyAPIError(f"API error {response.status}: {error_text}")
+                    raise ACAPyAPIError(f"API error {response.status}: {error_text}", status=response.status)
 
                 data = await response.json()
                 logger.debug(f"POST {url} response: {data}")
                 return data
 
-        try:
-            return await retry_with_backoff(
-                _do_post,
-                max_retries=3,
-                initial_delay=1.0,
-                exceptions=(aiohttp.ClientError, ACAPyConnectionError)
-            )
-        except Exception as e:
-            logger.error(f"Connection error POST {endpoint}: {e}")
-            raise ACAPyConnectionError(f"Failed to connect to {self.admin_url}{endpoint}: {e}")
+        return await self._call("POST", endpoint, _do_post)
 
     async def _delete(self, endpoint: str) -> Dict:
         """
@@ -206,11 +286,11 @@ class ACAPyClient:
             url = f"{self.admin_url}{endpoint}"
 
             logger.debug(f"DELETE {url}")
-            async with session.delete(url) as response:
+            async with session.delete(url, timeout=self.timeout) as response:
                 if response.status >= 400:
                     error_text = await response.text()
                     logger.error(f"DELETE {url} failed: {response.status} - {error_text}")
-                    raise ACAPyAPIError(f"API error {response.status}: {error_text}")
+                    raise ACAPyAPIError(f"API error {response.status}: {error_text}", status=response.status)
 
                 # DELETE可能返回204无内容
                 if response.status == 204:
@@ -220,16 +300,7 @@ class ACAPyClient:
                 logger.debug(f"DELETE {url} response: {data}")
                 return data
 
-        try:
-            return await retry_with_backoff(
-                _do_delete,
-                max_retries=3,
-                initial_delay=1.0,
-                exceptions=(aiohttp.ClientError, ACAPyConnectionError)
-            )
-        except Exception as e:
-            logger.error(f"Connection error DELETE {endpoint}: {e}")
-            raise ACAPyConnectionError(f"Failed to connect to {self.admin_url}{endpoint}: {e}")
+        return await self._call("DELETE", endpoint, _do_delete)
 
     # ==================== Present Proof 协议 ====================
 
@@ -394,6 +465,21 @@ class ACAPyClient:
         response = await self._get(endpoint, params)
         return response
 
+    async def remove_presentation_record_v2(self, pres_ex_id: str) -> Dict:
+        """
+        删除presentation exchange记录 (AIP 2.0)
+
+        参数:
+            pres_ex_id: presentation exchange ID
+
+        返回:
+            删除结果
+        """
+        endpoint = f"/present-proof-2.0/records/{pres_ex_id}"
+
+        logger.debug(f"[AIP 2.0] 删除presentation记录: {pres_ex_id}")
+        return await self._delete(endpoint)
+
     async def get_presentation_exchange(self, pres_ex_id: str) -> Dict:
         """
         获取presentation exchange记录
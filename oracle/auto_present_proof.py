@@ -9,9 +9,10 @@ import logging
 import json
 from typing import Dict
 
-import aiohttp
 from aiohttp import web
 
+from http_session_pool import close_all_sessions, get_session
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,16 +40,16 @@ async def handle_proof_request_event(request):
             if pres_ex_id:
                 logger.info(f"🎯 自动接受proof request: {pres_ex_id}")
 
-                # 调用Holder ACA-Py API接受proof request
-                async with aiohttp.ClientSession() as session:
-                    url = f"{HOLDER_ADMIN_URL}/present-proof-2.0/records/{pres_ex_id}/accept-presentation"
+                # 调用Holder ACA-Py API接受proof request（复用共享连接池）
+                session = await get_session(HOLDER_ADMIN_URL)
+                url = f"{HOLDER_ADMIN_URL}/present-proof-2.0/records/{pres_ex_id}/accept-presentation"
 
-                    async with session.post(url) as response:
-                        if response.status == 200:
-                            logger.info(f"✅ 成功接受proof request: {pres_ex_id}")
-                        else:
-                            text = await response.text()
-                            logger.error(f"❌ 接受proof request失败: {response.status} - {text}")
+                async with session.post(url) as response:
+                    if response.status == 200:
+                        logger.info(f"✅ 成功接受proof request: {pres_ex_id}")
+                    else:
+                        text = await response.text()
+                        logger.error(f"❌ 接受proof request失败: {response.status} - {text}")
 
         return web.Response(status=200)
 
@@ -103,6 +104,7 @@ async def main():
     except KeyboardInterrupt:
         logger.info("\n停止服务...")
         await runner.cleanup()
+        await close_all_sessions()
 
 
 if __name__ == "__main__":
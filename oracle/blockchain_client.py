@@ -2,23 +2,33 @@
 # -*- coding: utf-8 -*-
 """
 区块链查询客户端
-从区块链查询VC元数据并提取UUID
+从区块链查询VC元数据并提取UUID；以Merkle批量方式锚定的VC由本地包含证明验证，
+每个Merkle根只查询一次链上锚定状态
 
 参考实现: vp_verifier_old.py 第154-273行
 """
 
 import json
 import logging
+import sys
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Set, Tuple
 
 from web3_fixed_connection import FixedWeb3
 from web3 import Web3
 
+from merkle_tree import verify_merkle_proof
+
 
 logger = logging.getLogger(__name__)
 
 
+def _normalize_vc_hash(vc_hash: str) -> str:
+    """统一VC Hash写法（小写、0x前缀，与UUID登记表一致）"""
+    vc_hash = vc_hash.strip().lower()
+    return vc_hash if vc_hash.startswith('0x') else f"0x{vc_hash}"
+
+
 class BlockchainClient:
     """
     区块链查询客户端
@@ -27,6 +37,7 @@ class BlockchainClient:
     - 使用 FixedWeb3 建立区块链连接
     - 加载 VC Manager 合约
     - 从区块链查询 VC 元数据并提取 UUID
+    - 验证Merkle批量锚定的VC包含证明（blockchain.merkle_proofs.registry_path 指向发行Oracle的UUID登记表）
     """
 
     def __init__(self, blockchain_config: Dict, vc_config: Dict, use_local_cache: bool = True):
@@ -45,6 +56,10 @@ class BlockchainClient:
         self.w3 = None
         self.vc_manager_contracts: Dict = {}
 
+        # Merkle批量锚定：包含证明来自发行Oracle的UUID登记表（UUID由叶子绑定到链上的根），已确认锚定的根缓存在内存中
+        self.proof_registry = self._open_proof_registry(blockchain_config.get('merkle_proofs', {}))
+        self._anchored_roots: Set[Tuple[str, str]] = set()
+
         # 初始化 Web3 和合约
         self._init_blockchain_connection()
 
@@ -131,6 +146,84 @@ class BlockchainClient:
             logger.error(f"加载合约 ABI {contract_name} 失败: {e}")
             return []
 
+    @staticmethod
+    def _open_proof_registry(merkle_config: Dict):
+        """
+        打开发行Oracle的UUID登记表（VcIssureOracle/uuid_registry.py）
+
+        返回:
+            UUIDRegistry 实例，未配置或登记表不存在时返回None
+        """
+        registry_path = merkle_config.get('registry_path')
+        if not registry_path:
+            return None
+        if not Path(registry_path).exists():
+            logger.warning(f"Merkle包含证明登记表不存在: {registry_path}")
+            return None
+
+        sys.path.insert(0, str(Path(__file__).parent.parent / "VcIssureOracle"))
+        from uuid_registry import UUIDRegistry
+        logger.info(f"Merkle包含证明登记表: {registry_path}")
+        return UUIDRegistry(registry_path)
+
+    def _is_merkle_root_anchored(self, vc_type: str, merkle_root: str) -> bool:
+        """查询Merkle根是否已锚定（已确认的根缓存，不再重复查询链上）"""
+        if (vc_type, merkle_root) in self._anchored_roots:
+            return True
+
+        contract = self.vc_manager_contracts[vc_type]
+        anchored = contract.functions.isMerkleRootAnchored(bytes.fromhex(merkle_root[2:])).call()
+        if anchored:
+            self._anchored_roots.add((vc_type, merkle_root))
+        return anchored
+
+    def verify_merkle_inclusion(self, vc_type: str, vc_hash: str, vc_uuid: Optional[str]) -> Optional[bool]:
+        """
+        验证 (VC Hash, UUID) 包含在已锚定的Merkle根中（不逐个VC读取合约）
+
+        叶子由VC Hash和UUID计算，登记表中的UUID被改动时包含证明不再成立。
+
+        参数:
+            vc_type: VC 类型
+            vc_hash: VC 哈希值（0x前缀）
+            vc_uuid: 待验证的UUID
+
+        返回:
+            True: 包含证明有效且Merkle根已锚定
+            False: 包含证明无效（含UUID不符）、VC类型不符或Merkle根未锚定
+            None: 该VC不是以Merkle批量方式锚定（或未配置登记表），需按 getVCMetadata 查询
+        """
+        if self.proof_registry is None:
+            return None
+
+        vc_hash = _normalize_vc_hash(vc_hash)
+        record = self.proof_registry.get_merkle_proof(vc_hash)
+        if record is None:
+            return None
+
+        if record["vc_type"] != vc_type:
+            logger.warning(f"VC {vc_hash} 的Merkle批次属于 {record['vc_type']}，与请求的 {vc_type} 不符")
+            return False
+        if not vc_uuid:
+            logger.warning(f"VC {vc_hash} 没有UUID记录，无法验证Merkle包含证明")
+            return False
+        if not verify_merkle_proof(vc_hash, vc_uuid, record["proof"], record["merkle_root"]):
+            logger.warning(f"VC {vc_hash} 的Merkle包含证明无效（UUID: {vc_uuid}）")
+            return False
+        if vc_type not in self.vc_manager_contracts:
+            logger.error(f"未找到 VC 类型 {vc_type} 的合约实例")
+            return False
+
+        try:
+            if not self._is_merkle_root_anchored(vc_type, record["merkle_root"]):
+                logger.warning(f"Merkle根尚未锚定: {record['merkle_root']}（交易 {record['tx_hash']}）")
+                return False
+        except Exception as e:
+            logger.error(f"查询Merkle根锚定状态失败: {e}")
+            return False
+
+        return True
+
     def get_vc_uuid(self, vc_type: str, vc_hash: str) -> Optional[str]:
         """
         从区块链获取 VC 元数据并提取 UUID
@@ -145,6 +238,18 @@ class BlockchainClient:
             UUID 字符串，如果未找到则返回 None
         """
         try:
+            # Merkle批量锚定的VC：UUID包含在叶子中，用登记表中的UUID重新计算叶子并验证包含证明
+            uuid = None
+            if self.proof_registry is not None:
+                record = self.proof_registry.get_by_vc_hash(_normalize_vc_hash(vc_hash))
+                uuid = record["uuid"] if record else None
+            inclusion = self.verify_merkle_inclusion(vc_type, vc_hash, uuid)
+            if inclusion is not None:
+                if not inclusion:
+                    return None
+                logger.info(f"Merkle包含证明验证通过，UUID: {uuid}")
+                return uuid
+
             if vc_type not in self.vc_manager_contracts:
                 logger.error(f"未找到 VC 类型 {vc_type} 的合约实例")
                 return None
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ACA-Py调用熔断器与重试预算
+按管理URL维护熔断器（closed/open/half-open）和令牌桶重试预算，
+代理故障时快速失败，并限制重试对故障代理造成的额外压力
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# 熔断器状态
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+# 默认参数（可通过 service.acapy_resilience 配置段覆盖）
+DEFAULT_RESILIENCE_SETTINGS = {
+    "failure_threshold": 5,          # 连续失败多少次后熔断
+    "recovery_timeout_seconds": 30,  # 熔断后多久进入半开状态
+    "half_open_max_calls": 1,        # 半开状态下允许的探测请求数
+    "retry_budget_capacity": 10,     # 重试令牌桶容量
+    "retry_budget_refill_per_second": 0.5  # 令牌补充速率（个/秒）
+}
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    - closed: 正常放行，连续失败达到阈值后转为open
+    - open: 直接拒绝，recovery_timeout 后转为half_open
+    - half_open: 放行少量探测请求，成功则closed，失败则重新open
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout_seconds: float = 30,
+        half_open_max_calls: int = 1
+    ):
+        """
+        初始化熔断器
+
+        参数:
+            name: 熔断器名称（管理URL）
+            failure_threshold: 连续失败阈值
+            recovery_timeout_seconds: 熔断持续时间（秒）
+            half_open_max_calls: 半开状态允许的并发探测数
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_calls = 0
+
+        self._stats = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "times_opened": 0
+        }
+
+    @property
+    def state(self) -> str:
+        """当前状态（open超时后自动转为half_open）"""
+        if self._state == STATE_OPEN and self._opened_at is not None:
+            if time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = STATE_HALF_OPEN
+                self._half_open_calls = 0
+                logger.info(f"熔断器进入半开状态: {self.name}")
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        检查是否允许发起请求
+
+        返回:
+            允许返回True；熔断中返回False
+        """
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+
+        if state == STATE_HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+
+        self._stats["rejected"] += 1
+        return False
+
+    def retry_after(self) -> float:
+        """距离进入半开状态的剩余秒数"""
+        if self._state != STATE_OPEN or self._opened_at is None:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        """记录一次成功调用"""
+        self._stats["successes"] += 1
+        self._consecutive_failures = 0
+        if self._state != STATE_CLOSED:
+            logger.info(f"熔断器恢复: {self.name}")
+        self._state = STATE_CLOSED
+        self._opened_at = None
+        self._half_open_calls = 0
+
+    def release_probe(self):
+        """释放一个半开探测名额（探测请求被取消、未得到结果时调用，不改变状态）"""
+        if self._state == STATE_HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_failure(self):
+        """记录一次失败调用"""
+        self._stats["failures"] += 1
+        self._consecutive_failures += 1
+
+        if self._state == STATE_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != STATE_OPEN:
+                self._stats["times_opened"] += 1
+                logger.warning(
+                    f"熔断器打开: {self.name}（连续失败 {self._consecutive_failures} 次），"
+                    f"{self.recovery_timeout}秒内快速失败"
+                )
+            self._state = STATE_OPEN
+            self._opened_at = time.monotonic()
+            self._half_open_calls = 0
+
+    def get_stats(self) -> Dict:
+        """获取熔断器状态和统计"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            **self._stats
+        }
+
+
+class RetryBudget:
+    """
+    令牌桶重试预算
+
+    每次重试消耗一个令牌，令牌按固定速率补充；
+    令牌耗尽时不再重试，避免重试风暴。
+    """
+
+    def __init__(self, capacity: float = 10, refill_per_second: float = 0.5):
+        """
+        初始化重试预算
+
+        参数:
+            capacity: 令牌桶容量
+            refill_per_second: 每秒补充的令牌数
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_per_second
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._exhausted = 0
+
+    def _refill(self):
+        """按经过的时间补充令牌"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def try_acquire(self) -> bool:
+        """
+        尝试获取一次重试机会
+
+        返回:
+            获取成功返回True，预算耗尽返回False
+        """
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self._exhausted += 1
+        return False
+
+    def get_stats(self) -> Dict:
+        """获取重试预算状态"""
+        self._refill()
+        return {
+            "tokens": round(self._tokens, 2),
+            "capacity": self.capacity,
+            "exhausted": self._exhausted
+        }
+
+
+_settings: Dict = dict(DEFAULT_RESILIENCE_SETTINGS)
+_breakers: Dict[str, CircuitBreaker] = {}
+_budgets: Dict[str, RetryBudget] = {}
+
+
+def configure_resilience(resilience_config: Optional[Dict] = None):
+    """
+    配置熔断器与重试预算参数（对之后创建的熔断器生效）
+
+    参数:
+        resilience_config: 配置字典，键同 DEFAULT_RESILIENCE_SETTINGS
+    """
+    resilience_config = resilience_config or {}
+    for key in DEFAULT_RESILIENCE_SETTINGS:
+        if key in resilience_config:
+            _settings[key] = resilience_config[key]
+    logger.info(f"ACA-Py熔断配置: {_settings}")
+
+
+def get_circuit_breaker(admin_url: str) -> CircuitBreaker:
+    """获取（必要时创建）指定管理URL的熔断器"""
+    key = admin_url.rstrip('/')
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name=key,
+            failure_threshold=_settings["failure_threshold"],
+            recovery_timeout_seconds=_settings["recovery_timeout_seconds"],
+            half_open_max_calls=_settings["half_open_max_calls"]
+        )
+        _breakers[key] = breaker
+    return breaker
+
+
+def get_retry_budget(admin_url: str) -> RetryBudget:
+    """获取（必要时创建）指定管理URL的重试预算"""
+    key = admin_url.rstrip('/')
+    budget = _budgets.get(key)
+    if budget is None:
+        budget = RetryBudget(
+            capacity=_settings["retry_budget_capacity"],
+            refill_per_second=_settings["retry_budget_refill_per_second"]
+        )
+        _budgets[key] = budget
+    return budget
+
+
+def get_resilience_stats() -> Dict:
+    """
+    获取所有管理URL的熔断器与重试预算状态（用于 /api/health）
+
+    返回:
+        {admin_url: {"circuit_breaker": {...}, "retry_budget": {...}}}
+    """
+    return {
+        url: {
+            "circuit_breaker": breaker.get_stats(),
+            "retry_budget": _budgets[url].get_stats() if url in _budgets else None
+        }
+        for url, breaker in list(_breakers.items())
+    }
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发辅助工具
+供VP验证流程并行执行相互独立的阶段任务
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_in_thread(func: Callable[..., Any], *args) -> Any:
+    """
+    在默认线程池中执行阻塞函数（如Web3 RPC调用），避免阻塞事件循环
+
+    参数:
+        func: 同步函数
+        *args: 位置参数
+
+    返回:
+        函数执行结果
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+async def gather_or_cancel(*aws: Awaitable) -> List[Any]:
+    """
+    并发执行多个协程，任一失败时取消其余任务并抛出该异常
+
+    与 asyncio.gather 的区别：gather 在某个任务失败后不会取消其他任务，
+    这里保证失败时不会留下仍在运行的连接创建或RPC调用。
+
+    参数:
+        *aws: 协程或可等待对象
+
+    返回:
+        按传入顺序排列的结果列表
+
+    异常:
+        第一个失败任务抛出的异常
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    failed = [task for task in tasks if task.done() and not task.cancelled() and task.exception()]
+    if failed:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+            logger.debug(f"已取消 {len(pending)} 个未完成的并发任务")
+        raise failed[0].exception()
+
+    return [task.result() for task in tasks]
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合约写入Gas估算缓存
+同一合约、同一函数、参数长度相近的交易所需Gas几乎不变，
+按 (合约地址, 函数名, 参数长度分桶) 缓存 eth_estimateGas 的结果，命中时不再估算；
+交易回执中的 gasUsed 用于修正缓存，Gas不足或交易回滚时清除缓存，下次重新实时估算。
+
+VCManager 合约的 addVCMetadata/addVCMetadataBatch 会把新出现的字符串写入字符串表，
+所需Gas取决于链上状态（vcName、vcDescription 是否已存在）而不只是参数长度，默认不缓存、每次实时估算
+（uncached_functions）。字符串只增不删，实时估算的结果在交易执行时不会偏低。
+
+使用方:
+- VcIssureOracle: addVCMetadata、anchorMerkleRoot
+- oracle/vc_transfer_oracle.py: receiveFromCrossChain
+- webapp/vc_transfer_api.py: initiateCrossChainTransfer
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+logger = logging.getLogger('gas_estimate_cache')
+
+
+# 回执 gasUsed 达到 gas limit 的该比例时视为Gas不足
+OUT_OF_GAS_RATIO = 0.98
+
+# Gas取决于链上状态（字符串表）的函数，默认每次实时估算
+DEFAULT_UNCACHED_FUNCTIONS = ("addVCMetadata", "addVCMetadataBatch")
+
+GasKey = Tuple[str, str, int]
+
+
+def _payload_size(value: Any) -> int:
+    """参数中字符串/字节的总长度（ABI编码后calldata长度的主要变化来源）"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(item) for item in value)
+    return 0
+
+
+class GasEstimateCache:
+    """
+    Gas估算缓存（线程安全）
+
+    gas limit = max(估算值, 已观测到的最大gasUsed) × multiplier
+    """
+
+    def __init__(self, multiplier: float = 1.2, bucket_bytes: int = 64,
+                 max_age_seconds: float = 600, max_pending: int = 10000,
+                 uncached_functions: Iterable[str] = DEFAULT_UNCACHED_FUNCTIONS):
+        """
+        初始化缓存
+
+        参数:
+            multiplier: 安全系数
+            bucket_bytes: 参数长度分桶大小（字节）
+            max_age_seconds: 缓存有效期（秒），过期后重新实时估算
+            max_pending: 最多跟踪的未确认交易数
+            uncached_functions: 不缓存、每次实时估算的函数名
+        """
+        self.multiplier = multiplier
+        self.bucket_bytes = max(1, bucket_bytes)
+        self.max_age_seconds = max_age_seconds
+        self.max_pending = max_pending
+        self.uncached_functions = frozenset(uncached_functions)
+
+        self._lock = threading.Lock()
+        self._entries: Dict[GasKey, Dict] = {}
+        self._pending: "OrderedDict[str, Tuple[GasKey, int]]" = OrderedDict()  # tx_hash -> (key, gas_limit)
+        self._stats = {"hits": 0, "misses": 0, "estimate_failures": 0, "learned": 0, "invalidated": 0,
+                       "uncached": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> "GasEstimateCache":
+        """从配置段创建（gas_cache: {multiplier, bucket_bytes, max_age_seconds, uncached_functions}）"""
+        config = config or {}
+        return cls(
+            multiplier=config.get('multiplier', 1.2),
+            bucket_bytes=config.get('bucket_bytes', 64),
+            max_age_seconds=config.get('max_age_seconds', 600),
+            uncached_functions=config.get('uncached_functions', DEFAULT_UNCACHED_FUNCTIONS)
+        )
+
+    def key_for(self, function_call) -> GasKey:
+        """合约函数调用对应的缓存键"""
+        size = _payload_size(list(function_call.args or ()))
+        return (str(function_call.address).lower(), function_call.fn_name, size // self.bucket_bytes)
+
+    def gas_limit(self, function_call, from_address: str, fallback: Optional[int] = None) -> int:
+        """
+        获取交易的gas limit（命中缓存时不访问节点；uncached_functions 中的函数总是实时估算）
+
+        参数:
+            function_call: web3合约函数调用（contract.functions.xxx(...)）
+            from_address: 发送方地址
+            fallback: 实时估算失败（如交易将回滚）时使用的gas limit，None时抛出估算异常
+
+        返回:
+            gas limit
+        """
+        if function_call.fn_name in self.uncached_functions:
+            return self._estimate_uncached(function_call, from_address, fallback)
+
+        key = self.key_for(function_call)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry["updated_at"] < self.max_age_seconds:
+                self._stats["hits"] += 1
+                return int(max(entry["estimate"], entry["max_used"]) * self.multiplier)
+            self._stats["misses"] += 1
+
+        try:
+            estimate = function_call.estimate_gas({'from': from_address})
+        except Exception as e:
+            with self._lock:
+                self._stats["estimate_failures"] += 1
+                self._entries.pop(key, None)
+            if fallback is None:
+                raise
+            logger.warning(f"Gas 估算失败，使用默认值 {fallback}：{e}")
+            return fallback
+
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = {
+                "estimate": estimate,
+                "max_used": previous["max_used"] if previous else 0,
+                "updated_at": now
+            }
+        gas_limit = int(estimate * self.multiplier)
+        logger.info(f"Gas 估算：{estimate}，限制：{gas_limit}（{key[1]}，已缓存）")
+        return gas_limit
+
+    def _estimate_uncached(self, function_call, from_address: str, fallback: Optional[int]) -> int:
+        """实时估算（不读写缓存）"""
+        with self._lock:
+            self._stats["uncached"] += 1
+        try:
+            estimate = function_call.estimate_gas({'from': from_address})
+        except Exception as e:
+            with self._lock:
+                self._stats["estimate_failures"] += 1
+            if fallback is None:
+                raise
+            logger.warning(f"Gas 估算失败，使用默认值 {fallback}：{e}")
+            return fallback
+        return int(estimate * self.multiplier)
+
+    def track(self, tx_hash: str, function_call, gas_limit: int):
+        """记录已发送的交易，收到回执时用于修正缓存"""
+        with self._lock:
+            self._pending[str(tx_hash).lower()] = (self.key_for(function_call), gas_limit)
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+
+    def observe_receipt(self, tx_hash: str, receipt) -> None:
+        """
+        根据交易回执修正缓存
+
+        - 成功: 记录最大gasUsed（之后的gas limit不低于它）
+        - 失败且gasUsed接近gas limit（Gas不足）或交易回滚: 清除缓存，下次实时估算
+        """
+        if receipt is None:
+            return
+        with self._lock:
+            tracked = self._pending.pop(str(tx_hash).lower(), None)
+            if tracked is None:
+                return
+            key, gas_limit = tracked
+            entry = self._entries.get(key)
+            if receipt['status'] == 1:
+                if entry is not None and receipt['gasUsed'] > entry["max_used"]:
+                    entry["max_used"] = receipt['gasUsed']
+                    self._stats["learned"] += 1
+                return
+            if self._entries.pop(key, None) is not None:
+                self._stats["invalidated"] += 1
+
+        reason = "Gas不足" if receipt['gasUsed'] >= gas_limit * OUT_OF_GAS_RATIO else "交易回滚"
+        logger.warning(f"交易 {tx_hash} 失败（{reason}），清除 {key[1]} 的Gas缓存")
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        with self._lock:
+            return {"entries": len(self._entries), "pending": len(self._pending), **self._stats}
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+健康检查快照
+后台线程按固定间隔执行一次完整健康检查并缓存结果，
+/health 直接返回缓存的快照（附带检查时间和快照年龄），?deep=true 时才执行实时检查
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+logger = logging.getLogger('health_snapshot')
+
+
+class HealthSnapshot:
+    """
+    后台刷新的健康检查快照
+
+    多个请求同时触发实时检查时只执行一次，其余请求等待并共用该结果。
+    """
+
+    def __init__(self, collect: Callable[[], Dict], refresh_interval: float = 10):
+        """
+        初始化健康快照
+
+        参数:
+            collect: 执行完整健康检查的函数，返回健康状态字典
+            refresh_interval: 后台刷新间隔（秒）
+        """
+        self.collect = collect
+        self.refresh_interval = refresh_interval
+
+        self._snapshot: Optional[Dict] = None
+        self._checked_at: Optional[float] = None
+        self._check_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"refreshes": 0, "deep_checks": 0, "errors": 0, "last_check_seconds": None}
+
+    def start(self):
+        """启动后台刷新线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="health-snapshot", daemon=True)
+            self._thread.start()
+            logger.info(f"健康快照后台刷新已启动，间隔: {self.refresh_interval}秒")
+
+    def stop(self):
+        """停止后台刷新线程"""
+        self._stop_event.set()
+
+    def _refresh_loop(self):
+        """后台刷新循环"""
+        while not self._stop_event.is_set():
+            self.refresh()
+            self._stop_event.wait(self.refresh_interval)
+
+    def refresh(self) -> Dict:
+        """
+        执行一次完整健康检查并更新快照
+
+        返回:
+            最新快照
+        """
+        started_at = time.monotonic()
+        with self._check_lock:
+            # 等待锁期间已有其他线程完成检查，直接使用其结果
+            if self._checked_at is not None and self._checked_at >= started_at:
+                return self._snapshot
+
+            try:
+                snapshot = self.collect()
+            except Exception as e:
+                logger.error(f"健康检查失败: {e}", exc_info=True)
+                self._stats["errors"] += 1
+                snapshot = {"status": "error", "error": str(e)}
+
+            snapshot["checked_at"] = datetime.now().isoformat()
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            self._stats["refreshes"] += 1
+            self._stats["last_check_seconds"] = round(self._checked_at - started_at, 3)
+            return snapshot
+
+    def get(self, deep: bool = False) -> Dict:
+        """
+        获取健康状态
+
+        参数:
+            deep: 是否执行实时检查（否则返回缓存快照；尚无快照时同样执行实时检查）
+
+        返回:
+            健康状态字典，附带 checked_at、snapshot_age_seconds 和 cached
+        """
+        if deep or self._snapshot is None:
+            if deep:
+                self._stats["deep_checks"] += 1
+            result = dict(self.refresh())
+            result["cached"] = False
+        else:
+            result = dict(self._snapshot)
+            result["cached"] = True
+        result["snapshot_age_seconds"] = round(time.monotonic() - self._checked_at, 3)
+        return result
+
+    def get_stats(self) -> Dict:
+        """获取快照刷新统计"""
+        return {"refresh_interval_seconds": self.refresh_interval, **self._stats}
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程级共享HTTP会话池
+按ACA-Py管理URL共享 aiohttp.ClientSession，复用TCP连接，
+并统一配置连接器上限、keep-alive、DNS缓存和超时
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+
+logger = logging.getLogger(__name__)
+
+
+# 默认连接池参数（可通过 service.http_pool 配置段覆盖）
+DEFAULT_POOL_SETTINGS = {
+    "limit": 100,                # 全部主机合计的最大连接数
+    "limit_per_host": 32,        # 单个主机的最大连接数
+    "keepalive_timeout": 30,     # 空闲连接保持时间（秒）
+    "dns_cache_ttl": 300,        # DNS缓存时间（秒）
+    "total_timeout": 30,         # 单次请求总超时（秒）
+    "connect_timeout": 5,        # 建立连接超时（秒）
+    "sock_read_timeout": 30      # 读取超时（秒）
+}
+
+
+class _PooledSession:
+    """注册表中的会话条目（会话 + 所属事件循环 + 引用计数）"""
+
+    def __init__(self, session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop):
+        self.session = session
+        self.loop = loop
+        self.refs = 0
+
+
+_settings: Dict = dict(DEFAULT_POOL_SETTINGS)
+_sessions: Dict[Tuple[int, str], _PooledSession] = {}
+
+
+def configure_session_pool(pool_config: Optional[Dict] = None):
+    """
+    配置连接池参数（应在创建ACA-Py客户端之前调用）
+
+    已创建的会话不受影响，新参数对之后创建的会话生效。
+
+    参数:
+        pool_config: 连接池配置，键同 DEFAULT_POOL_SETTINGS
+    """
+    pool_config = pool_config or {}
+    for key in DEFAULT_POOL_SETTINGS:
+        if key in pool_config:
+            _settings[key] = pool_config[key]
+    logger.info(f"HTTP连接池配置: {_settings}")
+
+
+def build_timeout(total: Optional[float] = None) -> aiohttp.ClientTimeout:
+    """
+    构造请求超时对象
+
+    参数:
+        total: 总超时（秒），None使用连接池默认值
+
+    返回:
+        aiohttp.ClientTimeout
+    """
+    return aiohttp.ClientTimeout(
+        total=total if total is not None else _settings["total_timeout"],
+        connect=_settings["connect_timeout"],
+        sock_read=_settings["sock_read_timeout"]
+    )
+
+
+def _session_key(base_url: str) -> Tuple[int, str]:
+    """会话注册表键: (事件循环ID, 规范化URL)"""
+    return id(asyncio.get_running_loop()), base_url.rstrip('/')
+
+
+def _create_session() -> aiohttp.ClientSession:
+    """按当前配置创建会话"""
+    connector = aiohttp.TCPConnector(
+        limit=_settings["limit"],
+        limit_per_host=_settings["limit_per_host"],
+        keepalive_timeout=_settings["keepalive_timeout"],
+        ttl_dns_cache=_settings["dns_cache_ttl"],
+        use_dns_cache=True
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=build_timeout())
+
+
+def _get_entry(base_url: str) -> _PooledSession:
+    """获取（必要时创建）当前事件循环中指定URL的会话条目"""
+    key = _session_key(base_url)
+    entry = _sessions.get(key)
+
+    if entry is None or entry.session.closed or entry.loop.is_closed():
+        entry = _PooledSession(_create_session(), asyncio.get_running_loop())
+        _sessions[key] = entry
+        logger.debug(f"创建共享HTTP会话: {key[1]}")
+
+    return entry
+
+
+async def get_session(base_url: str) -> aiohttp.ClientSession:
+    """
+    获取指定管理URL的共享会话（不增加引用计数，适用于短生命周期的调用方）
+
+    参数:
+        base_url: ACA-Py管理URL
+
+    返回:
+        共享的 aiohttp.ClientSession
+    """
+    return _get_entry(base_url).session
+
+
+async def acquire_session(base_url: str) -> aiohttp.ClientSession:
+    """
+    获取共享会话并增加引用计数（与 release_session 成对调用）
+
+    参数:
+        base_url: ACA-Py管理URL
+
+    返回:
+        共享的 aiohttp.ClientSession
+    """
+    entry = _get_entry(base_url)
+    entry.refs += 1
+    return entry.session
+
+
+async def release_session(base_url: str):
+    """
+    释放共享会话引用，最后一个引用释放时关闭会话
+
+    参数:
+        base_url: ACA-Py管理URL
+    """
+    key = _session_key(base_url)
+    entry = _sessions.get(key)
+    if entry is None:
+        return
+
+    entry.refs -= 1
+    if entry.refs <= 0:
+        _sessions.pop(key, None)
+        if not entry.session.closed:
+            await entry.session.close()
+        logger.debug(f"关闭共享HTTP会话: {key[1]}")
+
+
+async def close_all_sessions():
+    """关闭当前事件循环中的所有共享会话（服务停止时调用）"""
+    loop_id = id(asyncio.get_running_loop())
+    for key in [k for k in _sessions if k[0] == loop_id]:
+        entry = _sessions.pop(key)
+        if not entry.session.closed:
+            await entry.session.close()
+    logger.info("共享HTTP会话已全部关闭")
+
+
+def get_pool_stats() -> Dict:
+    """
+    获取连接池统计信息
+
+    返回:
+        {"settings": {...}, "sessions": [{"url": ..., "refs": ..., "closed": ...}]}
+    """
+    return {
+        "settings": dict(_settings),
+        "sessions": [
+            {"url": url, "refs": entry.refs, "closed": entry.session.closed}
+            for (_, url), entry in list(_sessions.items())
+        ]
+    }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VC Hash Merkle树
+与 VCManager 合约的 verifyMerkleProof 使用相同的哈希规则：
+- 叶子: keccak256(vcHash || uuid)，uuid为VC UUID的16字节形式（abi.encodePacked(bytes32, bytes16)），
+  VC Hash与UUID的对应关系由链上Merkle根保证，登记表只保存包含证明
+- 内部节点: keccak256(较小节点 || 较大节点)（有序拼接，证明中无需记录左右位置）
+- 节点数为奇数时，最后一个节点直接进入上一层
+
+使用方:
+- VcIssureOracle/vc_merkle_anchor.py: 批量锚定时构建Merkle树和包含证明
+- oracle/blockchain_client.py: 验证VC包含在已锚定的Merkle根中
+"""
+
+import uuid
+from typing import List, Tuple
+
+from web3 import Web3
+
+
+def _to_bytes32(value: str) -> bytes:
+    """0x前缀（或无前缀）的十六进制字符串 -> 32字节"""
+    value = value[2:] if value.startswith('0x') else value
+    data = bytes.fromhex(value)
+    if len(data) != 32:
+        raise ValueError(f"不是32字节的哈希: {value}")
+    return data
+
+
+def _to_hex(data: bytes) -> str:
+    return '0x' + data.hex()
+
+
+def uuid_to_bytes16(vc_uuid: str) -> bytes:
+    """UUID字符串 -> 16字节（合约中的bytes16）"""
+    return uuid.UUID(vc_uuid).bytes
+
+
+def hash_leaf(vc_hash: str, vc_uuid: str) -> bytes:
+    """叶子节点哈希"""
+    return bytes(Web3.keccak(_to_bytes32(vc_hash) + uuid_to_bytes16(vc_uuid)))
+
+
+def hash_pair(left: bytes, right: bytes) -> bytes:
+    """内部节点哈希（有序拼接）"""
+    return bytes(Web3.keccak(left + right if left <= right else right + left))
+
+
+def build_merkle_levels(leaves: List[Tuple[str, str]]) -> List[List[bytes]]:
+    """
+    构建Merkle树
+
+    参数:
+        leaves: (VC Hash, UUID) 列表（叶子顺序即列表顺序）
+
+    返回:
+        各层节点，levels[0]为叶子层，levels[-1]为只含根的一层
+    """
+    if not leaves:
+        raise ValueError("VC Hash列表为空")
+
+    levels = [[hash_leaf(vc_hash, vc_uuid) for vc_hash, vc_uuid in leaves]]
+    while len(levels[-1]) > 1:
+        nodes = levels[-1]
+        parents = [hash_pair(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+        if len(nodes) % 2:
+            parents.append(nodes[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(levels: List[List[bytes]]) -> str:
+    """Merkle根（0x前缀）"""
+    return _to_hex(levels[-1][0])
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[str]:
+    """
+    生成叶子的包含证明
+
+    参数:
+        levels: build_merkle_levels 的结果
+        index: 叶子序号
+
+    返回:
+        从叶子到根的兄弟节点列表（0x前缀）
+    """
+    proof = []
+    for nodes in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(nodes):
+            proof.append(_to_hex(nodes[sibling]))
+        index //= 2
+    return proof
+
+
+def compute_merkle_root(vc_hash: str, vc_uuid: str, proof: List[str]) -> str:
+    """由VC Hash、UUID和包含证明计算Merkle根（0x前缀）"""
+    node = hash_leaf(vc_hash, vc_uuid)
+    for sibling in proof:
+        node = hash_pair(node, _to_bytes32(sibling))
+    return _to_hex(node)
+
+
+def verify_merkle_proof(vc_hash: str, vc_uuid: str, proof: List[str], root: str) -> bool:
+    """验证 (VC Hash, UUID) 包含在Merkle根中"""
+    try:
+        return compute_merkle_root(vc_hash, vc_uuid, proof) == _to_hex(_to_bytes32(root))
+    except ValueError:
+        return False
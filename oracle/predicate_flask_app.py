@@ -23,6 +23,10 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 
 from vp_predicate_oracle_service import VPPredicateOracleService
+from verification_scheduler import SchedulerRejectedError
+from http_session_pool import get_pool_stats
+from circuit_breaker import get_resilience_stats
+from health_snapshot import HealthSnapshot
 
 
 # 设置日志
@@ -39,6 +43,7 @@ CORS(app)  # 允许跨域请求
 
 # 全局服务实例
 oracle_service = None
+health_snapshot = None
 
 # 全局事件循环（用于异步操作）
 _event_loop = None
@@ -73,11 +78,29 @@ def run_async(coro):
     return future.result(timeout=180)  # 3分钟超时
 
 
+def scheduler_rejected_response(error: SchedulerRejectedError):
+    """调度器拒绝时返回 429/503 + Retry-After"""
+    response = jsonify({
+        "error": str(error),
+        "retry_after_seconds": error.retry_after
+    })
+    response.status_code = error.status_code
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
 def init_service(config_path: str = "vp_predicate_config.json"):
     """初始化Oracle服务"""
-    global oracle_service
+    global oracle_service, health_snapshot
     try:
         oracle_service = VPPredicateOracleService(config_path)
+        # 在后台事件循环中启动连接清理任务
+        run_async(oracle_service.start())
+        health_snapshot = HealthSnapshot(
+            _collect_health,
+            refresh_interval=oracle_service.service_config.get('health_refresh_seconds', 10)
+        )
+        health_snapshot.start()
         logger.info("VP谓词验证Oracle服务初始化成功")
     except Exception as e:
         logger.error(f"VP谓词验证Oracle服务初始化失败: {e}", exc_info=True)
@@ -89,27 +112,46 @@ def health():
     """
     GET /api/health - 健康检查
 
+    默认返回后台定时刷新的快照，?deep=true 时执行实时检查
+
     返回:
     {
         "status": "healthy",
         "service": "vp_predicate_oracle",
         "port": 7003,
         "timestamp": "...",
+        "checked_at": "...",
+        "snapshot_age_seconds": 3.2,
+        "cached": true,
         "blockchain_connected": true | false,
         "vc_types_count": 4,
-        "predicate_policies_count": 4
+        "predicate_policies_count": 4,
+        "scheduler": {"active": 2, "queued": 0, ...}
     }
     """
-    return jsonify({
+    deep = request.args.get('deep', '').lower() in ('1', 'true', 'yes')
+    result = health_snapshot.get(deep=deep) if health_snapshot else _collect_health()
+    result.update({
+        "vc_types_count": len(oracle_service.get_supported_vc_types()) if oracle_service else 0,
+        "predicate_policies_count": len(oracle_service.get_all_predicate_policies()) if oracle_service else 0,
+        "scheduler": oracle_service.scheduler.get_stats() if oracle_service else None,
+        "proof_templates": oracle_service.predicate_builder.get_template_stats() if oracle_service else None,
+        "http_pool": get_pool_stats(),
+        "acapy_circuit_breakers": get_resilience_stats()
+    })
+    return jsonify(result)
+
+
+def _collect_health() -> dict:
+    """执行需要访问区块链节点的健康检查（由后台线程定时执行）"""
+    return {
         "status": "healthy",
         "service": "vp_predicate_oracle",
         "version": "1.0.0",
         "port": 7003,
         "timestamp": datetime.now().isoformat(),
-        "blockchain_connected": oracle_service.blockchain_client.is_connected() if oracle_service else False,
-        "vc_types_count": len(oracle_service.get_supported_vc_types()) if oracle_service else 0,
-        "predicate_policies_count": len(oracle_service.get_all_predicate_policies()) if oracle_service else 0
-    })
+        "blockchain_connected": oracle_service.blockchain_client.is_connected() if oracle_service else False
+    }
 
 
 @app.route('/api/vc-types', methods=['GET'])
@@ -401,6 +443,8 @@ def verify_with_predicates():
                 )
             )
             return jsonify(result)
+        except SchedulerRejectedError as e:
+            return scheduler_rejected_response(e)
         except concurrent.futures.TimeoutError:
             logger.error(f"验证执行超时")
             return jsonify({
@@ -487,6 +531,8 @@ def verify_with_default_predicates():
                 )
             )
             return jsonify(result)
+        except SchedulerRejectedError as e:
+            return scheduler_rejected_response(e)
         except concurrent.futures.TimeoutError:
             logger.error(f"验证执行超时")
             return jsonify({
@@ -574,7 +620,7 @@ def main():
 
     logger.info(f"启动Flask服务器: http://{host}:{port}")
     logger.info(f"API端点:")
-    logger.info(f"  GET  /api/health")
+    logger.info(f"  GET  /api/health (?deep=true 实时检查)")
     logger.info(f"  GET  /api/vc-types")
     logger.info(f"  GET  /api/vc-types/<vc_type>/attributes")
     logger.info(f"  GET  /api/vc-types/<vc_type>/info")
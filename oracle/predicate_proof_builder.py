@@ -9,9 +9,16 @@
 - 新增: 支持谓词验证（predicates），Verifier只获得"属性是否满足条件"的结果
 """
 
+import copy
 import logging
 from typing import Dict, List, Optional, Any
 
+from proof_request_builder import (
+    ProofRequestTemplateCache,
+    generate_proof_nonce,
+    template_cache_key,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,9 +75,149 @@ class PredicateProofBuilder:
         """
         self.vc_config = vc_config
         self.predicate_policies = predicate_policies
+
+        # 预编译的VC类型信息: vc_type -> {"valid_attrs": frozenset, "restrictions": [...]}
+        self._compiled: Dict[str, Dict] = {}
+        self._template_cache = ProofRequestTemplateCache()
+        self._compile_templates()
+
         logger.info("谓词证明请求构造器初始化完成")
         logger.info(f"已加载 {len(self.predicate_policies)} 种VC类型的谓词策略")
 
+    def _compile_templates(self):
+        """
+        启动时预编译每个VC类型的属性集合、默认restrictions和默认策略模板
+
+        默认策略模板（属性校验、谓词值转换、静态attribute_filters）只计算一次，
+        之后每次请求只需补充nonce和UUID过滤。
+        """
+        self._compiled = {}
+        for vc_type, vc_cfg in self.vc_config.items():
+            self._compiled[vc_type] = {
+                "valid_attrs": frozenset(vc_cfg.get("attributes", [])),
+                "restrictions": self._compile_restrictions(vc_cfg)
+            }
+
+        compiled_count = 0
+        for vc_type in self.vc_config:
+            try:
+                self.get_proof_request_template(vc_type)
+                compiled_count += 1
+            except PredicateProofBuilderError as e:
+                logger.warning(f"VC类型 {vc_type} 的默认谓词策略无法预编译: {e}")
+
+        logger.info(f"已预编译 {compiled_count} 种VC类型的默认谓词证明请求模板")
+
+    def reload(self, vc_config: Dict, predicate_policies: Dict):
+        """
+        重新加载VC类型配置和谓词策略（配置文件变化时调用）
+
+        参数:
+            vc_config: 新的VC类型配置字典
+            predicate_policies: 新的谓词策略配置
+        """
+        self.vc_config = vc_config
+        self.predicate_policies = predicate_policies
+        self._template_cache.clear()
+        self._compile_templates()
+        logger.info(f"谓词证明请求构造器已重新加载: {len(self.predicate_policies)} 种VC类型的谓词策略")
+
+    def get_proof_request_template(
+        self,
+        vc_type: str,
+        custom_predicates: Optional[Dict[str, Dict]] = None,
+        custom_attributes_to_reveal: Optional[List[str]] = None,
+        custom_attribute_restrictions: Optional[Dict[str, Dict]] = None
+    ) -> Dict:
+        """
+        获取谓词证明请求模板（按请求形状缓存）
+
+        模板包含策略中的静态 attribute_filters，不含UUID过滤和nonce。
+        相同的自定义谓词/披露属性/限制条件组合只构造一次。
+        返回的对象只读，通过 instantiate_proof_request 得到实际发送的请求。
+
+        参数:
+            vc_type: VC类型
+            custom_predicates: 自定义谓词（None使用默认策略）
+            custom_attributes_to_reveal: 自定义披露属性（None使用默认策略）
+            custom_attribute_restrictions: 自定义限制条件（None使用默认策略，{}跳过）
+
+        返回:
+            {
+                "proof_request": {...},                 # 模板（只读）
+                "predicates_config": {...},             # 用于结果解析
+                "attribute_restrictions_config": {...}  # 用于结果解析
+            }
+
+        异常:
+            PredicateProofBuilderError: 构造失败
+        """
+        key = template_cache_key(
+            vc_type, custom_predicates, custom_attributes_to_reveal, custom_attribute_restrictions
+        )
+        template = self._template_cache.get(key)
+        if template is not None:
+            return template
+
+        policy = self.get_predicate_policy(vc_type)
+
+        # 配置文件中的静态 attribute_filters（零知识验证）
+        static_filters = policy.get("attribute_filters", {})
+
+        proof_request = self.build_predicate_proof_request_from_policy(
+            vc_type=vc_type,
+            attribute_filters=static_filters or None,
+            custom_predicates=custom_predicates,
+            custom_attributes_to_reveal=custom_attributes_to_reveal,
+            custom_attribute_restrictions=custom_attribute_restrictions
+        )
+
+        # 获取使用的谓词配置（用于后续结果解析）
+        if custom_predicates:
+            predicates_config = custom_predicates
+        else:
+            predicates_config = policy.get("predicates", {})
+
+        # 如果传入custom_attribute_restrictions，使用它（空字典表示跳过）
+        if custom_attribute_restrictions is not None:
+            attribute_restrictions_config = custom_attribute_restrictions
+        else:
+            attribute_restrictions_config = policy.get("attribute_restrictions", {})
+
+        template = {
+            "proof_request": proof_request,
+            "predicates_config": copy.deepcopy(predicates_config),
+            "attribute_restrictions_config": copy.deepcopy(attribute_restrictions_config)
+        }
+        self._template_cache.put(key, template)
+        return template
+
+    def instantiate_proof_request(
+        self,
+        template: Dict,
+        attribute_filters: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """
+        由模板生成单次请求：补充属性值过滤（如UUID）并生成新的nonce
+
+        参数:
+            template: get_proof_request_template 返回的 proof_request 模板
+            attribute_filters: 属性值过滤器，如 {"contractName": "uuid"}
+
+        返回:
+            新的proof_request字典
+        """
+        proof_request = self.apply_attribute_filters(template, attribute_filters)
+        proof_request["nonce"] = generate_proof_nonce()
+        return proof_request
+
+    def get_template_stats(self) -> Dict:
+        """获取模板缓存统计"""
+        return {
+            "compiled_vc_types": list(self._compiled.keys()),
+            "cache": self._template_cache.get_stats()
+        }
+
     def build_predicate_proof_request(
         self,
         vc_type: str,
@@ -125,14 +272,15 @@ class PredicateProofBuilder:
             raise PredicateProofBuilderError(f"不支持的VC类型: {vc_type}")
 
         vc_cfg = self.vc_config[vc_type]
-        valid_attrs = vc_cfg.get("attributes", [])
+        compiled = self._compiled.get(vc_type)
+        valid_attrs = compiled["valid_attrs"] if compiled else frozenset(vc_cfg.get("attributes", []))
 
         # 验证属性
         invalid_attrs = [attr for attr in attributes_to_reveal if attr not in valid_attrs]
         if invalid_attrs:
             raise PredicateProofBuilderError(
                 f"属性 {invalid_attrs} 不在VC类型 {vc_type} 中. "
-                f"有效属性: {valid_attrs}"
+                f"有效属性: {vc_cfg.get('attributes', [])}"
             )
 
         # 验证谓词属性
@@ -300,6 +448,40 @@ class PredicateProofBuilder:
             attribute_restrictions=attribute_restrictions if attribute_restrictions else None
         )
 
+    def apply_attribute_filters(
+        self,
+        proof_request: Dict,
+        attribute_filters: Optional[Dict[str, str]]
+    ) -> Dict:
+        """
+        在已构造的谓词证明请求上追加属性值过滤（不修改原对象）
+
+        与构造时传入 attribute_filters 的效果一致：披露属性和谓词中
+        属性名匹配的条目都会加上 attr::NAME::value 限制。
+
+        参数:
+            proof_request: 已构造的proof_request（模板）
+            attribute_filters: 属性值过滤器，如 {"contractName": "uuid"}
+
+        返回:
+            新的proof_request字典
+        """
+        proof_request = copy.deepcopy(proof_request)
+        if not attribute_filters:
+            return proof_request
+
+        for section in ("requested_attributes", "requested_predicates"):
+            for entry in proof_request.get(section, {}).values():
+                attr_name = entry.get("name")
+                if attr_name not in attribute_filters:
+                    continue
+                filter_key = f"attr::{attr_name}::value"
+                for restriction in entry.get("restrictions", []):
+                    restriction[filter_key] = attribute_filters[attr_name]
+                logger.debug(f"添加属性值过滤: {filter_key} = {attribute_filters[attr_name]}")
+
+        return proof_request
+
     def get_predicate_policy(self, vc_type: str) -> Dict:
         """
         获取VC类型的默认谓词策略
@@ -372,7 +554,7 @@ class PredicateProofBuilder:
 
     def _get_default_restrictions(self, vc_type: str) -> List[Dict]:
         """
-        获取VC类型的默认restrictions
+        获取VC类型的默认restrictions（返回预编译结果的副本）
 
         参数:
             vc_type: VC类型
@@ -383,7 +565,23 @@ class PredicateProofBuilder:
         if vc_type not in self.vc_config:
             raise PredicateProofBuilderError(f"不支持的VC类型: {vc_type}")
 
-        vc_cfg = self.vc_config[vc_type]
+        compiled = self._compiled.get(vc_type)
+        if compiled is None:
+            return self._compile_restrictions(self.vc_config[vc_type])
+
+        return [r.copy() for r in compiled["restrictions"]]
+
+    @staticmethod
+    def _compile_restrictions(vc_cfg: Dict) -> List[Dict]:
+        """
+        根据VC类型配置计算默认restrictions
+
+        参数:
+            vc_cfg: 单个VC类型的配置
+
+        返回:
+            restrictions列表
+        """
         restriction = {}
 
         # 添加schema_id
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Presentation Exchange 记录回收器
+定期删除Verifier/Holder钱包中已结束或已废弃的present-proof-2.0记录，
+避免记录表持续增长拖慢记录查询和凭证检索
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from acapy_client import ACAPyClient
+
+
+logger = logging.getLogger(__name__)
+
+
+# 已结束的记录状态（present-proof-2.0）
+TERMINAL_STATES = ("done", "abandoned", "deleted")
+
+
+def parse_acapy_timestamp(value: Optional[str]) -> Optional[float]:
+    """
+    解析ACA-Py记录时间戳（如 "2024-05-01 08:30:12.123456Z"）
+
+    参数:
+        value: 时间戳字符串
+
+    返回:
+        UNIX时间戳（秒），无法解析时返回None
+    """
+    if not value:
+        return None
+
+    text = value.strip().replace("T", " ")
+    if text.endswith("Z"):
+        text = text[:-1]
+
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+class PresentationReaper:
+    """
+    Presentation Exchange 记录回收器
+
+    回收规则：
+    - 已结束的记录（done/abandoned）在 retention_seconds 之后删除
+    - 长时间停留在中间状态的记录（如 request-sent）视为废弃，
+      在 stale_seconds 之后删除（应远大于验证超时时间）
+
+    每轮最多删除 max_deletes_per_run 条，按 batch_size 分批，
+    删除速率不超过 max_deletes_per_second，避免挤占验证流量。
+    """
+
+    def __init__(
+        self,
+        clients: Dict[str, ACAPyClient],
+        interval_seconds: int = 600,
+        retention_seconds: int = 3600,
+        stale_seconds: int = 86400,
+        batch_size: int = 50,
+        max_deletes_per_run: int = 500,
+        max_deletes_per_second: float = 10.0,
+        batch_pause_seconds: float = 1.0
+    ):
+        """
+        初始化回收器
+
+        参数:
+            clients: 需要回收的代理，名称 -> ACAPyClient（如 {"verifier": ..., "holder": ...}）
+            interval_seconds: 回收间隔（秒）
+            retention_seconds: 已结束记录的保留时间（秒）
+            stale_seconds: 中间状态记录被视为废弃的时间（秒）
+            batch_size: 每批删除的记录数
+            max_deletes_per_run: 每轮最多删除的记录数
+            max_deletes_per_second: 删除速率上限（条/秒）
+            batch_pause_seconds: 批次之间的暂停时间（秒）
+        """
+        self.clients = clients
+        self.interval = interval_seconds
+        self.retention_seconds = retention_seconds
+        self.stale_seconds = stale_seconds
+        self.batch_size = max(1, batch_size)
+        self.max_deletes_per_run = max_deletes_per_run
+        self.delete_delay = 1.0 / max_deletes_per_second if max_deletes_per_second > 0 else 0.0
+        self.batch_pause = batch_pause_seconds
+
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        # 统计
+        self._stats = {
+            "runs": 0,
+            "scanned": 0,
+            "deleted": 0,
+            "failed": 0,
+            "deleted_by_agent": {name: 0 for name in clients},
+            "last_run_at": None,
+            "last_run_duration_seconds": None,
+            "last_run_deleted": 0,
+            "last_run_reclaim_rate": None,
+            "last_error": None
+        }
+        self._started_at = time.monotonic()
+
+        logger.info(
+            f"Presentation记录回收器初始化完成: 代理={list(clients.keys())}, "
+            f"间隔={interval_seconds}秒, 保留={retention_seconds}秒, 废弃阈值={stale_seconds}秒"
+        )
+
+    @classmethod
+    def from_config(cls, clients: Dict[str, ACAPyClient], gc_config: Dict) -> "PresentationReaper":
+        """从 service.presentation_gc 配置段创建回收器"""
+        return cls(
+            clients=clients,
+            interval_seconds=gc_config.get('interval_seconds', 600),
+            retention_seconds=gc_config.get('retention_seconds', 3600),
+            stale_seconds=gc_config.get('stale_seconds', 86400),
+            batch_size=gc_config.get('batch_size', 50),
+            max_deletes_per_run=gc_config.get('max_deletes_per_run', 500),
+            max_deletes_per_second=gc_config.get('max_deletes_per_second', 10.0),
+            batch_pause_seconds=gc_config.get('batch_pause_seconds', 1.0)
+        )
+
+    async def start(self):
+        """启动后台回收任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reaper_loop())
+            logger.info(f"Presentation记录回收器已启动，回收间隔: {self.interval}秒")
+
+    async def stop(self):
+        """停止后台回收任务"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Presentation记录回收器已停止")
+
+    async def _reaper_loop(self):
+        """后台回收循环"""
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                await self.run_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._stats["last_error"] = str(e)
+                logger.error(f"Presentation记录回收出错: {e}", exc_info=True)
+
+    def _select_expired(self, records: List[Dict], now: float) -> List[str]:
+        """
+        筛选可删除的记录
+
+        参数:
+            records: presentation exchange记录列表
+            now: 当前UNIX时间戳
+
+        返回:
+            可删除的pres_ex_id列表（最旧的在前）
+        """
+        expired = []
+        for record in records:
+            pres_ex_id = record.get("pres_ex_id")
+            updated_at = parse_acapy_timestamp(record.get("updated_at") or record.get("created_at"))
+            if not pres_ex_id or updated_at is None:
+                continue
+
+            age = now - updated_at
+            if record.get("state") in TERMINAL_STATES:
+                if age >= self.retention_seconds:
+                    expired.append((updated_at, pres_ex_id))
+            elif age >= self.stale_seconds:
+                expired.append((updated_at, pres_ex_id))
+
+        expired.sort()
+        return [pres_ex_id for _, pres_ex_id in expired]
+
+    async def _reap_agent(self, name: str, client: ACAPyClient, budget: int) -> int:
+        """
+        回收单个代理的记录
+
+        参数:
+            name: 代理名称
+            client: ACA-Py客户端
+            budget: 本轮剩余可删除数量
+
+        返回:
+            成功删除的数量
+        """
+        response = await client.get_presentation_records_v2()
+        records = response.get("results", []) if isinstance(response, dict) else (response or [])
+        self._stats["scanned"] += len(records)
+
+        expired = self._select_expired(records, time.time())[:budget]
+        if not expired:
+            logger.debug(f"[{name}] 没有需要回收的presentation记录（共 {len(records)} 条）")
+            return 0
+
+        logger.info(f"[{name}] 待回收presentation记录: {len(expired)}/{len(records)}")
+
+        deleted = 0
+        for start in range(0, len(expired), self.batch_size):
+            for pres_ex_id in expired[start:start + self.batch_size]:
+                try:
+                    await client.remove_presentation_record_v2(pres_ex_id)
+                    deleted += 1
+                except Exception as e:
+                    if "404" in str(e):
+                        # 已被其他流程删除
+                        deleted += 1
+                    else:
+                        self._stats["failed"] += 1
+                        logger.warning(f"[{name}] 删除presentation记录失败 {pres_ex_id}: {e}")
+
+                if self.delete_delay:
+                    await asyncio.sleep(self.delete_delay)
+
+            logger.debug(f"[{name}] 已完成一批回收，累计删除 {deleted} 条")
+            if start + self.batch_size < len(expired) and self.batch_pause:
+                await asyncio.sleep(self.batch_pause)
+
+        self._stats["deleted_by_agent"][name] = self._stats["deleted_by_agent"].get(name, 0) + deleted
+        return deleted
+
+    async def run_once(self) -> Dict:
+        """
+        执行一轮回收
+
+        返回:
+            本轮结果 {"deleted": int, "duration_seconds": float, "by_agent": {...}}
+        """
+        if self._running:
+            logger.debug("上一轮回收尚未结束，跳过本轮")
+            return {"deleted": 0, "duration_seconds": 0.0, "by_agent": {}}
+
+        self._running = True
+        try:
+            return await self._run()
+        finally:
+            self._running = False
+
+    async def _run(self) -> Dict:
+        """执行一轮回收（由 run_once 调用）"""
+        start_time = time.monotonic()
+        budget = self.max_deletes_per_run
+        by_agent = {}
+
+        for name, client in self.clients.items():
+            if budget <= 0:
+                break
+            try:
+                deleted = await self._reap_agent(name, client, budget)
+            except Exception as e:
+                self._stats["last_error"] = f"{name}: {e}"
+                logger.error(f"[{name}] 获取presentation记录失败: {e}")
+                deleted = 0
+            by_agent[name] = deleted
+            budget -= deleted
+
+        duration = time.monotonic() - start_time
+        total = sum(by_agent.values())
+
+        self._stats["runs"] += 1
+        self._stats["deleted"] += total
+        self._stats["last_run_at"] = datetime.now().isoformat()
+        self._stats["last_run_duration_seconds"] = round(duration, 2)
+        self._stats["last_run_deleted"] = total
+        self._stats["last_run_reclaim_rate"] = round(total / duration, 2) if duration > 0 else None
+
+        if total:
+            logger.info(f"Presentation记录回收完成: 删除 {total} 条, 耗时 {duration:.2f}秒, 明细={by_agent}")
+
+        return {
+            "deleted": total,
+            "duration_seconds": round(duration, 2),
+            "by_agent": by_agent
+        }
+
+    def get_stats(self) -> Dict:
+        """
+        获取回收统计信息
+
+        返回:
+            统计字典（reclaim_rate_per_hour 为启动以来的平均回收速率）
+        """
+        uptime_hours = (time.monotonic() - self._started_at) / 3600
+        return {
+            "interval_seconds": self.interval,
+            "retention_seconds": self.retention_seconds,
+            "stale_seconds": self.stale_seconds,
+            "reclaim_rate_per_hour": round(self._stats["deleted"] / uptime_hours, 2) if uptime_hours > 0 else None,
+            **self._stats,
+            "deleted_by_agent": dict(self._stats["deleted_by_agent"])
+        }
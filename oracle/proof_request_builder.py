@@ -5,8 +5,11 @@
 构造ACA-Py的proof_request对象，支持多种VC类型
 """
 
+import copy
 import json
 import logging
+import secrets
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
@@ -14,11 +17,69 @@ from typing import Dict, List, Optional, Any
 logger = logging.getLogger(__name__)
 
 
+# 模板缓存最大条目数（按 VC类型 + 请求形状 区分）
+TEMPLATE_CACHE_SIZE = 256
+
+
 class ProofRequestBuilderError(Exception):
     """证明请求构造错误"""
     pass
 
 
+def generate_proof_nonce() -> str:
+    """生成proof_request的nonce（Indy要求80位以内的十进制数字字符串）"""
+    return str(secrets.randbits(80))
+
+
+def template_cache_key(*parts: Any) -> str:
+    """把请求形状（VC类型、属性、谓词等）序列化为稳定的缓存键"""
+    return json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ProofRequestTemplateCache:
+    """
+    证明请求模板LRU缓存
+
+    缓存中的模板视为只读，由 instantiate_proof_request 生成可修改的副本。
+    """
+
+    def __init__(self, max_size: int = TEMPLATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """查找模板，命中时移到队尾"""
+        template = self._entries.get(key)
+        if template is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return template
+
+    def put(self, key: str, template: Dict):
+        """存入模板，超出容量时淘汰最久未使用的条目"""
+        self._entries[key] = template
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存（配置重载时调用）"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses
+        }
+
+
 class ProofRequestBuilder:
     """
     证明请求构造器
@@ -46,8 +107,114 @@ class ProofRequestBuilder:
             }
         """
         self.vc_config = vc_config
+
+        # 预编译的VC类型信息: vc_type -> {"valid_attrs": frozenset, "restrictions": [...]}
+        self._compiled: Dict[str, Dict] = {}
+        self._template_cache = ProofRequestTemplateCache()
+        self._compile_vc_types()
+
         logger.info("证明请求构造器初始化完成")
 
+    def _compile_vc_types(self):
+        """启动时预编译每个VC类型的有效属性集合和默认restrictions"""
+        self._compiled = {}
+        for vc_type, vc_cfg in self.vc_config.items():
+            self._compiled[vc_type] = {
+                "valid_attrs": frozenset(vc_cfg.get("attributes", [])),
+                "restrictions": self._compile_restrictions(vc_cfg)
+            }
+
+        # 预热每个VC类型完整属性集的模板
+        for vc_type, vc_cfg in self.vc_config.items():
+            attributes = vc_cfg.get("attributes", [])
+            if not attributes:
+                continue
+            try:
+                self.get_proof_request_template(vc_type, list(attributes))
+            except ProofRequestBuilderError as e:
+                logger.warning(f"VC类型 {vc_type} 的默认模板无法预编译: {e}")
+
+        logger.info(f"已预编译 {len(self._compiled)} 种VC类型的证明请求模板")
+
+    def reload(self, vc_config: Dict):
+        """
+        重新加载VC类型配置（配置文件变化时调用）
+
+        参数:
+            vc_config: 新的VC类型配置字典
+        """
+        self.vc_config = vc_config
+        self._template_cache.clear()
+        self._compile_vc_types()
+        logger.info("证明请求构造器已重新加载配置")
+
+    def get_proof_request_template(
+        self,
+        vc_type: str,
+        requested_attributes: List[str],
+        name: Optional[str] = None
+    ) -> Dict:
+        """
+        获取证明请求模板（按请求形状缓存）
+
+        模板不含UUID过滤和nonce，缓存对象只读；
+        通过 instantiate_proof_request 得到实际发送的请求。
+
+        参数:
+            vc_type: VC类型名称
+            requested_attributes: 请求的属性列表
+            name: 请求名称（默认 "验证<vc_type>"）
+
+        返回:
+            proof_request模板（只读）
+        """
+        name = name or f"验证{vc_type}"
+        key = template_cache_key(vc_type, requested_attributes, name)
+        template = self._template_cache.get(key)
+        if template is not None:
+            return template
+
+        if vc_type == "InspectionReport":
+            template = self.build_inspection_report_request(
+                requested_attributes=requested_attributes,
+                name=name
+            )
+        else:
+            template = self.build_custom_proof_request(
+                vc_type=vc_type,
+                requested_attributes=requested_attributes,
+                name=name
+            )
+
+        self._template_cache.put(key, template)
+        return template
+
+    def instantiate_proof_request(
+        self,
+        template: Dict,
+        attribute_filters: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """
+        由模板生成单次请求：补充属性值过滤（如UUID）并生成新的nonce
+
+        参数:
+            template: get_proof_request_template 返回的模板
+            attribute_filters: 属性值过滤器，如 {"contractName": "uuid"}
+
+        返回:
+            新的proof_request字典
+        """
+        proof_request = self.apply_attribute_filters(template, attribute_filters)
+        proof_request["nonce"] = generate_proof_nonce()
+        return proof_request
+
+    def get_template_stats(self) -> Dict:
+        """获取模板缓存统计"""
+        return {
+            "compiled_vc_types": list(self._compiled.keys()),
+            "cache": self._template_cache.get_stats()
+        }
+
     def build_inspection_report_request(
         self,
         requested_attributes: List[str],
@@ -227,9 +394,42 @@ class ProofRequestBuilder:
 
         return proof_request
 
+    def apply_attribute_filters(
+        self,
+        proof_request: Dict,
+        attribute_filters: Optional[Dict[str, str]]
+    ) -> Dict:
+        """
+        在已构造的证明请求上追加属性值过滤（不修改原对象）
+
+        用于先构造不含UUID的请求模板，待UUID从区块链取回后再补充过滤条件。
+        结果与构造时直接传入 attribute_filters 一致。
+
+        参数:
+            proof_request: 已构造的proof_request（模板）
+            attribute_filters: 属性值过滤器，如 {"contractName": "uuid"}
+
+        返回:
+            新的proof_request字典
+        """
+        proof_request = copy.deepcopy(proof_request)
+        if not attribute_filters:
+            return proof_request
+
+        for attr_entry in proof_request.get("requested_attributes", {}).values():
+            attr_name = attr_entry.get("name")
+            if attr_name not in attribute_filters:
+                continue
+            filter_key = f"attr::{attr_name}::value"
+            for attr_restriction in attr_entry.get("restrictions", []):
+                attr_restriction[filter_key] = attribute_filters[attr_name]
+            logger.debug(f"添加属性值过滤: {filter_key} = {attribute_filters[attr_name]}")
+
+        return proof_request
+
     def _get_default_restrictions(self, vc_type: str) -> List[Dict]:
         """
-        获取VC类型的默认restrictions
+        获取VC类型的默认restrictions（返回预编译结果的副本）
 
         参数:
             vc_type: VC类型名称
@@ -240,8 +440,23 @@ class ProofRequestBuilder:
         if vc_type not in self.vc_config:
             raise ProofRequestBuilderError(f"不支持的VC类型: {vc_type}")
 
-        vc_config = self.vc_config[vc_type]
+        compiled = self._compiled.get(vc_type)
+        if compiled is None:
+            return self._compile_restrictions(self.vc_config[vc_type])
 
+        return [r.copy() for r in compiled["restrictions"]]
+
+    @staticmethod
+    def _compile_restrictions(vc_config: Dict) -> List[Dict]:
+        """
+        根据VC类型配置计算默认restrictions
+
+        参数:
+            vc_config: 单个VC类型的配置
+
+        返回:
+            restrictions列表
+        """
         restriction = {}
 
         # 添加schema_id
@@ -278,15 +493,17 @@ class ProofRequestBuilder:
         if vc_type not in self.vc_config:
             raise ProofRequestBuilderError(f"不支持的VC类型: {vc_type}")
 
-        vc_config = self.vc_config[vc_type]
-        valid_attrs = vc_config.get("attributes", [])
+        compiled = self._compiled.get(vc_type)
+        valid_attrs = compiled["valid_attrs"] if compiled else frozenset(
+            self.vc_config[vc_type].get("attributes", [])
+        )
 
         invalid_attrs = [attr for attr in attributes if attr not in valid_attrs]
 
         if invalid_attrs:
             raise ProofRequestBuilderError(
                 f"属性 {invalid_attrs} 不在VC类型 {vc_type} 中. "
-                f"有效属性: {valid_attrs}"
+                f"有效属性: {self.vc_config[vc_type].get('attributes', [])}"
             )
 
         return True
@@ -28,7 +28,9 @@ logger = logging.getLogger(__name__)
 # 默认配置
 DEFAULT_CONFIG_PATH = "vp_predicate_config.json"
 DEFAULT_ORACLE_URL = "http://localhost:7003"
-DEFAULT_UUID_PATH = "logs/uuid.json"
+# 发行Oracle的UUID登记表，不存在时读取旧的uuid.json
+DEFAULT_REGISTRY_PATH = str(Path(__file__).parent.parent / "VcIssureOracle" / "logs" / "uuid_registry.db")
+DEFAULT_UUID_PATH = str(Path(__file__).parent.parent / "VcIssureOracle" / "logs" / "uuid.json")
 
 
 def load_config(config_path: str) -> Dict:
@@ -37,14 +39,14 @@ def load_config(config_path: str) -> Dict:
         return json.load(f)
 
 
-def load_uuid_data(uuid_path: str) -> Dict:
-    """加载UUID数据文件"""
-    try:
-        with open(uuid_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.warning(f"UUID数据文件不存在: {uuid_path}")
-        return {}
+def load_uuid_data(registry_path: str, uuid_path: str) -> Dict:
+    """加载发行记录（优先读取UUID登记表，不存在时读取uuid.json）"""
+    sys.path.insert(0, str(Path(__file__).parent.parent / "VcIssureOracle"))
+    from uuid_registry import load_uuid_records
+    uuid_data = load_uuid_records(registry_path, uuid_path)
+    if not uuid_data:
+        logger.warning(f"UUID登记表和数据文件都不存在或为空: {registry_path}, {uuid_path}")
+    return uuid_data
 
 
 def find_matching_vc_hash(uuid_data: Dict, vc_type: str, credential_uuid: str) -> Optional[str]:
@@ -560,7 +562,8 @@ def main():
     parser = argparse.ArgumentParser(description='三步验证测试脚本')
     parser.add_argument('--vc-type', required=True, help='VC类型 (如 InspectionReport)')
     parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help='配置文件路径')
-    parser.add_argument('--uuid-path', default=DEFAULT_UUID_PATH, help='UUID数据文件路径')
+    parser.add_argument('--registry', default=DEFAULT_REGISTRY_PATH, help='UUID登记表路径')
+    parser.add_argument('--uuid-path', default=DEFAULT_UUID_PATH, help='登记表不存在时读取的UUID数据文件路径')
     parser.add_argument('--oracle-url', default=DEFAULT_ORACLE_URL, help='Oracle服务URL')
     parser.add_argument('--skip-step2', action='store_true', help='跳过步骤2（UUID验证）')
     parser.add_argument('--skip-step3', action='store_true', help='跳过步骤3（完整验证）')
@@ -573,7 +576,7 @@ def main():
         config = load_config(args.config)
 
         # 加载UUID数据
-        uuid_data = load_uuid_data(args.uuid_path)
+        uuid_data = load_uuid_data(args.registry, args.uuid_path)
 
         # 步骤1：建立测试实例
         uuid, vc_hash, credential_attributes = setup_test_instance(
@@ -11,7 +11,7 @@
 配置说明：
 - 从config/cross_chain_oracle_config.json读取VC Manager Owner账户（用于调用所有VC Manager）
 - 从config/cross_chain_oracle_config.json读取4个VC Manager合约地址
-- 从oracle/logs/uuid.json读取可用的VC Hash用于测试
+- 从发行Oracle的UUID登记表（VcIssureOracle/logs/uuid_registry.db）读取可用的VC Hash用于测试
 
 新功能（--create-random）：
 - 随机生成一个新的 VC Hash
@@ -31,10 +31,14 @@ from web3.middleware import geth_poa_middleware
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "VcIssureOracle"))
+from uuid_registry import load_uuid_records
 
 # 配置文件路径
 CONFIG_FILE = Path(__file__).parent.parent / "config" / "cross_chain_oracle_config.json"
-UUID_FILE = Path(__file__).parent / "logs" / "uuid.json"
+# 发行Oracle的UUID登记表，不存在时读取旧的uuid.json
+UUID_REGISTRY_FILE = Path(__file__).parent.parent / "VcIssureOracle" / "logs" / "uuid_registry.db"
+UUID_FILE = Path(__file__).parent.parent / "VcIssureOracle" / "logs" / "uuid.json"
 
 # 4个VC Manager合约地址（从cross_chain_oracle_config.json读取）
 VC_MANAGERS = {
@@ -105,13 +109,14 @@ def get_vc_manager_config(vc_type: str, config: dict) -> dict:
     }
 
 
-def get_latest_vc_hash():
-    """从uuid.json获取最新的VC记录（包含vc_hash和vc_type）"""
-    if not UUID_FILE.exists():
-        return None, None
+def load_uuid_data():
+    """加载发行记录（按时间正序）"""
+    return load_uuid_records(str(UUID_REGISTRY_FILE), str(UUID_FILE))
+
 
-    with open(UUID_FILE, 'r') as f:
-        uuid_data = json.load(f)
+def get_latest_vc_hash():
+    """从UUID登记表获取最新的VC记录（包含vc_hash和vc_type）"""
+    uuid_data = load_uuid_data()
 
     # 获取最新的（最后一个）VC记录
     if not uuid_data:
@@ -123,12 +128,8 @@ def get_latest_vc_hash():
 
 
 def get_available_vc_hashes(limit=10):
-    """从uuid.json获取可用的VC Hash列表"""
-    if not UUID_FILE.exists():
-        return []
-
-    with open(UUID_FILE, 'r') as f:
-        uuid_data = json.load(f)
+    """从UUID登记表获取可用的VC Hash列表"""
+    uuid_data = load_uuid_data()
 
     # 获取最近N个VC Hash
     hashes = []
@@ -520,20 +521,17 @@ def test_cross_chain_transfer(vc_hash: str = None, auto_initiate: bool = False):
     if not vc_hash:
         vc_hash, vc_type = get_latest_vc_hash()
         if vc_hash:
-            print(f"\n[INFO] 从uuid.json获取最新VC Hash: {vc_hash}")
+            print(f"\n[INFO] 从UUID登记表获取最新VC Hash: {vc_hash}")
             print(f"[INFO] VC 类型: {vc_type}")
         else:
-            print("[WARN] 无法从uuid.json获取VC Hash，请手动指定")
+            print("[WARN] 无法从UUID登记表获取VC Hash，请手动指定")
     else:
-        # 如果手动指定了vc_hash，需要从uuid.json查找类型
-        if UUID_FILE.exists():
-            with open(UUID_FILE, 'r') as f:
-                uuid_data = json.load(f)
-            for uuid_key, record in uuid_data.items():
-                if record.get('vc_hash') == vc_hash:
-                    vc_type = record.get('vc_type')
-                    print(f"\n[INFO] 指定的VC Hash类型: {vc_type}")
-                    break
+        # 如果手动指定了vc_hash，需要从UUID登记表查找类型
+        for uuid_key, record in load_uuid_data().items():
+            if record.get('vc_hash') == vc_hash:
+                vc_type = record.get('vc_type')
+                print(f"\n[INFO] 指定的VC Hash类型: {vc_type}")
+                break
 
     # 根据VC类型获取对应的VC Manager配置
     if vc_type:
@@ -738,7 +736,7 @@ def test_oracle_health():
 def list_available_vcs():
     """列出可用的VC Hash"""
     print("=" * 80)
-    print("可用的VC Hash列表（从uuid.json读取）")
+    print("可用的VC Hash列表（从UUID登记表读取）")
     print("=" * 80)
 
     vcs = get_available_vc_hashes(limit=10)
@@ -844,7 +842,7 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='跨链VC传输测试')
-    parser.add_argument('--vc-hash', type=str, help='要测试的VC Hash（如不指定则从uuid.json读取最新）')
+    parser.add_argument('--vc-hash', type=str, help='要测试的VC Hash（如不指定则从UUID登记表读取最新）')
     parser.add_argument('--health', action='store_true', help='检查Oracle健康状态')
     parser.add_argument('--list-vcs', action='store_true', help='列出可用的VC Hash')
     parser.add_argument('--list-managers', action='store_true', help='列出所有VC Manager信息')
@@ -12,9 +12,15 @@ from pathlib import Path
 from typing import Dict, Optional, List
 
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "VcIssureOracle"))
+from uuid_registry import load_uuid_records
+
+
 # 默认配置
 ORACLE_URL = "http://localhost:7002"
-UUID_JSON_PATH = Path(__file__).parent / "logs" / "uuid.json"
+# 发行Oracle的UUID登记表，不存在时读取旧的uuid.json
+UUID_REGISTRY_PATH = Path(__file__).parent.parent / "VcIssureOracle" / "logs" / "uuid_registry.db"
+UUID_JSON_PATH = Path(__file__).parent.parent / "VcIssureOracle" / "logs" / "uuid.json"
 
 
 def print_section(title: str):
@@ -36,14 +42,11 @@ def print_response(response: requests.Response):
 
 
 def load_uuid_data() -> Dict:
-    """加载uuid.json数据"""
+    """加载发行记录（优先读取UUID登记表，不存在时读取uuid.json）"""
     try:
-        if UUID_JSON_PATH.exists():
-            with open(UUID_JSON_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        return load_uuid_records(str(UUID_REGISTRY_PATH), str(UUID_JSON_PATH))
     except Exception as e:
-        print(f"警告: 无法加载uuid.json: {e}")
+        print(f"警告: 无法加载发行记录: {e}")
         return {}
 
 
@@ -150,9 +153,9 @@ def test_verify_vc(vc_type: str = "InspectionReport",
     """测试VC验证"""
     print_section("执行VC验证")
 
-    # 如果没有提供vc_hash，从uuid.json获取最新的
+    # 如果没有提供vc_hash，从UUID登记表获取最新的
     if vc_hash is None:
-        print(f"未提供vc_hash，从uuid.json获取最新的 {vc_type} VC...")
+        print(f"未提供vc_hash，从UUID登记表获取最新的 {vc_type} VC...")
         vc_hash = get_latest_vc_hash(vc_type)
         if not vc_hash:
             print(f"⚠️  未找到 {vc_type} 类型的VC，使用测试哈希")
@@ -257,7 +260,7 @@ def main():
     )
     parser.add_argument(
         '--vc-hash',
-        help='VC哈希 (66位十六进制)。如果不提供，将从uuid.json获取最新的VC'
+        help='VC哈希 (66位十六进制)。如果不提供，将从UUID登记表获取最新的VC'
     )
     parser.add_argument(
         '--attributes',
@@ -278,7 +281,7 @@ def main():
     parser.add_argument(
         '--list-vc',
         action='store_true',
-        help='列出uuid.json中的所有VC'
+        help='列出UUID登记表中的所有VC'
     )
 
     args = parser.parse_args()
@@ -289,10 +292,10 @@ def main():
 
     # 列出所有VC
     if args.list_vc:
-        print_section("uuid.json中的VC列表")
+        print_section("UUID登记表中的VC列表")
         uuid_data = load_uuid_data()
         if not uuid_data:
-            print("uuid.json为空或不存在")
+            print("UUID登记表为空或不存在")
             return
 
         # 按类型分组
@@ -355,7 +358,7 @@ def main():
 
         test_verify_vc(
             vc_type=args.vc_type,
-            vc_hash=args.vc_hash,  # None时自动从uuid.json获取
+            vc_hash=args.vc_hash,  # None时自动从UUID登记表获取
             attributes=args.attributes,
             oracle_url=args.url
         )
@@ -12,6 +12,7 @@ VP验证测试脚本 - V6版本
 
 import asyncio
 import json
+import sys
 import time
 from pathlib import Path
 from typing import Dict, Optional
@@ -194,15 +195,15 @@ class VPVerifierTester:
 
 
 def get_latest_vc_hash() -> tuple[str, str]:
-    """从 uuid.json 获取最新的 vc_hash 和 vc_type"""
-    uuid_file = Path(__file__).parent / "logs" / "uuid.json"
-    if not uuid_file.exists():
-        print("❌ uuid.json 文件不存在")
+    """从发行Oracle的UUID登记表获取最新的 vc_hash 和 vc_type（登记表不存在时读取uuid.json）"""
+    issuer_logs = Path(__file__).parent.parent / "VcIssureOracle" / "logs"
+    sys.path.insert(0, str(issuer_logs.parent))
+    from uuid_registry import load_uuid_records
+    data = load_uuid_records(str(issuer_logs / "uuid_registry.db"), str(issuer_logs / "uuid.json"))
+    if not data:
+        print("❌ UUID登记表和 uuid.json 都不存在或为空")
         return None, None
 
-    with open(uuid_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
     # 按时间戳排序，获取最新的
     records = [(uuid, info) for uuid, info in data.items()]
     records.sort(key=lambda x: x[1].get('timestamp', ''), reverse=True)
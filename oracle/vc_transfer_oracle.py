@@ -6,6 +6,8 @@
 1. 监听源链上VCCrossChainBridgeSimple合约的VCSent事件
 2. 从源链Bridge合约的sendList获取VC元数据
 3. 将VC元数据写入目标链的VCCrossChainBridgeSimple合约
+4. 写入成功后在源链调用 updateSendStatus(Completed)，将VC移出源链Bridge的待确认集合
+   （启动扫描只读取待确认集合，不再遍历全部历史发送记录）
 
 配置文件：config/cross_chain_oracle_config.json
 """
@@ -15,8 +17,9 @@ import json
 import logging
 import os
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 from web3 import Web3
@@ -26,6 +29,11 @@ from eth_account import Account
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from oracle.web3_fixed_connection import FixedWeb3
+from oracle.gas_estimate_cache import GasEstimateCache
+from oracle.concurrency import run_in_thread
+
+# VCCrossChainBridgeSimple.TransferStatus
+TRANSFER_STATUS_COMPLETED = 1
 
 # 配置日志
 def setup_logging(config: Dict) -> logging.Logger:
@@ -93,6 +101,16 @@ class VCTransferOracle:
         # 去重缓存
         self.processed_cache = {}
 
+        # Gas估算缓存（blockchain.gas_cache），receiveFromCrossChain 不再固定使用 gas_limit
+        self.gas_cache = GasEstimateCache.from_config(self.config['blockchain'].get('gas_cache'))
+
+        # 每条链的交易发送锁（交易在线程池中发送，同一链的发送串行执行，nonce不冲突）
+        self._tx_locks: Dict[str, threading.Lock] = {}
+
+        # 传输完成后确认源链发送状态（monitoring.acknowledge_sends），启动扫描分页大小
+        self.acknowledge_sends = self.config['monitoring'].get('acknowledge_sends', True)
+        self.pending_page_size = self.config['monitoring'].get('pending_page_size', 200)
+
         # 状态文件
         self.state_file = Path(self.config['state']['state_file'])
         self._load_state()
@@ -267,19 +285,10 @@ class VCTransferOracle:
     ) -> bool:
         """将VC元数据写入目标链"""
         try:
-            chain_data = self.connections[target_chain]
-            w3 = chain_data['web3'].w3
-            bridge = chain_data['bridge']
-
-            oracle_address = Web3.to_checksum_address(self.config['oracle']['address'])
-            oracle_private_key = self.config['oracle']['private_key']
+            bridge = self.connections[target_chain]['bridge']
 
             self.logger.info(f"写入VC元数据到 {target_chain}...")
 
-            # 构建交易
-            nonce = w3.eth.get_transaction_count(oracle_address)
-            gas_price = self.config['blockchain']['gas_price']
-
             # 准备参数（7个字段）
             vc_hash_bytes = vc_metadata['vcHash']
             vc_name = vc_metadata['vcName']
@@ -290,8 +299,7 @@ class VCTransferOracle:
 
             self.logger.info(f"调用 receiveFromCrossChain: vcHash={vc_hash_bytes.hex()}")
 
-            # 构建交易
-            transaction = bridge.functions.receiveFromCrossChain(
+            function_call = bridge.functions.receiveFromCrossChain(
                 vc_hash_bytes,
                 vc_name,
                 holder_endpoint,
@@ -299,25 +307,8 @@ class VCTransferOracle:
                 vc_manager_address,
                 expiry_time,
                 source_chain
-            ).build_transaction({
-                'from': oracle_address,
-                'gas': self.config['blockchain']['gas_limit'],
-                'gasPrice': gas_price,
-                'nonce': nonce
-            })
-
-            # 签名交易
-            signed_txn = w3.eth.account.sign_transaction(transaction, oracle_private_key)
-
-            # 发送交易
-            tx_hash = w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            self.logger.info(f"交易已发送: {tx_hash.hex()}")
-
-            # 等待确认
-            receipt = w3.eth.wait_for_transaction_receipt(
-                tx_hash,
-                timeout=self.config['blockchain']['tx_timeout']
             )
+            tx_hash, receipt = await run_in_thread(self._send_oracle_transaction, target_chain, function_call)
 
             if receipt['status'] == 1:
                 self.logger.info(
@@ -335,6 +326,88 @@ class VCTransferOracle:
             self.logger.error(f"写入目标链异常: {e}")
             return False
 
+    def _send_oracle_transaction(self, chain_name: str, function_call):
+        """
+        使用Oracle账户签名并发送交易，等待回执（阻塞，在线程池中调用）
+
+        gas limit 取自Gas估算缓存，估算失败时使用配置的 gas_limit；
+        同一链的交易持有发送锁直到回执返回（nonce读取的是已确认的交易数）
+
+        返回:
+            (交易哈希, 回执)
+        """
+        with self._tx_locks.setdefault(chain_name, threading.Lock()):
+            return self._send_oracle_transaction_locked(chain_name, function_call)
+
+    def _send_oracle_transaction_locked(self, chain_name: str, function_call):
+        """_send_oracle_transaction 的实现（调用方持有该链的发送锁）"""
+        w3 = self.connections[chain_name]['web3'].w3
+        oracle_address = Web3.to_checksum_address(self.config['oracle']['address'])
+        oracle_private_key = self.config['oracle']['private_key']
+
+        nonce = w3.eth.get_transaction_count(oracle_address)
+        gas_limit = self.gas_cache.gas_limit(
+            function_call, oracle_address, fallback=self.config['blockchain']['gas_limit']
+        )
+        transaction = function_call.build_transaction({
+            'from': oracle_address,
+            'gas': gas_limit,
+            'gasPrice': self.config['blockchain']['gas_price'],
+            'nonce': nonce
+        })
+
+        # 签名并发送交易
+        signed_txn = w3.eth.account.sign_transaction(transaction, oracle_private_key)
+        tx_hash = w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        self.gas_cache.track(tx_hash.hex(), function_call, gas_limit)
+        self.logger.info(f"交易已发送: {tx_hash.hex()} (gas={gas_limit})")
+
+        # 等待确认
+        receipt = w3.eth.wait_for_transaction_receipt(
+            tx_hash,
+            timeout=self.config['blockchain']['tx_timeout']
+        )
+        self.gas_cache.observe_receipt(tx_hash.hex(), receipt)
+        return tx_hash, receipt
+
+    async def _acknowledge_send(self, source_chain: str, vc_hash: bytes) -> bool:
+        """在源链Bridge将VC发送状态标记为Completed（移出待确认集合），失败不影响传输结果"""
+        if not self.acknowledge_sends:
+            return False
+        try:
+            bridge = self.connections[source_chain]['bridge']
+            function_call = bridge.functions.updateSendStatus(vc_hash, TRANSFER_STATUS_COMPLETED)
+            tx_hash, receipt = await run_in_thread(self._send_oracle_transaction, source_chain, function_call)
+            if receipt['status'] == 1:
+                self.logger.info(f"源链 {source_chain} 发送状态已确认: {vc_hash.hex()}")
+                return True
+            self.logger.warning(f"源链 {source_chain} 发送状态确认失败: tx={tx_hash.hex()}")
+        except Exception as e:
+            self.logger.warning(f"源链 {source_chain} 发送状态确认异常（VC {vc_hash.hex()}）: {e}")
+        return False
+
+    def _read_pending_sends(self, chain_name: str) -> Tuple[List[bytes], bool]:
+        """
+        读取源链Bridge中待确认的VC Hash（分页读取 getPendingRange）
+
+        旧版Bridge合约没有待确认集合时，回退到完整的 getSendListIndexes
+
+        返回:
+            (VC Hash列表, 是否读取的是待确认集合)
+        """
+        bridge = self.connections[chain_name]['bridge']
+        try:
+            total = bridge.functions.getPendingCount().call()
+        except Exception as e:
+            self.logger.warning(f"{chain_name} Bridge不支持待确认集合（旧版合约），读取完整sendList: {e}")
+            return bridge.functions.getSendListIndexes().call(), False
+
+        # 先读取全部分页再处理：确认发送状态会改变集合中元素的位置
+        pending = []
+        for offset in range(0, total, self.pending_page_size):
+            pending.extend(bridge.functions.getPendingRange(offset, self.pending_page_size).call())
+        return list(dict.fromkeys(pending)), True
+
     async def _handle_vc_sent_event(self, event, source_chain: str):
         """处理VCSent事件"""
         try:
@@ -388,6 +461,7 @@ class VCTransferOracle:
 
             if success:
                 self._mark_as_processed(vc_hash, source_chain)
+                await self._acknowledge_send(source_chain, vc_hash)
                 self.logger.info(
                     f"✅ VC跨链传输完成: "
                     f"{vc_hash.hex()}, "
@@ -475,24 +549,22 @@ class VCTransferOracle:
     async def _scan_pending_vcs(self, chain_name: str):
         """启动时扫描未传输的历史遗留 VC
 
-        此方法检查源链 sendList 中的所有 VC，找出尚未传输到目标链的 VC，
-        并触发跨链传输。这解决了 Oracle 启动时错过历史事件的问题。
+        此方法检查源链 Bridge 待确认集合中的 VC（尚未标记 Completed 的发送记录），
+        找出尚未传输到目标链的 VC，并触发跨链传输。这解决了 Oracle 启动时错过历史事件的问题。
+        已传输的 VC 在源链确认发送状态，扫描工作量只与实际积压有关。
         """
         try:
-            chain_data = self.connections[chain_name]
-            bridge = chain_data['bridge']
-
             self.logger.info(f"开始扫描 {chain_name} 的历史遗留 VC...")
 
-            # 获取源链 sendList 中的所有 VC 哈希
-            send_list_indexes = bridge.functions.getSendListIndexes().call()
+            # 获取源链待确认的 VC 哈希
+            send_list_indexes, pending_only = self._read_pending_sends(chain_name)
             send_count = len(send_list_indexes)
 
             if send_count == 0:
-                self.logger.info(f"{chain_name} sendList 为空，无需扫描")
+                self.logger.info(f"{chain_name} 没有待确认的 VC，无需扫描")
                 return
 
-            self.logger.info(f"{chain_name} sendList 中有 {send_count} 个 VC")
+            self.logger.info(f"{chain_name} 有 {send_count} 个待确认的 VC")
 
             # 检查每个 VC 是否需要传输
             pending_count = 0
@@ -502,6 +574,9 @@ class VCTransferOracle:
                 # 检查是否已在 processed_cache 中
                 if self._is_processed(vc_hash_bytes, chain_name):
                     self.logger.debug(f"VC {vc_hash_hex} 已在处理缓存中，跳过")
+                    if pending_only:
+                        # 已传输但发送状态未确认（如确认交易失败），补充确认
+                        await self._acknowledge_send(chain_name, vc_hash_bytes)
                     continue
 
                 # 获取 VC 元数据（包含目标链信息）
@@ -533,6 +608,7 @@ class VCTransferOracle:
                     if already_received:
                         self.logger.debug(f"VC {vc_hash_hex} 已在目标链 {target_chain_key} 中，跳过")
                         self._mark_as_processed(vc_hash_bytes, chain_name)
+                        await self._acknowledge_send(chain_name, vc_hash_bytes)
                         continue
                 except Exception as e:
                     self.logger.debug(f"检查目标链接收状态失败: {e}，继续处理")
@@ -548,6 +624,7 @@ class VCTransferOracle:
 
                 if success:
                     self._mark_as_processed(vc_hash_bytes, chain_name)
+                    await self._acknowledge_send(chain_name, vc_hash_bytes)
                     self.logger.info(
                         f"✅ 历史遗留 VC 传输完成: "
                         f"{vc_hash_hex}, "
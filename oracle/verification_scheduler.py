@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VP验证准入控制调度器
+限制全局并发与每个Holder的并发，超出部分进入有界等待队列，
+队列满时快速拒绝（HTTP 429 + Retry-After），并在Holder之间轮询公平调度
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# holder_did 未提供时使用的默认键（所有请求共用同一个Holder代理）
+DEFAULT_HOLDER_KEY = "default"
+
+
+class SchedulerRejectedError(Exception):
+    """调度器拒绝请求（队列已满或排队超时）"""
+
+    def __init__(self, message: str, retry_after: int, status_code: int = 429):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class VerificationScheduler:
+    """
+    VP验证调度器
+
+    负责：
+    - 全局并发上限（max_concurrent）
+    - 每个Holder DID的并发上限（per_holder_limit）
+    - 有界等待队列（max_queue_size），满时立即拒绝
+    - 排队超时（queue_timeout_seconds）
+    - 有空闲槽位时在有排队请求的Holder之间轮询分配
+
+    所有方法都应在同一个事件循环中调用。
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        per_holder_limit: int = 4,
+        max_queue_size: int = 64,
+        queue_timeout_seconds: float = 30,
+        retry_after_seconds: int = 5
+    ):
+        """
+        初始化调度器
+
+        参数:
+            max_concurrent: 全局最大并发验证数
+            per_holder_limit: 每个Holder的最大并发验证数
+            max_queue_size: 等待队列最大长度（所有Holder合计）
+            queue_timeout_seconds: 排队等待超时（秒）
+            retry_after_seconds: 拒绝时建议的最小重试间隔（秒）
+        """
+        self.max_concurrent = max_concurrent
+        self.per_holder_limit = per_holder_limit
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout_seconds
+        self.retry_after = retry_after_seconds
+
+        # 运行中计数
+        self._active_total = 0
+        self._active_by_holder: Dict[str, int] = {}
+
+        # 等待队列: holder_key -> deque[Future]，以及轮询顺序
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._round_robin: Deque[str] = deque()
+        self._queued_total = 0
+
+        # 平均执行时长（指数滑动平均，用于估算Retry-After）
+        self._avg_duration: Optional[float] = None
+
+        # 统计
+        self._stats = {
+            "admitted": 0,
+            "total_queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "completed": 0
+        }
+
+        logger.info(
+            f"验证调度器初始化完成: 全局并发={max_concurrent}, "
+            f"每Holder并发={per_holder_limit}, 队列上限={max_queue_size}"
+        )
+
+    @classmethod
+    def from_config(cls, scheduler_config: Dict) -> "VerificationScheduler":
+        """从 service.scheduler 配置段创建调度器"""
+        return cls(
+            max_concurrent=scheduler_config.get('max_concurrent', 16),
+            per_holder_limit=scheduler_config.get('per_holder_limit', 4),
+            max_queue_size=scheduler_config.get('max_queue_size', 64),
+            queue_timeout_seconds=scheduler_config.get('queue_timeout_seconds', 30),
+            retry_after_seconds=scheduler_config.get('retry_after_seconds', 5)
+        )
+
+    def _can_run(self, holder_key: str) -> bool:
+        """检查是否有空闲的全局槽位和Holder槽位"""
+        return (
+            self._active_total < self.max_concurrent and
+            self._active_by_holder.get(holder_key, 0) < self.per_holder_limit
+        )
+
+    def _grant(self, holder_key: str):
+        """占用一个槽位"""
+        self._active_total += 1
+        self._active_by_holder[holder_key] = self._active_by_holder.get(holder_key, 0) + 1
+        self._stats["admitted"] += 1
+
+    def _estimate_retry_after(self) -> int:
+        """根据排队长度和平均执行时长估算Retry-After（秒）"""
+        if not self._avg_duration:
+            return self.retry_after
+        estimate = self._avg_duration * (self._queued_total + 1) / max(self.max_concurrent, 1)
+        return max(self.retry_after, int(math.ceil(estimate)))
+
+    async def acquire(self, holder_key: Optional[str] = None):
+        """
+        获取执行槽位
+
+        参数:
+            holder_key: Holder DID（None使用默认键）
+
+        异常:
+            SchedulerRejectedError: 队列已满（429）或排队超时（503）
+        """
+        holder_key = holder_key or DEFAULT_HOLDER_KEY
+
+        # 没有人排队时直接放行；有人排队时新请求也要排队，保证公平
+        if self._queued_total == 0 and self._can_run(holder_key):
+            self._grant(holder_key)
+            return
+
+        if self._queued_total >= self.max_queue_size:
+            self._stats["rejected_queue_full"] += 1
+            retry_after = self._estimate_retry_after()
+            logger.warning(
+                f"验证队列已满（{self._queued_total}/{self.max_queue_size}），"
+                f"拒绝请求 holder={holder_key}, Retry-After={retry_after}秒"
+            )
+            raise SchedulerRejectedError("验证请求过多，队列已满", retry_after, status_code=429)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(holder_key, deque()).append(future)
+        if holder_key not in self._round_robin:
+            self._round_robin.append(holder_key)
+        self._queued_total += 1
+        self._stats["total_queued"] += 1
+        logger.debug(f"验证请求进入队列: holder={holder_key}, 队列长度={self._queued_total}")
+
+        # 入队后立即尝试分配（可能恰好有空闲槽位）
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._remove_waiter(holder_key, future)
+            self._stats["rejected_timeout"] += 1
+            logger.warning(f"验证请求排队超时（{self.queue_timeout}秒）: holder={holder_key}")
+            raise SchedulerRejectedError(
+                f"验证请求排队超时（{self.queue_timeout}秒）",
+                self._estimate_retry_after(),
+                status_code=503
+            )
+        except asyncio.CancelledError:
+            # 已分配槽位但调用方被取消：归还槽位
+            if future.done() and not future.cancelled():
+                self.release(holder_key)
+            else:
+                self._remove_waiter(holder_key, future)
+            raise
+
+    def release(self, holder_key: Optional[str] = None, duration: Optional[float] = None):
+        """
+        释放执行槽位并调度下一个等待者
+
+        参数:
+            holder_key: Holder DID（None使用默认键）
+            duration: 本次执行时长（秒），用于估算Retry-After
+        """
+        holder_key = holder_key or DEFAULT_HOLDER_KEY
+
+        self._active_total = max(0, self._active_total - 1)
+        remaining = self._active_by_holder.get(holder_key, 0) - 1
+        if remaining > 0:
+            self._active_by_holder[holder_key] = remaining
+        else:
+            self._active_by_holder.pop(holder_key, None)
+
+        if duration is not None:
+            self._stats["completed"] += 1
+            if self._avg_duration is None:
+                self._avg_duration = duration
+            else:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+
+        self._dispatch()
+
+    def _remove_waiter(self, holder_key: str, future: asyncio.Future):
+        """从等待队列中移除（超时或取消）"""
+        waiters = self._waiters.get(holder_key)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            self._queued_total -= 1
+            if not waiters:
+                self._drop_holder_queue(holder_key)
+
+    def _drop_holder_queue(self, holder_key: str):
+        """Holder队列为空时移出轮询"""
+        self._waiters.pop(holder_key, None)
+        if holder_key in self._round_robin:
+            self._round_robin.remove(holder_key)
+
+    def _dispatch(self):
+        """按Holder轮询顺序把空闲槽位分配给等待者"""
+        idle_rounds = 0
+        while self._round_robin and self._active_total < self.max_concurrent:
+            holder_key = self._round_robin[0]
+            self._round_robin.rotate(-1)
+
+            if not self._can_run(holder_key):
+                idle_rounds += 1
+                if idle_rounds >= len(self._round_robin):
+                    # 所有排队的Holder都已达到各自上限
+                    break
+                continue
+
+            waiters = self._waiters.get(holder_key)
+            granted = False
+            while waiters:
+                future = waiters.popleft()
+                self._queued_total -= 1
+                if not future.done():
+                    self._grant(holder_key)
+                    future.set_result(True)
+                    granted = True
+                    break
+            if not waiters:
+                self._drop_holder_queue(holder_key)
+
+            idle_rounds = 0 if granted else idle_rounds + 1
+
+    @asynccontextmanager
+    async def slot(self, holder_key: Optional[str] = None):
+        """
+        以上下文管理器方式占用槽位
+
+        用法:
+            async with scheduler.slot(holder_did):
+                ...
+        """
+        await self.acquire(holder_key)
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(holder_key, duration=time.monotonic() - start_time)
+
+    def get_stats(self) -> Dict:
+        """
+        获取调度器统计信息
+
+        返回:
+            统计字典
+        """
+        return {
+            "max_concurrent": self.max_concurrent,
+            "per_holder_limit": self.per_holder_limit,
+            "max_queue_size": self.max_queue_size,
+            "active": self._active_total,
+            "active_by_holder": dict(self._active_by_holder),
+            "queued": self._queued_total,
+            "avg_duration_seconds": round(self._avg_duration, 2) if self._avg_duration else None,
+            **self._stats
+        }
@@ -470,18 +470,26 @@ def progress_monitor(
 # ============================================================================
 # 加载测试数据
 # ============================================================================
-def load_vc_hashes(uuid_path: Path, vc_type: str, limit: int = None) -> List[str]:
+def load_vc_hashes(registry_path: Path, uuid_path: Path, vc_type: str, limit: int = None) -> List[str]:
     """
-    从uuid.json加载指定类型的VC哈希
+    从UUID登记表加载指定类型的VC哈希（登记表不存在时读取uuid.json）
 
     Args:
-        uuid_path: uuid.json文件路径
+        registry_path: UUID登记表路径
+        uuid_path: 登记表不存在时读取的uuid.json路径
         vc_type: VC类型
         limit: 最多返回的哈希数量
 
     Returns:
         VC哈希列表
     """
+    # 登记表按类型索引查询，无需解析整个uuid.json
+    if Path(registry_path).exists():
+        sys.path.insert(0, str(Path(__file__).parent.parent / "VcIssureOracle"))
+        from uuid_registry import UUIDRegistry
+        records = UUIDRegistry(str(registry_path)).query(vc_type=vc_type, limit=limit, descending=False)
+        return [record['vc_hash'] for record in records]
+
     try:
         with open(uuid_path, 'r', encoding='utf-8') as f:
             uuid_data = json.load(f)
@@ -580,18 +588,25 @@ def main():
         help='Oracle服务URL (默认: http://localhost:7002)'
     )
 
+    parser.add_argument(
+        '--registry',
+        type=str,
+        default=None,
+        help='UUID登记表路径 (默认: VcIssureOracle/logs/uuid_registry.db)'
+    )
+
     parser.add_argument(
         '--uuid-path',
         type=str,
         default=None,
-        help='uuid.json文件路径 (默认: oracle/logs/uuid.json)'
+        help='登记表不存在时读取的uuid.json路径 (默认: VcIssureOracle/logs/uuid.json)'
     )
 
     parser.add_argument(
         '--vc-hash',
         type=str,
         default=None,
-        help='指定单个VC哈希进行测试（覆盖uuid.json）'
+        help='指定单个VC哈希进行测试（不读取登记表）'
     )
 
     parser.add_argument(
@@ -629,9 +644,12 @@ def main():
 
     args = parser.parse_args()
 
-    # 确定uuid路径
+    # 确定登记表和uuid路径（发行Oracle写在 VcIssureOracle/logs 下）
+    issuer_logs_dir = Path(__file__).parent.parent / "VcIssureOracle" / "logs"
+    if args.registry is None:
+        args.registry = str(issuer_logs_dir / "uuid_registry.db")
     if args.uuid_path is None:
-        args.uuid_path = str(Path(__file__).parent / "logs" / "uuid.json")
+        args.uuid_path = str(issuer_logs_dir / "uuid.json")
 
     # 初始化输出
     output = TerminalOutput(quiet=args.quiet)
@@ -644,10 +662,10 @@ def main():
     if args.vc_hash:
         vc_hashes = [args.vc_hash]
     else:
-        vc_hashes = load_vc_hashes(Path(args.uuid_path), args.vc_type)
+        vc_hashes = load_vc_hashes(Path(args.registry), Path(args.uuid_path), args.vc_type)
         if not vc_hashes:
             output.print_error(f"未找到 {args.vc_type} 类型的VC哈希")
-            output.print_error(f"请检查 {args.uuid_path} 文件或使用 --vc-hash 指定哈希")
+            output.print_error(f"请检查 {args.registry}（或 {args.uuid_path}）或使用 --vc-hash 指定哈希")
             return 1
 
     total_requests = args.processes * args.iterations
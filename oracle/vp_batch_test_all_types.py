@@ -20,6 +20,12 @@ from typing import Dict, List, Optional
 
 import requests
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "VcIssureOracle"))
+from uuid_registry import load_uuid_records
+
+# 发行Oracle的UUID登记表和旧的uuid.json（VcIssureOracle/logs）
+ISSUER_LOGS_DIR = Path(__file__).parent.parent / "VcIssureOracle" / "logs"
+
 
 # ============================================================================
 # 终端颜色类
@@ -66,15 +72,12 @@ VC_TYPES_CONFIG = {
 # ============================================================================
 # 数据加载函数
 # ============================================================================
-def load_uuid_data(uuid_path: Path) -> Dict:
-    """加载uuid.json数据"""
+def load_uuid_data(registry_path: Path, uuid_path: Path) -> Dict:
+    """加载发行记录（优先读取UUID登记表，不存在时读取uuid.json）"""
     try:
-        if uuid_path.exists():
-            with open(uuid_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        return load_uuid_records(str(registry_path), str(uuid_path))
     except Exception as e:
-        print(f"{Colors.RED}警告: 无法加载uuid.json: {e}{Colors.END}")
+        print(f"{Colors.RED}警告: 无法加载发行记录: {e}{Colors.END}")
         return {}
 
 
@@ -591,11 +594,18 @@ def main():
         help='Oracle服务URL (默认: http://localhost:7002)'
     )
 
+    parser.add_argument(
+        '--registry',
+        type=str,
+        default=None,
+        help='UUID登记表路径 (默认: VcIssureOracle/logs/uuid_registry.db)'
+    )
+
     parser.add_argument(
         '--uuid-path',
         type=str,
         default=None,
-        help='uuid.json文件路径 (默认: oracle/logs/uuid.json)'
+        help='登记表不存在时读取的uuid.json路径 (默认: VcIssureOracle/logs/uuid.json)'
     )
 
     parser.add_argument(
@@ -626,9 +636,11 @@ def main():
 
     args = parser.parse_args()
 
-    # 确定uuid路径
+    # 确定登记表和uuid路径
+    if args.registry is None:
+        args.registry = str(ISSUER_LOGS_DIR / "uuid_registry.db")
     if args.uuid_path is None:
-        args.uuid_path = str(Path(__file__).parent / "logs" / "uuid.json")
+        args.uuid_path = str(ISSUER_LOGS_DIR / "uuid.json")
 
     # 初始化输出
     output = TerminalOutput(quiet=args.quiet)
@@ -637,9 +649,9 @@ def main():
     output.print_header("VP验证批量性能测试 - 4种VC类型组合验证")
 
     # 加载VC哈希数据
-    uuid_data = load_uuid_data(Path(args.uuid_path))
+    uuid_data = load_uuid_data(Path(args.registry), Path(args.uuid_path))
     if not uuid_data:
-        output.print_error(f"无法加载uuid.json: {args.uuid_path}")
+        output.print_error(f"无法加载发行记录: {args.registry}（或 {args.uuid_path}）")
         return 1
 
     vc_hashes = get_all_vc_hashes(uuid_data)
@@ -8,15 +8,21 @@ VP验证Oracle服务主类
 import asyncio
 import json
 import logging
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, List, Any
 
 from acapy_client import ACAPyClient, ACAPyClientError
+from http_session_pool import close_all_sessions, configure_session_pool
+from circuit_breaker import configure_resilience
 from connection_manager import ConnectionManager, ConnectionManagerError
 from proof_request_builder import ProofRequestBuilder
 from blockchain_client import BlockchainClient
+from concurrency import gather_or_cancel, run_in_thread
+from verification_scheduler import VerificationScheduler
+from presentation_reaper import PresentationReaper
 
 
 logger = logging.getLogger(__name__)
@@ -45,6 +51,9 @@ class VPOracleService:
         logger.info("=" * 70)
 
         # 加载配置
+        self.config_path = config_path
+        self._config_mtime = self._get_config_mtime()
+        self._last_config_check = 0.0
         self.config = self._load_config(config_path)
         self.service_config = self.config.get('service', {})
         self.acapy_config = self.config.get('acapy', {})
@@ -56,7 +65,9 @@ class VPOracleService:
             vc_config=self.vc_config
         )
 
-        # 初始化 ACA-Py 客户端
+        # 初始化 ACA-Py 客户端（共享进程级HTTP连接池）
+        configure_session_pool(self.service_config.get('http_pool', {}))
+        configure_resilience(self.service_config.get('acapy_resilience', {}))
         verifier_config = self.acapy_config.get('verifier', {})
         holder_config = self.acapy_config.get('holder', {})
 
@@ -78,6 +89,21 @@ class VPOracleService:
         # 服务配置
         self.default_timeout = self.service_config.get('default_timeout_seconds', 120)
 
+        # 准入控制调度器（全局/每Holder并发限制 + 有界等待队列）
+        self.scheduler = VerificationScheduler.from_config(self.service_config.get('scheduler', {}))
+
+        # Presentation记录回收器（Verifier与Holder钱包）
+        gc_config = self.service_config.get('presentation_gc', {})
+        self.presentation_reaper: Optional[PresentationReaper] = None
+        if gc_config.get('enabled', True):
+            self.presentation_reaper = PresentationReaper.from_config(
+                clients={
+                    'verifier': self.verifier_client,
+                    'holder': self.connection_manager.holder_client
+                },
+                gc_config=gc_config
+            )
+
         logger.info(f"验证者DID: {verifier_config.get('did')}")
         logger.info(f"支持的VC类型: {list(self.vc_config.keys())}")
         logger.info(f"区块链连接: {self.blockchain_client.is_connected()}")
@@ -96,20 +122,70 @@ class VPOracleService:
             logger.error(f"配置文件 {config_file} 加载失败: {e}")
             return {}
 
+    def _get_config_mtime(self) -> Optional[float]:
+        """获取配置文件修改时间（文件不存在时返回None）"""
+        try:
+            return (Path(__file__).parent / self.config_path).stat().st_mtime
+        except OSError:
+            return None
+
+    def _reload_config_if_changed(self):
+        """
+        配置文件变化时重新加载VC类型配置并重建证明请求模板
+
+        检查间隔由 service.config_reload_check_seconds 控制（默认5秒）
+        """
+        now = time.monotonic()
+        if now - self._last_config_check < self.service_config.get('config_reload_check_seconds', 5):
+            return
+        self._last_config_check = now
+
+        mtime = self._get_config_mtime()
+        if mtime is None or mtime == self._config_mtime:
+            return
+
+        config = self._load_config(self.config_path)
+        if not config:
+            return
+
+        self._config_mtime = mtime
+        self.config = config
+        self.vc_config = config.get('vc_types', {})
+        self.proof_request_builder.reload(self.vc_config)
+        logger.info(f"检测到配置文件变化，已重新加载VC类型: {list(self.vc_config.keys())}")
+
     async def start(self):
         """启动服务"""
         await self.connection_manager.start()
+        if self.presentation_reaper:
+            await self.presentation_reaper.start()
         logger.info("VP验证Oracle服务已启动")
 
     async def stop(self):
         """停止服务"""
+        if self.presentation_reaper:
+            await self.presentation_reaper.stop()
         await self.connection_manager.stop()
         await self.verifier_client.close()
+        await close_all_sessions()
         logger.info("VP验证Oracle服务已停止")
 
     async def verify_vc(self, vc_type: str, vc_hash: str, requested_attributes: List[str],
                        holder_did: Optional[str] = None) -> Dict:
         """
+        执行VC验证（经调度器准入控制）
+
+        参数与返回值同 _run_verification
+
+        异常:
+            SchedulerRejectedError: 队列已满或排队超时（由API层转换为429/503）
+        """
+        async with self.scheduler.slot(holder_did):
+            return await self._run_verification(vc_type, vc_hash, requested_attributes, holder_did)
+
+    async def _run_verification(self, vc_type: str, vc_hash: str, requested_attributes: List[str],
+                                holder_did: Optional[str] = None) -> Dict:
+        """
         执行VC验证（7个阶段）
 
         参数:
@@ -129,6 +205,8 @@ class VPOracleService:
             - revealed_attributes: 揭示的属性
             - error: 错误信息（失败时）
         """
+        self._reload_config_if_changed()
+
         verification_id = str(uuid.uuid4())
         logger.info(f"[{verification_id}] 开始VP验证流程")
         logger.info(f"[{verification_id}] VC类型: {vc_type}")
@@ -138,7 +216,7 @@ class VPOracleService:
         start_time = datetime.now()
 
         try:
-            # 阶段1: 准备阶段 - 验证输入，从区块链获取UUID，获取/创建连接
+            # 阶段1: 准备阶段 - 验证输入，并发执行UUID查询、获取/创建连接、构造请求模板
             logger.info(f"[{verification_id}] 阶段1: 准备阶段")
             phase1_result = await self._phase1_preparation(
                 verification_id, vc_type, vc_hash, requested_attributes, holder_did
@@ -213,62 +291,81 @@ class VPOracleService:
             if attr not in vc_attrs:
                 raise ValueError(f"属性 {attr} 不在VC类型 {vc_type} 中")
 
-        # 从区块链获取UUID
+        # 以下三项互不依赖，并发执行；任一失败时取消其余任务
+        # - 从区块链获取UUID（同步Web3调用，放入线程池）
+        # - 获取或创建连接（使用 ConnectionManager 原有逻辑）
+        # - 构造证明请求模板（不含UUID过滤，阶段2补充）
+        logger.info(f"[{verification_id}] 并发执行: 区块链UUID查询 / 获取连接 / 构造请求模板")
+        expected_uuid, connection_id, proof_request_template = await gather_or_cancel(
+            self._lookup_expected_uuid(verification_id, vc_type, vc_hash),
+            self._acquire_connection(verification_id, holder_did),
+            self._build_proof_request_template(vc_type, requested_attributes)
+        )
+
+        return {
+            'connection_id': connection_id,
+            'vc_type': vc_type,
+            'requested_attributes': requested_attributes,
+            'proof_request_template': proof_request_template,
+            '_expected_uuid': expected_uuid
+        }
+
+    async def _lookup_expected_uuid(self, verification_id: str, vc_type: str,
+                                    vc_hash: str) -> str:
+        """从区块链获取UUID（阶段1子任务）"""
         logger.info(f"[{verification_id}] 从区块链查询UUID...")
-        expected_uuid = self.blockchain_client.get_vc_uuid(vc_type, vc_hash)
+        expected_uuid = await run_in_thread(self.blockchain_client.get_vc_uuid, vc_type, vc_hash)
         if not expected_uuid:
             raise ValueError(f"无法从区块链获取 vc_hash={vc_hash} 对应的UUID")
 
         logger.info(f"[{verification_id}] 从区块链提取UUID: {expected_uuid}")
+        return expected_uuid
 
-        # 获取或创建连接（使用 ConnectionManager 原有逻辑）
+    async def _acquire_connection(self, verification_id: str,
+                                  holder_did: Optional[str]) -> str:
+        """获取或创建与Holder的连接（阶段1子任务）"""
         logger.info(f"[{verification_id}] 获取/创建连接...")
         connection_id = await self.connection_manager.get_or_create_connection(holder_did)
         if not connection_id:
             raise ConnectionError("无法建立与Holder的连接")
 
         logger.info(f"[{verification_id}] 使用连接: {connection_id}")
+        return connection_id
 
-        return {
-            'connection_id': connection_id,
-            'vc_type': vc_type,
-            'requested_attributes': requested_attributes,
-            '_expected_uuid': expected_uuid
-        }
+    async def _build_proof_request_template(self, vc_type: str,
+                                            requested_attributes: List[str]) -> Dict:
+        """
+        获取证明请求模板（阶段1子任务）
+
+        UUID在阶段1结束前不可用，因此模板不含contractName值过滤，
+        由阶段2通过 instantiate_proof_request 补充UUID过滤和nonce。
+        """
+        requested_attributes = requested_attributes.copy()
+
+        # 确保contractName在请求属性中（用于UUID匹配）
+        if 'contractName' not in requested_attributes:
+            requested_attributes.append('contractName')
+            logger.info("自动添加 contractName 到请求属性（用于UUID匹配）")
+
+        return self.proof_request_builder.get_proof_request_template(
+            vc_type=vc_type,
+            requested_attributes=requested_attributes
+        )
 
     async def _phase2_construct_proof_request(self, phase1_result: Dict) -> Dict:
-        """阶段2: 构造证明请求"""
-        vc_type = phase1_result['vc_type']
-        requested_attributes = phase1_result['requested_attributes'].copy()
+        """阶段2: 构造证明请求（由阶段1的模板补充UUID过滤和nonce）"""
         expected_uuid = phase1_result.get('_expected_uuid')
 
-        # 构造属性值过滤器（如果有expected_uuid）
+        # 添加UUID值过滤，确保Holder选择正确的VC
         attribute_filters = None
         if expected_uuid:
-            # 确保contractName在请求属性中
-            if 'contractName' not in requested_attributes:
-                requested_attributes.append('contractName')
-                logger.info("自动添加 contractName 到请求属性（用于UUID匹配）")
-
-            # 添加UUID值过滤，确保Holder选择正确的VC
             attribute_filters = {'contractName': expected_uuid}
             logger.info(f"添加contractName值过滤: {expected_uuid}")
 
-        # 构造证明请求
-        if vc_type == 'InspectionReport':
-            proof_request = self.proof_request_builder.build_inspection_report_request(
-                requested_attributes=requested_attributes,
-                name=f"验证{vc_type}",
-                version="1.0",
-                attribute_filters=attribute_filters
-            )
-        else:
-            proof_request = self.proof_request_builder.build_custom_proof_request(
-                vc_type=vc_type,
-                requested_attributes=requested_attributes,
-                name=f"验证{vc_type}",
-                attribute_filters=attribute_filters
-            )
+        proof_request = self.proof_request_builder.instantiate_proof_request(
+            phase1_result['proof_request_template'],
+            attribute_filters
+        )
 
         logger.debug(f"证明请求: {proof_request['name']}")
 
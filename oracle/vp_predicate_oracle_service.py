@@ -16,15 +16,20 @@ VP谓词验证Oracle服务
 import asyncio
 import json
 import logging
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, List, Any
 
 from acapy_client import ACAPyClient, ACAPyClientError
+from http_session_pool import close_all_sessions, configure_session_pool
+from circuit_breaker import configure_resilience
 from connection_manager import ConnectionManager, ConnectionManagerError
 from predicate_proof_builder import PredicateProofBuilder, PredicateProofBuilderError
 from blockchain_client import BlockchainClient
+from concurrency import gather_or_cancel, run_in_thread
+from verification_scheduler import VerificationScheduler
 
 
 logger = logging.getLogger(__name__)
@@ -53,6 +58,9 @@ class VPPredicateOracleService:
         logger.info("=" * 70)
 
         # 加载配置
+        self.config_path = config_path
+        self._config_mtime = self._get_config_mtime()
+        self._last_config_check = 0.0
         self.config = self._load_config(config_path)
         self.service_config = self.config.get('service', {})
         self.acapy_config = self.config.get('acapy', {})
@@ -65,7 +73,9 @@ class VPPredicateOracleService:
             vc_config=self.vc_config
         )
 
-        # 初始化 ACA-Py 客户端
+        # 初始化 ACA-Py 客户端（共享进程级HTTP连接池）
+        configure_session_pool(self.service_config.get('http_pool', {}))
+        configure_resilience(self.service_config.get('acapy_resilience', {}))
         verifier_config = self.acapy_config.get('verifier', {})
         holder_config = self.acapy_config.get('holder', {})
 
@@ -87,6 +97,9 @@ class VPPredicateOracleService:
         # 服务配置
         self.default_timeout = self.service_config.get('default_timeout_seconds', 120)
 
+        # 准入控制调度器（全局/每Holder并发限制 + 有界等待队列）
+        self.scheduler = VerificationScheduler.from_config(self.service_config.get('scheduler', {}))
+
         logger.info(f"验证者DID: {verifier_config.get('did')}")
         logger.info(f"支持的VC类型: {list(self.vc_config.keys())}")
         logger.info(f"已配置谓词策略: {list(self.predicate_policies.keys())}")
@@ -106,6 +119,39 @@ class VPPredicateOracleService:
             logger.error(f"配置文件 {config_file} 加载失败: {e}")
             return {}
 
+    def _get_config_mtime(self) -> Optional[float]:
+        """获取配置文件修改时间（文件不存在时返回None）"""
+        try:
+            return (Path(__file__).parent / self.config_path).stat().st_mtime
+        except OSError:
+            return None
+
+    def _reload_config_if_changed(self):
+        """
+        配置文件变化时重新加载VC类型配置和谓词策略，并重建预编译模板
+
+        检查间隔由 service.config_reload_check_seconds 控制（默认5秒）
+        """
+        now = time.monotonic()
+        if now - self._last_config_check < self.service_config.get('config_reload_check_seconds', 5):
+            return
+        self._last_config_check = now
+
+        mtime = self._get_config_mtime()
+        if mtime is None or mtime == self._config_mtime:
+            return
+
+        config = self._load_config(self.config_path)
+        if not config:
+            return
+
+        self._config_mtime = mtime
+        self.config = config
+        self.vc_config = config.get('vc_types', {})
+        self.predicate_policies = config.get('predicate_policies', {})
+        self.predicate_builder.reload(self.vc_config, self.predicate_policies)
+        logger.info(f"检测到配置文件变化，已重新加载谓词策略: {list(self.predicate_policies.keys())}")
+
     async def start(self):
         """启动服务"""
         await self.connection_manager.start()
@@ -115,6 +161,7 @@ class VPPredicateOracleService:
         """停止服务"""
         await self.connection_manager.stop()
         await self.verifier_client.close()
+        await close_all_sessions()
         logger.info("VP谓词验证Oracle服务已停止")
 
     async def verify_with_predicates(
@@ -125,6 +172,32 @@ class VPPredicateOracleService:
         custom_predicates: Optional[Dict[str, Dict]] = None,
         custom_attribute_restrictions: Optional[Dict[str, Dict]] = None,
         holder_did: Optional[str] = None
+    ) -> Dict:
+        """
+        使用谓词验证VC（经调度器准入控制）
+
+        参数与返回值同 _run_predicate_verification
+
+        异常:
+            SchedulerRejectedError: 队列已满或排队超时（由API层转换为429/503）
+        """
+        async with self.scheduler.slot(holder_did):
+            return await self._run_predicate_verification(
+                vc_type, vc_hash,
+                attributes_to_reveal=attributes_to_reveal,
+                custom_predicates=custom_predicates,
+                custom_attribute_restrictions=custom_attribute_restrictions,
+                holder_did=holder_did
+            )
+
+    async def _run_predicate_verification(
+        self,
+        vc_type: str,
+        vc_hash: str,
+        attributes_to_reveal: Optional[List[str]] = None,
+        custom_predicates: Optional[Dict[str, Dict]] = None,
+        custom_attribute_restrictions: Optional[Dict[str, Dict]] = None,
+        holder_did: Optional[str] = None
     ) -> Dict:
         """
         使用谓词验证VC
@@ -164,6 +237,8 @@ class VPPredicateOracleService:
                 "duration_seconds": 1.23
             }
         """
+        self._reload_config_if_changed()
+
         verification_id = str(uuid.uuid4())
         logger.info(f"[{verification_id}] 开始VP谓词验证流程")
         logger.info(f"[{verification_id}] VC类型: {vc_type}")
@@ -177,18 +252,16 @@ class VPPredicateOracleService:
             # 阶段1: 准备阶段
             logger.info(f"[{verification_id}] 阶段1: 准备阶段")
             phase1_result = await self._phase1_preparation(
-                verification_id, vc_type, vc_hash, holder_did
-            )
-
-            # 阶段2: 构造谓词证明请求
-            logger.info(f"[{verification_id}] 阶段2: 构造谓词证明请求")
-            phase2_result = await self._phase2_build_predicate_request(
-                phase1_result,
+                verification_id, vc_type, vc_hash, holder_did,
                 attributes_to_reveal=attributes_to_reveal,
                 custom_predicates=custom_predicates,
                 custom_attribute_restrictions=custom_attribute_restrictions
             )
 
+            # 阶段2: 构造谓词证明请求
+            logger.info(f"[{verification_id}] 阶段2: 构造谓词证明请求")
+            phase2_result = await self._phase2_build_predicate_request(phase1_result)
+
             # 阶段3: 发送证明请求
             logger.info(f"[{verification_id}] 阶段3: 发送证明请求")
             phase3_result = await self._phase3_send_proof_request(
@@ -248,7 +321,10 @@ class VPPredicateOracleService:
         verification_id: str,
         vc_type: str,
         vc_hash: str,
-        holder_did: Optional[str]
+        holder_did: Optional[str],
+        attributes_to_reveal: Optional[List[str]] = None,
+        custom_predicates: Optional[Dict[str, Dict]] = None,
+        custom_attribute_restrictions: Optional[Dict[str, Dict]] = None
     ) -> Dict:
         """阶段1: 准备阶段"""
         # 验证VC类型
@@ -259,63 +335,77 @@ class VPPredicateOracleService:
         if not self._validate_vc_hash(vc_hash):
             raise ValueError("vc_hash格式无效，应为66位十六进制字符串（含0x前缀）")
 
-        # 从区块链获取UUID
+        # 以下三项互不依赖，并发执行；任一失败时取消其余任务
+        # - 从区块链获取UUID（同步Web3调用，放入线程池）
+        # - 获取或创建连接
+        # - 构造谓词证明请求模板（不含UUID过滤，阶段2补充）
+        logger.info(f"[{verification_id}] 并发执行: 区块链UUID查询 / 获取连接 / 构造请求模板")
+        expected_uuid, connection_id, template = await gather_or_cancel(
+            self._lookup_expected_uuid(verification_id, vc_type, vc_hash),
+            self._acquire_connection(verification_id, holder_did),
+            self._build_predicate_request_template(
+                vc_type,
+                attributes_to_reveal=attributes_to_reveal,
+                custom_predicates=custom_predicates,
+                custom_attribute_restrictions=custom_attribute_restrictions
+            )
+        )
+
+        return {
+            'connection_id': connection_id,
+            'vc_type': vc_type,
+            'vc_hash': vc_hash,
+            'proof_request_template': template['proof_request'],
+            'predicates_config': template['predicates_config'],
+            'attribute_restrictions_config': template['attribute_restrictions_config'],
+            '_expected_uuid': expected_uuid
+        }
+
+    async def _lookup_expected_uuid(
+        self,
+        verification_id: str,
+        vc_type: str,
+        vc_hash: str
+    ) -> str:
+        """从区块链获取UUID（阶段1子任务）"""
         logger.info(f"[{verification_id}] 从区块链查询UUID...")
-        expected_uuid = self.blockchain_client.get_vc_uuid(vc_type, vc_hash)
+        expected_uuid = await run_in_thread(self.blockchain_client.get_vc_uuid, vc_type, vc_hash)
         if not expected_uuid:
             raise ValueError(f"无法从区块链获取 vc_hash={vc_hash} 对应的UUID")
 
         logger.info(f"[{verification_id}] 从区块链提取UUID: {expected_uuid}")
+        return expected_uuid
 
-        # 获取或创建连接
+    async def _acquire_connection(
+        self,
+        verification_id: str,
+        holder_did: Optional[str]
+    ) -> str:
+        """获取或创建与Holder的连接（阶段1子任务）"""
         logger.info(f"[{verification_id}] 获取/创建连接...")
         connection_id = await self.connection_manager.get_or_create_connection(holder_did)
         if not connection_id:
             raise ConnectionError("无法建立与Holder的连接")
 
         logger.info(f"[{verification_id}] 使用连接: {connection_id}")
+        return connection_id
 
-        return {
-            'connection_id': connection_id,
-            'vc_type': vc_type,
-            'vc_hash': vc_hash,
-            '_expected_uuid': expected_uuid
-        }
-
-    async def _phase2_build_predicate_request(
+    async def _build_predicate_request_template(
         self,
-        phase1_result: Dict,
+        vc_type: str,
         attributes_to_reveal: Optional[List[str]] = None,
         custom_predicates: Optional[Dict[str, Dict]] = None,
         custom_attribute_restrictions: Optional[Dict[str, Dict]] = None
     ) -> Dict:
-        """阶段2: 构造谓词证明请求"""
-        vc_type = phase1_result['vc_type']
-        expected_uuid = phase1_result.get('_expected_uuid')
-
-        # 合并静态 attribute_filters 和动态 UUID 过滤
-        attribute_filters = {}
-
-        # 1. 添加配置文件中的静态 attribute_filters（零知识验证）
-        policy = self.predicate_builder.get_predicate_policy(vc_type)
-        static_filters = policy.get('attribute_filters', {})
-        if static_filters:
-            attribute_filters.update(static_filters)
-            logger.info(f"添加静态attribute_filters: {list(static_filters.keys())}")
-
-        # 2. 添加UUID过滤（动态从区块链获取）
-        if expected_uuid:
-            attribute_filters['contractName'] = expected_uuid
-            logger.info(f"添加UUID过滤: contractName={expected_uuid}")
-
-        if not attribute_filters:
-            attribute_filters = None
+        """
+        获取谓词证明请求模板（阶段1子任务）
 
-        # 使用谓词证明构造器构建请求
+        模板只包含配置文件中的静态 attribute_filters，UUID过滤和nonce在阶段2补充。
+        相同形状的请求复用构造器中的预编译模板。
+        """
         try:
-            proof_request = self.predicate_builder.build_predicate_proof_request_from_policy(
+            template = self.predicate_builder.get_proof_request_template(
                 vc_type=vc_type,
-                attribute_filters=attribute_filters,
                 custom_predicates=custom_predicates,
                 custom_attributes_to_reveal=attributes_to_reveal,
                 custom_attribute_restrictions=custom_attribute_restrictions
@@ -324,19 +414,23 @@ class VPPredicateOracleService:
             logger.error(f"构造谓词证明请求失败: {e}")
             raise ValueError(f"构造谓词证明请求失败: {e}")
 
-        # 获取使用的谓词配置（用于后续结果解析）
-        policy = self.predicate_builder.get_predicate_policy(vc_type)
-        if custom_predicates:
-            predicates_config = custom_predicates
-        else:
-            predicates_config = policy.get('predicates', {})
+        return template
+
+    async def _phase2_build_predicate_request(self, phase1_result: Dict) -> Dict:
+        """阶段2: 构造谓词证明请求（由阶段1的模板补充UUID过滤和nonce）"""
+        expected_uuid = phase1_result.get('_expected_uuid')
 
-        # 获取attribute_restrictions配置
-        # 如果传入custom_attribute_restrictions，使用它（空字典表示跳过）
-        if custom_attribute_restrictions is not None:
-            attribute_restrictions_config = custom_attribute_restrictions
-        else:
-            attribute_restrictions_config = policy.get('attribute_restrictions', {})
+        # 添加UUID过滤（动态从区块链获取）
+        attribute_filters = None
+        if expected_uuid:
+            attribute_filters = {'contractName': expected_uuid}
+            logger.info(f"添加UUID过滤: contractName={expected_uuid}")
+
+        proof_request = self.predicate_builder.instantiate_proof_request(
+            phase1_result['proof_request_template'],
+            attribute_filters
+        )
+        attribute_restrictions_config = phase1_result['attribute_restrictions_config']
 
         logger.info(f"谓词证明请求构造完成:")
         logger.info(f"  - 名称: {proof_request.get('name')}")
@@ -346,7 +440,7 @@ class VPPredicateOracleService:
 
         return {
             'proof_request': proof_request,
-            'predicates_config': predicates_config,
+            'predicates_config': phase1_result['predicates_config'],
             'attribute_restrictions_config': attribute_restrictions_config
         }
 
@@ -28,7 +28,9 @@ from web3_fixed_connection import FixedWeb3
 # from cross_chain_bridge import CrossChainBridge  # 模块不存在，暂时注释
 
 # 导入 VC 跨链传输服务模块
-from vc_transfer_api import vc_crosschain_service
+from vc_transfer_api import (
+    VC_MANAGER_PAGE_ABI, get_uuid_registry, parse_page_args, read_vc_metadata_page, vc_crosschain_service
+)
 
 # 导入 VC 跨链传输 API 路由 Blueprint
 from vc_transfer_routes import vc_transfer_bp
@@ -1572,8 +1574,12 @@ def vc_issuance_api_issue():
         }
 
         # 直接调用新 Oracle 服务
+        # 透传调用方的幂等键（未提供时由Oracle按 vc_type + attributes 计算），超时重试不会重复发行
         oracle_url = f'{VC_ISSUANCE_ORACLE_URL}/issue-vc'
-        response = requests.post(oracle_url, json=oracle_request, timeout=180)
+        headers = {}
+        if request.headers.get('Idempotency-Key'):
+            headers['Idempotency-Key'] = request.headers['Idempotency-Key']
+        response = requests.post(oracle_url, json=oracle_request, headers=headers, timeout=180)
         result = response.json()
 
         if result.get('status') == 'success':
@@ -1972,11 +1978,16 @@ def api_crosschain_vc_managers():
 
 @app.route('/api/crosschain/vc-hashes/<vc_manager_type>')
 def api_crosschain_vc_hashes(vc_manager_type):
-    """从Chain A VC管理器读取VC哈希列表"""
+    """从Chain A VC管理器分页读取VC哈希列表（?offset=0&limit=100）"""
     try:
         if vc_manager_type not in VC_MANAGERS_CONFIG:
             return jsonify({'success': False, 'error': '无效的VC管理器类型'})
 
+        try:
+            offset, limit = parse_page_args(request.args.get('offset'), request.args.get('limit'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'offset和limit必须是整数'})
+
         manager_address = VC_MANAGERS_CONFIG[vc_manager_type]['address']
 
         # 使用Web3直接调用合约，添加POA中间件支持Besu IBFT
@@ -1993,67 +2004,39 @@ def api_crosschain_vc_hashes(vc_manager_type):
         except Exception as e:
             return jsonify({'success': False, 'error': f'无法连接到Chain A: {str(e)}'})
 
-        # VC Manager ABI - 只需要getAllVCHashes和getVCMetadata方法
-        vc_manager_abi = [
-            {
-                "inputs": [],
-                "name": "getAllVCHashes",
-                "outputs": [{"internalType": "bytes32[]", "name": "", "type": "bytes32[]"}],
-                "stateMutability": "view",
-                "type": "function"
-            },
-            {
-                "inputs": [{"internalType": "bytes32", "name": "_vcHash", "type": "bytes32"}],
-                "name": "getVCMetadata",
-                "outputs": [
-                    {"internalType": "string", "name": "vcName", "type": "string"},
-                    {"internalType": "string", "name": "vcDescription", "type": "string"},
-                    {"internalType": "string", "name": "issuerEndpoint", "type": "string"},
-                    {"internalType": "string", "name": "issuerDID", "type": "string"},
-                    {"internalType": "string", "name": "holderEndpoint", "type": "string"},
-                    {"internalType": "string", "name": "holderDID", "type": "string"},
-                    {"internalType": "address", "name": "vcManagerAddress", "type": "address"},
-                    {"internalType": "uint256", "name": "expiryTime", "type": "uint256"},
-                    {"internalType": "bool", "name": "exists", "type": "bool"}
-                ],
-                "stateMutability": "view",
-                "type": "function"
-            }
-        ]
+        contract = w3.eth.contract(address=manager_address, abi=VC_MANAGER_PAGE_ABI)
 
-        contract = w3.eth.contract(address=manager_address, abi=vc_manager_abi)
-
-        # 获取所有VC哈希
-        vc_hashes = contract.functions.getAllVCHashes().call()
+        # 每页只读取本页的VC哈希和元数据（getVCHashesRange + getVCMetadataBatch）
+        total, page = read_vc_metadata_page(contract, offset, limit)
 
-        # 获取每个VC的元数据
         vc_list = []
-        for vc_hash in vc_hashes:
-            try:
-                metadata = contract.functions.getVCMetadata(vc_hash).call()
-                # metadata是一个元组，按照ABI顺序: (vcName, vcDescription, issuerEndpoint, issuerDID, holderEndpoint, holderDID, vcManagerAddress, expiryTime, exists)
-                if metadata[8]:  # exists == True
-                    vc_list.append({
-                        'hash': vc_hash.hex() if hasattr(vc_hash, 'hex') else vc_hash,
-                        'vcHash': '0x' + (metadata[0].hex() if hasattr(metadata[0], 'hex') else metadata[0]),
-                        'vcDescription': metadata[1],
-                        'issuerEndpoint': metadata[2],
-                        'issuerDID': metadata[3],
-                        'holderEndpoint': metadata[4],
-                        'holderDID': metadata[5],
-                        'vcManagerAddress': metadata[6],
-                        'expiryTime': metadata[7],
-                        'exists': metadata[8]
-                    })
-            except Exception as e:
-                logger.warning(f"无法读取VC {vc_hash} 的元数据: {e}")
-                continue
+        for metadata in page:
+            # metadata按合约VCMetadata结构顺序: (vcHash, vcName, vcDescription, issuerEndpoint, issuerDID,
+            # holderEndpoint, holderDID, blockchainEndpoint, vcManagerAddress, blockchainType, expiryTime, exists)
+            if metadata[11]:  # exists == True
+                vc_hash = metadata[0].hex() if hasattr(metadata[0], 'hex') else metadata[0]
+                vc_list.append({
+                    'hash': vc_hash,
+                    'vcHash': vc_hash if vc_hash.startswith('0x') else '0x' + vc_hash,
+                    'vcName': metadata[1],
+                    'vcDescription': metadata[2],
+                    'issuerEndpoint': metadata[3],
+                    'issuerDID': metadata[4],
+                    'holderEndpoint': metadata[5],
+                    'holderDID': metadata[6],
+                    'vcManagerAddress': metadata[8],
+                    'expiryTime': metadata[10],
+                    'exists': metadata[11]
+                })
 
         return jsonify({
             'success': True,
             'vc_manager_type': vc_manager_type,
             'vc_manager_address': manager_address,
-            'vc_list': vc_list
+            'vc_list': vc_list,
+            'total': total,
+            'offset': offset,
+            'limit': limit
         })
 
     except Exception as e:
@@ -2347,6 +2330,14 @@ def get_latest_uuids_api():
     try:
         vc_type_filter = request.args.get('vc_type', None)
 
+        # 优先使用 UUID 登记表（按类型和时间索引，无需解析整个文件）
+        registry = get_uuid_registry()
+        if registry is not None:
+            return jsonify({
+                'success': True,
+                'data': registry.latest_by_type(vc_type_filter)
+            })
+
         # 读取 uuid.json
         with open(UUID_JSON_PATH, 'r', encoding='utf-8') as f:
             uuid_data = json.load(f)
@@ -3,30 +3,171 @@
 VC 跨链传输 API 模块
 
 实现与 test_vc_transfer_oracle.py 脚本相同的功能：
-1. 从 uuid.json 读取已发行的 VC 记录
+1. 从 UUID 登记表（uuid_registry.db，不存在时回退到 uuid.json）读取已发行的 VC 记录
 2. 发起跨链传输 (initiateCrossChainTransfer)
 3. 等待 Oracle 传输到目标链
 4. 验证目标链是否收到
 """
 
 import json
+import sys
 import time
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
 
-# uuid.json 文件路径
+# uuid.json 文件路径（旧格式，登记表不存在时使用）
 UUID_JSON_PATH = '/home/manifold/cursor/cross-chain-new/VcIssureOracle/logs/uuid.json'
 
+# UUID 登记表路径（VcIssureOracle/uuid_registry.py）
+VC_ISSUANCE_ORACLE_DIR = '/home/manifold/cursor/cross-chain-new/VcIssureOracle'
+UUID_REGISTRY_PATH = '/home/manifold/cursor/cross-chain-new/VcIssureOracle/logs/uuid_registry.db'
+
+# Gas估算缓存（oracle/gas_estimate_cache.py，与发行Oracle、跨链Oracle共用实现）
+ORACLE_DIR = '/home/manifold/cursor/cross-chain-new/oracle'
+
 # 配置文件路径
 CROSS_CHAIN_ORACLE_CONFIG_PATH = '/home/manifold/cursor/cross-chain-new/config/cross_chain_oracle_config.json'
 VC_ISSUANCE_CONFIG_PATH = '/home/manifold/cursor/cross-chain-new/VcIssureOracle/vc_issuance_config.json'
 
+# VC 列表分页（getVCHashesRange + getVCMetadataBatch）
+DEFAULT_VC_PAGE_SIZE = 100
+MAX_VC_PAGE_SIZE = 500
+
+_VC_METADATA_FIELDS = [
+    ("bytes32", "vcHash"), ("string", "vcName"), ("string", "vcDescription"),
+    ("string", "issuerEndpoint"), ("string", "issuerDID"), ("string", "holderEndpoint"),
+    ("string", "holderDID"), ("string", "blockchainEndpoint"), ("address", "vcManagerAddress"),
+    ("string", "blockchainType"), ("uint256", "expiryTime"), ("bool", "exists")
+]
+
+# VC Manager 列表查询所需的 ABI（合约 ABI 文件不存在时使用；旧合约没有分页接口时回退到 getAllVCHashes）
+VC_MANAGER_PAGE_ABI = [
+    {
+        "inputs": [],
+        "name": "getVCCount",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [{"name": "_offset", "type": "uint256"}, {"name": "_limit", "type": "uint256"}],
+        "name": "getVCHashesRange",
+        "outputs": [{"name": "", "type": "bytes32[]"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [{"name": "_vcHashes", "type": "bytes32[]"}],
+        "name": "getVCMetadataBatch",
+        "outputs": [{
+            "components": [{"name": name, "type": type_} for type_, name in _VC_METADATA_FIELDS],
+            "name": "",
+            "type": "tuple[]"
+        }],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "getAllVCHashes",
+        "outputs": [{"name": "", "type": "bytes32[]"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [{"name": "", "type": "bytes32"}],
+        "name": "vcMetadataList",
+        "outputs": [{"name": name, "type": type_} for type_, name in _VC_METADATA_FIELDS],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
 logger = logging.getLogger(__name__)
 
+_uuid_registry = None
+_gas_cache = None
+
+
+def get_uuid_registry():
+    """
+    获取 UUID 登记表（只在登记表文件存在时打开）
+
+    Returns:
+        UUIDRegistry 实例，登记表不存在时返回 None
+    """
+    global _uuid_registry
+    if _uuid_registry is None and Path(UUID_REGISTRY_PATH).exists():
+        if VC_ISSUANCE_ORACLE_DIR not in sys.path:
+            sys.path.insert(0, VC_ISSUANCE_ORACLE_DIR)
+        from uuid_registry import UUIDRegistry
+        _uuid_registry = UUIDRegistry(UUID_REGISTRY_PATH)
+    return _uuid_registry
+
+
+def get_gas_cache(config: Optional[Dict] = None):
+    """
+    获取 Gas 估算缓存（进程内共享）
+
+    Args:
+        config: gas_cache 配置段（首次创建时使用）
+
+    Returns:
+        GasEstimateCache 实例
+    """
+    global _gas_cache
+    if _gas_cache is None:
+        if ORACLE_DIR not in sys.path:
+            sys.path.insert(0, ORACLE_DIR)
+        from gas_estimate_cache import GasEstimateCache
+        _gas_cache = GasEstimateCache.from_config(config)
+    return _gas_cache
+
+
+def parse_page_args(offset: Any, limit: Any) -> Tuple[int, int]:
+    """
+    解析分页参数
+
+    Args:
+        offset: 起始位置（查询参数，可为 None）
+        limit: 每页数量（查询参数，可为 None）
+
+    Returns:
+        (offset, limit)，limit 限制在 1..MAX_VC_PAGE_SIZE
+    """
+    offset = max(int(offset or 0), 0)
+    limit = min(max(int(limit or DEFAULT_VC_PAGE_SIZE), 1), MAX_VC_PAGE_SIZE)
+    return offset, limit
+
+
+def read_vc_metadata_page(vc_manager, offset: int, limit: int) -> Tuple[int, List[Tuple]]:
+    """
+    分页读取 VC Manager 中的 VC 元数据（每页 3 次合约调用，与 VC 总数无关）
+
+    旧版合约没有 getVCHashesRange / getVCMetadataBatch 时，回退到 getAllVCHashes + 逐个读取 vcMetadataList。
+
+    Args:
+        vc_manager: VC Manager 合约实例
+        offset: 起始位置
+        limit: 每页数量
+
+    Returns:
+        (VC 总数, 本页元数据列表)，元数据字段顺序见 _VC_METADATA_FIELDS
+    """
+    total = vc_manager.functions.getVCCount().call()
+    try:
+        vc_hashes = vc_manager.functions.getVCHashesRange(offset, limit).call()
+        return total, list(vc_manager.functions.getVCMetadataBatch(vc_hashes).call()) if vc_hashes else []
+    except Exception as e:
+        logger.warning(f"分页接口调用失败，回退到 getAllVCHashes：{e}")
+
+    vc_hashes = vc_manager.functions.getAllVCHashes().call()[offset:offset + limit]
+    return total, [vc_manager.functions.vcMetadataList(vc_hash).call() for vc_hash in vc_hashes]
+
 
 class VCCrossChainService:
     """VC 跨链传输服务类"""
@@ -136,12 +277,32 @@ class VCCrossChainService:
 
     def get_issued_vcs_from_log(self) -> Dict:
         """
-        从 uuid.json 读取已发行的 VC 记录
+        读取已发行的 VC 记录（优先使用 UUID 登记表，不存在时读取 uuid.json）
 
         Returns:
             包含 VC 列表的字典
         """
         try:
+            registry = get_uuid_registry()
+            if registry is not None:
+                result = [
+                    {
+                        'uuid': record['uuid'],
+                        'timestamp': record.get('timestamp') or '',
+                        'vc_type': record.get('vc_type') or '',
+                        'contract_name': record.get('original_contract_name') or '',
+                        'vc_hash': record.get('vc_hash') or '',
+                        'tx_hash': record.get('tx_hash') or '',
+                        'request_id': record.get('request_id') or ''
+                    }
+                    for record in registry.query()
+                ]
+                return {
+                    'success': True,
+                    'vcs': result,
+                    'total': len(result)
+                }
+
             uuid_file = UUID_JSON_PATH
             if not Path(uuid_file).exists():
                 return {
@@ -257,7 +418,14 @@ class VCCrossChainService:
             vc_hash_bytes = bytes.fromhex(vc_hash.replace('0x', ''))
 
             gas_price = self.config.get('blockchain', {}).get('gas_price', 1000000000)
-            gas_limit = self.config.get('blockchain', {}).get('gas_limit', 5000000)
+
+            # gas limit 取自 Gas 估算缓存（估算失败时使用配置的 gas_limit）
+            function_call = vc_manager.functions.initiateCrossChainTransfer(vc_hash_bytes, target_chain)
+            gas_cache = get_gas_cache(self.config.get('blockchain', {}).get('gas_cache'))
+            gas_limit = gas_cache.gas_limit(
+                function_call, caller_address,
+                fallback=self.config.get('blockchain', {}).get('gas_limit', 5000000)
+            )
 
             # ========== 添加详细的日志输出 ==========
             logger.info("=" * 60)
@@ -313,10 +481,7 @@ class VCCrossChainService:
             nonce = w3.eth.get_transaction_count(caller_address)
 
             # 构建 initiateCrossChainTransfer 交易
-            txn = vc_manager.functions.initiateCrossChainTransfer(
-                vc_hash_bytes,
-                target_chain
-            ).build_transaction({
+            txn = function_call.build_transaction({
                 'from': caller_address,
                 'gas': gas_limit,
                 'gasPrice': gas_price,
@@ -334,12 +499,14 @@ class VCCrossChainService:
                 tx_hash_hex = tx_hash.hex()
             else:
                 tx_hash_hex = tx_hash if isinstance(tx_hash, str) else str(tx_hash)
+            gas_cache.track(tx_hash_hex, function_call, gas_limit)
 
             logger.info(f"交易已发送！tx_hash={tx_hash_hex}")
             logger.info(f"等待交易确认...")
 
             # 等待交易确认
             receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            gas_cache.observe_receipt(tx_hash_hex, receipt)
 
             if receipt['status'] != 1:
                 error_msg = f"initiateCrossChainTransfer 交易失败！tx_hash: {tx_hash_hex}"
@@ -587,8 +754,19 @@ class VCCrossChainService:
                 'error': str(e)
             }
 
-    def get_all_vc_hashes(self, vc_manager_type: str) -> Dict:
-        """从 Chain A VC Manager 获取所有 VC 哈希列表"""
+    def get_all_vc_hashes(self, vc_manager_type: str, offset: int = 0,
+                          limit: int = DEFAULT_VC_PAGE_SIZE) -> Dict:
+        """
+        从 Chain A VC Manager 分页获取 VC 哈希列表
+
+        Args:
+            vc_manager_type: VC Manager 类型
+            offset: 起始位置
+            limit: 每页数量
+
+        Returns:
+            包含 VC 列表和总数的字典
+        """
         try:
             # 构建 VC 类型到 Manager 配置的映射
             vc_type = None
@@ -622,68 +800,39 @@ class VCCrossChainService:
             vc_manager_abi = self._load_contract_abi(contract_name)
 
             if not vc_manager_abi:
-                vc_manager_abi = [
-                    {
-                        "inputs": [],
-                        "name": "getAllVCHashes",
-                        "outputs": [{"name": "", "type": "bytes32[]"}],
-                        "stateMutability": "view",
-                        "type": "function"
-                    },
-                    {
-                        "inputs": [{"name": "_vcHash", "type": "bytes32"}],
-                        "name": "getVCMetadata",
-                        "outputs": [
-                            {"name": "vcName", "type": "string"},
-                            {"name": "vcDescription", "type": "string"},
-                            {"name": "issuerEndpoint", "type": "string"},
-                            {"name": "issuerDID", "type": "string"},
-                            {"name": "holderEndpoint", "type": "string"},
-                            {"name": "holderDID", "type": "string"},
-                            {"name": "vcManagerAddress", "type": "address"},
-                            {"name": "expiryTime", "type": "uint256"},
-                            {"name": "exists", "type": "bool"}
-                        ],
-                        "stateMutability": "view",
-                        "type": "function"
-                    }
-                ]
+                vc_manager_abi = VC_MANAGER_PAGE_ABI
 
             vc_manager = w3.eth.contract(
                 address=Web3.to_checksum_address(auth_config['vc_manager_address']),
                 abi=vc_manager_abi
             )
 
-            # 获取所有 VC 哈希
-            vc_hashes = vc_manager.functions.getAllVCHashes().call()
+            total, page = read_vc_metadata_page(vc_manager, offset, limit)
 
-            # 获取每个 VC 的元数据
             vc_list = []
-            for vc_hash in vc_hashes:
-                try:
-                    metadata = vc_manager.functions.getVCMetadata(vc_hash).call()
-                    if metadata[8]:  # exists == True
-                        vc_list.append({
-                            'hash': vc_hash.hex() if hasattr(vc_hash, 'hex') else vc_hash,
-                            'vc_name': metadata[0],
-                            'vc_description': metadata[1],
-                            'issuer_endpoint': metadata[2],
-                            'issuer_did': metadata[3],
-                            'holder_endpoint': metadata[4],
-                            'holder_did': metadata[5],
-                            'vc_manager_address': metadata[6],
-                            'expiry_time': metadata[7],
-                            'exists': metadata[8]
-                        })
-                except Exception as e:
-                    logger.warning(f"无法读取 VC 元数据：{vc_hash}, 错误：{e}")
-                    continue
+            for metadata in page:
+                if metadata[11]:  # exists == True
+                    vc_list.append({
+                        'hash': metadata[0].hex() if hasattr(metadata[0], 'hex') else metadata[0],
+                        'vc_name': metadata[1],
+                        'vc_description': metadata[2],
+                        'issuer_endpoint': metadata[3],
+                        'issuer_did': metadata[4],
+                        'holder_endpoint': metadata[5],
+                        'holder_did': metadata[6],
+                        'vc_manager_address': metadata[8],
+                        'expiry_time': metadata[10],
+                        'exists': metadata[11]
+                    })
 
             return {
                 'success': True,
                 'vc_manager_type': vc_manager_type,
                 'vc_manager_address': auth_config['vc_manager_address'],
-                'vc_list': vc_list
+                'vc_list': vc_list,
+                'total': total,
+                'offset': offset,
+                'limit': limit
             }
 
         except Exception as e:
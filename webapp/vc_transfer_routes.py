@@ -7,7 +7,7 @@ VC 跨链传输 API 路由模块
 
 import logging
 from flask import Blueprint, jsonify, request
-from vc_transfer_api import vc_crosschain_service
+from vc_transfer_api import parse_page_args, vc_crosschain_service
 
 logger = logging.getLogger(__name__)
 
@@ -238,16 +238,21 @@ def get_bridge_record(vc_hash: str):
 @vc_transfer_bp.route('/all-vc-hashes/<vc_manager_type>', methods=['GET'])
 def get_all_vc_hashes(vc_manager_type: str):
     """
-    从 Chain A VC Manager 获取所有 VC 哈希列表
+    从 Chain A VC Manager 分页获取 VC 哈希列表（?offset=0&limit=100）
 
     Args:
         vc_manager_type: VC Manager 类型（如 InspectionReportVCManager）
 
     Returns:
-        JSON VC 列表
+        JSON VC 列表（含 total、offset、limit）
     """
     try:
-        result = vc_crosschain_service.get_all_vc_hashes(vc_manager_type)
+        try:
+            offset, limit = parse_page_args(request.args.get('offset'), request.args.get('limit'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'offset 和 limit 必须是整数'}), 400
+
+        result = vc_crosschain_service.get_all_vc_hashes(vc_manager_type, offset, limit)
         return jsonify(result)
 
     except Exception as e: